@@ -29,6 +29,7 @@ from .graph.jsonparser import *
 from .tensor import *
 from .local_search.simulated_annealing import anneal
 from .local_search.genetic import GeneticOptimizer
+from .local_search.parallel import parallel_anneal, parallel_evolve
 from .circuit.qasmparser import qasm
 from .circuit.sqasm import sqasm
 from . import generate
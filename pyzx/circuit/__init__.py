@@ -15,7 +15,7 @@
 # limitations under the License.
 
 import os
-from typing import List, Union, Optional, Iterator, Dict
+from typing import List, Union, Optional, Iterator, Dict, Any, TYPE_CHECKING
 
 import numpy as np
 
@@ -25,6 +25,8 @@ from .gates import (Gate, gate_types, NOT, Y, Z, HAD, XPhase, YPhase, ZPhase, U2
 
 from ..graph.base import BaseGraph
 from ..utils import EdgeType
+if TYPE_CHECKING:
+    from ..simulate import EquivalenceResult
 
 CircuitLike = Union['Circuit', Gate]
 
@@ -129,6 +131,15 @@ class Circuit(object):
         else:
             return False
 
+    def verify_equality_sampled(self, other: 'Circuit', **kwargs: Any) -> 'EquivalenceResult':
+        """Checks equality with the other circuit by composing it with the adjoint of this one
+        chunk by chunk and, if that does not reduce to the identity, comparing the values of
+        random product states. Unlike :meth:`verify_equality` this can also disprove equality.
+        Returns an :class:`~pyzx.simulate.EquivalenceResult`. The keyword arguments are passed
+        on to :func:`~pyzx.simulate.verify_equality_sampled`."""
+        from ..simulate import verify_equality_sampled
+        return verify_equality_sampled(self, other, **kwargs)
+
     def add_gate(self, gate: Union[Gate,str], *args, **kwargs) -> None:
         """Adds a gate to the circuit. ``gate`` can either be
         an instance of a :class:`Gate`, or it can be the name of a gate,
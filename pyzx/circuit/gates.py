@@ -19,7 +19,6 @@ This file contains the definition of commonly used
 quantum gates for use in the Circuit class.
 """
 
-import copy
 import math
 from fractions import Fraction
 from typing import Dict, List, Optional, Type, ClassVar, TypeVar, Generic, Set
@@ -228,7 +227,10 @@ class Gate(object):
         return c@c2
 
     def copy(self: Tvar) -> Tvar:
-        return copy.copy(self)
+        # Same as copy.copy, since gates keep all their state in __dict__, but without its overhead
+        g = self.__class__.__new__(self.__class__)
+        g.__dict__.update(self.__dict__)
+        return g
 
     def to_adjoint(self: Tvar) -> Tvar:
         g = self.copy()
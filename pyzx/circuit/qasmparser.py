@@ -18,13 +18,28 @@
 import math
 import re
 from fractions import Fraction
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional, Union
 
 from . import Circuit
 from .gates import Gate, qasm_gate_table, Measurement, Reset, ConditionalGate
 from ..utils import settings
 
 
+# Splits QASM source into statement text and the delimiters ``;``, ``{``, ``}`` and comments.
+# As this is a single ``re.split``, the whole source is tokenized in one linear pass.
+_TOKEN_RE = re.compile(r'(//[^\n]*|/\*.*?\*/|[{};])', re.S)
+_VERSION_RE = re.compile(r"OPENQASM ([23])(\.\d+)?")
+_IF_RE = re.compile(r'if\s*\(\s*(\w+)\s*==\s*(\d+)\s*\)\s*(.*)', re.S)
+_IF_HEADER_RE = re.compile(r'if\s*\([^)]*\)$')
+_QASM3_BIT_RE = re.compile(r"^bit\[(\d+)] (\w+)$")
+_QASM3_QUBIT_RE = re.compile(r"^qubit\[(\d+)] (\w+)$")
+_QASM3_MEASURE_RE = re.compile(r"^(\w+)\[(\d+)] = measure (\w+)\[(\d+)]$")
+
+# A statement is either a plain command, or a block header (``gate ...`` or ``if (...)``)
+# together with the commands in its body.
+Statement = Union[str, Tuple[str, List[str]]]
+
+
 class QASMParser(object):
     """Class for parsing QASM source files into circuit descriptions."""
 
@@ -37,6 +52,7 @@ class QASMParser(object):
         self.qubit_count: int = 0
         self.bit_count: int = 0
         self.circuit: Optional[Circuit] = None
+        self._phase_cache: Dict[str,Fraction] = {}
 
     def parse(self, s: str, strict:bool=True) -> Circuit:
         self.gates = []
@@ -46,41 +62,34 @@ class QASMParser(object):
         self.qubit_count = 0
         self.bit_count = 0
         self.circuit = None
-        lines = s.splitlines()
-        r = []
-        #strip comments
-        for s in lines:
-            if s.find("//")!=-1:
-                t = s[0:s.find("//")].strip()
-            else: t = s.strip()
-            if t: r.append(t)
+        self._phase_cache = {}
+        statements = self._statements(s)
 
-        match = re.fullmatch(r"OPENQASM ([23])(\.\d+)?;", r[0])
+        match = _VERSION_RE.fullmatch(statements[0]) if statements and isinstance(statements[0], str) else None
         if match and match.group(1):
             self.qasm_version = int(match.group(1))
-            r.pop(0)
+            statements.pop(0)
         elif strict:
             raise TypeError("File does not start with supported OPENQASM descriptor.")
 
-        if self.qasm_version == 2 and r[0].startswith('include "qelib1.inc";') or \
-                self.qasm_version == 3 and r[0].startswith('include "stdgates.inc";'):
-            r.pop(0)
+        if statements and (self.qasm_version == 2 and statements[0] == 'include "qelib1.inc"' or
+                self.qasm_version == 3 and statements[0] == 'include "stdgates.inc"'):
+            statements.pop(0)
         elif strict:
             raise TypeError("File is not importing standard library")
 
-        data = "\n".join(r)
-        # Strip the custom command definitions from the normal commands
-        while True:
-            i = data.find("gate ")
-            if i == -1: break
-            j = data.find("}", i)
-            self.parse_custom_gate(data[i:j+1])
-            data = data[:i] + data[j+1:]
-        data = self._expand_if_blocks(data)
-        # Parse the regular commands.
-        commands = [s.strip() for s in data.split(";") if s.strip()]
-        for c in commands:
-            self.gates.extend(self.parse_command(c, self.registers))
+        for st in statements:
+            if isinstance(st, str):
+                self.gates.extend(self.parse_command(st, self.registers))
+                continue
+            header, body = st
+            if header.startswith("gate") and header[4:5].isspace():
+                self.parse_custom_gate(header, body)
+            elif _IF_HEADER_RE.match(header):
+                for c in body:
+                    self.gates.extend(self.parse_command(header + ' ' + c, self.registers))
+            else:
+                raise TypeError("Unsupported block: {}".format(header))
 
         self.bit_count = sum(self.cregisters.values())
         circ = Circuit(self.qubit_count, bit_amount=self.bit_count)
@@ -89,44 +98,59 @@ class QASMParser(object):
         return self.circuit
 
     @staticmethod
-    def _expand_if_blocks(s: str) -> str:
-        """Expand braced if-blocks into flat if-statements.
-
-        E.g. ``if (c==1) { x q[0]; z q[1]; }`` becomes
-        ``if (c==1) x q[0]; if (c==1) z q[1];``
+    def _statements(s: str) -> List[Statement]:
+        """Splits QASM source into statements in a single pass.
 
-        This is done before semicolon-splitting so that the braces do
-        not break the command boundaries.  Nested if-blocks (e.g.
-        ``if (c==1) { if (c==0) { x q[0]; } }``) are rejected.
+        Comments are dropped and the text between ``;`` delimiters becomes a command.
+        A braced block ``header { a; b; }`` becomes the tuple ``(header, [a, b])``.
+        Nested blocks (e.g. ``if (c==1) { if (c==0) { x q[0]; } }``) are rejected.
         """
-        pattern = re.compile(r'if\s*\([^)]*\)\s*\{')
-        while True:
-            m = pattern.search(s)
-            if m is None:
-                break
-            prefix = m.group()          # e.g. "if (c==1) {"
-            condition = prefix[:prefix.rfind('{')].strip()  # "if (c==1)"
-            brace_start = m.end()
-            try:
-                brace_end = s.index('}', brace_start)
-            except ValueError:
+        pieces = _TOKEN_RE.split(s)
+        statements: List[Statement] = []
+        block: Optional[Tuple[str, List[str]]] = None
+        text: List[str] = []
+        for i, piece in enumerate(pieces):
+            if i % 2 == 0:
+                text.append(piece)
+                continue
+            if piece[0] == '/': continue  # A comment
+            t = ''.join(text).strip()
+            text = []
+            if piece == ';':
+                if t: (block[1] if block is not None else statements).append(t)
+            elif piece == '{':
+                if block is not None:
+                    if block[0].startswith('if'):
+                        raise TypeError("Nested if-blocks are not supported: {} {{ {}".format(block[0], t))
+                    raise TypeError("Nested blocks are not supported: {} {{ {}".format(block[0], t))
+                block = (t, [])
+            else:
+                if block is None:
+                    raise TypeError("Unmatched '}}' after: {}".format(t))
+                if t: block[1].append(t)
+                statements.append(block)
+                block = None
+        t = ''.join(text).strip()
+        if block is not None:
+            if block[0].startswith('if'):
                 raise TypeError(
                     "Unterminated if-block (missing closing '}}') near: "
-                    "{}".format(s[m.start():m.start() + 80].strip()))
-            body = s[brace_start:brace_end]
-            # Reject nested if-blocks.
-            if '{' in body:
-                raise TypeError(
-                    "Nested if-blocks are not supported: {}".format(
-                        s[m.start():brace_end + 1].strip()))
-            inner_cmds = [c.strip() for c in body.split(';') if c.strip()]
-            expanded = '; '.join(condition + ' ' + c for c in inner_cmds) + ';'
-            s = s[:m.start()] + expanded + s[brace_end + 1:]
-        return s
+                    "{}".format(block[0]))
+            raise TypeError("Unterminated block (missing closing '}}') near: {}".format(block[0]))
+        if t: statements.append(t)
+        return statements
 
-    def parse_custom_gate(self, data: str) -> None:
-        data = data[5:]
-        spec, body = data.split("{",1)
+    def parse_custom_gate(self, spec: str, commands: Optional[List[str]] = None) -> None:
+        """Compiles the definition ``gate spec { commands }`` into a template circuit,
+        which is repositioned onto the arguments whenever the gate is used.
+        Without ``commands``, ``spec`` is the whole definition ``gate name args { body }``."""
+        if commands is None:
+            statements = self._statements(spec)
+            if len(statements) != 1 or isinstance(statements[0], str):
+                raise TypeError("Not a custom gate definition: {}".format(spec))
+            spec, commands = statements[0]
+        data = "{} {{ {} }}".format(spec, "; ".join(commands))
+        spec = spec[5:]
         if "(" in spec:
             i = spec.find("(")
             j = spec.find(")")
@@ -151,8 +175,6 @@ class QASMParser(object):
             registers[a] = (qubit_count,1)
             qubit_count += 1
 
-        body = body[:-1].strip()
-        commands = [s.strip() for s in body.split(";") if s.strip()]
         circ = Circuit(qubit_count)
         for c in commands:
             for g in self.parse_command(c, registers):
@@ -162,9 +184,9 @@ class QASMParser(object):
     def extract_command_parts(self, c: str) -> Tuple[str,List[Fraction],List[str]]:
         if self.qasm_version == 3:
             # Convert some OpenQASM 3 commands into OpenQASM 2 format.
-            c = re.sub(r"^bit\[(\d+)] (\w+)$", r"creg \2[\1]", c)
-            c = re.sub(r"^qubit\[(\d+)] (\w+)$", r"qreg \2[\1]", c)
-            c = re.sub(r"^(\w+)\[(\d+)] = measure (\w+)\[(\d+)]$", r"measure \3[\4] -> \1[\2]", c)
+            c = _QASM3_BIT_RE.sub(r"creg \2[\1]", c)
+            c = _QASM3_QUBIT_RE.sub(r"qreg \2[\1]", c)
+            c = _QASM3_MEASURE_RE.sub(r"measure \3[\4] -> \1[\2]", c)
         right_bracket = c.find(")")
         name, rest = c.split(" ", 1) if right_bracket == -1\
             else [c[:right_bracket+1], c[right_bracket+1:]]
@@ -175,7 +197,7 @@ class QASMParser(object):
             if right_bracket == -1:
                 raise TypeError("Mismatched bracket: {}.".format(name))
             vals = name[left_bracket+1:right_bracket].split(',')
-            phases = [self.parse_phase_arg(val) for val in vals]
+            phases = [self._parse_phase_cached(val) for val in vals]
             name = name[:left_bracket]
         return name, phases, args
 
@@ -183,7 +205,7 @@ class QASMParser(object):
         gates: List[Gate] = []
         # Handle `if (creg == val) gate args;` before extract_command_parts,
         # because the parentheses in `if(...)` confuse the phase parser.
-        if_match = re.match(r'if\s*\(\s*(\w+)\s*==\s*(\d+)\s*\)\s*(.*)', c)
+        if_match = _IF_RE.match(c) if c.startswith('if') else None
         if if_match:
             reg_name = if_match.group(1)
             cond_val = int(if_match.group(2))
@@ -302,48 +324,20 @@ class QASMParser(object):
                     raise TypeError("Argument amount does not match gate spec: {}".format(c))
                 for g in circ.gates:
                     gates.append(g.reposition(argset))
-            elif name in ('x', 'y', 'z', 's', 't', 'h', 'sx'):
-                if len(phases) != 0: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](argset[0])  # type: ignore # mypy can't handle Gate subclasses with different number of parameters
-                gates.append(g)
-            elif name in ('sdg', 'tdg', 'sxdg'):
-                if len(phases) != 0: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](argset[0],adjoint=True)  # type: ignore
-                gates.append(g)
-            elif name in ('rx', 'ry', 'rz', 'p', 'u1'):
-                if len(phases) != 1: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](argset[0],phase=phases[0])  # type: ignore
-                gates.append(g)
-            elif name == 'u2':
-                if len(phases) != 2: raise TypeError("Invalid specification {}".format(c))
-                gates.append(qasm_gate_table[name](argset[0], phases[0], phases[1]))  # type: ignore
-            elif name in ('u3', 'u', 'U'):
-                if len(phases) != 3: raise TypeError("Invalid specification {}".format(c))
-                gates.append(qasm_gate_table[name](argset[0], phases[0], phases[1], phases[2]))  # type: ignore
-            elif name in ('cx', 'CX', 'cy', 'cz', 'ch', 'csx', 'swap'):
-                if len(phases) != 0: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](control=argset[0],target=argset[1])  # type: ignore
-                gates.append(g)
-            elif name in ('crx', 'cry', 'crz', 'cp', 'cphase', 'cu1', 'rxx', 'rzz'):
-                if len(phases) != 1: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](argset[0],argset[1],phase=phases[0])  # type: ignore
-                gates.append(g)
-            elif name in ('ccx', 'ccz', 'cswap'):
-                if len(phases) != 0: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](ctrl1=argset[0],ctrl2=argset[1],target=argset[2])  # type: ignore
-                gates.append(g)
-            elif name == 'cu3':
-                if len(phases) != 3: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](control=argset[0],target=argset[1],theta=phases[0],phi=phases[1],rho=phases[2])  # type: ignore
-                gates.append(g)
-            elif name == 'cu':
-                if len(phases) != 4: raise TypeError("Invalid specification {}".format(c))
-                g = qasm_gate_table[name](control=argset[0],target=argset[1],theta=phases[0],phi=phases[1],rho=phases[2],gamma=phases[3])  # type: ignore
-                gates.append(g)
-            else:
+                continue
+            if name not in _GATE_BUILDERS:
                 raise TypeError("Invalid specification: {}".format(c))
+            n_phases, build = _GATE_BUILDERS[name]
+            if len(phases) != n_phases: raise TypeError("Invalid specification {}".format(c))
+            gates.append(build(name, argset, phases))
         return gates
 
+    def _parse_phase_cached(self, val: str) -> Fraction:
+        phase = self._phase_cache.get(val)
+        if phase is None:
+            phase = self._phase_cache[val] = self.parse_phase_arg(val)
+        return phase
+
     def parse_phase_arg(self, val):
         try:
             phase = float(val)/math.pi
@@ -370,6 +364,28 @@ class QASMParser(object):
         return phase
 
 
+# For every standard gate, the number of phase parameters it takes and how to build it from
+# (name, qubit arguments, phases).
+_GATE_BUILDERS: Dict[str, Tuple[int, Callable[[str, List[int], List[Fraction]], Gate]]] = {}
+for _name in ('x', 'y', 'z', 's', 't', 'h', 'sx'):
+    _GATE_BUILDERS[_name] = (0, lambda name, a, p: qasm_gate_table[name](a[0]))  # type: ignore # mypy can't handle Gate subclasses with different number of parameters
+for _name in ('sdg', 'tdg', 'sxdg'):
+    _GATE_BUILDERS[_name] = (0, lambda name, a, p: qasm_gate_table[name](a[0],adjoint=True))  # type: ignore
+for _name in ('rx', 'ry', 'rz', 'p', 'u1'):
+    _GATE_BUILDERS[_name] = (1, lambda name, a, p: qasm_gate_table[name](a[0],phase=p[0]))  # type: ignore
+_GATE_BUILDERS['u2'] = (2, lambda name, a, p: qasm_gate_table[name](a[0], p[0], p[1]))  # type: ignore
+for _name in ('u3', 'u', 'U'):
+    _GATE_BUILDERS[_name] = (3, lambda name, a, p: qasm_gate_table[name](a[0], p[0], p[1], p[2]))  # type: ignore
+for _name in ('cx', 'CX', 'cy', 'cz', 'ch', 'csx', 'swap'):
+    _GATE_BUILDERS[_name] = (0, lambda name, a, p: qasm_gate_table[name](control=a[0],target=a[1]))  # type: ignore
+for _name in ('crx', 'cry', 'crz', 'cp', 'cphase', 'cu1', 'rxx', 'rzz'):
+    _GATE_BUILDERS[_name] = (1, lambda name, a, p: qasm_gate_table[name](a[0],a[1],phase=p[0]))  # type: ignore
+for _name in ('ccx', 'ccz', 'cswap'):
+    _GATE_BUILDERS[_name] = (0, lambda name, a, p: qasm_gate_table[name](ctrl1=a[0],ctrl2=a[1],target=a[2]))  # type: ignore
+_GATE_BUILDERS['cu3'] = (3, lambda name, a, p: qasm_gate_table[name](control=a[0],target=a[1],theta=p[0],phi=p[1],rho=p[2]))  # type: ignore
+_GATE_BUILDERS['cu'] = (4, lambda name, a, p: qasm_gate_table[name](control=a[0],target=a[1],theta=p[0],phi=p[1],rho=p[2],gamma=p[3]))  # type: ignore
+
+
 def qasm(s: str) -> Circuit:
     """Parses a string representing a program in QASM, and outputs a `Circuit`."""
     p = QASMParser()
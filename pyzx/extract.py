@@ -22,7 +22,7 @@ import itertools
 from typing_extensions import deprecated
 
 from .utils import EdgeType, VertexType, toggle_edge
-from .linalg import Mat2, Z2
+from .linalg import Mat2, Z2, pack_row
 from .simplify import id_simp, tcount, full_reduce, is_graph_like, pivot_simp
 from .rewrite_rules import *
 from .circuit import Circuit
@@ -168,16 +168,26 @@ def _find_targets(
 def xor_rows(l1: List[Z2], l2: List[Z2]) -> List[Z2]:
     return [0 if l1[i]==l2[i] else 1 for i in range(len(l1))]
 
+# The greedy searches below add together many rows of the biadjacency matrix,
+# so they work on the rows packed into integers, see :func:`~pyzx.linalg.pack_row`.
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+def _is_single_bit(x: int) -> bool:
+    """Whether the packed row contains exactly one 1."""
+    return x != 0 and x & (x - 1) == 0
+
 
 def find_minimal_sums(m: Mat2, reversed_search=False) -> Optional[Tuple[int, ...]]:
     """Returns a list of rows in m that can be added together to reduce one of the rows so that
     it only contains a single 1. Used in :func:`greedy_reduction`"""
     r = m.rows()
-    d = m.data
-    if any(sum(r) == 1 for r in d):
+    d = [pack_row(row) for row in m.data]
+    if any(_is_single_bit(row) for row in d):
         return tuple()
-    combs:  Dict[Tuple[int, ...], List[Z2]] = {(i,): d[i] for i in range(r)}
-    combs2: Dict[Tuple[int, ...], List[Z2]] = {}
+    combs:  Dict[Tuple[int, ...], int] = {(i,): d[i] for i in range(r)}
+    combs2: Dict[Tuple[int, ...], int] = {}
     iterations = 0
     while True:
         combs2 = {}
@@ -185,10 +195,8 @@ def find_minimal_sums(m: Mat2, reversed_search=False) -> Optional[Tuple[int, ...
             max_index: int = max(index)
             rr: range = range(max_index + 1, r) if not reversed_search else range(r - 1, max_index, -1)
             for k in rr:
-                # Unrolled xor_rows(combs[index],d[k])
-                row: List[Z2] = [0 if v1 == v2 else 1 for v1, v2 in zip(combs[index], d[k])]
-                # row = xor_rows(combs[index],d[k])
-                if sum(row) == 1:
+                row = l ^ d[k]
+                if _is_single_bit(row):
                     return (*index, k)
                 combs2[(*index, k)] = row
                 iterations += 1
@@ -207,8 +215,8 @@ def greedy_reduction(m: Mat2) -> Optional[List[Tuple[int, int]]]:
     indicest = find_minimal_sums(m)
     if indicest is None: return indicest
     indices = list(indicest)
-    rows = {i:m.data[i] for i in indices}
-    weights: Dict[int,int] = {i: sum(r) for i,r in rows.items()}
+    rows = {i:pack_row(m.data[i]) for i in indices}
+    weights: Dict[int,int] = {i: _popcount(r) for i,r in rows.items()}
     result = []
     while len(indices)>1:
         best = (-1,-1)
@@ -216,7 +224,7 @@ def greedy_reduction(m: Mat2) -> Optional[List[Tuple[int, int]]]:
         for i in indices:
             for j in indices:
                 if j <= i: continue
-                w = sum(xor_rows(rows[i],rows[j]))
+                w = _popcount(rows[i] ^ rows[j])
                 if weights[i] - w > reduction:
                     best = (j,i) # "Add row j to i"
                     reduction = weights[i] - w
@@ -225,7 +233,7 @@ def greedy_reduction(m: Mat2) -> Optional[List[Tuple[int, int]]]:
                     reduction = weights[j] - w
         result.append(best)
         control, target = best
-        rows[target] = xor_rows(rows[control],rows[target])
+        rows[target] = rows[control] ^ rows[target]
         weights[target] = weights[target] - reduction
         indices.remove(control)
     return result
@@ -357,32 +365,25 @@ def max_overlap(cz_matrix: Mat2) -> Tuple[Tuple[int,int],List[int]]:
     Used in :func:`extract_circuit` to more optimally place CZ gates. 
     """
     N = len(cz_matrix.data[0])
+    rows = [pack_row(row) for row in cz_matrix.data]
+    czs = [_popcount(row) for row in rows]
 
     max_inner_product = 0
-    final_common_qbs = list()
+    final_common = 0
     overlapping_rows = (-1,-1)
     for i in range(N):
         for j in range(i+1,N):
-            inner_product = 0
-            i_czs = 0
-            j_czs = 0
-            common_qbs = list()
-            for k in range(N):
-                i_czs += cz_matrix.data[i][k]
-                j_czs += cz_matrix.data[j][k]
-
-                if cz_matrix.data[i][k]!=0 and cz_matrix.data[j][k]!=0:
-                    inner_product+=1
-                    common_qbs.append(k)
-
+            common = rows[i] & rows[j]
+            if not common: continue
+            inner_product = _popcount(common)
             if inner_product > max_inner_product:
                 max_inner_product = inner_product
-                if i_czs < j_czs:
+                if czs[i] < czs[j]:
                     overlapping_rows = (j,i)
                 else:
                     overlapping_rows = (i,j)
-                final_common_qbs = common_qbs
-    return (overlapping_rows,final_common_qbs)
+                final_common = common
+    return (overlapping_rows,[k for k in range(N) if final_common >> k & 1])
 
 def filter_duplicate_cnots(cnots: List[CNOT]) -> List[CNOT]:
     """Cancels adjacent CNOT gates in a list of CNOT gates."""
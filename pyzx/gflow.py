@@ -15,13 +15,49 @@
 # limitations under the License.
 
 from fractions import Fraction
-from typing import Dict, Set, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 
-from .linalg import Mat2
 from .graph.base import BaseGraph, VT, ET
 from .utils import phase_is_clifford, phase_is_pauli, vertex_is_zx
 
 
+def _reduce_flow_demand(rows: List[int]) -> Tuple[List[Tuple[int, int]], int]:
+    """Brings the F2 matrix with the given rows (as bitsets) into reduced row echelon form.
+
+    The row operations are tracked, so that ``M * x = e_u`` can be solved for every ``u``
+    from this single reduction, which gives the same particular solution as :meth:`Mat2.solve`.
+
+    Returns:
+        A list of pairs ``(c, ops)``, one for every pivot row, where ``c`` is the column
+        of the pivot and bit ``u`` of ``ops`` is the ``u``-th entry of the reduced ``e_u``
+        in that row, and a bitset with bit ``u`` set iff ``M * x = e_u`` has no solution.
+    """
+    rows = list(rows)
+    ops = [1 << i for i in range(len(rows))]
+    pivots: List[Tuple[int, int]] = []
+    n = 0  # number of pivot rows found so far, they are at the top
+    remaining = 0
+    for r in rows: remaining |= r
+    while remaining:
+        low = remaining & -remaining
+        c = low.bit_length() - 1
+        remaining ^= low
+        p = next((i for i in range(n, len(rows)) if rows[i] & low), None)
+        if p is None: continue
+        rows[n], rows[p] = rows[p], rows[n]
+        ops[n], ops[p] = ops[p], ops[n]
+        for i in range(len(rows)):
+            if i != n and rows[i] & low:
+                rows[i] ^= rows[n]
+                ops[i] ^= ops[n]
+        pivots.append((c, n))
+        n += 1
+    inconsistent = 0
+    for i in range(n, len(rows)):
+        inconsistent |= ops[i]
+    return [(c, ops[i]) for c, i in pivots], inconsistent
+
+
 def gflow(
     g: BaseGraph[VT, ET], focus: bool=False, reverse: bool=False, pauli: bool=False
 ) -> Optional[Tuple[Dict[VT, int], Dict[VT, Set[VT]]]]:
@@ -97,7 +133,6 @@ def gflow(
 
     processed: Set[VT] = pattern_outputs.copy() | g.grounds()
     non_outputs = list(vertices.difference(pattern_outputs))
-    zerovec = Mat2.zeros(len(non_outputs), 1)
     for v in processed:
         l[v] = 0
 
@@ -121,18 +156,26 @@ def gflow(
 
         # compute the "flow-demand matrix", which is essentially the bi-adjacency matrix from
         # "clean" to "candidates", which additionally relates every Y-measured node to
-        # itself.
-        m = Mat2([[1 if g.connected(v,w) or (v==w and v in pauli_y) else 0 
-                   for v in candidates] for w in clean])
-
+        # itself. Its rows are stored as bitsets, with bit j for column j.
+        col_index = {v: j for j, v in enumerate(candidates)}
+        rows = []
+        for w in clean:
+            r = 0
+            for v in g.neighbors(w):
+                j = col_index.get(v)
+                if j is not None: r |= 1 << j
+            if w in pauli_y and w in col_index:
+                r |= 1 << col_index[w]
+            rows.append(r)
+
+        # row-reduce the matrix once, so that the system for every vertex can be read off
+        pivots, inconsistent = _reduce_flow_demand(rows)
         for index, u in enumerate(clean):
             if not focus or (u not in processed and any(w in candidates for w in g.neighbors(u))):
-                vu = zerovec.copy()
-                vu.data[index][0] = 1
-                x = m.solve(vu)
-                if x:
+                bit = 1 << index
+                if not inconsistent & bit:
                     correct.add(u)
-                    gflow[u] = {candidates[i] for i in range(x.rows()) if x.data[i][0]}
+                    gflow[u] = {candidates[j] for j, ops in pivots if ops & bit}
                     l[u] = k
 
         if not correct:
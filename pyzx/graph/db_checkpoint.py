@@ -0,0 +1,104 @@
+"""
+Write-ahead log of the simplifications of the graph database backends.
+
+A long simplification of a graph in the database, such as ``full_reduce_db``, is a
+sequence of steps, each of which applies one simplification (``spider_simp``,
+``gadget_simp``, ...) until it no longer matches. Every rewrite query commits on its
+own, so the graph is a valid diagram after any of them, but which step was running is
+only known to the client. The log keeps this in the database itself: before a step
+starts, an entry with status ``started`` is written, and when it is done, an entry
+with status ``done`` that carries where the run is (``iteration``, ``step``), the
+rewrites counted so far and the scalar of the graph, which is tracked by the client.
+
+The entries are nodes labelled ReduceLog, with the ``graph_id`` of their graph, so the
+queries on the nodes of the graph do not see them. A run can be resumed after the last
+``done`` entry: the step that was interrupted is simply run again.
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .scalar import Scalar
+
+WRITE_ENTRY_QUERY = """
+CREATE (e:ReduceLog {graph_id: $graph_id})
+SET e += $entry
+"""
+
+LAST_ENTRY_QUERY = """
+MATCH (e:ReduceLog {graph_id: $graph_id})
+WHERE e.status = 'done'
+RETURN properties(e) AS entry
+ORDER BY e.seq DESC
+LIMIT 1
+"""
+
+LAST_SEQ_QUERY = """
+MATCH (e:ReduceLog {graph_id: $graph_id})
+RETURN max(e.seq) AS seq
+"""
+
+CLEAR_QUERY = """
+MATCH (e:ReduceLog {graph_id: $graph_id})
+DELETE e
+"""
+
+
+class ReduceLog:
+    """The write-ahead log of the simplification of the graph ``graph_id``."""
+
+    def __init__(self, session_factory: Callable, graph_id: str) -> None:
+        self.session_factory = session_factory
+        self.graph_id = graph_id
+        self.seq = 0
+
+    def _run(self, query: str, **params: Any) -> Any:
+        with self.session_factory() as session:
+            record = session.run(query, dict(params, graph_id=self.graph_id)).single()
+            return None if record is None else record[0]
+
+    def clear(self) -> None:
+        """Removes all the entries of the graph."""
+        self._run(CLEAR_QUERY)
+        self.seq = 0
+
+    def write(
+        self,
+        iteration: int,
+        step: int,
+        rule: str,
+        status: str,
+        progress: bool = False,
+        counts: Optional[Dict[str, int]] = None,
+        scalar: Optional[Scalar] = None
+    ) -> None:
+        """Appends an entry: ``status`` is ``started`` before the step ``step`` of the iteration
+        ``iteration`` runs the simplification ``rule``, and ``done`` after it. ``progress`` is
+        whether the iteration made progress so far, and ``counts`` the rewrites of the run so far."""
+        self.seq += 1
+        entry = {
+            "seq": self.seq,
+            "iteration": iteration,
+            "step": step,
+            "rule": rule,
+            "status": status,
+            "progress": progress,
+            "counts": json.dumps(counts or {}),
+            "scalar": scalar.to_json() if scalar is not None else None,
+            "time": time.time(),
+        }
+        self._run(WRITE_ENTRY_QUERY, entry=entry)
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        """The last ``done`` entry, with its ``counts`` as a dict and its ``scalar`` as a Scalar
+        (or None), or None if no step was done yet. New entries are written after all the
+        entries in the log, including those of the step that was interrupted."""
+        self.seq = self._run(LAST_SEQ_QUERY) or 0
+        entry = self._run(LAST_ENTRY_QUERY)
+        if entry is None:
+            return None
+        entry = dict(entry)
+        entry["counts"] = json.loads(entry.get("counts") or "{}")
+        entry["scalar"] = Scalar.from_json(entry["scalar"]) if entry.get("scalar") else None
+        return entry
@@ -0,0 +1,186 @@
+"""
+Exact encoding of vertex phases in the graph database backends.
+
+A phase is stored on a node as two integer properties, ``phase_n`` and ``phase_d``:
+the numerator and denominator of the phase as a multiple of pi, normalised to [0, 2).
+Symbolic phases are stored as their string in ``phase_sym`` (with ``phase_n = 0`` and
+``phase_d = 1``), so only symbolic phases are ever parsed when reading a graph back.
+
+Nodes written before this encoding carry a single ``phase`` property (a string such as
+``"1/2"`` or a float); these are still read by ``decode_phase``, and are converted
+when the phase of the vertex is next set. The rewrite queries only look at the new
+properties, and would take such a node for a phase 0 spider, so ``migrate_legacy_phases``
+converts all the legacy nodes of a graph before it is simplified.
+The queries also leave symbolic phases alone: the vertices they test the phase of
+must have a numeric phase.
+
+The ``cypher_*`` functions build the Cypher expressions with which the rewrite queries
+do their phase arithmetic on the integers, so that a phase survives any number of
+rewrites without rounding. Phases are passed around in Cypher as ``[numerator,
+denominator]`` lists. The sum of two phases uses the larger denominator when one
+divides the other (always the case for Clifford+T phases) and their product otherwise;
+the result is not reduced, which the predicates and ``decode_phase`` do not need.
+"""
+
+import logging
+import numbers
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..symbolic import new_var, parse
+from ..utils import FractionLike
+
+PHASE_PROPERTIES = ("phase_n", "phase_d", "phase_sym")
+
+logger = logging.getLogger(__name__)
+
+
+def encode_phase(phase: Optional[FractionLike]) -> Dict[str, Any]:
+    """Node properties that store the phase (a multiple of pi) exactly."""
+    if phase is None:
+        phase = 0
+    if isinstance(phase, numbers.Rational):
+        f = Fraction(phase) % 2
+    elif isinstance(phase, numbers.Real):
+        f = Fraction(float(phase)).limit_denominator() % 2
+    else:
+        try:
+            phase = phase % 2
+            if hasattr(phase, "terms"):
+                phase.terms = [(c, t) for c, t in phase.terms if c != 0]
+        except Exception:
+            logger.warning("Could not reduce the phase %s modulo 2, storing it as it is", phase, exc_info=True)
+        return {"phase_n": 0, "phase_d": 1, "phase_sym": str(phase)}
+    return {"phase_n": f.numerator, "phase_d": f.denominator, "phase_sym": None}
+
+
+def decode_phase(
+    n: Optional[int], d: Optional[int], sym: Optional[str] = None, legacy: Any = None
+) -> FractionLike:
+    """The phase stored in the properties ``phase_n``, ``phase_d`` and ``phase_sym`` of a node.
+    ``legacy`` is the ``phase`` property of nodes written before this encoding,
+    which is only used if the node has no ``phase_n``."""
+    if sym is not None:
+        return parse(sym, lambda x: new_var(x, False))
+    if n is not None:
+        return Fraction(n, d or 1)
+    if legacy is None:
+        return Fraction(0)
+    if isinstance(legacy, float):
+        return Fraction(legacy).limit_denominator()
+    try:
+        return Fraction(legacy)
+    except (TypeError, ValueError):
+        try:
+            return parse(str(legacy), lambda x: new_var(x, False))
+        except Exception:
+            return Fraction(0)
+
+
+def decode_node_phase(props: Dict[str, Any]) -> FractionLike:
+    """The phase of a node, given its properties."""
+    return decode_phase(
+        props.get("phase_n"), props.get("phase_d"), props.get("phase_sym"), props.get("phase")
+    )
+
+
+LEGACY_PHASES_QUERY = """
+MATCH (n:Node {graph_id: $graph_id})
+WHERE n.phase IS NOT NULL AND n.phase_n IS NULL AND n.phase_sym IS NULL
+RETURN n.id AS id, n.phase AS phase
+"""
+
+SET_PHASES_QUERY = """
+UNWIND $rows AS row
+MATCH (n:Node {graph_id: $graph_id, id: row.id})
+SET n.phase_n = row.phase_n, n.phase_d = row.phase_d, n.phase_sym = row.phase_sym
+REMOVE n.phase
+"""
+
+
+def legacy_phase_rows(records: Iterable[Any]) -> List[Dict[str, Any]]:
+    """The parameters of ``SET_PHASES_QUERY`` for the records of ``LEGACY_PHASES_QUERY``."""
+    return [dict(encode_phase(decode_phase(None, None, None, r["phase"])), id=r["id"]) for r in records]
+
+
+def migrate_legacy_phases(session: Any, graph_id: str) -> int:
+    """Converts the ``phase`` property of the nodes of the graph ``graph_id`` that were
+    written before this encoding, and returns the number of nodes converted."""
+    rows = legacy_phase_rows(session.run(LEGACY_PHASES_QUERY, {"graph_id": graph_id}))
+    if rows:
+        session.run(SET_PHASES_QUERY, {"graph_id": graph_id, "rows": rows}).consume()
+    return len(rows)
+
+
+# Cypher expressions. ``node`` is the name of a node variable of the query, and ``phase``
+# an expression that evaluates to a [numerator, denominator] list.
+
+def cypher_phase(node: str) -> str:
+    """The phase of ``node`` as a [numerator, denominator] list."""
+    return f"[coalesce({node}.phase_n, 0), coalesce({node}.phase_d, 1)]"
+
+
+def cypher_phase_const(phase: Union[int, Fraction]) -> str:
+    """A constant phase as a [numerator, denominator] list."""
+    f = Fraction(phase) % 2
+    return f"[{f.numerator}, {f.denominator}]"
+
+
+def cypher_phase_sum_list(phases: str) -> str:
+    """The sum modulo 2 of a list of phases, e.g. of a ``collect(...)`` of phases."""
+    return (
+        f"reduce(phase_acc = [0, 1], phase_term IN {phases} | "
+        "[phase_den IN [CASE WHEN phase_acc[1] % phase_term[1] = 0 THEN phase_acc[1] "
+        "WHEN phase_term[1] % phase_acc[1] = 0 THEN phase_term[1] "
+        "ELSE phase_acc[1] * phase_term[1] END] | "
+        "[((phase_acc[0] * (phase_den / phase_acc[1]) + phase_term[0] * (phase_den / phase_term[1]))"
+        " % (2 * phase_den) + 2 * phase_den) % (2 * phase_den), phase_den]][0])"
+    )
+
+
+def cypher_phase_sum(*phases: str) -> str:
+    """The sum modulo 2 of the given phases."""
+    return cypher_phase_sum_list("[" + ", ".join(phases) + "]")
+
+
+def cypher_phase_neg(phase: str) -> str:
+    """The phase with its sign flipped (not yet reduced modulo 2)."""
+    return f"[phase_neg IN [{phase}] | [-phase_neg[0], phase_neg[1]]][0]"
+
+
+def cypher_phase_float(node: str) -> str:
+    """The phase of ``node`` as a float, for ordering."""
+    return f"(1.0 * coalesce({node}.phase_n, 0) / coalesce({node}.phase_d, 1))"
+
+
+def cypher_set_phase(node: str, phase: str) -> str:
+    """A clause that sets the phase of ``node``; it can also be used inside a FOREACH."""
+    return f"FOREACH (phase_pair IN [{phase}] | SET {node}.phase_n = phase_pair[0], {node}.phase_d = phase_pair[1])"
+
+
+def cypher_is_numeric(node: str) -> str:
+    """Whether the phase of ``node`` is not symbolic."""
+    return f"{node}.phase_sym IS NULL"
+
+
+def cypher_is_zero(node: str) -> str:
+    """Whether the phase of ``node`` is 0."""
+    return f"({node}.phase_sym IS NULL AND coalesce({node}.phase_n, 0) = 0)"
+
+
+def cypher_is_pauli(node: str) -> str:
+    """Whether the phase of ``node`` is 0 or pi."""
+    return f"({node}.phase_sym IS NULL AND coalesce({node}.phase_n, 0) % coalesce({node}.phase_d, 1) = 0)"
+
+
+def cypher_is_proper_clifford(node: str) -> str:
+    """Whether the phase of ``node`` is pi/2 or 3pi/2."""
+    return (
+        f"({node}.phase_sym IS NULL AND (2 * coalesce({node}.phase_n, 0)) % coalesce({node}.phase_d, 1) = 0"
+        f" AND coalesce({node}.phase_n, 0) % coalesce({node}.phase_d, 1) <> 0)"
+    )
+
+
+def cypher_is_non_clifford(node: str) -> str:
+    """Whether the phase of ``node`` is not a multiple of pi/2."""
+    return f"({node}.phase_sym IS NULL AND (2 * coalesce({node}.phase_n, 0)) % coalesce({node}.phase_d, 1) <> 0)"
@@ -0,0 +1,238 @@
+"""
+Bulk transfer of whole graphs between the graph database backends and GraphS.
+
+A graph is exported by reading it as one stream of rows: a row for each node, followed
+by a row for each wire. Node rows carry the properties ``id``, ``t``, ``phase_n``,
+``phase_d``, ``phase_sym``, ``phase`` (the legacy phase property), ``qubit``, ``row``
+and ``labels``, and have ``target`` set to null; a wire row has the id of its source
+in ``id``, that of its target in ``target`` and its edge type in ``t``. The graph is
+built while the rows come in, so the driver only has to hold one batch of them at a time.
+
+A graph is imported by turning it into lists of node and wire properties (see
+``graph_s_rows``) that the backends write with one UNWIND query per batch. The changes
+of a ``GraphDiff`` are written in the same way, with the queries of ``DIFF_QUERIES``.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .base import BaseGraph
+from .db_phase import decode_phase, encode_phase
+from .diff import GraphDiff
+from .graph_s import GraphS
+from ..utils import EdgeType, VertexType
+
+# The columns of the rows with which the backends stream a graph.
+ROW_COLUMNS = ("id", "t", "phase_n", "phase_d", "phase_sym", "phase", "qubit", "row", "labels", "target")
+
+# The Cypher query with which GraphNeo4j and GraphMemgraph stream a graph. The wires are
+# read in the second part of the union, so they only come in after all of the nodes.
+STREAM_GRAPH_QUERY = """
+MATCH (n:Node {graph_id: $graph_id})
+RETURN n.id AS id, n.t AS t, n.phase_n AS phase_n, n.phase_d AS phase_d,
+       n.phase_sym AS phase_sym, n.phase AS phase, n.qubit AS qubit, n.row AS row,
+       labels(n) AS labels, null AS target
+UNION ALL
+MATCH (s:Node {graph_id: $graph_id})-[w:Wire]->(t:Node {graph_id: $graph_id})
+RETURN s.id AS id, w.t AS t, null AS phase_n, null AS phase_d,
+       null AS phase_sym, null AS phase, null AS qubit, null AS row,
+       null AS labels, t.id AS target
+"""
+
+# The Cypher queries with which GraphNeo4j and GraphMemgraph write a batch of the
+# nodes and of the wires of ``graph_s_rows``.
+CREATE_NODES_QUERY = """
+UNWIND $vertices AS v
+CREATE (n:Node {
+    graph_id: $graph_id,
+    id: v.id,
+    t: v.t,
+    phase_n: v.phase_n,
+    phase_d: v.phase_d,
+    phase_sym: v.phase_sym,
+    qubit: v.qubit,
+    row: v.row
+})
+FOREACH (_ IN CASE WHEN v.input THEN [1] ELSE [] END | SET n:Input)
+FOREACH (_ IN CASE WHEN v.output THEN [1] ELSE [] END | SET n:Output)
+"""
+
+CREATE_WIRES_QUERY = """
+UNWIND $edges AS e
+MATCH (n1:Node {graph_id: $graph_id, id: e.s})
+MATCH (n2:Node {graph_id: $graph_id, id: e.t})
+CREATE (n1)-[:Wire {t: e.et, id: e.id}]->(n2)
+"""
+
+# The queries with which GraphNeo4j and GraphMemgraph write the rows of ``diff_rows``, in
+# this order: each is run with the rows under the given key as the given parameter.
+DIFF_QUERIES = [
+    ("""
+UNWIND $edges AS e
+MATCH (n1:Node {graph_id: $graph_id, id: e.s})-[r:Wire]-(n2:Node {graph_id: $graph_id, id: e.t})
+DELETE r
+""", "removed_edges", "edges"),
+    ("""
+UNWIND $ids AS vid
+MATCH (n:Node {graph_id: $graph_id, id: vid})
+DETACH DELETE n
+""", "removed_verts", "ids"),
+    (CREATE_NODES_QUERY, "new_verts", "vertices"),
+    ("""
+UNWIND $vertices AS v
+MATCH (n:Node {graph_id: $graph_id, id: v.id})
+SET n += v.props
+""", "changed_verts", "vertices"),
+    ("""
+UNWIND $edges AS e
+MATCH (n1:Node {graph_id: $graph_id, id: e.s})-[r:Wire]-(n2:Node {graph_id: $graph_id, id: e.t})
+SET r.t = e.et
+""", "changed_edges", "edges"),
+    (CREATE_WIRES_QUERY, "new_edges", "edges"),
+]
+
+
+def graph_s_from_rows(
+    rows: Iterable[Any],
+    inputs: Sequence[int] = (),
+    outputs: Sequence[int] = (),
+    layout: bool = False,
+) -> GraphS:
+    """Builds a GraphS, keeping the vertex ids, from the rows with which a backend streams
+    its graph. ``rows`` can be any iterable of mappings, such as a neo4j Result.
+    The inputs and outputs are ``inputs`` and ``outputs`` if these are given, and else the
+    nodes labelled Input and Output, ordered by id. When ``layout`` is set, the vertices
+    are given positions with ``spring_layout`` instead of their stored qubit and row."""
+    g = GraphS()
+    labelled_inputs: List[int] = []
+    labelled_outputs: List[int] = []
+    for r in rows:
+        if r["target"] is not None:
+            t = r["t"]
+            g.add_edge((r["id"], r["target"]), EdgeType(t) if t is not None else EdgeType.SIMPLE)
+            continue
+        v = r["id"]
+        g.add_vertex_indexed(v)
+        g.set_type(v, VertexType(r["t"]) if r["t"] is not None else VertexType.BOUNDARY)
+        g.set_phase(v, decode_phase(r["phase_n"], r["phase_d"], r["phase_sym"], r["phase"]))
+        if r["qubit"] is not None:
+            g.set_qubit(v, r["qubit"])
+        if r["row"] is not None:
+            g.set_row(v, r["row"])
+        labels = r["labels"] or ()
+        if "Input" in labels:
+            labelled_inputs.append(v)
+        if "Output" in labels:
+            labelled_outputs.append(v)
+    g.set_inputs(tuple(inputs) if inputs else tuple(sorted(labelled_inputs)))
+    g.set_outputs(tuple(outputs) if outputs else tuple(sorted(labelled_outputs)))
+    if layout:
+        spring_layout(g)
+    return g
+
+
+def graph_s_rows(g: BaseGraph) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """The properties of the nodes and of the wires with which the backends store the graph ``g``.
+    The wires point from the smaller to the larger vertex id, as in ``GraphNeo4j.create_graph``,
+    and the nodes are marked with ``input`` and ``output`` to be labelled Input or Output."""
+    ty, ph, qs, rs = g.types(), g.phases(), g.qubits(), g.rows()
+    inputs, outputs = set(g.inputs()), set(g.outputs())
+    nodes = [
+        {
+            "id": v,
+            "t": ty[v].value,
+            **encode_phase(ph[v]),
+            "qubit": qs.get(v, -1),
+            "row": rs.get(v, -1),
+            "input": v in inputs,
+            "output": v in outputs,
+        }
+        for v in g.vertices()
+    ]
+    wires = []
+    for i, e in enumerate(g.edges()):
+        s, t = g.edge_st(e)
+        wires.append({"s": min(s, t), "t": max(s, t), "et": g.edge_type(e).value, "id": i})
+    return nodes, wires
+
+
+def diff_rows(diff: GraphDiff) -> Dict[str, List[Dict[str, Any]]]:
+    """The rows with which the queries of ``DIFF_QUERIES`` write the changes of ``diff``.
+    New vertices keep the ids they have in the diff, and the vertex data is not written."""
+    new_verts = set(diff.new_verts)
+    new_edges = {(min(s, t), max(s, t)) for (s, t), _ in diff.new_edges}
+    vertices = []
+    for v in diff.new_verts:
+        q, r = diff.changed_pos.get(v, (-1, -1))
+        vertices.append({
+            "id": v,
+            "t": diff.changed_vertex_types.get(v, VertexType.Z).value,
+            **encode_phase(diff.changed_phases.get(v, 0)),
+            "qubit": q,
+            "row": r,
+            "input": False,
+            "output": False,
+        })
+    changed: Dict[Any, Dict[str, Any]] = {}
+    for v, t in diff.changed_vertex_types.items():
+        changed.setdefault(v, {})["t"] = t.value
+    for v, phase in diff.changed_phases.items():
+        changed.setdefault(v, {}).update(encode_phase(phase))
+    for v, (q, r) in diff.changed_pos.items():
+        changed.setdefault(v, {}).update(qubit=q, row=r)
+    return {
+        "removed_edges": [{"s": s, "t": t} for s, t in diff.removed_edges],
+        "removed_verts": list(diff.removed_verts),
+        "new_verts": vertices,
+        "changed_verts": [{"id": v, "props": props} for v, props in changed.items() if v not in new_verts],
+        "changed_edges": [
+            {"s": s, "t": t, "et": et.value}
+            for (s, t), et in diff.changed_edge_types.items()
+            if (min(s, t), max(s, t)) not in new_edges
+        ],
+        "new_edges": [
+            {"s": min(s, t), "t": max(s, t), "et": et.value, "id": None}
+            for (s, t), et in diff.new_edges
+        ],
+    }
+
+
+def copy_graph_state(src: Any, dst: Any) -> None:
+    """Copies the state of the database graph ``src`` that is not stored in the database,
+    such as the scalar, the phase tracking and the vertex index, to its clone ``dst``."""
+    dst.scalar = src.scalar.copy()
+    dst.track_phases = src.track_phases
+    dst.phase_index = src.phase_index.copy()
+    dst.phase_master = src.phase_master
+    dst.phase_mult = src.phase_mult.copy()
+    dst.max_phase_index = src.max_phase_index
+    dst.merge_vdata = src.merge_vdata
+    dst._vindex = src._vindex
+    dst._maxr = src._maxr
+
+
+def adopt_graph_s_state(graph: Any, g: BaseGraph) -> None:
+    """Gives the database graph ``graph``, to which ``g`` was written with ``graph_s_rows``,
+    the scalar, inputs and outputs of ``g``, and a vertex index past the ids of its vertices."""
+    graph.scalar = g.scalar.copy()
+    graph._vindex = max(max(g.vertices(), default=-1) + 1, graph._vindex)
+    graph._inputs = tuple(g.inputs())
+    graph._outputs = tuple(g.outputs())
+
+
+def batches(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Splits ``items`` into lists of at most ``size`` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def spring_layout(g: BaseGraph, seed: int = 42) -> None:
+    """Positions the vertices of ``g`` with the spring layout of networkx.
+    This takes time quadratic in the number of vertices, so it is only worth it for
+    graphs without a meaningful qubit and row, and of at most a few thousand vertices."""
+    import networkx as nx  # imported here since networkx is only needed for the layout
+
+    nxg = nx.Graph()
+    nxg.add_nodes_from(g.vertices())
+    nxg.add_edges_from(g.edge_st(e) for e in g.edges())
+    for v, (x, y) in nx.spring_layout(nxg, seed=seed, k=100).items():
+        g.set_position(v, float(x), float(y))
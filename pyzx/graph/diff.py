@@ -16,6 +16,10 @@
 
 import copy
 import json
+import struct
+import sys
+import zlib
+from array import array
 from collections import Counter
 from typing import Any, Callable, Generic, Optional, List, Dict, Tuple
 
@@ -25,6 +29,12 @@ from .graph_s import GraphS
 from .jsonparser import string_to_phase
 from ..symbolic import VarRegistry
 
+# The backends whose graphs are stored in a database, and so cannot be copied by apply_diff.
+DB_BACKENDS = ("neo4j", "memgraph", "age")
+
+# The first bytes of the binary serialisation of a GraphDiff, see GraphDiff.to_bytes.
+BINARY_MAGIC = b"ZXD1"
+
 class GraphDiff(Generic[VT, ET]):
     removed_verts: List[VT]
     new_verts: List[VT]
@@ -42,7 +52,11 @@ class GraphDiff(Generic[VT, ET]):
     def __init__(self, g1: BaseGraph[VT,ET], g2: BaseGraph[VT,ET]) -> None:
         self.calculate_diff(g1,g2)
 
-    def calculate_diff(self, g1: BaseGraph[VT,ET], g2: BaseGraph[VT,ET]) -> None:
+    def _clear(self) -> None:
+        self.removed_verts = []
+        self.new_verts = []
+        self.removed_edges = []
+        self.new_edges = []
         self.changed_vertex_types = {}
         self.changed_edge_types = {}
         self.changed_phases = {}
@@ -50,6 +64,65 @@ class GraphDiff(Generic[VT, ET]):
         self.changed_vdata = {}
         self.changed_edata = {}
         self.var_registry = VarRegistry()
+        self.variable_types = {}
+
+    @staticmethod
+    def from_changes(g: GraphS, restart: bool = True) -> "GraphDiff":
+        """The diff between ``g`` when it started recording its changes with
+        :meth:`~pyzx.graph.graph_s.GraphS.record_changes` and ``g`` as it is now.
+        This is the same diff as ``GraphDiff(g_then, g)``, but only the vertices and edges that
+        were changed are compared. If ``restart`` is set, the recording starts again, so that
+        the next diff continues from this one, as for checkpoints or undo."""
+        log = g._changes
+        if log is None:
+            raise ValueError("The graph is not recording its changes, see GraphS.record_changes")
+        gd: GraphDiff = GraphDiff.__new__(GraphDiff)
+        gd._clear()
+        for name in g.var_registry.vars():
+            gd.var_registry.set_type(name, g.var_registry.get_type(name, False))
+        gd.variable_types = gd.var_registry.types.copy()
+
+        for v, old in log.verts.items():
+            if v not in g.graph:
+                if old is not None:
+                    gd.removed_verts.append(v)
+                continue
+            ty, phase, d = g.ty[v], g._phase[v], g._vdata.get(v, {})
+            pos = g.qubit(v), g.row(v)
+            if old is None: # It is a new vertex
+                gd.new_verts.append(v)
+                if ty != VertexType.Z: gd.changed_vertex_types[v] = ty
+                if phase != 0: gd.changed_phases[v] = phase
+                if d: gd.changed_vdata[v] = dict(d)
+                gd.changed_pos[v] = pos
+                continue
+            if old[0] != ty: gd.changed_vertex_types[v] = ty
+            if old[1] != phase: gd.changed_phases[v] = phase
+            if old[4] != d: gd.changed_vdata[v] = dict(d)
+            if (old[2], old[3]) != pos: gd.changed_pos[v] = pos
+
+        for e, old_e in log.edges.items():
+            s, t = e
+            et = g.graph[s].get(t) if s in g.graph else None
+            if et is None:
+                if old_e is not None:
+                    gd.removed_edges.append(e) # type: ignore
+                continue
+            d = g._edata.get(e, {}) # type: ignore
+            if old_e is None:
+                gd.new_edges.append((e, et)) # type: ignore
+                if et != EdgeType.HADAMARD: gd.changed_edge_types[e] = et # type: ignore
+                if d: gd.changed_edata[e] = dict(d) # type: ignore
+                continue
+            if old_e[0] != et: gd.changed_edge_types[e] = et # type: ignore
+            if old_e[1] != d: gd.changed_edata[e] = dict(d) # type: ignore
+
+        if restart:
+            g.record_changes()
+        return gd
+
+    def calculate_diff(self, g1: BaseGraph[VT,ET], g2: BaseGraph[VT,ET]) -> None:
+        self._clear()
         for name in g1.var_registry.vars():
             self.var_registry.set_type(name, g1.var_registry.get_type(name, False))
         for name in g2.var_registry.vars():
@@ -111,8 +184,27 @@ class GraphDiff(Generic[VT, ET]):
                 if d2:
                     self.changed_edata[e] = d2
 
-    def apply_diff(self,g: BaseGraph[VT,ET]) -> BaseGraph[VT,ET]:
-        g = copy.deepcopy(g)
+    def apply_diff(self, g: BaseGraph[VT,ET], in_place: bool = False) -> BaseGraph[VT,ET]:
+        """Applies the diff to ``g``, or to a copy of ``g`` unless ``in_place`` is set, and returns it.
+        On a :class:`~pyzx.graph.graph_s.GraphS` the changes are applied as bulk dict updates.
+        A graph stored in a database is always changed in place: backends that have their
+        own ``apply_diff`` (such as GraphNeo4j, which writes the diff in one transaction)
+        are handed the diff."""
+        if g.backend in DB_BACKENDS:
+            if hasattr(g, "apply_diff"):
+                g.apply_diff(self) # type: ignore
+            else:
+                self._apply(g)
+            return g
+        if not in_place:
+            g = copy.deepcopy(g)
+        if isinstance(g, GraphS):
+            self._apply_graph_s(g)
+        else:
+            self._apply(g)
+        return g
+
+    def _apply(self, g: BaseGraph[VT,ET]) -> None:
         g.remove_edges(self.removed_edges)
         g.remove_vertices(self.removed_verts)
         for v in self.new_verts:
@@ -154,7 +246,56 @@ class GraphDiff(Generic[VT, ET]):
         for name in self.var_registry.vars():
             g.var_registry.set_type(name, self.var_registry.get_type(name))
         g.rebind_variables_to_registry()
-        return g
+
+    def _apply_graph_s(self, g: GraphS) -> None:
+        if g._changes is not None: # Log the state before the changes made below
+            for v in self.removed_verts: g._touch_vertex(v) # type: ignore
+            for v in self.new_verts: g._touch_vertex(v) # type: ignore
+            for vertex_changes in (self.changed_vertex_types, self.changed_phases, self.changed_pos, self.changed_vdata):
+                for v in vertex_changes: g._touch_vertex(v) # type: ignore
+            for s, t in self.removed_edges: g._touch_edge(s, t) # type: ignore
+            for (s, t), _ in self.new_edges: g._touch_edge(s, t) # type: ignore
+            for edge_changes in (self.changed_edge_types, self.changed_edata):
+                for s, t in edge_changes: g._touch_edge(s, t) # type: ignore
+        adj = g.graph
+        for s, t in self.removed_edges: # type: ignore
+            if t in adj[s]:
+                del adj[s][t]
+                del adj[t][s]
+                g.nedges -= 1
+                g._edata.pop((s, t), None)
+        if self.removed_verts:
+            g.remove_vertices(self.removed_verts)
+        for v in self.new_verts:
+            adj[v] = dict() # type: ignore
+            g.ty[v] = VertexType.Z # type: ignore
+            g._phase[v] = 0 # type: ignore
+        if self.new_verts:
+            g._vindex = max(g._vindex, max(self.new_verts) + 1) # type: ignore
+        g.ty.update(self.changed_vertex_types) # type: ignore
+        g._phase.update(self.changed_phases) # type: ignore
+        for v, (q, r) in self.changed_pos.items():
+            g._qindex[v] = q # type: ignore
+            g._rindex[v] = r # type: ignore
+        if self.changed_pos:
+            g._maxq = max(g._maxq, max(q for q, _ in self.changed_pos.values()))
+            g._maxr = max(g._maxr, max(r for _, r in self.changed_pos.values()))
+        for v, d in self.changed_vdata.items():
+            if d: g._vdata[v] = dict(d) # type: ignore
+            else: g._vdata.pop(v, None) # type: ignore
+        for (s, t), et in self.new_edges: # type: ignore
+            if t not in adj[s]:
+                g.nedges += 1
+            adj[s][t] = et
+            adj[t][s] = et
+        for (s, t), et in self.changed_edge_types.items(): # type: ignore
+            adj[s][t] = et
+            adj[t][s] = et
+        for e, d in self.changed_edata.items():
+            g._edata.setdefault(e, {}).update(d) # type: ignore
+        for name in self.var_registry.vars():
+            g.var_registry.set_type(name, self.var_registry.get_type(name))
+        g.rebind_variables_to_registry()
 
     def to_dict(self) -> Dict[str, Any]:
         changed_edge_types_str_dict = {}
@@ -181,6 +322,76 @@ class GraphDiff(Generic[VT, ET]):
     def to_json(self) -> str:
         return json.dumps(self.to_dict())
 
+    def to_bytes(self) -> bytes:
+        """A compact binary serialisation of the diff, which can be read with :meth:`from_bytes`.
+        The vertices, edges, types and positions are stored as arrays of 64-bit numbers, the
+        phases, vdata, edata and variable types as in :meth:`to_json`, and all of it is compressed."""
+        ints = [
+            list(self.removed_verts),
+            list(self.new_verts),
+            [v for e in self.removed_edges for v in e], # type: ignore
+            [x for (s, t), et in self.new_edges for x in (s, t, et.value)],
+            [x for v, ty in self.changed_vertex_types.items() for x in (v, ty.value)],
+            [x for (s, t), et in self.changed_edge_types.items() for x in (s, t, et.value)], # type: ignore
+            list(self.changed_pos),
+        ]
+        floats = [float(c) for pos in self.changed_pos.values() for c in pos]
+        rest = {
+            "changed_phases": {k: phase_to_s(v, limit_denominator=False) for k, v in self.changed_phases.items()},
+            "changed_vdata": self.changed_vdata,
+            "changed_edata": {f"{key[0]},{key[1]}": value for key, value in self.changed_edata.items()}, # type: ignore
+            "variable_types": self.var_registry.types,
+        }
+        parts = [BINARY_MAGIC]
+        for numbers in ints + [floats]:
+            a = array("q" if numbers is not floats else "d", numbers)
+            if sys.byteorder == "big": a.byteswap()
+            parts.append(struct.pack("<I", len(a)))
+            parts.append(a.tobytes())
+        parts.append(json.dumps(rest, separators=(",", ":")).encode("utf-8"))
+        return zlib.compress(b"".join(parts))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "GraphDiff":
+        """Reads a diff serialised with :meth:`to_bytes`."""
+        data = zlib.decompress(data)
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("Not a serialised GraphDiff")
+        offset = 4
+
+        def unpack(code: str) -> list:
+            nonlocal offset
+            n, = struct.unpack_from("<I", data, offset)
+            offset += 4
+            a = array(code)
+            a.frombytes(data[offset:offset + n * a.itemsize])
+            if sys.byteorder == "big": a.byteswap()
+            offset += n * a.itemsize
+            return a.tolist()
+
+        ints: List[List[int]] = [unpack("q") for _ in range(7)]
+        removed_verts, new_verts, removed_edges, new_edges, vertex_types, edge_types, pos_verts = ints
+        pos: List[float] = unpack("d")
+        rest = json.loads(data[offset:].decode("utf-8"))
+
+        gd: GraphDiff = GraphDiff.__new__(GraphDiff)
+        gd._clear()
+        for name, is_bool in rest["variable_types"].items():
+            gd.var_registry.set_type(name, is_bool)
+        gd.variable_types = gd.var_registry.types.copy()
+        gd.removed_verts = removed_verts
+        gd.new_verts = new_verts
+        gd.removed_edges = [(removed_edges[i], removed_edges[i+1]) for i in range(0, len(removed_edges), 2)] # type: ignore
+        gd.new_edges = [((new_edges[i], new_edges[i+1]), EdgeType(new_edges[i+2])) for i in range(0, len(new_edges), 3)]
+        gd.changed_vertex_types = {vertex_types[i]: VertexType(vertex_types[i+1]) for i in range(0, len(vertex_types), 2)}
+        gd.changed_edge_types = {(edge_types[i], edge_types[i+1]): EdgeType(edge_types[i+2]) for i in range(0, len(edge_types), 3)} # type: ignore
+        coords = [int(c) if c.is_integer() else c for c in pos]
+        gd.changed_pos = {v: (coords[2*i], coords[2*i+1]) for i, v in enumerate(pos_verts)}
+        gd.changed_phases = {int(k): string_to_phase(v, gd) for k, v in rest["changed_phases"].items()}
+        gd.changed_vdata = map_dict_keys(rest["changed_vdata"], int)
+        gd.changed_edata = map_dict_keys(rest["changed_edata"], lambda x: tuple(map(int, x.split(","))))
+        return gd
+
     @staticmethod
     def from_json(json_str: str) -> "GraphDiff":
         d = json.loads(json_str)
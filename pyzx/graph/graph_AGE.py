@@ -22,6 +22,9 @@ from dotenv import load_dotenv
 import psycopg
 
 from .base import BaseGraph
+from .db_transfer import adopt_graph_s_state, batches, copy_graph_state, graph_s_from_rows
+from .diff import GraphDiff
+from .graph_s import GraphS
 
 from ..utils import (
     EdgeType,
@@ -39,6 +42,59 @@ load_dotenv()
 VT = int
 ET = Tuple[int, int]
 
+# The Cypher queries with which lists of nodes, wires and changes are written in bulk,
+# see GraphAGE._unwind. Each of them is run with a list of maps as the variable ``x``.
+_CREATE_NODES = """
+    CREATE (n:Node {id: x.id, t: x.t, phase: x.phase, qubit: x.qubit, row: x.row})
+    RETURN count(n)
+"""
+_CREATE_WIRES = """
+    MATCH (a:Node {id: x.s}), (b:Node {id: x.t})
+    CREATE (a)-[w:Wire {t: x.et}]->(b)
+    RETURN count(w)
+"""
+_REMOVE_WIRES = """
+    MATCH (a:Node {id: x.s})-[w:Wire]-(b:Node {id: x.t})
+    DELETE w
+    RETURN count(*)
+"""
+_REMOVE_NODES = """
+    MATCH (n:Node {id: x.id})
+    DETACH DELETE n
+    RETURN count(*)
+"""
+_UPDATE_NODES = """
+    MATCH (n:Node {id: x.id})
+    SET n.t = coalesce(x.t, n.t), n.phase = coalesce(x.phase, n.phase),
+        n.qubit = coalesce(x.qubit, n.qubit), n.row = coalesce(x.row, n.row)
+    RETURN count(n)
+"""
+_SET_WIRE_TYPES = """
+    MATCH (a:Node {id: x.s})-[w:Wire]-(b:Node {id: x.t})
+    SET w.t = x.et
+    RETURN count(w)
+"""
+
+
+def _agtype_value(raw: Any) -> Any:
+    """The Python value of an agtype column, which psycopg returns as its text."""
+    if raw is None:
+        return None
+    text = str(raw).split("::", 1)[0]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip('"')
+
+
+def _age_phase(phase: FractionLike) -> str:
+    """The phase as the quoted string with which it is stored in the ``phase`` property."""
+    try:
+        phase = phase % 2
+    except Exception:
+        pass
+    return "'" + str(phase).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
 
 class GraphAGE(BaseGraph[VT, ET]):
 
@@ -1186,16 +1242,7 @@ class GraphAGE(BaseGraph[VT, ET]):
         new_graph_id = f"{self.graph_id}_clone_{uuid.uuid4().hex}"
         cpy = GraphAGE(graph_id=new_graph_id)
 
-        cpy.scalar = self.scalar.copy()
-        cpy.track_phases = self.track_phases
-        cpy.phase_index = self.phase_index.copy()
-        cpy.phase_master = self.phase_master
-        cpy.phase_mult = self.phase_mult.copy()
-        cpy.max_phase_index = self.max_phase_index
-        cpy.merge_vdata = self.merge_vdata
-
-        cpy._vindex = self._vindex
-        cpy._maxr = self._maxr
+        copy_graph_state(self, cpy)
 
         base_vprops = {"id", "t", "ty", "phase", "qubit", "row"}
         base_eprops = {"id", "t"}
@@ -1221,3 +1268,129 @@ class GraphAGE(BaseGraph[VT, ET]):
         cpy.set_inputs(self.inputs())
         cpy.set_outputs(self.outputs())
         return cpy
+
+    def to_graph_s(self, layout: bool = False, fetch_size: int = 10000) -> GraphS:
+        """Exports the graph to a GraphS, keeping the vertex ids and the order of the inputs and outputs.
+
+        All the nodes and wires are read with one SQL query, through a server-side cursor
+        that fetches ``fetch_size`` rows at a time while the GraphS is built. The vertices
+        keep their stored qubit and row, unless ``layout`` is set, in which case they are
+        positioned with a spring layout (which is slow for large graphs).
+        """
+        query = f"""
+        SELECT id, t, ty, phase, qubit, row, NULL::agtype AS target
+        FROM ag_catalog.cypher('{self.graph_id}', $$
+            MATCH (n:Node)
+            RETURN n.id, n.t, n.ty, n.phase, n.qubit, n.row
+        $$) AS (id agtype, t agtype, ty agtype, phase agtype, qubit agtype, row agtype)
+        UNION ALL
+        SELECT id, t, NULL, NULL, NULL, NULL, target
+        FROM ag_catalog.cypher('{self.graph_id}', $$
+            MATCH (s:Node)-[w:Wire]->(n:Node)
+            RETURN s.id, w.t, n.id
+        $$) AS (id agtype, t agtype, target agtype);
+        """
+
+        def records(cur):
+            for vid, t, ty, phase, qubit, row, target in cur:
+                t = _agtype_value(t)
+                ty = _agtype_value(ty)
+                if t is None and ty is not None:
+                    t = VertexType[ty].value
+                yield {
+                    "id": _agtype_value(vid),
+                    "t": t,
+                    "phase_n": None,
+                    "phase_d": None,
+                    "phase_sym": None,
+                    "phase": _agtype_value(phase),
+                    "qubit": _agtype_value(qubit),
+                    "row": _agtype_value(row),
+                    "labels": None,
+                    "target": _agtype_value(target),
+                }
+
+        with self.conn.cursor(name=f"to_graph_s_{uuid.uuid4().hex}") as cur:
+            cur.itersize = fetch_size
+            cur.execute(query)
+            g = graph_s_from_rows(records(cur), self._inputs, self._outputs, layout)
+        g.scalar = self.scalar.copy()
+        return g
+
+    @classmethod
+    def from_graph_s(cls, g: BaseGraph, graph_id: Optional[str] = None, batch_size: int = 5000) -> "GraphAGE":
+        """Writes the graph ``g`` (typically a GraphS) to the database and returns it as a GraphAGE.
+
+        The vertices keep their ids, and the inputs and outputs their order. Nodes and then
+        wires are created with one query per ``batch_size`` of them, committed together.
+        """
+        graph = cls(graph_id=graph_id)
+        ty, ph, qs, rs = g.types(), g.phases(), g.qubits(), g.rows()
+        nodes = [
+            f"{{id: {v}, t: {ty[v].value}, phase: {_age_phase(ph[v])}, "
+            f"qubit: {qs.get(v, -1)}, row: {rs.get(v, -1)}}}"
+            for v in g.vertices()
+        ]
+        wires = []
+        for e in g.edges():
+            s, t = g.edge_st(e)
+            wires.append(f"{{s: {min(s, t)}, t: {max(s, t)}, et: {g.edge_type(e).value}}}")
+
+        graph.begin_batch()
+        try:
+            graph._unwind(_CREATE_NODES, nodes, batch_size)
+            graph._unwind(_CREATE_WIRES, wires, batch_size)
+        except Exception:
+            graph.rollback_batch()
+            raise
+        graph.end_batch()
+
+        adopt_graph_s_state(graph, g)
+        return graph
+
+    def _unwind(self, query: str, items: List[str], batch_size: int) -> None:
+        """Runs the Cypher ``query`` for every map of ``items`` (as Cypher literals),
+        with one SQL statement per ``batch_size`` of them."""
+        for batch in batches(items, batch_size):
+            self.db_execute(f"""
+            SELECT * FROM ag_catalog.cypher('{self.graph_id}', $$
+                UNWIND [{", ".join(batch)}] AS x
+                {query}
+            $$) AS (count agtype);
+            """)
+
+    def apply_diff(self, diff: GraphDiff, batch_size: int = 5000) -> None:
+        """Writes ``diff`` to the graph like ``GraphNeo4j.apply_diff``, with the phases in the
+        ``phase`` property. The vertex and edge data are not written either."""
+        new_verts = set(diff.new_verts)
+        new_edges = {(min(s, t), max(s, t)) for (s, t), _ in diff.new_edges}
+        nodes = []
+        for v in diff.new_verts:
+            q, r = diff.changed_pos.get(v, (-1, -1))
+            t = diff.changed_vertex_types.get(v, VertexType.Z).value
+            nodes.append(f"{{id: {v}, t: {t}, phase: {_age_phase(diff.changed_phases.get(v, 0))}, qubit: {q}, row: {r}}}")
+        changed: dict[VT, List[str]] = {}
+        for v, ty in diff.changed_vertex_types.items():
+            changed.setdefault(v, []).append(f"t: {ty.value}")
+        for v, phase in diff.changed_phases.items():
+            changed.setdefault(v, []).append(f"phase: {_age_phase(phase)}")
+        for v, (q, r) in diff.changed_pos.items():
+            changed.setdefault(v, []).append(f"qubit: {q}, row: {r}")
+        updates = [f"{{id: {v}, {', '.join(props)}}}" for v, props in changed.items() if v not in new_verts]
+        edge_types = [f"{{s: {s}, t: {t}, et: {et.value}}}"
+                      for (s, t), et in diff.changed_edge_types.items() if (min(s, t), max(s, t)) not in new_edges]
+        wires = [f"{{s: {min(s, t)}, t: {max(s, t)}, et: {et.value}}}" for (s, t), et in diff.new_edges]
+
+        self.begin_batch()
+        try:
+            self._unwind(_REMOVE_WIRES, [f"{{s: {s}, t: {t}}}" for s, t in diff.removed_edges], batch_size)
+            self._unwind(_REMOVE_NODES, [f"{{id: {v}}}" for v in diff.removed_verts], batch_size)
+            self._unwind(_CREATE_NODES, nodes, batch_size)
+            self._unwind(_UPDATE_NODES, updates, batch_size)
+            self._unwind(_SET_WIRE_TYPES, edge_types, batch_size)
+            self._unwind(_CREATE_WIRES, wires, batch_size)
+        except Exception:
+            self.rollback_batch()
+            raise
+        self.end_batch()
+        self._vindex = max([self._vindex] + [v + 1 for v in diff.new_verts])
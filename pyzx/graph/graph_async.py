@@ -0,0 +1,432 @@
+"""
+Asynchronous counterparts of GraphNeo4j and GraphMemgraph, built on the async neo4j driver.
+
+Unlike the synchronous backends, these classes do not implement the BaseGraph interface
+vertex by vertex: every method is a coroutine that does one bulk operation in a single
+round trip (or a single transaction), so that a web service can use them without blocking
+its event loop. Graphs that share a driver can be processed concurrently on one event loop,
+their queries are then pipelined over the connection pool of the driver:
+
+    driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
+    graphs = [AsyncGraphNeo4j(graph_id=f"circuit_{i}", driver=driver) for i in range(n)]
+    await asyncio.gather(*(g.create_graph(vertices, edges, inputs, outputs) for g in graphs))
+    await asyncio.gather(*(g.run_cypher_rewrite("spider_fusion_rewrite") for g in graphs))
+    results = await asyncio.gather(*(g.to_graph() for g in graphs))
+
+The data layout in the database is the same as that of the synchronous backends, so a graph
+can be written by one and read by the other.
+"""
+
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import ClientError
+
+from .db_phase import LEGACY_PHASES_QUERY, SET_PHASES_QUERY, decode_node_phase, encode_phase, legacy_phase_rows
+from .graph_db_rewrite_runner import get_query_store
+from .graph_memgraph import _composite_index_unsupported
+
+from ..utils import EdgeType, VertexType
+from .base import BaseGraph, upair
+
+load_dotenv()
+
+VT = int
+ET = Tuple[int, int]
+
+
+class AsyncGraphNeo4j:
+    """A graph stored in a Neo4j database, with awaitable bulk operations."""
+
+    backend = "neo4j"
+
+    def __init__(
+        self,
+        uri: str = os.getenv("DB_URI", "bolt://neo4j:7687"),
+        user: str = "neo4j",
+        password: str = os.getenv("DB_PASSWORD", "password"),
+        graph_id: Optional[str] = None,
+        database: Optional[str] = None,
+        driver: Any = None,
+    ):
+        """If a driver is given, it is shared with the other graphs and not closed by :meth:`close`."""
+        self.uri = uri
+        self.user = user
+        self.password = password
+        self.database = database
+        self._driver = driver
+        self._owns_driver = driver is None
+
+        self.graph_id = graph_id if graph_id is not None else "graph_" + uuid.uuid4().hex
+        self._vindex: int = 0
+        self._inputs: Tuple[VT, ...] = tuple()
+        self._outputs: Tuple[VT, ...] = tuple()
+
+    @property
+    def driver(self):
+        """Create driver only when needed"""
+        if self._driver is None:
+            self._driver = AsyncGraphDatabase.driver(
+                self.uri, auth=(self.user, self.password)
+            )
+        return self._driver
+
+    def _get_session(self):
+        """Returns async driver session"""
+        if self.database:
+            return self.driver.session(database=self.database)
+        return self.driver.session()
+
+    async def close(self) -> None:
+        """Close the driver, unless it was given to the constructor"""
+        if self._driver is not None and self._owns_driver:
+            await self._driver.close()
+            self._driver = None
+
+    async def __aenter__(self) -> "AsyncGraphNeo4j":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _write(self, query: str, **params) -> None:
+        async with self._get_session() as session:
+            await session.execute_write(self._run, query, params)
+
+    async def _read(self, query: str, **params) -> List[Dict[str, Any]]:
+        async with self._get_session() as session:
+            return await session.execute_read(self._fetch, query, params)
+
+    @staticmethod
+    async def _run(tx, query: str, params: Dict[str, Any]) -> None:
+        result = await tx.run(query, params)
+        await result.consume()
+
+    @staticmethod
+    async def _fetch(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        result = await tx.run(query, params)
+        return await result.data()
+
+    async def init_indices(self) -> None:
+        """Creates the indices on which the rewrite queries anchor their matches, see GraphNeo4j.init_indices."""
+        async with self._get_session() as session:
+            for query in (
+                "CREATE INDEX node_graph_id_t IF NOT EXISTS FOR (n:Node) ON (n.graph_id, n.t)",
+                "CREATE INDEX node_graph_id_pattern_id IF NOT EXISTS FOR (n:Node) ON (n.graph_id, n.pattern_id)",
+                "CALL db.awaitIndexes()",
+            ):
+                await (await session.run(query)).consume()
+        await self._migrate_legacy_phases()
+
+    async def _migrate_legacy_phases(self) -> None:
+        """Converts the nodes of the graph with a phase of the old encoding, see db_phase.migrate_legacy_phases."""
+        rows = legacy_phase_rows(await self._read(LEGACY_PHASES_QUERY, graph_id=self.graph_id))
+        if rows:
+            await self._write(SET_PHASES_QUERY, graph_id=self.graph_id, rows=rows)
+
+    async def remove_all_data(self) -> None:
+        """Removes ALL nodes and relationships for this graph_id."""
+        await self._write("MATCH (n:Node {graph_id: $graph_id}) DETACH DELETE n", graph_id=self.graph_id)
+        self._vindex = 0
+        self._inputs = tuple()
+        self._outputs = tuple()
+
+    def vindex(self) -> int:
+        """returns private variable _vindex (int)"""
+        return self._vindex
+
+    def inputs(self) -> Tuple[VT, ...]:
+        return self._inputs
+
+    def outputs(self) -> Tuple[VT, ...]:
+        return self._outputs
+
+    async def num_vertices(self) -> int:
+        rows = await self._read("MATCH (n:Node {graph_id: $graph_id}) RETURN count(n) AS count", graph_id=self.graph_id)
+        return rows[0]["count"] if rows else 0
+
+    async def num_edges(self) -> int:
+        rows = await self._read(
+            "MATCH (:Node {graph_id: $graph_id})-[r:Wire]->(:Node {graph_id: $graph_id}) RETURN count(r) AS count",
+            graph_id=self.graph_id,
+        )
+        return rows[0]["count"] if rows else 0
+
+    async def create_graph(
+        self,
+        vertices_data: List[dict],
+        edges_data: List[Tuple[Tuple[int, int], EdgeType]],
+        inputs: Optional[List[int]] = None,
+        outputs: Optional[List[int]] = None,
+    ) -> List[VT]:
+        """Creates a graph with given vertices and edges in one transaction, like GraphNeo4j.create_graph.
+        The edges, inputs and outputs refer to the positions of the vertices in ``vertices_data``."""
+        if not vertices_data:
+            return []
+        vertices = list(range(self._vindex, self._vindex + len(vertices_data)))
+
+        all_vertices = []
+        for v_id, data in zip(vertices, vertices_data):
+            all_vertices.append({
+                "id": v_id,
+                "t": data.get("ty", VertexType.BOUNDARY).value,
+                **encode_phase(data.get("phase")),
+                "qubit": data.get("qubit", -1),
+                "row": data.get("row", -1),
+            })
+
+        n = await self.num_edges() if edges_data else 0
+        all_edges = []
+        for i, ((s, t), et) in enumerate(edges_data):
+            s, t = upair(vertices[s], vertices[t])
+            all_edges.append({"s": s, "t": t, "et": et.value, "id": n + i})
+        input_ids = [vertices[i] for i in inputs] if inputs else []
+        output_ids = [vertices[i] for i in outputs] if outputs else []
+
+        async def create_full_graph(tx):
+            await (await tx.run(
+                """
+                UNWIND $vertices AS v
+                CREATE (n:Node {graph_id: $graph_id, id: v.id, t: v.t, phase_n: v.phase_n,
+                                phase_d: v.phase_d, phase_sym: v.phase_sym, qubit: v.qubit, row: v.row})
+                """, graph_id=self.graph_id, vertices=all_vertices)).consume()
+            if all_edges:
+                await (await tx.run(
+                    """
+                    UNWIND $edges AS e
+                    MATCH (n1:Node {graph_id: $graph_id, id: e.s})
+                    MATCH (n2:Node {graph_id: $graph_id, id: e.t})
+                    CREATE (n1)-[:Wire {t: e.et, id: e.id}]->(n2)
+                    """, graph_id=self.graph_id, edges=all_edges)).consume()
+            for label, ids in (("Input", input_ids), ("Output", output_ids)):
+                if ids:
+                    await (await tx.run(
+                        "UNWIND $ids AS vid MATCH (n:Node {graph_id: $graph_id, id: vid}) SET n:" + label,
+                        graph_id=self.graph_id, ids=ids)).consume()
+
+        async with self._get_session() as session:
+            await session.execute_write(create_full_graph)
+
+        self._vindex += len(vertices_data)
+        self._inputs = tuple(input_ids)
+        self._outputs = tuple(output_ids)
+        return vertices
+
+    async def add_edges(
+        self,
+        edge_pairs: Iterable[Tuple[int, int]],
+        edgetype: EdgeType = EdgeType.SIMPLE,
+        *,
+        edge_data: Optional[Iterable[EdgeType]] = None,
+    ) -> None:
+        """Adds multiple edges at once, like GraphNeo4j.add_edges: the type of an existing
+        edge is replaced, and a Hadamard self-loop adds pi to the phase of its vertex."""
+        edges_list = list(edge_pairs)
+        if not edges_list:
+            return
+        if edge_data is None:
+            data_list = [edgetype] * len(edges_list)
+        else:
+            data_list = list(edge_data)
+            if len(data_list) != len(edges_list):
+                raise ValueError("edge_data must have same length as edge_pairs")
+
+        edges: Dict[ET, EdgeType] = {}
+        flips: Dict[VT, int] = {}
+        for e, et in zip(edges_list, data_list):
+            s, t = upair(*e)
+            if s == t:
+                if et == EdgeType.HADAMARD:
+                    flips[s] = flips.get(s, 0) + 1
+                continue
+            edges[(s, t)] = et
+
+        if flips:
+            rows = await self._read(
+                "UNWIND $ids AS vid MATCH (n:Node {graph_id: $graph_id, id: vid}) RETURN n.id AS id, properties(n) AS props",
+                graph_id=self.graph_id, ids=list(flips))
+            phases = [{"id": r["id"], "phase": encode_phase(decode_node_phase(r["props"]) + flips[r["id"]])}
+                      for r in rows]
+            await self._write(
+                "UNWIND $phases AS p MATCH (n:Node {graph_id: $graph_id, id: p.id}) SET n += p.phase REMOVE n.phase",
+                graph_id=self.graph_id, phases=phases)
+        if not edges:
+            return
+
+        n = await self.num_edges()
+        payload = [{"s": s, "t": t, "et": et.value, "id": n + i} for i, ((s, t), et) in enumerate(edges.items())]
+        await self._write(
+            """
+            UNWIND $edges AS e
+            MATCH (n1:Node {graph_id: $graph_id, id: e.s})
+            MATCH (n2:Node {graph_id: $graph_id, id: e.t})
+            MERGE (n1)-[r:Wire]->(n2)
+            ON CREATE SET r.t = e.et, r.id = e.id
+            ON MATCH SET r.t = e.et
+            """, graph_id=self.graph_id, edges=payload)
+
+    async def remove_vertices(self, vertices: Iterable[VT]) -> None:
+        """Removes the specified vertices, with their edges, from the graph."""
+        vertex_list = list(vertices)
+        if not vertex_list:
+            return
+        await self._write(
+            """
+            UNWIND $vertex_ids AS vid
+            MATCH (n:Node {graph_id: $graph_id, id: vid})
+            DETACH DELETE n
+            """, graph_id=self.graph_id, vertex_ids=vertex_list)
+        removed = set(vertex_list)
+        self._inputs = tuple(v for v in self._inputs if v not in removed)
+        self._outputs = tuple(v for v in self._outputs if v not in removed)
+
+    async def run_cypher_rewrite(
+        self,
+        rule_name: str,
+        params: Optional[Dict[str, Any]] = None,
+        measure_time: bool = False,
+    ) -> Tuple[Optional[int], Optional[float]]:
+        """Run a named Cypher rewrite on this graph, like graph_db_rewrite_runner.run_rewrite.
+        Batched rules apply at most their default batch size of rewrites, unless a batch_size is in ``params``.
+
+        Returns:
+            Tuple of the number of rewrites (or None) and the execution time (or None if measure_time=False)
+        """
+        query_store = get_query_store()
+        if rule_name not in query_store.list_rules():
+            raise ValueError(
+                f"Unknown rewrite rule: '{rule_name}'. "
+                f"Available rules: {query_store.list_rules()}"
+            )
+        run_params = dict(params or {})
+        run_params["graph_id"] = self.graph_id
+        default_batch_size = query_store.default_batch_size(rule_name)
+        if default_batch_size is not None:
+            run_params.setdefault("batch_size", default_batch_size)
+
+        start = time.perf_counter()
+        async with self._get_session() as session:
+            result = await session.run(query_store.get(rule_name), run_params)
+            record = await result.single()
+        elapsed = time.perf_counter() - start if measure_time else None
+        count = None
+        if record:
+            values = record.values()
+            if values:
+                count = values[0]
+        return (count, elapsed)
+
+    async def _snapshot(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The nodes and wires of this graph, read in one transaction."""
+        async def read(tx):
+            nodes = await (await tx.run(
+                """
+                MATCH (n:Node {graph_id: $graph_id})
+                RETURN n.id AS id, properties(n) AS props, labels(n) AS labels
+                ORDER BY id
+                """, graph_id=self.graph_id)).data()
+            edges = await (await tx.run(
+                """
+                MATCH (n1:Node {graph_id: $graph_id})-[r:Wire]->(n2:Node {graph_id: $graph_id})
+                RETURN n1.id AS s, n2.id AS t, properties(r) AS props
+                """, graph_id=self.graph_id)).data()
+            return nodes, edges
+
+        async with self._get_session() as session:
+            return await session.execute_read(read)
+
+    def _io(self, nodes: List[Dict[str, Any]]) -> Tuple[List[VT], List[VT]]:
+        """The inputs and outputs: the in-memory ones, or else those labelled in the database."""
+        inputs = list(self._inputs) or [r["id"] for r in nodes if "Input" in (r["labels"] or [])]
+        outputs = list(self._outputs) or [r["id"] for r in nodes if "Output" in (r["labels"] or [])]
+        return inputs, outputs
+
+    async def clone(self) -> "AsyncGraphNeo4j":
+        """Return an identical copy of the graph in a fresh graph_id, sharing the driver of this one.
+        Vertices and edges keep their ids and all their properties."""
+        cpy = type(self)(
+            uri=self.uri, user=self.user, password=self.password,
+            graph_id=f"{self.graph_id}_clone_{uuid.uuid4().hex}",
+            database=self.database, driver=self.driver,
+        )
+        cpy._vindex = self._vindex
+        nodes, edges = await self._snapshot()
+        inputs, outputs = self._io(nodes)
+        if nodes:
+            node_payload = [dict(r["props"] or {}, graph_id=cpy.graph_id) for r in nodes]
+            edge_payload = [{"s": r["s"], "t": r["t"], "props": dict(r["props"] or {})} for r in edges]
+
+            async def write(tx):
+                await (await tx.run("UNWIND $nodes AS p CREATE (n:Node) SET n = p", nodes=node_payload)).consume()
+                if edge_payload:
+                    await (await tx.run(
+                        """
+                        UNWIND $edges AS e
+                        MATCH (s:Node {graph_id: $graph_id, id: e.s})
+                        MATCH (t:Node {graph_id: $graph_id, id: e.t})
+                        CREATE (s)-[r:Wire]->(t)
+                        SET r = e.props
+                        """, graph_id=cpy.graph_id, edges=edge_payload)).consume()
+                for label, ids in (("Input", inputs), ("Output", outputs)):
+                    if ids:
+                        await (await tx.run(
+                            "UNWIND $ids AS vid MATCH (n:Node {graph_id: $graph_id, id: vid}) SET n:" + label,
+                            graph_id=cpy.graph_id, ids=ids)).consume()
+
+            async with self._get_session() as session:
+                await session.execute_write(write)
+        cpy._inputs = tuple(inputs)
+        cpy._outputs = tuple(outputs)
+        return cpy
+
+    async def to_graph(self, backend: Optional[str] = None) -> BaseGraph:
+        """Export the graph to an in-memory graph (by default GraphS), keeping the vertex ids."""
+        from .graph import Graph
+        nodes, edges = await self._snapshot()
+        g = Graph(backend)
+        for r in nodes:
+            props = r["props"] or {}
+            v = r["id"]
+            g.add_vertex_indexed(v)
+            g.set_type(v, VertexType(props.get("t", VertexType.BOUNDARY.value)))
+            g.set_phase(v, decode_node_phase(props))
+            g.set_qubit(v, props.get("qubit", -1))
+            g.set_row(v, props.get("row", -1))
+        for r in edges:
+            g.add_edge((r["s"], r["t"]), EdgeType((r["props"] or {}).get("t", EdgeType.SIMPLE.value)))
+        inputs, outputs = self._io(nodes)
+        g.set_inputs(tuple(inputs))
+        g.set_outputs(tuple(outputs))
+        return g
+
+
+class AsyncGraphMemgraph(AsyncGraphNeo4j):
+    """A graph stored in a Memgraph database, with awaitable bulk operations."""
+
+    backend = "memgraph"
+
+    def __init__(
+        self,
+        uri: str = os.getenv("DB_URI", ""),
+        user: str = os.getenv("DB_USER", ""),
+        password: str = os.getenv("DB_PASSWORD", ""),
+        graph_id: Optional[str] = None,
+        database: Optional[str] = None,
+        driver: Any = None,
+    ):
+        super().__init__(uri, user, password, graph_id, database, driver)
+
+    async def init_indices(self) -> None:
+        """Creates the indices on which the rewrite queries anchor their matches, see GraphMemgraph.init_indices."""
+        async with self._get_session() as session:
+            await (await session.run("CREATE INDEX ON :Node(graph_id)")).consume()
+            try:
+                await (await session.run("CREATE INDEX ON :Node(graph_id, t)")).consume()
+            except ClientError as e:
+                if not _composite_index_unsupported(e):
+                    raise
+        await self._migrate_legacy_phases()
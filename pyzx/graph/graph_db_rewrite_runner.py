@@ -29,14 +29,194 @@ Example usage:
         rules=["spider_fusion_rewrite", "hadamard_edge_cancellation"],
         measure_time=True
     )
+
+Batched rules (see ZXQueryStore.batch_sizes) apply at most $batch_size rewrites per
+query. Passing a BatchSizeTuner chooses this size per rule from the observed throughput.
 """
 
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Dict, List, Optional, Tuple, Type, Callable
 
 from .memgraph_queries import ZXQueryStore
 
 
+try:
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired
+    _CONNECTION_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionError, ServiceUnavailable, SessionExpired)
+except ImportError:  # Without the driver there are only the built-in connection errors
+    _CONNECTION_ERRORS = (ConnectionError,)
+
+# The codes of the Neo4j errors of a transaction that ran out of memory or time
+_RESOURCE_ERROR_CODES = {
+    "Neo.TransientError.General.MemoryPoolOutOfMemoryError",
+    "Neo.TransientError.General.OutOfMemoryError",
+    "Neo.TransientError.General.TransactionMemoryLimit",
+    "Neo.TransientError.General.TransactionOutOfMemoryError",
+    "Neo.ClientError.Transaction.TransactionTimedOut",
+    "Neo.ClientError.Transaction.TransactionTimedOutClientConfiguration",
+}
+
+
+def _error_code(e: Exception) -> str:
+    """The status code of a database error, such as ``Neo.TransientError.Transaction.DeadlockDetected``,
+    or an empty string for errors that do not come from the database."""
+    code = getattr(e, "code", None)
+    return code if isinstance(code, str) else ""
+
+
+def is_resource_error(e: Exception) -> bool:
+    """
+    Whether a database error is caused by a transaction that was too large,
+    i.e. a transaction timeout or the memory limit of the database.
+    Neo4j errors are recognised by their status code. Memgraph reports all of its
+    errors with the same few codes, so for these the message is checked as well.
+    """
+    if isinstance(e, (MemoryError, TimeoutError)):
+        return True
+    code = _error_code(e)
+    if code in _RESOURCE_ERROR_CODES:
+        return True
+    if code.startswith("Memgraph."):
+        message = str(getattr(e, "message", None) or e).lower()
+        return "memory limit" in message or "timeout" in message
+    return False
+
+
+def is_transient_error(e: Exception) -> bool:
+    """
+    Whether a database error is transient, i.e. the transaction was rolled back because it
+    conflicted with a concurrent transaction (or the connection was lost), so that running
+    it again may succeed. These are the errors with a ``TransientError`` status code,
+    such as ``Neo.TransientError.Transaction.DeadlockDetected``, and the connection errors.
+    """
+    if isinstance(e, _CONNECTION_ERRORS):
+        return True
+    return _error_code(e).startswith(("Neo.TransientError.", "Memgraph.TransientError."))
+
+
+class _BatchState:
+    def __init__(self, size: int, ceiling: int) -> None:
+        self.size = size
+        self.ceiling = ceiling
+        self.rate: Optional[float] = None  # Rewrites per second with a full batch at the current size
+        self.grown_from: Optional[int] = None  # The size before the last growth step
+        self.full_runs = 0  # Runs with a full batch since the ceiling was last lowered or raised
+
+
+class BatchSizeTuner:
+    """
+    Chooses the $batch_size of batched rewrite queries per rule.
+
+    A rule starts at its default batch size from ZXQueryStore. After every run in which the
+    batch was full, the batch size is doubled as long as the number of rewrites per second
+    keeps improving. When a larger batch turns out slower, the tuner returns to the previous
+    size and stops growing. A transaction timeout or memory error halves the batch size,
+    after which the query is retried. Since the load of the database changes, a rule that
+    stopped growing tries a larger batch again after ``retry_after`` runs with a full batch.
+
+    Example:
+        tuner = BatchSizeTuner()
+        total, iters = run_rewrite_until_complete(session_factory, "circuit_1",
+                                                  "spider_fusion_rewrite", tuner=tuner)
+        print(tuner.sizes())
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 100000, growth: int = 2, retry_after: int = 20) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.growth = growth
+        self.retry_after = retry_after
+        self._states: Dict[str, _BatchState] = {}
+        self._lock = threading.RLock()  # The tuner is shared by the workers of reduce_graphs
+
+    def _state(self, rule_name: str) -> _BatchState:
+        with self._lock:
+            if rule_name not in self._states:
+                size = ZXQueryStore().default_batch_size(rule_name) or self.min_size
+                self._states[rule_name] = _BatchState(min(max(size, self.min_size), self.max_size), self.max_size)
+            return self._states[rule_name]
+
+    def size(self, rule_name: str) -> int:
+        """The batch size to use for the next run of a rule."""
+        return self._state(rule_name).size
+
+    def sizes(self) -> Dict[str, int]:
+        """The current batch size of every rule that has been run."""
+        with self._lock:
+            return {rule: st.size for rule, st in self._states.items()}
+
+    def observe(self, rule_name: str, batch_size: int, count: int, elapsed: float) -> None:
+        """
+        Updates the batch size of a rule after a successful run.
+
+        Args:
+            rule_name: Name of the rewrite rule
+            batch_size: The batch size of the run
+            count: Number of rewrites applied by the run
+            elapsed: Duration of the run in seconds
+        """
+        with self._lock:
+            st = self._state(rule_name)
+            if batch_size != st.size or count < batch_size:
+                # Either an outdated observation, or all remaining matches fitted in the batch,
+                # in which case the batch size did not limit the run
+                return
+            rate = count / max(elapsed, 1e-9)
+            if st.grown_from is not None and st.rate is not None and rate <= st.rate:
+                # The larger batch did not pay off
+                st.size = st.ceiling = st.grown_from
+                st.grown_from = None
+                st.full_runs = 0
+                return
+            st.rate = rate
+            if st.size >= st.ceiling and st.ceiling < self.max_size:
+                st.full_runs += 1
+                if st.full_runs >= self.retry_after:
+                    st.ceiling = min(st.ceiling * self.growth, self.max_size)
+                    st.full_runs = 0
+            if st.size < st.ceiling:
+                st.grown_from = st.size
+                st.size = min(st.size * self.growth, st.ceiling)
+            else:
+                st.grown_from = None
+
+    def shrink(self, rule_name: str) -> bool:
+        """
+        Halves the batch size of a rule after a failed run, and stops it from growing past that size
+        until ``retry_after`` runs with a full batch succeeded.
+
+        Returns:
+            False if the batch size is already at its minimum
+        """
+        with self._lock:
+            st = self._state(rule_name)
+            if st.size <= self.min_size:
+                return False
+            st.size = st.ceiling = max(self.min_size, st.size // 2)
+            st.rate = st.grown_from = None
+            st.full_runs = 0
+            return True
+
+    def run(self, rule_name: str, execute: Callable[[int], Optional[int]]) -> Optional[int]:
+        """
+        Runs ``execute(batch_size)``, which should run the query of the rule and return
+        the number of rewrites, and updates the batch size of the rule.
+        Runs that fail with a transaction timeout or memory error are retried with smaller batches.
+        """
+        while True:
+            size = self.size(rule_name)
+            start = time.perf_counter()
+            try:
+                count = execute(size)
+            except Exception as e:
+                if is_resource_error(e) and self.shrink(rule_name):
+                    continue
+                raise
+            self.observe(rule_name, size, count or 0, time.perf_counter() - start)
+            return count
+
+
 def get_query_store() -> ZXQueryStore:
     """Get the query store instance."""
     return ZXQueryStore()
@@ -60,6 +240,8 @@ def run_rewrite(
     params: Optional[Dict[str, Any]] = None,
     measure_time: bool = True,
     quiet: bool = True,
+    batch_size: Optional[int] = None,
+    tuner: Optional[BatchSizeTuner] = None,
 ) -> Tuple[Optional[int], Optional[float]]:
     """
     Execute a single Cypher rewrite rule on a graph in the database.
@@ -71,6 +253,8 @@ def run_rewrite(
         params: Additional query parameters (graph_id is set automatically)
         measure_time: If True, measure and return execution time
         quiet: If False, print execution details
+        batch_size: Maximal number of rewrites of a batched rule (default from the query store)
+        tuner: Optional BatchSizeTuner that chooses the batch size instead
     
     Returns:
         Tuple of (count, elapsed_seconds) where:
@@ -100,24 +284,34 @@ def run_rewrite(
     # Prepare parameters
     run_params = dict(params or {})
     run_params["graph_id"] = graph_id
+    default_batch_size = query_store.default_batch_size(rule_name)
+    
+    def execute(size: Optional[int]) -> Optional[int]:
+        if size is not None:
+            run_params["batch_size"] = size
+        with session_factory() as session:
+            result = session.run(cypher, run_params)
+            record = result.single()
+        # Extract count from result
+        if record:
+            # Try to extract a count value from the first field
+            values = record.values()
+            if values and len(values) > 0:
+                return values[0]
+        return None
     
     # Execute the query
     start = time.perf_counter() if measure_time else 0.0
     
-    with session_factory() as session:
-        result = session.run(cypher, run_params)
-        record = result.single()
+    if default_batch_size is None:
+        count = execute(None)
+    elif batch_size is not None or tuner is None or "batch_size" in run_params:
+        count = execute(batch_size or run_params.get("batch_size", default_batch_size))
+    else:
+        count = tuner.run(rule_name, execute)
     
     elapsed = (time.perf_counter() - start) if measure_time else None
     
-    # Extract count from result
-    count = None
-    if record:
-        # Try to extract a count value from the first field
-        values = record.values()
-        if values and len(values) > 0:
-            count = values[0]
-    
     if not quiet:
         if count is not None:
             print(f"Rule '{rule_name}': {count} rewrites applied", end="")
@@ -138,6 +332,7 @@ def run_rewrites(
     params: Optional[Dict[str, Any]] = None,
     measure_time: bool = True,
     quiet: bool = False,
+    tuner: Optional[BatchSizeTuner] = None,
 ) -> List[Dict[str, Any]]:
     """
     Execute multiple rewrite rules sequentially on a graph.
@@ -151,6 +346,7 @@ def run_rewrites(
         params: Additional query parameters
         measure_time: If True, measure execution time for each rule
         quiet: If False, print progress information
+        tuner: Optional BatchSizeTuner that chooses the batch sizes of batched rules
     
     Returns:
         List of dictionaries with keys:
@@ -186,6 +382,7 @@ def run_rewrites(
                 params=params,
                 measure_time=measure_time,
                 quiet=quiet,
+                tuner=tuner,
             )
             results.append({
                 "rule": rule_name,
@@ -219,6 +416,7 @@ def run_rewrite_until_complete(
     max_iterations: int = 100,
     params: Optional[Dict[str, Any]] = None,
     quiet: bool = True,
+    tuner: Optional[BatchSizeTuner] = None,
 ) -> Tuple[int, int]:
     """
     Repeatedly apply a rewrite rule until no more matches are found.
@@ -230,6 +428,7 @@ def run_rewrite_until_complete(
         max_iterations: Maximum number of iterations to prevent infinite loops
         params: Additional query parameters
         quiet: If False, print progress information
+        tuner: BatchSizeTuner for batched rules (default: a new one for this call)
     
     Returns:
         Tuple of (total_rewrites, iterations)
@@ -247,6 +446,8 @@ def run_rewrite_until_complete(
     
     total_rewrites = 0
     iteration = 0
+    if tuner is None:
+        tuner = BatchSizeTuner()
     
     for iteration in range(1, max_iterations + 1):
         count, _ = run_rewrite(
@@ -256,6 +457,7 @@ def run_rewrite_until_complete(
             params=params,
             measure_time=False,
             quiet=True,
+            tuner=tuner,
         )
         
         if count is None or count == 0:
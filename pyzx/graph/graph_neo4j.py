@@ -8,7 +8,6 @@ Docstring for pyzx.graph.graph_neo4j
 
 import os
 import uuid
-from fractions import Fraction
 from typing import (
     Any,
     Iterable,
@@ -24,7 +23,19 @@ from typing import (
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 
-from pyzx.symbolic import new_var, parse
+from .db_phase import decode_phase, encode_phase, migrate_legacy_phases
+from .db_transfer import (
+    CREATE_NODES_QUERY,
+    CREATE_WIRES_QUERY,
+    DIFF_QUERIES,
+    STREAM_GRAPH_QUERY,
+    adopt_graph_s_state,
+    batches,
+    copy_graph_state,
+    diff_rows,
+    graph_s_from_rows,
+    graph_s_rows,
+)
 from .graph_db_rewrite_runner import run_rewrite
 
 from ..utils import (
@@ -38,6 +49,8 @@ from ..utils import (
     get_z_box_label,
 )
 from .base import BaseGraph, upair
+from .diff import GraphDiff
+from .graph_s import GraphS
 
 load_dotenv()
 
@@ -87,17 +100,28 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             )
         return self._driver
 
+    def init_indices(self) -> None:
+        """Creates the indices on which the rewrite queries anchor their matches:
+        the graph_id of the nodes together with their type, and together with the
+        pattern_id with which the labelling queries mark the matches of CypherRewrites.
+        Nodes of the graph with a phase of the old encoding are converted, see db_phase."""
+        with self._get_session() as session:
+            session.run("CREATE INDEX node_graph_id_t IF NOT EXISTS FOR (n:Node) ON (n.graph_id, n.t)").consume()
+            session.run("CREATE INDEX node_graph_id_pattern_id IF NOT EXISTS FOR (n:Node) ON (n.graph_id, n.pattern_id)").consume()
+            session.run("CALL db.awaitIndexes()").consume()
+            migrate_legacy_phases(session, self.graph_id)
+
     def remove_all_data(self) -> None:
         """Removes ALL nodes and relationships for this graph_id."""
         query = """MATCH (n:Node {graph_id: $graph_id}) DETACH DELETE n"""
         with self._get_session() as session:
             session.execute_write(lambda tx: tx.run(query, graph_id=self.graph_id))
 
-    def _get_session(self):
-        """Returns driver session"""
+    def _get_session(self, **config):
+        """Returns driver session, with the given session configuration (such as fetch_size)"""
         if self.database:
-            return self.driver.session(database=self.database)
-        return self.driver.session()
+            return self.driver.session(database=self.database, **config)
+        return self.driver.session(**config)
 
     def close(self):
         """Explicitly close the driver"""
@@ -122,21 +146,11 @@ class GraphNeo4j(BaseGraph[VT, ET]):
         all_vertices = []
         for v_id, data in zip(vertices, vertices_data):
             ty = data.get("ty", VertexType.BOUNDARY)
-            phase = data.get("phase")
-            if phase is not None:
-                try:
-                    phase = phase % 2
-                    if hasattr(phase, "terms"):
-                        phase.terms = [(c,t) for c,t in phase.terms if c != 0]
-                except Exception as e:
-                    print(f"Error occurred while processing phase: {e}")
-            phase_str = self._phase_to_str(phase) if phase is not None else "0"
-
             all_vertices.append(
                 {
                     "id": v_id,
                     "t": ty.value,
-                    "phase": phase_str,
+                    **encode_phase(data.get("phase")),
                     "qubit": data.get("qubit", -1),
                     "row": data.get("row", -1),
                 }
@@ -175,7 +189,9 @@ class GraphNeo4j(BaseGraph[VT, ET]):
                         graph_id: $graph_id,
                         id: v.id,
                         t: v.t,
-                        phase: v.phase,
+                        phase_n: v.phase_n,
+                        phase_d: v.phase_d,
+                        phase_sym: v.phase_sym,
                         qubit: v.qubit,
                         row: v.row
                     })
@@ -309,11 +325,6 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             self._maxr = int(rec["maxr"]) if rec and rec["maxr"] is not None else -1
             return self._maxr
 
-    def _phase_to_str(self, phase) -> str:
-        if phase is None:
-            return "0"
-        return str(phase)
-
     def vindex(self) -> int:
         """returns private variable _vindex (int)"""
         return self._vindex
@@ -714,40 +725,27 @@ class GraphNeo4j(BaseGraph[VT, ET]):
 
     def phase(self, vertex: VT) -> FractionLike:
         """Returns the phase value of the given vertex."""
-        query = """MATCH (n:Node {graph_id: $graph_id, id: $id}) RETURN n.phase"""
+        query = """MATCH (n:Node {graph_id: $graph_id, id: $id})
+        RETURN n.phase_n AS n, n.phase_d AS d, n.phase_sym AS sym, n.phase AS legacy"""
         with self._get_session() as session:
             result = session.execute_read(
-                lambda tx: tx.run(query, graph_id=self.graph_id, id=vertex).data()
+                lambda tx: tx.run(query, graph_id=self.graph_id, id=vertex).single()
             )
         if not result:
             return 0
-        p = result[0]["n.phase"]
-        if p is None:
-            return 0
-        try:
-            return Fraction(p)
-        except ValueError:
-            try:
-                return parse(p, lambda x: new_var(x, False))
-            except Exception:
-                return Fraction(0)
+        return decode_phase(result["n"], result["d"], result["sym"], result["legacy"])
 
     def set_phase(self, vertex: VT, phase: FractionLike) -> None:
         """Sets the phase of the vertex to the given value."""
-        try:
-            phase = phase % 2
-            if hasattr(phase, "terms"):
-                phase.terms = [(c,t) for c,t in phase.terms if c != 0]
-        except Exception as e:
-            print(f"Error occurred while processing phase: {e}")
-        query = """MATCH (n:Node {graph_id: $graph_id, id: $id}) SET n.phase = $phase"""
+        query = """MATCH (n:Node {graph_id: $graph_id, id: $id})
+        SET n += $phase REMOVE n.phase"""
         with self._get_session() as session:
             session.execute_write(
                 lambda tx: tx.run(
                     query,
                     graph_id=self.graph_id,
                     id=vertex,
-                    phase=self._phase_to_str(phase),
+                    phase=encode_phase(phase),
                 )
             )
 
@@ -800,7 +798,8 @@ class GraphNeo4j(BaseGraph[VT, ET]):
     def clear_vdata(self, vertex: VT) -> None:
         """Removes all vdata associated to a vertex"""
         query = """MATCH (n:Node {graph_id: $graph_id, id: $id})
-        SET n = {id: $id, t: n.t, phase: n.phase, qubit: n.qubit,
+        SET n = {id: $id, t: n.t, phase_n: n.phase_n, phase_d: n.phase_d,
+        phase_sym: n.phase_sym, phase: n.phase, qubit: n.qubit,
         row: n.row, graph_id: $graph_id}"""
 
         with self._get_session() as session:
@@ -963,7 +962,13 @@ class GraphNeo4j(BaseGraph[VT, ET]):
     # stores these e.g. as Python dicts, just return the relevant dicts.
     def phases(self) -> Mapping[VT, FractionLike]:
         """Returns a mapping of vertices to their phase values."""
-        return {v: self.phase(v) for v in self.vertices()}
+        query = """MATCH (n:Node {graph_id: $graph_id}) WHERE n.id IS NOT NULL
+        RETURN n.id AS id, n.phase_n AS n, n.phase_d AS d, n.phase_sym AS sym, n.phase AS legacy"""
+        with self._get_session() as session:
+            result = session.execute_read(
+                lambda tx: tx.run(query, graph_id=self.graph_id).data()
+            )
+        return {r["id"]: decode_phase(r["n"], r["d"], r["sym"], r["legacy"]) for r in result}
 
     def types(self) -> Mapping[VT, VertexType]:
         """Returns a mapping of vertices to their types."""
@@ -1060,7 +1065,8 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             graph_id: $graph_id,
             id: $id,
             t: $t,
-            phase: $phase,
+            phase_n: 0,
+            phase_d: 1,
             qubit: $qubit,
             row: $row
         })
@@ -1072,7 +1078,6 @@ class GraphNeo4j(BaseGraph[VT, ET]):
                     graph_id=self.graph_id,
                     id=v,
                     t=VertexType.BOUNDARY.value,
-                    phase="0",
                     qubit=-1,
                     row=-1,
                 )
@@ -1085,11 +1090,11 @@ class GraphNeo4j(BaseGraph[VT, ET]):
     def add_vertices(self, amount: int) -> List[VT]:
         """Adds ``amount`` number of vertices and returns a list containing their IDs
 
-        Neo4j nodes are stored as (:Node {graph_id, id, t, phase, qubit, row})
+        Neo4j nodes are stored as (:Node {graph_id, id, t, phase_n, phase_d, qubit, row})
 
         Default values:
             t = VertexType.BOUNDARY
-            phase = "0"
+            phase = 0 (phase_n = 0, phase_d = 1)
             qubit = -1
             row = -1
         """
@@ -1103,7 +1108,9 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             {
                 "id": v_id,
                 "t": VertexType.BOUNDARY.value,
-                "phase": "0",
+                "phase_n": 0,
+                "phase_d": 1,
+                "phase_sym": None,
                 "qubit": -1,
                 "row": -1,
             }
@@ -1116,7 +1123,9 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             graph_id: $graph_id,
             id: v.id,
             t: v.t,
-            phase: v.phase,
+            phase_n: v.phase_n,
+            phase_d: v.phase_d,
+            phase_sym: v.phase_sym,
             qubit: v.qubit,
             row: v.row
         })
@@ -1331,18 +1340,8 @@ class GraphNeo4j(BaseGraph[VT, ET]):
             database=self.database,
         )
 
-        # Copy BaseGraph-level state that is not stored in the DB.
-        cpy.scalar = self.scalar.copy()
-        cpy.track_phases = self.track_phases
-        cpy.phase_index = self.phase_index.copy()
-        cpy.phase_master = self.phase_master
-        cpy.phase_mult = self.phase_mult.copy()
-        cpy.max_phase_index = self.max_phase_index
-        cpy.merge_vdata = self.merge_vdata
-
-        # Preserve backend bookkeeping.
-        cpy._vindex = self._vindex
-        cpy._maxr = self._maxr
+        # Copy the state that is not stored in the DB.
+        copy_graph_state(self, cpy)
 
         # Snapshot the current graph from Neo4j.
         q_nodes = """
@@ -1448,3 +1447,65 @@ class GraphNeo4j(BaseGraph[VT, ET]):
         cpy._outputs = tuple(output_ids)
 
         return cpy
+
+    def to_graph_s(self, layout: bool = False, fetch_size: int = 10000) -> GraphS:
+        """Exports the graph to a GraphS, keeping the vertex ids and the order of the inputs and outputs.
+
+        All the nodes and wires are read with one query, whose records the driver fetches
+        ``fetch_size`` at a time while the GraphS is built. The vertices keep their stored
+        qubit and row, unless ``layout`` is set, in which case they are positioned with a
+        spring layout (which is slow for large graphs).
+        """
+        def read(tx):
+            result = tx.run(STREAM_GRAPH_QUERY, graph_id=self.graph_id)
+            return graph_s_from_rows(result, self._inputs, self._outputs, layout)
+
+        with self._get_session(fetch_size=fetch_size) as session:
+            g = session.execute_read(read)
+        g.scalar = self.scalar.copy()
+        return g
+
+    @classmethod
+    def from_graph_s(cls, g: BaseGraph, batch_size: int = 10000, **kwargs) -> "GraphNeo4j":
+        """Writes the graph ``g`` (typically a GraphS) to the database and returns it as a GraphNeo4j.
+
+        The vertices keep their ids, and the inputs and outputs their order. The keyword
+        arguments are passed on to the constructor, e.g. to choose the ``graph_id``.
+        Nodes and then wires are created with one query per ``batch_size`` of them,
+        all in a single transaction.
+        """
+        graph = cls(**kwargs)
+        nodes, wires = graph_s_rows(g)
+
+        def write(tx):
+            for batch in batches(nodes, batch_size):
+                tx.run(CREATE_NODES_QUERY, graph_id=graph.graph_id, vertices=batch)
+            for batch in batches(wires, batch_size):
+                tx.run(CREATE_WIRES_QUERY, graph_id=graph.graph_id, edges=batch)
+
+        if nodes:
+            with graph._get_session() as session:
+                session.execute_write(write)
+
+        adopt_graph_s_state(graph, g)
+        return graph
+
+    def apply_diff(self, diff: GraphDiff, batch_size: int = 10000) -> None:
+        """Writes the changes of ``diff`` to the graph in the database, in one transaction.
+
+        The diff is typically taken between a GraphS exported with ``to_graph_s`` and the
+        same GraphS after it was rewritten, so only the vertices and wires that changed are
+        written. New vertices keep the ids they have in the diff. The scalar is not part of
+        the diff, so it has to be updated separately.
+        """
+        rows = diff_rows(diff)
+
+        def write(tx):
+            for query, key, param in DIFF_QUERIES:
+                for batch in batches(rows[key], batch_size):
+                    tx.run(query, graph_id=self.graph_id, **{param: batch})
+
+        if any(rows.values()):
+            with self._get_session() as session:
+                session.execute_write(write)
+        self._vindex = max([self._vindex] + [v + 1 for v in diff.new_verts])
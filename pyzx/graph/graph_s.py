@@ -18,9 +18,20 @@ from fractions import Fraction
 from typing import Optional, Tuple, Dict, Set, Any
 
 from .base import BaseGraph
+from ..symbolic import Poly
 
 from ..utils import VertexType, EdgeType, FractionLike, FloatInt, vertex_is_zx_like, vertex_is_z_like, set_z_box_label, get_z_box_label, assert_phase_real
 
+class ChangeLog(object):
+    """The state of every vertex and edge of a :class:`GraphS` before its first change since
+    the graph started recording its changes, from which
+    :meth:`~pyzx.graph.diff.GraphDiff.from_changes` computes a diff.
+    The state of a vertex is its type, phase, qubit, row and vdata, that of an edge
+    its type and edata, and the state is None for vertices and edges that did not exist yet."""
+    def __init__(self) -> None:
+        self.verts: Dict[int, Optional[Tuple[VertexType, FractionLike, FloatInt, FloatInt, Dict[str, Any]]]] = dict()
+        self.edges: Dict[Tuple[int,int], Optional[Tuple[EdgeType, Dict[str, Any]]]] = dict()
+
 class GraphS(BaseGraph[int,Tuple[int,int]]):
     """Purely Pythonic implementation of :class:`~graph.base.BaseGraph`."""
     backend = 'simple'
@@ -44,6 +55,31 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         self._edata: Dict[Tuple[int,int],Any] = dict()
         self._inputs: Tuple[int, ...]                   = tuple()
         self._outputs: Tuple[int, ...]                  = tuple()
+        self._changes: Optional[ChangeLog]              = None
+
+    def record_changes(self) -> None:
+        """Starts recording which vertices and edges change, so that
+        :meth:`~pyzx.graph.diff.GraphDiff.from_changes` can compute the diff between the
+        graph as it is now and as it will be, without comparing the whole graphs.
+        If the graph was already recording its changes, the recording starts again."""
+        self._changes = ChangeLog()
+
+    def stop_recording_changes(self) -> None:
+        """Stops recording the changes started by :meth:`record_changes`."""
+        self._changes = None
+
+    def _touch_vertex(self, v: int) -> None:
+        """Logs the state of vertex v, if it was not logged yet since the recording started."""
+        verts = self._changes.verts # type: ignore
+        if v not in verts:
+            verts[v] = (self.ty[v], self._phase[v], self.qubit(v), self.row(v), dict(self._vdata.get(v, {}))) if v in self.graph else None
+
+    def _touch_edge(self, s: int, t: int) -> None:
+        """Logs the state of the edge between s and t, if it was not logged yet since the recording started."""
+        e = (s,t) if s < t else (t,s)
+        edges = self._changes.edges # type: ignore
+        if e not in edges:
+            edges[e] = (self.graph[s][t], dict(self._edata.get(e, {}))) if s in self.graph and t in self.graph[s] else None
 
     def clone(self) -> 'GraphS':
         cpy = GraphS()
@@ -98,6 +134,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
 
     def add_vertices(self, amount):
         for i in range(self._vindex, self._vindex + amount):
+            if self._changes is not None: self._touch_vertex(i)
             self.graph[i] = dict()
             self.ty[i] = VertexType.BOUNDARY
             self._phase[i] = 0
@@ -109,6 +146,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         This method is used in the editor to support undo, which requires vertices
         to preserve their index."""
         if v in self.graph: raise ValueError("Vertex with this index already exists")
+        if self._changes is not None: self._touch_vertex(v)
         if v >= self._vindex: self._vindex = v+1
         self.graph[v] = dict()
         self.ty[v] = VertexType.BOUNDARY
@@ -116,6 +154,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
 
     def add_edges(self, edge_pairs, edgetype=EdgeType.SIMPLE):
         for s,t in edge_pairs:
+            if self._changes is not None: self._touch_edge(s,t)
             self.nedges += 1
             self.graph[s][t] = edgetype
             self.graph[t][s] = edgetype
@@ -136,6 +175,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
                 raise ValueError(f'The edge you are adding is not an accepted type')
                 
         if not t in self.graph[s]:
+            if self._changes is not None: self._touch_edge(s,t)
             self.nedges += 1
             self.graph[s][t] = edgetype
             self.graph[t][s] = edgetype
@@ -178,6 +218,9 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
     def remove_vertices(self, vertices):
         for v in vertices:
             vs = list(self.graph[v])
+            if self._changes is not None:
+                self._touch_vertex(v)
+                for v1 in vs: self._touch_edge(v,v1)
             # remove all edges
             for v1 in vs:
                 if v1 == v:
@@ -210,6 +253,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         for s,t in edges:
             if s == t:
                 continue
+            if self._changes is not None: self._touch_edge(s,t)
             self.nedges -= 1
             del self.graph[s][t]
             del self.graph[t][s]
@@ -311,6 +355,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
 
     def set_edge_type(self, e, t):
         v1,v2 = e
+        if self._changes is not None: self._touch_edge(v1,v2)
         self.graph[v1][v2] = t
         self.graph[v2][v1] = t
 
@@ -319,6 +364,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
     def types(self):
         return self.ty
     def set_type(self, vertex, t):
+        if self._changes is not None: self._touch_vertex(vertex)
         self.ty[vertex] = t
 
     def phase(self, vertex):
@@ -327,22 +373,27 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         return self._phase
     def set_phase(self, vertex, phase):
         assert_phase_real(phase)
+        if self._changes is not None: self._touch_vertex(vertex)
         try:
             self._phase[vertex] = phase % 2
         except Exception:
             self._phase[vertex] = phase
     def add_to_phase(self, vertex, phase):
         assert_phase_real(phase)
+        if self._changes is not None: self._touch_vertex(vertex)
         old_phase = self._phase.get(vertex, Fraction(1))
+        new_phase = old_phase + phase
         try:
-            self._phase[vertex] = (old_phase + phase) % 2
+            # The sum is a fresh object, so a symbolic phase can be reduced in place
+            self._phase[vertex] = new_phase.mod_inplace(2) if isinstance(new_phase, Poly) else new_phase % 2
         except Exception:
-            self._phase[vertex] = old_phase + phase
+            self._phase[vertex] = new_phase
     def qubit(self, vertex):
         return self._qindex.get(vertex,-1)
     def qubits(self):
         return self._qindex
     def set_qubit(self, vertex, q):
+        if self._changes is not None: self._touch_vertex(vertex)
         if q > self._maxq: self._maxq = q
         self._qindex[vertex] = q
 
@@ -351,6 +402,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
     def rows(self):
         return self._rindex
     def set_row(self, vertex, r):
+        if self._changes is not None: self._touch_vertex(vertex)
         if r > self._maxr: self._maxr = r
         self._rindex[vertex] = r
 
@@ -365,6 +417,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
             self._grounds.discard(vertex)
 
     def clear_vdata(self, vertex):
+        if self._changes is not None: self._touch_vertex(vertex)
         if vertex in self._vdata:
             del self._vdata[vertex]
     def vdata_keys(self, vertex):
@@ -375,12 +428,14 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         else:
             return default
     def set_vdata(self, vertex, key, val):
+        if self._changes is not None: self._touch_vertex(vertex)
         if vertex in self._vdata:
             self._vdata[vertex][key] = val
         else:
             self._vdata[vertex] = {key:val}
 
     def clear_edata(self, edge):
+        if self._changes is not None: self._touch_edge(*edge)
         self._edata.pop(edge, None)
     def edata_keys(self, edge):
         return self._edata.get(edge, {}).keys()
@@ -390,6 +445,7 @@ class GraphS(BaseGraph[int,Tuple[int,int]]):
         else:
             return default
     def set_edata(self, edge, key, val):
+        if self._changes is not None: self._touch_edge(*edge)
         if edge in self._edata:
             self._edata[edge][key] = val
         else:
@@ -1,10 +1,34 @@
 import textwrap
 
+from .db_phase import (
+    cypher_is_non_clifford,
+    cypher_is_numeric,
+    cypher_is_pauli,
+    cypher_is_proper_clifford,
+    cypher_is_zero,
+    cypher_phase,
+    cypher_phase_const,
+    cypher_phase_float,
+    cypher_phase_neg,
+    cypher_phase_sum,
+    cypher_phase_sum_list,
+    cypher_set_phase,
+)
+
 class ZXQueryStore:
     """
     Stores ZX-Calculus graph rewrite queries for Memgraph/Neo4j.
+    Phases are read and written as the integers phase_n/phase_d, see db_phase.
     """
 
+    # Queries that apply at most $batch_size rewrites per run, with their default batch size
+    batch_sizes = {
+        "hadamard_edge_cancellation": 100,
+        "spider_fusion_rewrite": 100,
+        "bialgebra_red_green": 10,
+        "bialgebra_hadamard": 10,
+    }
+
     def __init__(self):
         # Mapping friendly snake_case names to the raw Cypher queries
         self._queries = {
@@ -43,27 +67,30 @@ class ZXQueryStore:
         """Returns a list of all available rewrite rule names."""
         return list(self._queries.keys())
 
+    def default_batch_size(self, query_name: str):
+        """Returns the default $batch_size of a batched query, or None if the query takes no batch size."""
+        return self.batch_sizes.get(query_name)
+
     # ==========================================
     # Query Definitions (Private Methods)
     # ==========================================
 
     def _remove_isolated_vertices_single(self):
         return """
-        MATCH (n:Node)
-        WHERE n.graph_id = $graph_id AND degree(n) = 0 AND n.t <> 0
-        WITH n, n.t AS ty, n.phase AS ph
+        MATCH (n:Node {graph_id: $graph_id})
+        WHERE degree(n) = 0 AND n.t <> 0
+        WITH n, n.t AS ty, n.phase_n AS ph_n, n.phase_d AS ph_d
         DETACH DELETE n
         RETURN count(n) AS count
         """
 
     def _remove_isolated_vertices_pair(self):
         return """
-        MATCH (n:Node)-[r:Wire]-(m:Node)
-        WHERE n.graph_id = $graph_id AND m.graph_id = $graph_id
-          AND degree(n) = 1 AND degree(m) = 1
+        MATCH (n:Node {graph_id: $graph_id})-[r:Wire]-(m:Node {graph_id: $graph_id})
+        WHERE degree(n) = 1 AND degree(m) = 1
           AND id(n) < id(m)
           AND n.t <> 0 AND m.t <> 0
-        WITH n, m, r, n.t AS t1, m.t AS t2, n.phase AS p1, m.phase AS p2, r.t AS et
+        WITH n, m, r, n.t AS t1, m.t AS t2, [n.phase_n, n.phase_d] AS p1, [m.phase_n, m.phase_d] AS p2, r.t AS et
         DETACH DELETE n, m
         RETURN count(r) AS count
         """
@@ -76,8 +103,7 @@ class ZXQueryStore:
     def _to_gh(self):
         return """
         // Match all Red nodes (t: 2)
-        MATCH (n:Node)
-        WHERE n.graph_id = $graph_id AND n.t = 2
+        MATCH (n:Node {graph_id: $graph_id, t: 2})
         WITH collect(n) AS red_nodes
         
         // Toggle edges connecting red nodes to non-red nodes (neighbors not in red_nodes)
@@ -99,21 +125,23 @@ class ZXQueryStore:
 
     def _hadamard_edge_cancellation(self):
         return """
-        // Find paths of Hadamard nodes (chains of H-gates that can cancel)
-        MATCH path = (start:Node)-[:Wire*2..6]-(end:Node)
-        WHERE start.graph_id = $graph_id 
-          AND end.graph_id = $graph_id
+        // Find chains of H-nodes (degree 2 nodes joined by Hadamard edges) of 1 to 5 nodes
+        // between two nodes that are not H-nodes themselves.
+        // Anchor on the first H-node of a chain next to its start
+        MATCH (start:Node {graph_id: $graph_id})-[:Wire {t: 2}]-(first:Node {graph_id: $graph_id})
+        WHERE degree(first) = 2
+          AND NOT (degree(start) = 2 AND ALL(e IN [(start)-[r]-() | r] WHERE e.t = 2))
+        
+        // Walk along the chain, only expanding through Hadamard edges into degree 2 nodes
+        MATCH chain = (first)-[:Wire *0..4 (w, n | w.t = 2 AND degree(n) = 2)]-(last:Node)
+        MATCH (last)-[:Wire {t: 2}]-(end:Node)
+        WHERE end <> start
+          AND NOT end IN nodes(chain)
           AND id(start) < id(end)
-          // All intermediate nodes must be H-nodes (degree 2 simple gates)
-          AND ALL(node IN nodes(path)[1..-1] WHERE node.graph_id = $graph_id AND size([(node)-[]-() | 1]) = 2)
-          // All edges in path must be Hadamard edges (t=2)
-          AND ALL(edge IN relationships(path) WHERE edge.t = 2)
-          // Start and end should not be H-nodes themselves
-          AND NOT (size([(start)-[]-() | 1]) = 2 AND ALL(e IN [(start)-[r]-() | r] WHERE e.t = 2))
-          AND NOT (size([(end)-[]-() | 1]) = 2 AND ALL(e IN [(end)-[r]-() | r] WHERE e.t = 2))
+          AND NOT (degree(end) = 2 AND ALL(e IN [(end)-[r]-() | r] WHERE e.t = 2))
         
-        WITH start, end, nodes(path)[1..-1] as nodes_to_delete
-        LIMIT 100  // Process in batches to avoid long transactions
+        WITH start, end, nodes(chain) as nodes_to_delete
+        LIMIT $batch_size  // Process in batches to avoid long transactions
         
         // Create direct connection with simple edge (Hadamards canceled)
         CREATE (start)-[:Wire {t: 1, graph_id: $graph_id}]->(end)
@@ -129,51 +157,51 @@ class ZXQueryStore:
     def _spider_fusion_rewrite(self):
         return """
         // Find adjacent same-color spiders connected by simple edge
-        MATCH (u:Node)-[e:Wire {t: 1}]-(v:Node)
-        WHERE ((u.t = 1 AND v.t = 1) OR (u.t = 2 AND v.t = 2))
-          AND u.graph_id = $graph_id 
-          AND v.graph_id = $graph_id
+        MATCH (u:Node {graph_id: $graph_id})-[e:Wire {t: 1}]-(v:Node {graph_id: $graph_id})
+        WHERE u.t IN [1, 2]
+          AND v.t = u.t
           AND id(u) < id(v)  // Process each pair once
+          AND """ + cypher_is_numeric("u") + " AND " + cypher_is_numeric("v") + """
         
         WITH u, v, e
-        LIMIT 100  // Batch size
+        LIMIT $batch_size
+        WITH u, v, e, """ + cypher_phase_sum(cypher_phase("u"), cypher_phase("v")) + """ AS merged_phase
         
         // Create merged node
         CREATE (merged:Node {
             t: u.t,
-            phase: coalesce(u.phase, 0.0) + coalesce(v.phase, 0.0),
+            phase_n: merged_phase[0],
+            phase_d: merged_phase[1],
             graph_id: $graph_id,
             id: u.id,
             qubit: u.qubit,
             row: u.row
         })
         
-        // Collect u neighbors
+        // Collect u neighbors (self-loops are dropped)
         WITH u, v, merged
         OPTIONAL MATCH (u)-[r:Wire]-(x:Node)
-        WHERE x <> v
-        WITH u, v, merged, collect({node_id: id(x), node_t: x.t, edge_t: r.t}) as u_conns
+        WHERE x <> v AND x <> u
+        WITH u, v, merged, collect({node: x, node_t: x.t, edge_t: r.t}) as u_conns
         
         // Collect v neighbors
         WITH u, v, merged, u_conns
         OPTIONAL MATCH (v)-[r:Wire]-(y:Node)
-        WHERE y <> u
-        WITH u, v, merged, u_conns + collect({node_id: id(y), node_t: y.t, edge_t: r.t}) as all_conns
+        WHERE y <> u AND y <> v
+        WITH u, v, merged, u_conns + collect({node: y, node_t: y.t, edge_t: r.t}) as all_conns
         
         // Delete original nodes
         DETACH DELETE u, v
         
-        // Unwind connections to process them
+        // Unwind connections to process them. The neighbours are carried along as node
+        // references, so they do not have to be looked up again.
         WITH merged, all_conns
         UNWIND (CASE WHEN size(all_conns) > 0 THEN all_conns ELSE [null] END) as c
         WITH merged, c
-        WHERE c IS NOT NULL
-        
-        // Re-match t to have a valid node reference for creating edges
-        MATCH (t:Node) WHERE id(t) = c.node_id
+        WHERE c IS NOT NULL AND c.node IS NOT NULL
 
         // Group by neighbor to handle parallel edges
-        WITH merged, t, c.node_t as t_type, collect(c.edge_t) as edge_types
+        WITH merged, c.node as t, c.node_t as t_type, collect(c.edge_t) as edge_types
         
         // Logic for merging parallel edges
         // 1 = Simple, 2 = Hadamard
@@ -264,7 +292,7 @@ class ZXQueryStore:
         
         // Aggregate phase shift
         WITH merged, sum(is_mixed) as total_phase_shift
-        SET merged.phase = merged.phase + total_phase_shift
+        """ + cypher_set_phase("merged", cypher_phase_sum(cypher_phase("merged"), "[total_phase_shift, 1]")) + """
         
         RETURN count(DISTINCT merged) as rewrites_applied
         """
@@ -281,10 +309,9 @@ class ZXQueryStore:
         # Hadamard*Hadamard = Simple.
         # So: type = (e1.t == e2.t) ? 1 : 2. Correct.
         return """
-        MATCH (v:Node)
-        WHERE v.graph_id = $graph_id
-          AND v.t = 1  // ONLY Z-spiders (t=1) are identity spiders (phase 0)
-          AND (v.phase IS NULL OR v.phase = 0)
+        MATCH (v:Node {graph_id: $graph_id})
+        WHERE v.t = 1  // ONLY Z-spiders (t=1) are identity spiders (phase 0)
+          AND """ + cypher_is_zero("v") + """
         
         // Check degree using count instead of size() on pattern if problematic
         MATCH (v)-[r:Wire]-()
@@ -311,11 +338,11 @@ class ZXQueryStore:
     def _remove_self_loop_simp(self):
         return """
         // Remove self-loops on ZX-like nodes; Hadamard self-loops add a pi phase.
-        MATCH (v:Node)-[e:Wire]-(v)
-        WHERE v.graph_id = $graph_id AND v.t IN [1, 2]
+        MATCH (v:Node {graph_id: $graph_id})-[e:Wire]-(v)
+        WHERE v.t IN [1, 2]
         WITH v, COLLECT(e) AS loops,
              sum(CASE e.t WHEN 2 THEN 1 ELSE 0 END) AS had_count
-      SET v.phase = coalesce(v.phase, 0) + CASE WHEN had_count % 2 = 1 THEN 1 ELSE 0 END
+      """ + cypher_set_phase("v", cypher_phase_sum(cypher_phase("v"), "[had_count % 2, 1]")) + """
       FOREACH (loop IN loops | DELETE loop)
       RETURN count(DISTINCT v) AS rewrites_applied
         """
@@ -323,17 +350,11 @@ class ZXQueryStore:
     def _pivot_rule_two_interior_pauli(self):
         return """
         // Find pivot candidates: two t=1 nodes with integer phases connected by t=2 edge
-        MATCH (a:Node {t: 1})-[pivot_edge:Wire {t: 2}]-(b:Node {t: 1})
-        WHERE a.graph_id = $graph_id AND b.graph_id = $graph_id
-          AND id(a) < id(b)  // Process each pair once
-          AND a.phase IS NOT NULL 
-          AND b.phase IS NOT NULL
+        MATCH (a:Node {graph_id: $graph_id, t: 1})-[pivot_edge:Wire {t: 2}]-(b:Node {graph_id: $graph_id, t: 1})
+        WHERE id(a) < id(b)  // Process each pair once
           // Check if phases are integer multiples of pi (phase = k for integer k)
-          // Use toFloat to handle potential string storage and avoid crashes on non-numeric types
-          AND toFloat(a.phase) IS NOT NULL 
-          AND toFloat(b.phase) IS NOT NULL
-          AND toFloat(a.phase) = round(toFloat(a.phase)) 
-          AND toFloat(b.phase) = round(toFloat(b.phase))
+          AND """ + cypher_is_pauli("a") + """
+          AND """ + cypher_is_pauli("b") + """
 
         // START CHANGE: Ensure a and b are strictly interior (no connections to boundaries or non-Z nodes)
         WITH a, b, pivot_edge
@@ -408,15 +429,16 @@ class ZXQueryStore:
         // neighbors_b (only connected to b) should get a.phase
         
         FOREACH (n IN neighbors_a |
-          SET n.phase = coalesce(n.phase, 0.0) + b.phase
+          """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("b"))) + """
         ) 
 
         FOREACH (n IN neighbors_b |
-          SET n.phase = coalesce(n.phase, 0.0) + a.phase
+          """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("a"))) + """
         ) 
           
         FOREACH (shared_neighbor IN shared_neighbors | 
-          SET shared_neighbor.phase = coalesce(shared_neighbor.phase, 0) + a.phase + b.phase + 1
+          """ + cypher_set_phase("shared_neighbor", cypher_phase_sum(
+              cypher_phase("shared_neighbor"), cypher_phase("a"), cypher_phase("b"), cypher_phase_const(1))) + """
         )
 
         // 7. Delete the original pivot nodes
@@ -431,12 +453,9 @@ class ZXQueryStore:
         // Interior Pauli spider removal rule
         // Matches a pair (a)-(b) where both are Pauli spiders (t=1, integer phase) connected by Hadamard (t=2)
         // AND one of them (b) is connected to exactly one boundary node.
-        MATCH (a:Node {t: 1})-[:Wire {t: 2}]-(b:Node {t: 1})
-        WHERE a.graph_id = $graph_id AND b.graph_id = $graph_id
-          AND toFloat(a.phase) IS NOT NULL 
-          AND toFloat(b.phase) IS NOT NULL
-          AND toFloat(a.phase) = round(toFloat(a.phase)) 
-          AND toFloat(b.phase) = round(toFloat(b.phase))
+        MATCH (a:Node {graph_id: $graph_id, t: 1})-[:Wire {t: 2}]-(b:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_pauli("a") + """
+          AND """ + cypher_is_pauli("b") + """
 
         // Check b's connections: should be essentially (a)-[H]-(b)-[?]-(boundary)
         // b must have exactly 2 edges: one to a, one to boundary.
@@ -480,11 +499,11 @@ class ZXQueryStore:
         // Use FOREACH to update phases (handles empty collections automatically)
         WITH a, b, boundary_vertex, boundary_edge, COLLECT(a_neighbor) as a_neighbors
         FOREACH (neighbor IN a_neighbors |
-          SET neighbor.phase = (coalesce(neighbor.phase, 0) + b.phase + a.phase) % 2 // Wait, pivot updates neighbors by a.phase + b.phase + pi?
+          """ + cypher_set_phase("neighbor", cypher_phase_sum(cypher_phase("neighbor"), cypher_phase("b"), cypher_phase("a"))) + """ // Wait, pivot updates neighbors by a.phase + b.phase + pi?
           // Standard pivot on (u,v): neighbors of u get +v.phase, neighbors of v get +u.phase, shared get +u+v+pi
           // Here b only has 'boundary' neighbor. 'a' has 'a_neighbors'.
           // 'a_neighbors' are neighbors of 'a', so they get +b.phase.
-          SET neighbor.phase = (coalesce(neighbor.phase, 0) + b.phase)
+          """ + cypher_set_phase("neighbor", cypher_phase_sum(cypher_phase("neighbor"), cypher_phase("b"))) + """
         )
 
         // Connect a_neighbors to boundary?
@@ -531,10 +550,8 @@ class ZXQueryStore:
     def _local_complement_rewrite(self):
         return """
         // Find local complementation pattern: Z-spider with ±π/2 phase, all neighbors via Hadamard
-        MATCH (center:Node {t: 1})
-        WHERE center.graph_id = $graph_id
-          AND center.phase IS NOT NULL
-          AND (center.phase = 0.5 OR center.phase = -0.5)
+        MATCH (center:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_proper_clifford("center") + """
         
         // Check for any "bad" connections (boundary nodes, simple edges, or non-Z neighbors)
         OPTIONAL MATCH (center)-[bad_edge]-(bad_neighbor)
@@ -543,8 +560,7 @@ class ZXQueryStore:
         WHERE bad_connections = 0
 
         // Collect all Hadamard-connected Z-spider neighbors
-        MATCH (center)-[w:Wire {t: 2}]-(nbr:Node {t: 1})
-        WHERE nbr.graph_id = $graph_id
+        MATCH (center)-[w:Wire {t: 2}]-(nbr:Node {graph_id: $graph_id, t: 1})
         WITH center, COLLECT(DISTINCT nbr) AS neighbors
         WHERE size(neighbors) > 0
         LIMIT 1  // Process one at a time
@@ -584,7 +600,7 @@ class ZXQueryStore:
         // 5. Update phases (once per center)
         WITH center, neighbors
         FOREACH (n IN neighbors |
-          SET n.phase = coalesce(n.phase, 0) - coalesce(center.phase, 0)
+          """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_neg(cypher_phase("center")))) + """
         )
         
         // Remove the center
@@ -596,8 +612,8 @@ class ZXQueryStore:
     def _gadget_fusion_red_green(self):
         return """
         // 1. Find all t=1 nodes with degree 1 (phase spiders)
-        MATCH (p:Node {t: 1})
-        WHERE p.graph_id = $graph_id AND degree(p) = 1
+        MATCH (p:Node {graph_id: $graph_id, t: 1})
+        WHERE degree(p) = 1
         WITH p
 
         // 3. Now that we have the correct 'p' nodes, find their single neighbor 'x', ensuring it's a t=2 node.
@@ -627,7 +643,8 @@ class ZXQueryStore:
             neighbor_key,
             phase_spiders,
             x_spiders,
-            sum(coalesce(ps.phase, 0.0)) AS total_phase
+            collect(""" + cypher_phase("ps") + """) AS phases
+        WITH neighbor_key, phase_spiders, x_spiders, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
         // 9. Select one gadget to survive and identify the rest for deletion.
         WITH
@@ -639,7 +656,7 @@ class ZXQueryStore:
 
         // 10. Perform the rewrite:
         // a) Update the phase of the surviving phase spider.
-        SET survivor_p.phase = total_phase
+        """ + cypher_set_phase("survivor_p", "total_phase") + """
 
         // b) Delete all other gadgets in the group.
         FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
@@ -652,8 +669,7 @@ class ZXQueryStore:
     def _gadget_fusion_hadamard(self):
         return """
         // 1. Find all t=1 nodes with degree exactly 1 (phase spiders)
-        MATCH (p:Node {t: 1})-[r:Wire]-(neighbor)
-        WHERE p.graph_id = $graph_id
+        MATCH (p:Node {graph_id: $graph_id, t: 1})-[r:Wire]-(neighbor)
         WITH p, count(r) AS degree
 
         // 2. Filter for nodes that have a degree of exactly 1. These are our phase spiders.
@@ -687,7 +703,8 @@ class ZXQueryStore:
             neighbor_key,
             phase_spiders,
             central_spiders,
-            sum(coalesce(ps.phase, 0.0)) AS total_phase
+            collect(""" + cypher_phase("ps") + """) AS phases
+        WITH neighbor_key, phase_spiders, central_spiders, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
         // 9. Select one gadget to survive and identify the rest for deletion.
         WITH
@@ -699,7 +716,7 @@ class ZXQueryStore:
 
         // 10. Perform the rewrite:
         // a) Update the phase of the surviving phase spider.
-        SET survivor_p.phase = total_phase
+        """ + cypher_set_phase("survivor_p", "total_phase") + """
 
         // b) Delete all other gadgets in the group (both the leaf and the now-redundant central spider).
         FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
@@ -712,18 +729,17 @@ class ZXQueryStore:
     def _pivot_gadget(self):
         return """
         // 1. Find pivot candidates: two t=1 nodes connected by t=2 edge, where one has integer phase
-        MATCH (z_j:Node {t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {t: 1})
-        WHERE z_j.graph_id = $graph_id AND z_alpha.graph_id = $graph_id
-          AND z_j.phase IS NOT NULL AND z_alpha.phase IS NOT NULL
+        MATCH (z_j:Node {graph_id: $graph_id, t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_numeric("z_alpha") + """
           // Check if z_j's phase is an integer multiple of pi.
-          AND z_j.phase = round(z_j.phase)
+          AND """ + cypher_is_pauli("z_j") + """
           // NEW: Ensure both are interior spiders (no simple wires of type t=1).
           AND NOT EXISTS((z_j)-[:Wire {t: 1}]-())
           AND NOT EXISTS((z_alpha)-[:Wire {t: 1}]-())
 
         // 1b. Out of all candidates, keep only the one with the largest z_j.phase
         WITH z_j, z_alpha
-        ORDER BY z_j.phase DESC
+        ORDER BY """ + cypher_phase_float("z_j") + """ DESC
         //LIMIT 1
 
         // 2. Collect the three disjoint sets of neighbors.
@@ -742,10 +758,13 @@ class ZXQueryStore:
         OPTIONAL MATCH (z_j)-[:Wire {t: 2}]-(n_shared:Node {t: 1})-[:Wire {t: 2}]-(z_alpha)
         WHERE n_shared <> z_j AND n_shared <> z_alpha
         WITH z_j, z_alpha, neighbors_j, neighbors_alpha, COLLECT(DISTINCT n_shared) AS shared_neighbors
+        WITH z_j, z_alpha, neighbors_j, neighbors_alpha, shared_neighbors,
+             """ + cypher_phase_sum("CASE WHEN coalesce(z_j.phase_n, 0) = 0 THEN " + cypher_phase_neg(cypher_phase("z_alpha"))
+                           + " ELSE " + cypher_phase("z_alpha") + " END") + """ AS new_phase
 
         // 3. Create the two new central nodes for the rewritten structure.
-        CREATE (z_new_phaseless:Node {t: 1, phase: 1.0, graph_id: z_j.graph_id, id: z_j.id, qubit: z_j.qubit, row: z_j.row}),
-               (z_new_phased:Node {t: 1, phase: (CASE z_j.phase % 2 WHEN 0 THEN -1 ELSE 1 END) * z_alpha.phase, graph_id: z_j.graph_id, id: z_alpha.id, qubit: z_alpha.qubit, row: z_alpha.row})
+        CREATE (z_new_phaseless:Node {t: 1, phase_n: 1, phase_d: 1, graph_id: z_j.graph_id, id: z_j.id, qubit: z_j.qubit, row: z_j.row}),
+               (z_new_phased:Node {t: 1, phase_n: new_phase[0], phase_d: new_phase[1], graph_id: z_j.graph_id, id: z_alpha.id, qubit: z_alpha.qubit, row: z_alpha.row})
         CREATE (z_new_phaseless)-[:Wire {t: 2}]->(z_new_phased)
 
         // 4. Connect the new central nodes to all neighbors.
@@ -772,10 +791,10 @@ class ZXQueryStore:
 
         // 6. Update phases on the neighbor nodes.
         FOREACH (n IN neighbors_alpha |
-            SET n.phase = coalesce(n.phase, 0.0) + z_j.phase
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"))) + """
         )
         FOREACH (n IN shared_neighbors |
-            SET n.phase = coalesce(n.phase, 0.0) + z_j.phase + 1
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"), cypher_phase_const(1))) + """
         )
 
         // 7. Finally, remove the original two central spiders.
@@ -788,10 +807,9 @@ class ZXQueryStore:
     def _pivot_boundary(self):
         return """
         // 1. Find pivot candidates: interior spider (z_j) and boundary-connected spider (z_alpha).
-        MATCH (z_j:Node {t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {t: 1})
+        MATCH (z_j:Node {graph_id: $graph_id, t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_pauli("z_j") + " AND " + cypher_is_numeric("z_alpha") + """
         MATCH (z_alpha)-[boundary_wire:Wire {t: 1}]-(boundary_node:Node {t: 0})
-        WHERE z_j.graph_id = $graph_id AND z_alpha.graph_id = $graph_id
-          AND z_j.phase = round(z_j.phase)
 
         // Ensure that z_j is not connected to a simple wire 
         WITH z_j, z_alpha, pivot_edge, boundary_wire, boundary_node
@@ -821,7 +839,7 @@ class ZXQueryStore:
         //RETURN z_j, z_alpha, pivot_edge
 
         WITH z_j, z_alpha, boundary_node, boundary_wire
-        ORDER BY z_j.phase DESC
+        ORDER BY """ + cypher_phase_float("z_j") + """ DESC
         LIMIT 1
 
         // 2. Collect the three disjoint sets of neighbors (connected via Hadamard edges).
@@ -837,12 +855,15 @@ class ZXQueryStore:
         OPTIONAL MATCH (z_j)-[:Wire {t: 2}]-(n_shared:Node {t: 1})-[:Wire {t: 2}]-(z_alpha)
         WHERE n_shared <> z_j AND n_shared <> z_alpha
         WITH z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, COLLECT(DISTINCT n_shared) AS shared_neighbors
+        WITH z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, shared_neighbors,
+             """ + cypher_phase_sum("CASE WHEN coalesce(z_j.phase_n, 0) = 0 THEN " + cypher_phase_neg(cypher_phase("z_alpha"))
+                           + " ELSE " + cypher_phase("z_alpha") + " END") + """ AS new_phase
 
         // RETURN z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, shared_neighbors
         // 3. Create the THREE new central spiders for the rewritten structure.
-        CREATE (z_new_phaseless:Node {t: 1, phase: 1.0, graph_id: z_j.graph_id}),
-               (z_new_phased:Node {t: 1, graph_id: z_j.graph_id, phase: (CASE z_j.phase % 2 WHEN 0 THEN -1 ELSE 1 END) * z_alpha.phase}),
-               (z_j_replacement:Node {t: 1, phase: z_j.phase, graph_id: z_j.graph_id})
+        CREATE (z_new_phaseless:Node {t: 1, phase_n: 1, phase_d: 1, graph_id: z_j.graph_id}),
+               (z_new_phased:Node {t: 1, graph_id: z_j.graph_id, phase_n: new_phase[0], phase_d: new_phase[1]}),
+               (z_j_replacement:Node {t: 1, phase_n: coalesce(z_j.phase_n, 0), phase_d: coalesce(z_j.phase_d, 1), graph_id: z_j.graph_id})
         CREATE (z_new_phaseless)-[:Wire {t: 2}]->(z_new_phased)
 
         // 4. Perform the boundary rewiring and connect the new spiders.
@@ -876,10 +897,10 @@ class ZXQueryStore:
 
         // 6. Update phases on the neighbor nodes.
         FOREACH (n IN neighbors_alpha |
-            SET n.phase = coalesce(n.phase, 0.0) + z_j.phase
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"))) + """
         )
         FOREACH (n IN shared_neighbors |
-            SET n.phase = coalesce(n.phase, 0.0) + z_j.phase + 1
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"), cypher_phase_const(1))) + """
         )
 
         // 8. Finally, remove the original two central spiders.
@@ -893,11 +914,10 @@ class ZXQueryStore:
     def _bialgebra_red_green(self):
         return """
         // Find bialgebra pattern: Z-spider (t=1) connected to X-spider (t=2) by simple edge
-        MATCH (n1:Node {t: 1})-[w:Wire {t: 1}]->(n2:Node {t: 2})
-        WHERE n1.graph_id = $graph_id AND n2.graph_id = $graph_id
+        MATCH (n1:Node {graph_id: $graph_id, t: 1})-[w:Wire {t: 1}]->(n2:Node {graph_id: $graph_id, t: 2})
         
         WITH n1, n2, w
-        LIMIT 10  // Process in small batches due to complexity
+        LIMIT $batch_size  // Process in small batches due to complexity
         
         // Gather n1's neighbors (except n2)
         OPTIONAL MATCH (n1)-[edge1:Wire]-(nb1:Node)
@@ -911,13 +931,13 @@ class ZXQueryStore:
         
         // Create new nodes for n1 (becomes t=2)
         UNWIND n1_neighs AS conn1
-        CREATE (new_n1:Node {t: 2, phase: coalesce(n1.phase, 0), graph_id: $graph_id})
+        CREATE (new_n1:Node {t: 2, phase_n: coalesce(n1.phase_n, 0), phase_d: coalesce(n1.phase_d, 1), phase_sym: n1.phase_sym, graph_id: $graph_id})
         CREATE (new_n1)-[:Wire {t: conn1.edge.t, graph_id: $graph_id}]-(conn1.node)
         WITH n1, n2, w, COLLECT(new_n1) AS new_n1s, n2_neighs
         
         // Create new nodes for n2 (becomes t=1)
         UNWIND n2_neighs AS conn2
-        CREATE (new_n2:Node {t: 1, phase: coalesce(n2.phase, 0), graph_id: $graph_id})
+        CREATE (new_n2:Node {t: 1, phase_n: coalesce(n2.phase_n, 0), phase_d: coalesce(n2.phase_d, 1), phase_sym: n2.phase_sym, graph_id: $graph_id})
         CREATE (new_n2)-[:Wire {t: conn2.edge.t, graph_id: $graph_id}]-(conn2.node)
         WITH n1, n2, new_n1s, COLLECT(new_n2) AS new_n2s
         
@@ -938,11 +958,10 @@ class ZXQueryStore:
     def _bialgebra_hadamard(self):
         return """
         // Find bialgebra pattern: two Z-spiders connected by Hadamard edge
-        MATCH (n1:Node {t: 1})-[w:Wire {t: 2}]->(n2:Node {t: 1})
-        WHERE n1.graph_id = $graph_id AND n2.graph_id = $graph_id
+        MATCH (n1:Node {graph_id: $graph_id, t: 1})-[w:Wire {t: 2}]->(n2:Node {graph_id: $graph_id, t: 1})
         
         WITH n1, n2, w
-        LIMIT 10  // Process in small batches
+        LIMIT $batch_size  // Process in small batches
         
         // Gather n1's neighbors (except n2)
         OPTIONAL MATCH (n1)-[edge1:Wire]-(nb1:Node)
@@ -956,13 +975,13 @@ class ZXQueryStore:
         
         // Create new X-spiders (t=2) for n1's neighbors
         UNWIND n1_neighs AS conn1
-        CREATE (new_n1:Node {t: 2, phase: 0, graph_id: $graph_id})
+        CREATE (new_n1:Node {t: 2, phase_n: 0, phase_d: 1, graph_id: $graph_id})
         CREATE (new_n1)-[:Wire {t: conn1.edge.t, graph_id: $graph_id}]-(conn1.node)
         WITH n1, n2, w, COLLECT(new_n1) AS new_n1s, n2_neighs
         
         // Create new Z-spiders (t=1) for n2's neighbors, flip Hadamard edges
         UNWIND n2_neighs AS conn2
-        CREATE (new_n2:Node {t: 1, phase: 0, graph_id: $graph_id})
+        CREATE (new_n2:Node {t: 1, phase_n: 0, phase_d: 1, graph_id: $graph_id})
         WITH new_n2, conn2, n1, n2, new_n1s, n2_neighs
         // Flip edge type: Hadamard (2) becomes Simple (1), Simple (1) becomes Hadamard (2)
         CREATE (new_n2)-[:Wire {t: CASE conn2.edge.t WHEN 1 THEN 2 ELSE 1 END, graph_id: $graph_id}]-(conn2.node)
@@ -989,20 +1008,20 @@ class ZXQueryStore:
         // All spiders are phase-free, each has exactly one external connection
         
         // Step 1: Find a seed - phase-free Z-spider with multiple X-neighbors
-        MATCH (z_seed:Node {t: 1, phase: 0})
-        WHERE z_seed.graph_id = $graph_id
+        MATCH (z_seed:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_zero("z_seed") + """
         
         // Collect all its X-neighbors (must be phase-free, connected by simple edge)
         WITH z_seed
-        MATCH (z_seed)-[:Wire {t: 1}]-(x_cand:Node {t: 2, phase: 0})
-        WHERE x_cand.graph_id = $graph_id
+        MATCH (z_seed)-[:Wire {t: 1}]-(x_cand:Node {graph_id: $graph_id, t: 2})
+        WHERE """ + cypher_is_zero("x_cand") + """
         WITH z_seed, COLLECT(DISTINCT x_cand) AS x_group
         WHERE size(x_group) >= 2
         
         // Step 2: Find all Z-spiders that connect to ALL these X-spiders (complete bipartite)
         WITH x_group
-        MATCH (z_cand:Node {t: 1, phase: 0})
-        WHERE z_cand.graph_id = $graph_id
+        MATCH (z_cand:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_zero("z_cand") + """
         
         // Check each z_cand connects to all x's in x_group with simple edges
         WITH x_group, z_cand
@@ -1036,8 +1055,8 @@ class ZXQueryStore:
         
         // Step 6: Create new collapsed nodes
         // New Z-spider replaces the X-group, new X-spider replaces the Z-group
-        CREATE (new_z:Node {t: 1, phase: 0, graph_id: $graph_id, qubit: avg_qubit_x, row: avg_row_x})
-        CREATE (new_x:Node {t: 2, phase: 0, graph_id: $graph_id, qubit: avg_qubit_z, row: avg_row_z})
+        CREATE (new_z:Node {t: 1, phase_n: 0, phase_d: 1, graph_id: $graph_id, qubit: avg_qubit_x, row: avg_row_x})
+        CREATE (new_x:Node {t: 2, phase_n: 0, phase_d: 1, graph_id: $graph_id, qubit: avg_qubit_z, row: avg_row_z})
         CREATE (new_z)-[:Wire {t: 1, graph_id: $graph_id}]-(new_x)
         
         // Step 7: Reconnect external edges from X-spiders to new Z-spider
@@ -1068,10 +1087,8 @@ class ZXQueryStore:
     def _local_complement_full(self):
         return """
         // Find local complementation pattern: Z-spider with ±π/2 phase, all neighbors via Hadamard
-        MATCH (center:Node)
-        WHERE center.graph_id = $graph_id
-          AND center.t = 1
-          AND (center.phase = 0.5 OR center.phase = -0.5 OR center.phase = 1.5)
+        MATCH (center:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_proper_clifford("center") + """
 
         // Find neighbors and ensure all are Z-spiders connected via Hadamard edges
         MATCH (center)-[w:Wire {t:2}]-(nbr:Node {t:1})
@@ -1088,7 +1105,7 @@ class ZXQueryStore:
         // 1. Update neighbors' phases
         WITH center, neighbors
         FOREACH (n IN neighbors | 
-            SET n.phase = n.phase - center.phase
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_neg(cypher_phase("center")))) + """
         )
         
         // 2. Delete the center node immediately to ensure execution
@@ -1120,8 +1137,8 @@ class ZXQueryStore:
         // Combined Phase Gadget Fusion: handles both Z-gadgets (t=2 edges) and X-gadgets (t=1 edges)
 
         // 1. Find all degree-1 phase spiders (t=1, degree=1)
-        MATCH (p:Node {t: 1})
-        WHERE p.graph_id = $graph_id AND degree(p) = 1
+        MATCH (p:Node {graph_id: $graph_id, t: 1})
+        WHERE degree(p) = 1
 
         // 2. Find their single neighbor (the gadget center), which can be either Z (t=1) or X (t=2)
         MATCH (p)-[e:Wire]-(center:Node)
@@ -1145,14 +1162,15 @@ class ZXQueryStore:
 
         // 7. Calculate the sum of phases for each group
         UNWIND phase_spiders AS ps
-        WITH edge_type, neighbor_key, phase_spiders, centers, sum(coalesce(ps.phase, 0.0)) AS total_phase
+        WITH edge_type, neighbor_key, phase_spiders, centers, collect(""" + cypher_phase("ps") + """) AS phases
+        WITH edge_type, neighbor_key, phase_spiders, centers, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
         // 8. Select one gadget to survive and identify the rest for deletion
         WITH total_phase, phase_spiders[0] AS survivor_p, centers[0] AS survivor_center,
              phase_spiders[1..] AS to_delete_p, centers[1..] AS to_delete_centers
 
         // 9. Update the surviving phase spider and delete the rest
-        SET survivor_p.phase = total_phase
+        """ + cypher_set_phase("survivor_p", "total_phase") + """
         FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
         FOREACH (c_del IN to_delete_centers | DETACH DELETE c_del)
 
@@ -1162,9 +1180,9 @@ class ZXQueryStore:
     def _spider_fusion_rewrite_2(self):
         return """
         // Match all candidate edges for spider fusion
-        MATCH (a:Node)-[r:Wire {t: 1}]->(b:Node)
+        MATCH (a:Node {graph_id: $graph_id})-[r:Wire {t: 1}]->(b:Node {graph_id: $graph_id})
         WHERE ((a.t = 1 AND b.t = 1) OR (a.t = 2 AND b.t = 2))
-          AND a.graph_id = $graph_id AND b.graph_id = $graph_id
+          AND """ + cypher_is_numeric("a") + " AND " + cypher_is_numeric("b") + """
         WITH COLLECT(DISTINCT r) AS allEdges
 
         // Keep only edges where neither endpoint already appears
@@ -1183,10 +1201,12 @@ class ZXQueryStore:
         // Step 2: For each matched edge, create a merged node
         UNWIND matchedEdges AS e
         WITH startNode(e) AS u, endNode(e) AS v
+        WITH u, v, """ + cypher_phase_sum(cypher_phase("u"), cypher_phase("v")) + """ AS merged_phase
 
         // Step 3: Create the new merged node with summed phase
         CREATE (merged:Node {
-          phase: coalesce(u.phase, 0) + coalesce(v.phase, 0),
+          phase_n: merged_phase[0],
+          phase_d: merged_phase[1],
           t: u.t,
           graph_id: u.graph_id,
           id: u.id,
@@ -1215,10 +1235,9 @@ class ZXQueryStore:
     def _copy_simp(self):
         return """
         // Copy rule for arity-1 ZX spiders through their neighbor (ZX-only variant).
-        MATCH (v:Node)-[vw:Wire]-(w:Node)
-        WHERE v.graph_id = $graph_id AND w.graph_id = $graph_id
-          AND v.t IN [1, 2] AND w.t IN [1, 2]
-          AND v.phase IN [0, 1]
+        MATCH (v:Node {graph_id: $graph_id})-[vw:Wire]-(w:Node {graph_id: $graph_id})
+        WHERE v.t IN [1, 2] AND w.t IN [1, 2]
+          AND """ + cypher_is_pauli("v") + """
           AND degree(v) = 1
           AND (
             (vw.t = 2 AND w.t = v.t) OR
@@ -1238,7 +1257,7 @@ class ZXQueryStore:
 
         OPTIONAL MATCH (w)-[we:Wire]-(n:Node)
         WHERE n <> v
-        WITH v, w, copy_type, coalesce(v.phase, 0) AS v_phase,
+        WITH v, w, copy_type, """ + cypher_phase("v") + """ AS v_phase,
              COLLECT(n) AS neighbor_nodes, COLLECT(we.t) AS neighbor_edge_types
 
         DETACH DELETE v, w
@@ -1248,7 +1267,8 @@ class ZXQueryStore:
         WITH applied, copy_type, v_phase, neighbor_nodes[idx] AS n, neighbor_edge_types[idx] AS et
         CREATE (u:Node {
           t: copy_type,
-          phase: v_phase,
+          phase_n: v_phase[0],
+          phase_d: v_phase[1],
           graph_id: $graph_id
         })
         CREATE (u)-[:Wire {t: et, graph_id: $graph_id}]->(n)
@@ -1259,18 +1279,12 @@ class ZXQueryStore:
     def _supplementarity_simp(self):
         return """
         // Supplementarity rule for non-Clifford Z-spiders with identical neighborhoods.
-        MATCH (v:Node {t: 1})
-        WHERE v.graph_id = $graph_id
-          AND v.phase IS NOT NULL
-          AND v.phase <> 0
-          AND v.phase * 2 <> round(v.phase * 2)
-
-        MATCH (w:Node {t: 1})
-        WHERE w.graph_id = $graph_id
-          AND id(v) < id(w)
-          AND w.phase IS NOT NULL
-          AND w.phase <> 0
-          AND w.phase * 2 <> round(w.phase * 2)
+        MATCH (v:Node {graph_id: $graph_id, t: 1})
+        WHERE """ + cypher_is_non_clifford("v") + """
+
+        MATCH (w:Node {graph_id: $graph_id, t: 1})
+        WHERE id(v) < id(w)
+          AND """ + cypher_is_non_clifford("w") + """
 
         OPTIONAL MATCH (v)-[vw:Wire]-(w)
 
@@ -1287,12 +1301,13 @@ class ZXQueryStore:
 
         WITH v, w, v_neighbors AS neighbors,
              CASE WHEN vw IS NULL THEN 1 ELSE 2 END AS supp_type,
-             coalesce(v.phase, 0) AS alpha,
-             coalesce(w.phase, 0) AS beta
+             """ + cypher_phase_sum(cypher_phase("v"), cypher_phase("w")) + """ AS phase_sum,
+             """ + cypher_phase_sum(cypher_phase("v"), cypher_phase_neg(cypher_phase("w"))) + """ AS phase_diff
 
+        // The sum and difference of the phases modulo 2, -1 if they are not 0 or 1
         WITH v, w, neighbors, supp_type,
-             abs((alpha + beta) % 2) AS sum_mod2,
-             abs((alpha - beta) % 2) AS diff_mod2
+             CASE WHEN phase_sum[0] = 0 THEN 0 WHEN phase_sum[0] = phase_sum[1] THEN 1 ELSE -1 END AS sum_mod2,
+             CASE WHEN phase_diff[0] = 0 THEN 0 WHEN phase_diff[0] = phase_diff[1] THEN 1 ELSE -1 END AS diff_mod2
 
         WHERE (supp_type = 1 AND (sum_mod2 = 1 OR diff_mod2 = 1))
            OR (supp_type = 2 AND (sum_mod2 = 0 OR diff_mod2 = 1))
@@ -1304,7 +1319,7 @@ class ZXQueryStore:
           FOREACH (_ IN CASE
             WHEN (supp_type = 1 AND sum_mod2 = 1) OR (supp_type = 2 AND sum_mod2 = 0)
             THEN [1] ELSE [] END |
-            SET n.phase = coalesce(n.phase, 0) + 1
+            """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_const(1))) + """
           )
         )
 
@@ -5,30 +5,49 @@ Usage:
 - All queries that operate on (:Node) should be run with parameter graph_id so only
   one graph is modified. Add "AND n.graph_id = $graph_id" (and similar for other
   matched nodes) to each MATCH when using with GraphNeo4j.
+- The queries that rewrite labelled patterns also take a parameter run_id. A labelling
+  pass marks its patterns with pattern_id = run_id + ':' + <unique id>, and the rewrite
+  only picks up the patterns of its own graph_id and run_id. Several workers can
+  therefore label and rewrite graphs of the same database concurrently.
 - SPIDER_FUSION_2 was written for Memgraph (collections.contains); a Neo4j-compatible
   version uses "node IN list" and startNode(r)/endNode(r).
 - GADGET_FUSION_RED_GREEN: PROFILE has been removed for production; use EXPLAIN/PROFILE
   only when analyzing performance.
+- Phases are read and written as the integers phase_n/phase_d, see db_phase.
 """
 
+from .db_phase import (
+    cypher_is_numeric,
+    cypher_is_pauli,
+    cypher_is_proper_clifford,
+    cypher_phase,
+    cypher_phase_const,
+    cypher_phase_float,
+    cypher_phase_neg,
+    cypher_phase_sum,
+    cypher_phase_sum_list,
+    cypher_set_phase,
+)
+
 
 class CypherRewrites:
     HADAMARD_EDGE_CANCELLATION = """
-    // Find all marked patterns
-    MATCH (s)
-    WHERE s.pattern_id IS NOT NULL
-
-    // Reconstruct the full path for each pattern
-    WITH DISTINCT s.pattern_id AS pattern_id
-    MATCH path = (start)-[:Wire*2..6]-(end)
-    WHERE ALL(edge IN relationships(path) WHERE edge.pattern_id = pattern_id)
-    AND start.pattern_id IS NULL AND end.pattern_id IS NULL AND elementId(start) < elementId(end)
-
-    WITH start, end, pattern_id,
-         [node IN nodes(path)[1..-1] WHERE node.pattern_id = pattern_id] as nodes_to_delete
+    // Find the marked intermediate nodes of every pattern
+    MATCH (h:Node {graph_id: $graph_id})
+    WHERE h.pattern_id STARTS WITH $run_id + ':'
+    WITH h.pattern_id AS pattern_id, collect(h) AS nodes_to_delete
+
+    // The ends of the chain are the unmarked nodes on its marked wires
+    UNWIND nodes_to_delete AS h
+    MATCH (h)-[w:Wire]-(e:Node)
+    WHERE w.pattern_id = pattern_id AND e.pattern_id IS NULL
+    WITH pattern_id, nodes_to_delete, collect(DISTINCT e) AS ends
+    WHERE size(ends) = 2
+    WITH pattern_id, nodes_to_delete,
+         CASE WHEN elementId(ends[0]) < elementId(ends[1]) THEN ends[0] ELSE ends[1] END AS start,
+         CASE WHEN elementId(ends[0]) < elementId(ends[1]) THEN ends[1] ELSE ends[0] END AS end
 
     // Create direct connection
-    WITH DISTINCT start, end, nodes_to_delete, pattern_id
     CREATE (start)-[newWire:Wire {t: 1}]->(end)
 
     // Delete the nodes with the corresponding Hadamard edges
@@ -44,12 +63,12 @@ class CypherRewrites:
     SPIDER_FUSION = """
     CALL () {
       // Find all marked patterns
-      MATCH ()-[s:Wire]-()
-      WHERE s.pattern_id IS NOT NULL
+      MATCH (:Node {graph_id: $graph_id})-[s:Wire]-()
+      WHERE s.pattern_id STARTS WITH $run_id + ':'
 
       // Reconstruct the full path for each pattern
       WITH DISTINCT s.pattern_id AS pattern_id
-      MATCH path = (start)-[:Wire*1..3]-(end)
+      MATCH path = (start:Node {graph_id: $graph_id})-[:Wire*1..3]-(end:Node {graph_id: $graph_id})
       WHERE ALL(edge IN relationships(path) WHERE edge.pattern_id = pattern_id)
         AND ALL(n IN nodes(path) WHERE n.pattern_id = pattern_id)
         AND elementId(start) < elementId(end)
@@ -70,13 +89,13 @@ class CypherRewrites:
       WHERE start_deg = 1 AND end_deg = 1
       // Calculate sum of phases from all nodes in the path
       WITH start, end, path_nodes, path_edges, pattern_id,
-           reduce(phase_sum = 0, node IN path_nodes | phase_sum + coalesce(node.phase, 0)) AS total_phase
+           """ + cypher_phase_sum_list("[node IN path_nodes | " + cypher_phase("node") + "]") + """ AS total_phase
       //LIMIT 1
       //RETURN total_phase
       // Find all external edges connected to any node in the path (excluding path edges)
-      MATCH (external)-[ext_edge:Wire]-(path_node)
-      WHERE path_node IN path_nodes
-        AND NOT external IN path_nodes
+      UNWIND path_nodes AS path_node
+      MATCH (path_node)-[ext_edge:Wire]-(external)
+      WHERE NOT external IN path_nodes
         AND NOT ext_edge IN path_edges
 
       // Collect all data needed before any modifications
@@ -89,7 +108,7 @@ class CypherRewrites:
            }) AS external_connections
 
       // Update start node with summed phase (non-destructive operation)
-      SET start.phase = total_phase
+      """ + cypher_set_phase("start", "total_phase") + """
       CREATE (fused:Node)
       SET fused = properties(start)
       
@@ -117,11 +136,13 @@ class CypherRewrites:
              SUM(connections_created) AS total_connections_created
     }
     CALL () {
-      MATCH (n)
+      MATCH (n:Node {graph_id: $graph_id})
+      WHERE n.pattern_id STARTS WITH $run_id + ':'
       REMOVE n.pattern_id
     }
     CALL () {
-      MATCH ()-[r]-()
+      MATCH (:Node {graph_id: $graph_id})-[r]-()
+      WHERE r.pattern_id STARTS WITH $run_id + ':'
       REMOVE r.pattern_id
     }
     RETURN patterns_processed;
@@ -131,11 +152,9 @@ class CypherRewrites:
     // Find pivot candidates: two t=1 nodes with integer phases connected by t=2 edge
     MATCH (a {t: 1})-[pivot_edge:Wire {t: 2}]-(b {t: 1})
     WHERE elementId(a) < elementId(b)  // Process each pair once
-      AND a.phase IS NOT NULL 
-      AND b.phase IS NOT NULL
       // Check if phases are integer multiples of pi (phase = k for integer k)
-      AND a.phase = round(a.phase) 
-      AND b.phase = round(b.phase)
+      AND """ + cypher_is_pauli("a") + """
+      AND """ + cypher_is_pauli("b") + """
 
     // Find neighbors of a (excluding b and nodes connected to b)
     WITH a, b, pivot_edge
@@ -193,15 +212,16 @@ class CypherRewrites:
         
     // 6. Update phases on the neighbor nodes. 
     FOREACH (n IN neighbors_a |
-      SET n.phase = coalesce(n.phase, 0.0) + a.phase
+      """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("a"))) + """
     ) 
 
     FOREACH (n IN neighbors_b |
-      SET n.phase = coalesce(n.phase, 0.0) + b.phase
+      """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("b"))) + """
     ) 
       
     FOREACH (shared_neighbor IN shared_neighbors | 
-      SET shared_neighbor.phase = coalesce(shared_neighbor.phase, 0) + a.phase + b.phase + 1
+      """ + cypher_set_phase("shared_neighbor", cypher_phase_sum(
+          cypher_phase("shared_neighbor"), cypher_phase("a"), cypher_phase("b"), cypher_phase_const(1))) + """
     )
 
     // 7. Delete the original pivot nodes
@@ -214,8 +234,8 @@ class CypherRewrites:
     PIVOT_SINGLE_INTERIOR_PAULI = """
     // Interior Pauli spider removal rule - Memgraph compatible
     MATCH (a {t: 1})-[:Wire {t : 2}]-(b {t: 1})
-    WHERE a.phase = round(a.phase) 
-      AND b.phase = round(b.phase)
+    WHERE """ + cypher_is_pauli("a") + """
+      AND """ + cypher_is_pauli("b") + """
       //AND elementId(a) < elementId(b)
     //RETURN a.id, b.id
     // Check b's connectivity: exactly one boundary (t=0) and one non-boundary
@@ -258,7 +278,7 @@ class CypherRewrites:
     // Use FOREACH to update phases (handles empty collections automatically)
     WITH a, b, boundary_vertex, boundary_edge, COLLECT(a_neighbor) as a_neighbors
     FOREACH (neighbor IN a_neighbors |
-      SET neighbor.phase = (coalesce(neighbor.phase, 0) + b.phase) % 2
+      """ + cypher_set_phase("neighbor", cypher_phase_sum(cypher_phase("neighbor"), cypher_phase("b"))) + """
     )
 
     // Connect a to boundary with opposite edge type
@@ -276,56 +296,47 @@ class CypherRewrites:
     """
 
     LOCAL_COMPLEMENT = """
-    // Complement each labeled pattern, add center phase to neighbors, then delete center
-    MATCH (n) 
-    WHERE n.pattern_id IS NOT NULL
+    // Find the patterns that this run marked on this graph
+    MATCH (n:Node {graph_id: $graph_id})
+    WHERE n.pattern_id STARTS WITH $run_id + ':'
     WITH n.pattern_id AS pid, COLLECT(DISTINCT n) AS nodes
 
-    // Count nodes per pattern
-    //UNWIND nodes AS tmp
-    //WITH pid, nodes, COUNT(tmp) AS total_nodes
-
-    // Find center: node connected to all others in this pattern
+    // The center is the node whose neighbors are exactly the other nodes of the pattern
     UNWIND nodes AS c
-    MATCH (c)-[:Wire]-(cn)
-    WHERE cn.pattern_id = pid AND degree(c) = size(nodes) - 1
-    WITH pid, nodes, c AS center, collect(DISTINCT c) AS centers
-
-    // Neighbors = pattern nodes except center
-    MATCH (center)-[:Wire]-(nbr)
-    WHERE nbr.pattern_id = pid
-    WITH pid, center, COLLECT(DISTINCT nbr) AS neighbors
-
-    // Enumerate neighbor pairs and toggle: create missing edges first
-    UNWIND range(0, size(neighbors)-2) AS i
-    UNWIND range(i+1, size(neighbors)-1) AS j
-    WITH pid, center, neighbors, neighbors[i] AS n1, neighbors[j] AS n2
-    //WHERE elementId(n1) < elementId(n2)
-    OPTIONAL MATCH (n1)-[e:Wire]-(n2)
-    FOREACH (_ IN CASE WHEN e IS NULL THEN [1] ELSE [] END |
+    MATCH (c)-[:Wire]-(x)
+    WITH pid, nodes, c, count(x) AS deg, count(CASE WHEN x.pattern_id = pid THEN 1 END) AS marked
+    WHERE deg = size(nodes) - 1 AND marked = deg
+      AND c.t = 1 AND """ + cypher_is_proper_clifford("c") + """
+    WITH pid, nodes, collect(c)[0] AS center
+    WITH pid, center, [n IN nodes WHERE n <> center] AS neighbors
+
+    // Toggle the Hadamard edges between all pairs of neighbors
+    WITH pid, center, neighbors,
+         reduce(acc = [], i IN range(0, size(neighbors) - 1) |
+                acc + [j IN range(i + 1, size(neighbors) - 1) | [neighbors[i], neighbors[j]]]) AS pairs
+    UNWIND CASE WHEN size(pairs) = 0 THEN [null] ELSE pairs END AS pair
+    WITH pid, center, neighbors, pair[0] AS n1, pair[1] AS n2
+    OPTIONAL MATCH (n1)-[e:Wire {t: 2}]-(n2)
+    FOREACH (_ IN CASE WHEN n1 IS NOT NULL AND e IS NULL THEN [1] ELSE [] END |
       CREATE (n1)-[:Wire {t: 2}]->(n2)
     )
-    FOREACH (_ IN CASE WHEN e IS NOT NULL THEN [1] ELSE [] END |
-      DELETE e
-    )
-    // Collect edges that existed to delete later (no UNWIND after this point)
-    WITH pid, center, neighbors, COLLECT(e) AS edges_to_delete
+    WITH pid, center, neighbors, COLLECT(e) AS existing
+    FOREACH (e IN existing | DELETE e)
 
-    // Add center's phase to all neighbors
+    // Subtract the phase of the center from its neighbors, and remove the center
     FOREACH (n IN neighbors |
-      SET n.phase = coalesce(n.phase, 0) + coalesce(-center.phase, 0)
+      """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_neg(cypher_phase("center")))) + """
     )
-
-    // Delete existing edges between neighbors to finish the complement
-    //FOREACH (ed IN edges_to_delete |
-    //  FOREACH (_ IN CASE WHEN ed IS NOT NULL THEN [1] ELSE [] END |
-    //    DELETE ed))
-
-    // Remove the center and clear labels
     DETACH DELETE center
-    FOREACH (n IN neighbors | SET n.pattern_id = NULL)
+    WITH COUNT(DISTINCT pid) AS num_processed
+
+    // Clear the markers of this run, also those of patterns that no longer matched
+    OPTIONAL MATCH (n:Node {graph_id: $graph_id})
+    WHERE n.pattern_id STARTS WITH $run_id + ':'
+    WITH num_processed, COLLECT(n) AS still_marked
+    FOREACH (n IN still_marked | SET n.pattern_id = NULL)
 
-    RETURN COUNT(DISTINCT pid) AS num_processed
+    RETURN num_processed
     """
 
     GADGET_FUSION_RED_GREEN = """
@@ -364,7 +375,8 @@ class CypherRewrites:
         neighbor_key,
         phase_spiders,
         x_spiders,
-        sum(coalesce(ps.phase, 0.0)) AS total_phase
+        collect(""" + cypher_phase("ps") + """) AS phases
+    WITH neighbor_key, phase_spiders, x_spiders, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
     // 9. Select one gadget to survive and identify the rest for deletion.
     WITH
@@ -376,7 +388,7 @@ class CypherRewrites:
 
     // 10. Perform the rewrite:
     // a) Update the phase of the surviving phase spider.
-    SET survivor_p.phase = total_phase
+    """ + cypher_set_phase("survivor_p", "total_phase") + """
 
     // b) Delete all other gadgets in the group.
     FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
@@ -422,7 +434,8 @@ class CypherRewrites:
         neighbor_key,
         phase_spiders,
         central_spiders,
-        sum(coalesce(ps.phase, 0.0)) AS total_phase
+        collect(""" + cypher_phase("ps") + """) AS phases
+    WITH neighbor_key, phase_spiders, central_spiders, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
     // 9. Select one gadget to survive and identify the rest for deletion.
     WITH
@@ -434,7 +447,7 @@ class CypherRewrites:
 
     // 10. Perform the rewrite:
     // a) Update the phase of the surviving phase spider.
-    SET survivor_p.phase = total_phase
+    """ + cypher_set_phase("survivor_p", "total_phase") + """
 
     // b) Delete all other gadgets in the group (both the leaf and the now-redundant central spider).
     FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
@@ -448,16 +461,16 @@ class CypherRewrites:
     // 1. Find pivot candidates: two t=1 nodes connected by a t=2 edge, where one has an integer phase.
     MATCH (z_j:Node {t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {t: 1})
     // Process each pair once, ensure phases exist, and check they are interior spiders.
-    WHERE z_j.phase IS NOT NULL AND z_alpha.phase IS NOT NULL
+    WHERE """ + cypher_is_numeric("z_alpha") + """
       // Check if z_j's phase is an integer multiple of pi.
-      AND z_j.phase = round(z_j.phase)
+      AND """ + cypher_is_pauli("z_j") + """
       // NEW: Ensure both are interior spiders (no simple wires of type t=1).
       AND NOT EXISTS((z_j)-[:Wire {t: 1}]-())
       AND NOT EXISTS((z_alpha)-[:Wire {t: 1}]-())
 
     // 1b. Out of all candidates, keep only the one with the largest z_j.phase
     WITH z_j, z_alpha
-    ORDER BY z_j.phase DESC
+    ORDER BY """ + cypher_phase_float("z_j") + """ DESC
     //LIMIT 1
 
     // 2. Collect the three disjoint sets of neighbors.
@@ -476,10 +489,13 @@ class CypherRewrites:
     OPTIONAL MATCH (z_j)-[:Wire {t: 2}]-(n_shared:Node {t: 1})-[:Wire {t: 2}]-(z_alpha)
     WHERE n_shared <> z_j AND n_shared <> z_alpha
     WITH z_j, z_alpha, neighbors_j, neighbors_alpha, COLLECT(DISTINCT n_shared) AS shared_neighbors
+    WITH z_j, z_alpha, neighbors_j, neighbors_alpha, shared_neighbors,
+         """ + cypher_phase_sum("CASE WHEN coalesce(z_j.phase_n, 0) = 0 THEN " + cypher_phase_neg(cypher_phase("z_alpha"))
+                       + " ELSE " + cypher_phase("z_alpha") + " END") + """ AS new_phase
 
     // 3. Create the two new central nodes for the rewritten structure.
-    CREATE (z_new_phaseless:Node {t: 1, phase: 1.0, graph_id: z_j.graph_id}),
-           (z_new_phased:Node {t: 1, phase: (CASE z_j.phase % 2 WHEN 0 THEN -1 ELSE 1 END) * z_alpha.phase, graph_id: z_j.graph_id})
+    CREATE (z_new_phaseless:Node {t: 1, phase_n: 1, phase_d: 1, graph_id: z_j.graph_id}),
+           (z_new_phased:Node {t: 1, phase_n: new_phase[0], phase_d: new_phase[1], graph_id: z_j.graph_id})
     CREATE (z_new_phaseless)-[:Wire {t: 2}]->(z_new_phased)
 
     // 4. Connect the new central nodes to all neighbors.
@@ -506,10 +522,10 @@ class CypherRewrites:
 
     // 6. Update phases on the neighbor nodes.
     FOREACH (n IN neighbors_alpha |
-        SET n.phase = coalesce(n.phase, 0.0) + z_j.phase
+        """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"))) + """
     )
     FOREACH (n IN shared_neighbors |
-        SET n.phase = coalesce(n.phase, 0.0) + z_j.phase + 1
+        """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"), cypher_phase_const(1))) + """
     )
 
     // 7. Finally, remove the original two central spiders.
@@ -523,7 +539,7 @@ class CypherRewrites:
     // 1. Find pivot candidates: a t=1 interior spider (z_j) and a t=1 boundary-connected spider (z_alpha).
     MATCH (z_j:Node {t: 1})-[pivot_edge:Wire {t: 2}]-(z_alpha:Node {t: 1})
     MATCH (z_alpha)-[boundary_wire:Wire {t: 1}]-(boundary_node {t: 0})
-    WHERE z_j.phase = round(z_j.phase)
+    WHERE """ + cypher_is_pauli("z_j") + " AND " + cypher_is_numeric("z_alpha") + """
 
     // Ensure that z_j is not connected to a simple wire 
     WITH z_j, z_alpha, pivot_edge, boundary_wire, boundary_node
@@ -553,7 +569,7 @@ class CypherRewrites:
     //RETURN z_j, z_alpha, pivot_edge
 
     WITH z_j, z_alpha, boundary_node, boundary_wire
-    ORDER BY z_j.phase DESC
+    ORDER BY """ + cypher_phase_float("z_j") + """ DESC
     LIMIT 1
 
     // 2. Collect the three disjoint sets of neighbors (connected via Hadamard edges).
@@ -569,12 +585,15 @@ class CypherRewrites:
     OPTIONAL MATCH (z_j)-[:Wire {t: 2}]-(n_shared:Node {t: 1})-[:Wire {t: 2}]-(z_alpha)
     WHERE n_shared <> z_j AND n_shared <> z_alpha
     WITH z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, COLLECT(DISTINCT n_shared) AS shared_neighbors
+    WITH z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, shared_neighbors,
+         """ + cypher_phase_sum("CASE WHEN coalesce(z_j.phase_n, 0) = 0 THEN " + cypher_phase_neg(cypher_phase("z_alpha"))
+                       + " ELSE " + cypher_phase("z_alpha") + " END") + """ AS new_phase
 
     // RETURN z_j, z_alpha, boundary_node, boundary_wire, neighbors_j, neighbors_alpha, shared_neighbors
     // 3. Create the THREE new central spiders for the rewritten structure.
-    CREATE (z_new_phaseless:Node {t: 1, phase: 1.0, graph_id: z_j.graph_id}),
-           (z_new_phased:Node {t: 1, graph_id: z_j.graph_id, phase: (CASE z_j.phase % 2 WHEN 0 THEN -1 ELSE 1 END) * z_alpha.phase}),
-           (z_j_replacement:Node {t: 1, phase: z_j.phase, graph_id: z_j.graph_id})
+    CREATE (z_new_phaseless:Node {t: 1, phase_n: 1, phase_d: 1, graph_id: z_j.graph_id}),
+           (z_new_phased:Node {t: 1, graph_id: z_j.graph_id, phase_n: new_phase[0], phase_d: new_phase[1]}),
+           (z_j_replacement:Node {t: 1, phase_n: coalesce(z_j.phase_n, 0), phase_d: coalesce(z_j.phase_d, 1), graph_id: z_j.graph_id})
     CREATE (z_new_phaseless)-[:Wire {t: 2}]->(z_new_phased)
 
     // 4. Perform the boundary rewiring and connect the new spiders.
@@ -608,10 +627,10 @@ class CypherRewrites:
 
     // 6. Update phases on the neighbor nodes.
     FOREACH (n IN neighbors_alpha |
-        SET n.phase = coalesce(n.phase, 0.0) + z_j.phase
+        """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"))) + """
     )
     FOREACH (n IN shared_neighbors |
-        SET n.phase = coalesce(n.phase, 0.0) + z_j.phase + 1
+        """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase("z_j"), cypher_phase_const(1))) + """
     )
 
     // 8. Finally, remove the original two central spiders.
@@ -624,8 +643,10 @@ class CypherRewrites:
 
     BIALGEBRA_RED_GREEN = """
     // Rewriting: For each labeled pattern, perform the bialgebra rewrite
-    MATCH (n1:Node {pattern_id})-[w:Wire {pattern_id}]->(n2:Node {pattern_id})
-    WHERE n1.t = 1 AND n2.t = 2
+    MATCH (n1:Node {graph_id: $graph_id})-[w:Wire]->(n2:Node {graph_id: $graph_id})
+    WHERE n1.pattern_id STARTS WITH $run_id + ':'
+      AND w.pattern_id = n1.pattern_id AND n2.pattern_id = n1.pattern_id
+      AND n1.t = 1 AND n2.t = 2
 
     // Gather n1's neighbors (except n2), and the relationship types
     OPTIONAL MATCH (n1)-[edge1]-(nb1)
@@ -644,12 +665,12 @@ class CypherRewrites:
 
     // Create new nodes for n1 (t:2)
     UNWIND n1_idx AS i1
-    CREATE (new_n1:Node {t:2, uuid: randomUUID(), original: elementId(n1)})
+    CREATE (new_n1:Node {t:2, graph_id: $graph_id, uuid: randomUUID(), original: elementId(n1)})
     WITH n1, n2, w, n1_neighs, n1_edges, n2_neighs, n2_edges, collect(new_n1) AS new_n1s, n2_idx
 
     // Create new nodes for n2 (t:1)
     UNWIND n2_idx AS i2
-    CREATE (new_n2:Node {t:1, uuid: randomUUID(), original: elementId(n2)})
+    CREATE (new_n2:Node {t:1, graph_id: $graph_id, uuid: randomUUID(), original: elementId(n2)})
     WITH n1, n2, w, n1_neighs, n1_edges, n2_neighs, n2_edges, new_n1s, collect(new_n2) AS new_n2s
 
     // Reconnect previous edges for new_n1 nodes (index-safe)
@@ -676,8 +697,10 @@ class CypherRewrites:
 
     BIALGEBRA_HADAMARD = """
     // Rewriting: For each labeled pattern, perform the bialgebra rewrite
-    MATCH (n1:Node {pattern_id})-[w:Wire {pattern_id}]->(n2:Node {pattern_id})
-    WHERE n1.t = 1 AND n2.t = 1 AND w.t = 2
+    MATCH (n1:Node {graph_id: $graph_id})-[w:Wire]->(n2:Node {graph_id: $graph_id})
+    WHERE n1.pattern_id STARTS WITH $run_id + ':'
+      AND w.pattern_id = n1.pattern_id AND n2.pattern_id = n1.pattern_id
+      AND n1.t = 1 AND n2.t = 1 AND w.t = 2
 
     // Gather n1's neighbors (except n2), and the relationship types
     OPTIONAL MATCH (n1)-[edge1]-(nb1)
@@ -696,12 +719,12 @@ class CypherRewrites:
 
     // Create new nodes for n1 (t:2)
     UNWIND n1_idx AS i1
-    CREATE (new_n1:Node {t:2})
+    CREATE (new_n1:Node {t:2, graph_id: $graph_id})
     WITH n1, n2, w, n1_neighs, n1_edges, n2_neighs, n2_edges, collect(new_n1) AS new_n1s, n2_idx
 
     // Create new nodes for n2 (t:1)
     UNWIND n2_idx AS i2
-    CREATE (new_n2:Node {t:1})
+    CREATE (new_n2:Node {t:1, graph_id: $graph_id})
     WITH n1, n2, w, n1_neighs, n1_edges, n2_neighs, n2_edges, new_n1s, collect(new_n2) AS new_n2s
 
     // Reconnect previous edges for new_n1 nodes (index-safe)
@@ -729,8 +752,8 @@ class CypherRewrites:
     BIALGEBRA_SIMPLIFICATION = """
 CALL () {
   // Pick exactly one marked pattern for this execution.
-  MATCH (a:Node)
-  WHERE a.pattern_id IS NOT NULL
+  MATCH (a:Node {graph_id: $graph_id})
+  WHERE a.pattern_id STARTS WITH $run_id + ':'
   WITH DISTINCT a.pattern_id AS pid, a.graph_id AS graph_id
   ORDER BY pid
   LIMIT 1
@@ -876,8 +899,8 @@ CALL () {
   RETURN pid, newA, newB
 }
 CALL () {
-  MATCH (n:Node)
-  WHERE n.pattern_id IS NOT NULL
+  MATCH (n:Node {graph_id: $graph_id})
+  WHERE n.pattern_id STARTS WITH $run_id + ':'
   REMOVE n.pattern_id
 }
 RETURN pid, newA, newB;
@@ -886,14 +909,17 @@ RETURN pid, newA, newB;
 
     LOCAL_COMPLEMENT_FULL = """
     // Find and rewrite local complementation patterns (green spider with ±0.5 phase and all-green Hadamard neighbors)
-    MATCH (center:Node)
+    MATCH (center:Node {graph_id: $graph_id})
     WHERE center.t = 1
-      AND (center.phase = 0.5 OR center.phase = -0.5)
+      AND """ + cypher_is_proper_clifford("center") + """
+      // Leave the patterns that other runs marked alone
+      AND (center.pattern_id IS NULL OR center.pattern_id STARTS WITH $run_id + ':')
 
     // Collect all neighbors
     MATCH (center)-[w:Wire {t:2}]-(nbr:Node {t:1})
     WITH center, COLLECT(DISTINCT nbr) AS neighbors, COLLECT(w) AS neighbor_edges
     WHERE size(neighbors) > 0 
+      AND ALL(neigh IN neighbors WHERE neigh.pattern_id IS NULL OR neigh.pattern_id STARTS WITH $run_id + ':')
       AND ALL(neigh IN neighbors WHERE neigh.t = 1)
       AND ALL(w in neighbor_edges WHERE w.t = 2)
 
@@ -920,7 +946,7 @@ RETURN pid, newA, newB;
     // Add center's phase to all neighbors
     WITH center, neighbors
     FOREACH (n IN neighbors |
-      SET n.phase = coalesce(n.phase, 0) - coalesce(center.phase, 0)
+      """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_neg(cypher_phase("center")))) + """
     )
 
     // Remove the center
@@ -958,14 +984,15 @@ RETURN pid, newA, newB;
 
     // 7. Calculate the sum of phases for each group
     UNWIND phase_spiders AS ps
-    WITH edge_type, neighbor_key, phase_spiders, centers, sum(coalesce(ps.phase, 0.0)) AS total_phase
+    WITH edge_type, neighbor_key, phase_spiders, centers, collect(""" + cypher_phase("ps") + """) AS phases
+    WITH edge_type, neighbor_key, phase_spiders, centers, """ + cypher_phase_sum_list("phases") + """ AS total_phase
 
     // 8. Select one gadget to survive and identify the rest for deletion
     WITH total_phase, phase_spiders[0] AS survivor_p, centers[0] AS survivor_center,
          phase_spiders[1..] AS to_delete_p, centers[1..] AS to_delete_centers
 
     // 9. Update the surviving phase spider and delete the rest
-    SET survivor_p.phase = total_phase
+    """ + cypher_set_phase("survivor_p", "total_phase") + """
     FOREACH (p_del IN to_delete_p | DETACH DELETE p_del)
     FOREACH (c_del IN to_delete_centers | DETACH DELETE c_del)
 
@@ -974,8 +1001,11 @@ RETURN pid, newA, newB;
 
     SPIDER_FUSION_2 = """
     // Match all candidate edges satisfying the condition (Neo4j-compatible; was Memgraph collections.contains)
-    MATCH (a:Node)-[r:Wire]->(b:Node)
-    WHERE (a.t = 1 AND b.t = 1) OR (a.t = 2 AND b.t = 2) AND r.t = 1
+    MATCH (a:Node {graph_id: $graph_id})-[r:Wire]->(b:Node {graph_id: $graph_id})
+    WHERE a.t IN [1, 2] AND b.t = a.t AND r.t = 1
+      // Nodes marked by a labelling pass belong to the pattern of some run
+      AND a.pattern_id IS NULL AND b.pattern_id IS NULL
+      AND """ + cypher_is_numeric("a") + " AND " + cypher_is_numeric("b") + """
     WITH collect(DISTINCT r) AS allEdges
 
     // Keep only edges where neither endpoint already appears
@@ -994,10 +1024,12 @@ RETURN pid, newA, newB;
     // Step 2: For each matched edge, create a merged node
     UNWIND matchedEdges AS e
     WITH startNode(e) AS u, endNode(e) AS v
+    WITH u, v, """ + cypher_phase_sum(cypher_phase("u"), cypher_phase("v")) + """ AS merged_phase
 
     // Step 3: Create the new merged node with summed phase
     CREATE (merged:Node {
-      phase: coalesce(u.phase, 0) + coalesce(v.phase, 0),
+      phase_n: merged_phase[0],
+      phase_d: merged_phase[1],
       t: u.t,
       graph_id: u.graph_id
 
@@ -5,6 +5,7 @@ import os
 from typing import Optional
 import logging
 import time
+import uuid
 from typing import (
     Any,
     Iterable,
@@ -33,13 +34,16 @@ logging.basicConfig(
 
 class ZXdb:
     
-    def __init__(self, uri = "bolt://localhost:7687", user = "", password="", graph_id: Optional['str'] = None):
+    def __init__(self, uri = "bolt://localhost:7687", user = "", password="", graph_id: Optional['str'] = None, run_id: Optional[str] = None):
         self.uri = uri
         self.user = user
         self.password = password
         self.basic_rewrite_rule_queries = {}
         self._driver = None
         self.graph_id = graph_id if graph_id is not None else "graph_test_zxdb"
+        # The labelling queries mark their patterns with '<run_id>:<uuid>' on the nodes of
+        # graph_id only, so several workers can rewrite graphs of the same database at once
+        self.run_id = run_id if run_id is not None else uuid.uuid4().hex
         self.current_path = os.path.dirname(os.path.abspath(__file__))
 
         with open(f"{self.current_path}/query_collections/memgraph-collection-zxdb.json", "r") as f:
@@ -110,11 +114,14 @@ class ZXdb:
 
 
     def export_graphdb_to_zx_graph(self,
-        json_file_path: str
+        json_file_path: str,
+        layout: bool = True
         ) -> zx.Graph:
         """
         Export a graph from Neo4j or Memgraph database to a PyZX graph and write JSON.
-        Positions are computed (spring layout) and stored so they appear as 'pos' in JSON.
+        If layout is set, positions are computed (spring layout) and stored so they appear
+        as 'pos' in JSON. The spring layout is quadratic in the number of vertices, so
+        leave it off for large graphs.
         """
         g = zx.Graph()
 
@@ -205,18 +212,19 @@ class ZXdb:
             g.set_outputs(tuple(output_vertices))
 
             # Compute positions (spring layout) so JSON contains "pos"
-            nxg = nx.Graph()
-            for v in g.vertices():
-                nxg.add_node(v)
-            for u, v in g.edges():
-                nxg.add_edge(u, v)
-            pos = nx.spring_layout(
-                nxg,
-                seed=42,
-                k=100,  # larger k -> more spacing
-                )
-            for v, (x, y) in pos.items():
-                g.set_position(v, float(x), float(y))
+            if layout:
+                nxg = nx.Graph()
+                for v in g.vertices():
+                    nxg.add_node(v)
+                for u, v in g.edges():
+                    nxg.add_edge(u, v)
+                pos = nx.spring_layout(
+                    nxg,
+                    seed=42,
+                    k=100,  # larger k -> more spacing
+                    )
+                for v, (x, y) in pos.items():
+                    g.set_position(v, float(x), float(y))
 
             #g.normalize()
 
@@ -411,7 +419,7 @@ class ZXdb:
             def mark_pattern(tx):
                 # Get the marking query from your JSON collection
                 mark_query = str(self.basic_rewrite_rule_queries["Hadamard cancellation labeling query"]["query"]["code"]["value"])
-                result = tx.run(mark_query)
+                result = tx.run(mark_query, graph_id=self.graph_id, run_id=self.run_id)
                 record = result.single()
                 return record["pattern_id"] if record and record["pattern_id"] else None
             
@@ -424,7 +432,7 @@ class ZXdb:
         if total_patterns > 0:
             def cancel_patterns(tx):
                 cancel_query = str(self.basic_rewrite_rule_queries["Hadamard edge cancellation"]["query"]["code"]["value"])
-                result = tx.run(cancel_query, graph_id=self.graph_id)
+                result = tx.run(cancel_query, graph_id=self.graph_id, run_id=self.run_id)
                 return result.single()["patterns_processed"]
             processed = session.execute_write(cancel_patterns)
         return total_patterns
@@ -443,7 +451,7 @@ class ZXdb:
                 def mark_pattern(tx):
                     # Get the marking query from your JSON collection
                     mark_query = str(self.basic_rewrite_rule_queries["Hadamard cancellation labeling query"]["query"]["code"]["value"])
-                    result = tx.run(mark_query)
+                    result = tx.run(mark_query, graph_id=self.graph_id, run_id=self.run_id)
                     record = result.single()
                     return record["pattern_id"] if record and record["pattern_id"] else None
                 
@@ -457,7 +465,7 @@ class ZXdb:
             if total_patterns > 0:
                 def cancel_patterns(tx):
                     cancel_query = str(self.basic_rewrite_rule_queries["Hadamard edge cancellation"]["query"]["code"]["value"])
-                    result = tx.run(cancel_query, graph_id=self.graph_id)
+                    result = tx.run(cancel_query, graph_id=self.graph_id, run_id=self.run_id)
                     return result.single()["patterns_processed"]
                 
                 processed = session.execute_write(cancel_patterns)
@@ -625,32 +633,34 @@ class ZXdb:
         with self.driver.session() as session:
             #start_time = time.time()
             iteration = 0
+            processed = 0
             while True:
                 iteration += 1
                 print(f'{iteration}th iteration')
                 def apply_local_complementation_labeling(tx):
                    lc_query = str(self.basic_rewrite_rule_queries["Local complement labeling"]["query"]["code"]["value"])
-                   result = tx.run(lc_query, graph_id=self.graph_id)
+                   result = tx.run(lc_query, graph_id=self.graph_id, run_id=self.run_id)
                    return result.single()["num_processed"]
                 changed = session.execute_write(apply_local_complementation_labeling)
 
                 if changed == 0:
                    break  # No more patterns found
                 
+                # Rewrites the patterns marked above and clears their markers
                 def apply_local_complementation_rewrite(tx):
-                    lc_query = str(self.basic_rewrite_rule_queries["Local complement full"]["query"]["code"]["value"])
-                    result = tx.run(lc_query, graph_id=self.graph_id)
-                    #print(result)
-                    return result.single()
+                    lc_query = str(self.basic_rewrite_rule_queries["Local complement rewrite"]["query"]["code"]["value"])
+                    result = tx.run(lc_query, graph_id=self.graph_id, run_id=self.run_id)
+                    return result.single()["num_processed"]
                 
                 changed = session.execute_write(apply_local_complementation_rewrite)
-                if changed:
-                    break  # No more patterns found
+                if changed == 0:
+                    break  # None of the marked patterns could be rewritten
+                processed += changed
 
 
             #end_time = time.time()
-            #logging.info(f"Local complementation applied for graph ID '{graph_id}' with {changed} patterns processed in {end_time - start_time} seconds")
-            return changed
+            #logging.info(f"Local complementation applied for graph ID '{graph_id}' with {processed} patterns processed in {end_time - start_time} seconds")
+            return processed
         
     
     def phase_gadget_fusion_rule(self) -> int:
@@ -766,7 +776,7 @@ class ZXdb:
 
                 def apply_bialgebra_labeling(tx):
                     pgf_query = str(self.basic_rewrite_rule_queries["Bialgebra labeling"]["query"]["code"]["value"])
-                    result = tx.run(pgf_query, graph_id=self.graph_id)
+                    result = tx.run(pgf_query, graph_id=self.graph_id, run_id=self.run_id)
                     record = result.single()
                     return record if record is not None else 0
                 
@@ -774,7 +784,7 @@ class ZXdb:
 
                 def apply_bialgebra_rewrite(tx):
                     pgf_query = str(self.basic_rewrite_rule_queries["Bialgebra simplification"]["query"]["code"]["value"])
-                    result = tx.run(pgf_query, graph_id=self.graph_id)
+                    result = tx.run(pgf_query, graph_id=self.graph_id, run_id=self.run_id)
                     record = result.single()
                     return record["pid"] if record is not None else 0
                 
@@ -30,6 +30,15 @@ except ImportError:
 Z2 = Literal[0,1]
 MatLike = List[List[Z2]]
 
+def pack_row(row: List[Z2]) -> int:
+    """Packs a row of a matrix into an integer, where bit ``j`` is the entry in column ``j``.
+    Adding rows then becomes a single XOR."""
+    return int("".join("1" if v else "0" for v in reversed(row)) or "0", 2)
+
+def unpack_row(bits: int, cols: int) -> List[Z2]:
+    """Inverse of :func:`pack_row`."""
+    return [cast(Z2, bits >> j & 1) for j in range(cols)]
+
 class Mat2(object):
     """A matrix over Z2, with methods for multiplication, primitive row and column
     operations, Gaussian elimination, rank, and epi-mono factorisation."""
@@ -175,20 +184,23 @@ class Mat2(object):
 
         rows = self.rows()
         cols = self.cols()
+        # The row operations are done on the rows packed into integers, see pack_row
+        data = [pack_row(row) for row in self.data]
         #pivot_cols = []
         pivot_row = 0
         for sec in range(math.ceil(cols / blocksize)):
             i0 = sec * blocksize
             i1 = min(cols, (sec+1) * blocksize)
+            mask = (1 << (i1 - i0)) - 1
 
             # search for duplicate chunks of 'blocksize' bits and eliminate them
-            chunks: Dict[Tuple[Z2,...],int] = dict()
+            chunks: Dict[int,int] = dict()
             for r in range(pivot_row, rows):
-                t = tuple(self.data[r][i0:i1])
-                if not any(t): continue
+                t = data[r] >> i0 & mask
+                if not t: continue
                 if t in chunks:
                     #print('hit (down)', r, chunks[t], t, i0, i1)
-                    self.row_add(chunks[t], r)
+                    data[r] ^= data[chunks[t]]
                     if x is not None: x.row_add(chunks[t], r)
                     if y is not None: y.col_add(r, chunks[t])
                 else:
@@ -196,17 +208,18 @@ class Mat2(object):
 
             p = i0
             while p < i1:
+                bit = 1 << p
                 for r0 in range(pivot_row, rows):
-                    if self.data[r0][p] != 0:
+                    if data[r0] & bit:
                         if r0 != pivot_row:
-                            self.row_add(r0, pivot_row)
+                            data[pivot_row] ^= data[r0]
                             if x is not None: x.row_add(r0, pivot_row)
                             if y is not None: y.col_add(pivot_row, r0)
 
+                        prow = data[pivot_row]
                         for r1 in range(pivot_row+1, rows):
-                            # TODO: remove pivot_row != r1 and test
-                            if pivot_row != r1 and self.data[r1][p] != 0:
-                                self.row_add(pivot_row, r1)
+                            if data[r1] & bit:
+                                data[r1] ^= prow
                                 if x is not None: x.row_add(pivot_row, r1)
                                 if y is not None: y.col_add(r1, pivot_row)
                         #if full_reduce:
@@ -224,15 +237,16 @@ class Mat2(object):
             for sec in range(math.ceil(cols / blocksize) - 1, -1, -1):
                 i0 = sec * blocksize
                 i1 = min(cols, (sec+1) * blocksize)
+                mask = (1 << (i1 - i0)) - 1
 
                 # search for duplicate chunks of 'blocksize' bits and eliminate them
                 chunks = dict()
                 for r in range(pivot_row, -1, -1):
-                    t = tuple(self.data[r][i0:i1])
-                    if not any(t): continue
+                    t = data[r] >> i0 & mask
+                    if not t: continue
                     if t in chunks:
                         #print('hit (up)', r, chunks[t], t, i0, i1)
-                        self.row_add(chunks[t], r)
+                        data[r] ^= data[chunks[t]]
                         if x is not None: x.row_add(chunks[t], r)
                         if y is not None: y.col_add(r, chunks[t])
                     else:
@@ -240,13 +254,16 @@ class Mat2(object):
 
                 while len(pivot_cols1) != 0 and i0 <= pivot_cols1[-1] < i1:
                     pcol = pivot_cols1.pop()
+                    bit = 1 << pcol
                     for r in range(0, pivot_row):
-                        if self.data[r][pcol] != 0:
-                            self.row_add(pivot_row, r)
+                        if data[r] & bit:
+                            data[r] ^= data[pivot_row]
                             if x is not None: x.row_add(pivot_row, r)
                             if y is not None: y.col_add(r, pivot_row)
                     pivot_row -= 1
 
+        for row, bits in zip(self.data, data):
+            row[:] = unpack_row(bits, cols)
         return rank
 
     def rank(self) -> int:
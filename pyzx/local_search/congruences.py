@@ -132,6 +132,7 @@ def lc_cong(g, v):
 
     :param g: Graph where the operation is applied.
     :param v: Vertex to apply local complementation.
+    :return: The set of vertices whose neighbourhood changed.
     """
     # FIXME: not gracefully handling if on boundary. If on boundary, sohuld just add on same qubit rather than add a gadget
     ns = [n for n in g.neighbors(v) if g.type(n) == VertexType.Z]
@@ -154,6 +155,7 @@ def lc_cong(g, v):
     )
     g.set_phase(v, phase=Fraction(1, 2))
     g.add_edge((v, new_v), edgetype=EdgeType.HADAMARD)
+    return set(ns) | {v, new_v}
 
 
 def lc_cong2(g, v):
@@ -161,6 +163,7 @@ def lc_cong2(g, v):
 
     :param g: Graph where the operation is applied.
     :param v: Vertex to apply local complementation.
+    :return: The set of vertices whose neighbourhood changed.
     """
     p = g.phase(v)
     if p != Fraction(1,2) and p != Fraction(-1,2):
@@ -176,6 +179,8 @@ def lc_cong2(g, v):
         g.add_edge((v1, v2), edgetype=EdgeType.HADAMARD)
         g.add_edge((v2, v), edgetype=EdgeType.HADAMARD)
         g.set_phase(v, Fraction(-1,2))
+        return {v, v1, v2}
+    return set()
     # apply_rule(g, lcomp, [[v, list(g.neighbors(v))]])
 
 
@@ -185,12 +190,13 @@ def apply_rand_lc(g, weight_func=uniform_weights):
 
     :param g: Graph where the operation is applied.
     :param weight_func: Function to determine weights for selection.    
+    :return: The set of vertices whose neighbourhood changed.
     """
 
     lc_vs = [v for v in g.vertices() if is_lc_vertex(g, v)]
     weights = weight_func(g, lc_vs)
     lc_v = np.random.choice(lc_vs, 1, p=weights)[0]
-    lc_cong2(g, lc_v)
+    return lc_cong2(g, lc_v)
 
 
 
@@ -217,6 +223,7 @@ def pivot_cong(g, v1, v2):
     :param g: Graph where the operation is applied.
     :param v1: First vertex.
     :param v2: Second vertex.
+    :return: The set of vertices whose neighbourhood changed.
     """
 
     # get the three subsets
@@ -251,6 +258,8 @@ def pivot_cong(g, v1, v2):
     g.add_edge((v1, new_v2), edgetype=EdgeType.HADAMARD)
     g.add_edge((v2, new_v1), edgetype=EdgeType.HADAMARD)
 
+    return set(shared_ns + nhd1_only + nhd2_only + bs1 + bs2) | {v1, v2, new_v1, new_v2}
+
 
 
 
@@ -260,6 +269,7 @@ def apply_rand_pivot(g, weight_func=uniform_weights):
 
     :param g: Graph where the operation is applied.
     :param weight_func: Function to determine weights for selection. Default is uniform weights.
+    :return: The set of vertices whose neighbourhood changed.
     """
 
     # assumes len(candidates) != 0
@@ -268,4 +278,4 @@ def apply_rand_pivot(g, weight_func=uniform_weights):
     e_idx = np.random.choice(len(candidates), 1, p=weights)[0]
     e = candidates[e_idx]
     v1, v2 = g.edge_st(e)
-    pivot_cong(g, v1, v2)
+    return pivot_cong(g, v1, v2)
@@ -0,0 +1,227 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimisation using the ZX-calculus
+# Copyright (C) 2021 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+This module contains parallel drivers for the local search methods in simulated_annealing.py and genetic.py. Several independent annealing chains (or island populations of the genetic algorithm) are run in separate processes for a number of epochs. Between epochs the best solution found so far is exchanged between the workers. Every worker is seeded deterministically from a base seed, its index and the epoch, so that a run can be reproduced.
+"""
+
+import time
+import random
+from copy import deepcopy
+from multiprocessing import cpu_count
+from multiprocessing.pool import Pool
+
+import numpy as np
+
+from .simulated_annealing import anneal
+from .genetic import GeneticOptimizer, Mutant
+from .scores import g_wgc
+import sys
+if __name__ == '__main__':
+    sys.path.append('..')
+from pyzx.simplify import to_graph_like
+from pyzx.extract import extract_circuit
+from pyzx.optimize import basic_optimization
+
+
+__all__ = ['parallel_anneal', 'parallel_evolve']
+
+
+def worker_seed(seed, worker, epoch):
+    """
+    Deterministically derives the seed of a single worker in a single epoch.
+
+    :param seed: The base seed of the run.
+    :param worker: The index of the chain or island.
+    :param epoch: The index of the epoch.
+    :return: An integer seed.
+    """
+    return int(np.random.SeedSequence([seed, worker, epoch]).generate_state(1)[0])
+
+def _seed_all(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+def _map(pool, f, args):
+    if pool is not None:
+        return pool.map(f, args)
+    return [f(a) for a in args]
+
+def _make_pool(n_workers, n_threads):
+    n_threads = min(n_threads, cpu_count()) if n_threads is not None else cpu_count()
+    n_threads = min(n_threads, n_workers)
+    return Pool(n_threads) if n_threads > 1 else None
+
+
+def _anneal_chain(args):
+    """Runs a single annealing chain for one epoch. Used as the worker function of :func:`parallel_anneal`."""
+    g, iters, temp, seed, kwargs = args
+    _seed_all(seed)
+    g_best, best_scores = anneal(g, iters=iters, temp=temp, quiet=True, **kwargs)
+    return g_best, best_scores[-1]
+
+def parallel_anneal(g, n_chains=4,
+                    iters=1000,
+                    exchange_every=100,
+                    time_budget=None,
+                    seed=0,
+                    n_threads=None,
+                    temp=25,
+                    cool=0.005,
+                    score=g_wgc,
+                    **kwargs
+):
+    """
+    Runs several independent simulated annealing chains in parallel processes.
+
+    The chains are run for ``exchange_every`` iterations at a time, after which every chain continues
+    from the best diagram it has found. The chain with the worst score instead continues from
+    the best diagram found by any chain. The temperature keeps cooling across epochs as if the
+    chains had not been interrupted.
+
+    :param g: Initial ZX-diagram to optimize.
+    :param n_chains: Number of independent annealing chains (default is 4).
+    :param iters: Number of iterations to perform in every chain (default is 1000).
+    :param exchange_every: Number of iterations between exchanges of the best solution (default is 100).
+    :param time_budget: Wall-clock budget in seconds. It is checked between epochs, so the
+                        last epoch might overrun it (default is None, no budget).
+    :param seed: Base seed from which the seeds of the workers are derived (default is 0).
+    :param n_threads: Number of processes to use. If None, use all available cores.
+    :param temp: Initial temperature for annealing (default is 25).
+    :param cool: Cooling rate for temperature reduction (default is 0.005).
+    :param score: Function to evaluate the energy of a diagram (default is `g_wgc`). Must be picklable.
+    :param kwargs: Further keyword arguments passed to :func:`anneal`.
+    :return: A tuple containing the best ZX-diagram found and the convergence trace, a list of
+             ``(seconds elapsed, best score)`` pairs, one for every epoch.
+    """
+    start = time.perf_counter()
+    pool = _make_pool(n_chains, n_threads)
+    kwargs = dict(kwargs, cool=cool, score=score)
+
+    chains = [g.copy() for _ in range(n_chains)]
+    g_best = g.copy()
+    sz_best = score(g_best)
+    trace = [(0.0, sz_best)]
+    try:
+        for epoch, done in enumerate(range(0, iters, exchange_every)):
+            if time_budget is not None and time.perf_counter() - start > time_budget:
+                break
+            n = min(exchange_every, iters - done)
+            t = temp * (1.0 - cool)**done
+            results = _map(pool, _anneal_chain,
+                           [(chains[i], n, t, worker_seed(seed, i, epoch), kwargs) for i in range(n_chains)])
+            chains = [r[0] for r in results]
+            scores = [r[1] for r in results]
+            i_best = min(range(n_chains), key=lambda i: scores[i])
+            if scores[i_best] < sz_best:
+                g_best = chains[i_best].copy()
+                sz_best = scores[i_best]
+            i_worst = max(range(n_chains), key=lambda i: scores[i])
+            chains[i_worst] = g_best.copy()
+            trace.append((time.perf_counter() - start, sz_best))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return g_best, trace
+
+
+def _evolve_island(args):
+    """Evolves a single island population for one epoch. Used as the worker function of :func:`parallel_evolve`."""
+    optimizer, mutants, n_generations, seed = args
+    _seed_all(seed)
+    optimizer.mutants = mutants
+    optimizer.n_mutants = len(mutants)
+    best_mutant = min(mutants, key=lambda m: m.score)
+    for _ in range(n_generations):
+        optimizer.mutate()
+        best_in_gen = min(optimizer.mutants, key=lambda m: m.score)
+        if best_in_gen.score < best_mutant.score:
+            best_mutant = deepcopy(best_in_gen)
+        if all([m.dead for m in optimizer.mutants]):
+            break
+        optimizer.select()
+    return optimizer.mutants, best_mutant
+
+def parallel_evolve(g, n_islands=4,
+                    n_mutants=20,
+                    n_generations=40,
+                    migrate_every=5,
+                    time_budget=None,
+                    seed=0,
+                    n_threads=None,
+                    optimizer=None
+):
+    """
+    Runs an island model of :class:`GeneticOptimizer` populations in parallel processes.
+
+    Every island evolves its own population for ``migrate_every`` generations at a time. After
+    every such epoch, the best mutant of each island replaces the worst mutant of the next island
+    (in a ring).
+
+    :param g: Initial ZX-diagram to optimize.
+    :param n_islands: Number of island populations (default is 4).
+    :param n_mutants: Number of mutants in every island (default is 20).
+    :param n_generations: Number of generations to evolve every island (default is 40).
+    :param migrate_every: Number of generations between migrations (default is 5).
+    :param time_budget: Wall-clock budget in seconds. It is checked between epochs, so the
+                        last epoch might overrun it (default is None, no budget).
+    :param seed: Base seed from which the seeds of the workers are derived (default is 0).
+    :param n_threads: Number of processes to use. If None, use all available cores.
+    :param optimizer: The :class:`GeneticOptimizer` whose actions and score are used. Must be picklable.
+                      By default a new one with the default actions and score is used.
+    :return: A tuple containing the best ZX-diagram found and the convergence trace, a list of
+             ``(seconds elapsed, best score)`` pairs, one for every epoch.
+    """
+    start = time.perf_counter()
+    if optimizer is None:
+        optimizer = GeneticOptimizer()
+    pool = _make_pool(n_islands, n_threads)
+
+    g_orig = g.copy()
+    to_graph_like(g_orig)
+    c_orig = extract_circuit(g_orig.copy()).to_basic_gates()
+    c_orig = basic_optimization(c_orig)
+    best_mutant = Mutant(c_orig, g_orig)
+    best_mutant.score = optimizer.score(best_mutant)
+    islands = [[deepcopy(best_mutant) for _ in range(n_mutants)] for _ in range(n_islands)]
+    trace = [(0.0, best_mutant.score)]
+    try:
+        for epoch, done in enumerate(range(0, n_generations, migrate_every)):
+            if time_budget is not None and time.perf_counter() - start > time_budget:
+                break
+            n = min(migrate_every, n_generations - done)
+            results = _map(pool, _evolve_island,
+                           [(GeneticOptimizer(optimizer.actions, optimizer.score), islands[i], n,
+                             worker_seed(seed, i, epoch)) for i in range(n_islands)])
+            islands = [r[0] for r in results]
+            bests = [r[1] for r in results]
+            for b in bests:
+                if b.score < best_mutant.score:
+                    best_mutant = deepcopy(b)
+            for i in range(n_islands):
+                island = islands[(i + 1) % n_islands]
+                i_worst = max(range(len(island)), key=lambda j: island[j].score)
+                island[i_worst] = deepcopy(bests[i])
+            trace.append((time.perf_counter() - start, best_mutant.score))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return best_mutant.g_curr, trace
@@ -17,6 +17,8 @@
 
 """
 This module contains objective functions to guide local search over ZX-diagrams. The wgc method defines a measure of circuit complexity -- a weighted gate count where 2-qubit counts incur a higher cost. The g_wgc takes a ZX-diagram as input and optionally applies various optimizations before measuring the complexity of the circuit obtained via extraction.
+
+Since extraction is by far the most expensive part of a local search step, the search can also be guided by a scoring strategy. ExactScore wraps a function like g_wgc, while ProxyScore estimates the cost from quantities of the diagram that can be updated incrementally after a congruence is applied.
 """
 
 import sys
@@ -25,6 +27,8 @@ if __name__ == '__main__':
 from pyzx.extract import extract_circuit
 from pyzx.simplify import full_reduce
 from pyzx.optimize import basic_optimization
+from pyzx.linalg import Mat2
+from pyzx.utils import VertexType, phase_is_clifford
 
 # Weighted gate count
 def wgc(c, two_qb_weight=10):
@@ -61,3 +65,95 @@ def g_wgc(g, two_qb_weight=10, g_simplify=False, c_simplify=True):
         c = basic_optimization(c)
 
     return wgc(c, two_qb_weight=two_qb_weight)
+
+
+class ExactScore:
+    """Scoring strategy that evaluates a score function like :func:`g_wgc` on every state.
+
+    A scoring strategy keeps a small state per diagram. ``reset(g)`` computes the state from
+    scratch, ``update(g, state, touched)`` computes it after a congruence changed the
+    neighbourhoods of the vertices in ``touched``, and ``value(state)`` turns it into a score
+    where lower is better. If ``exact`` is False, the values are only estimates and the search
+    should confirm improvements with :attr:`score`.
+
+    Attributes:
+        score: The function mapping a ZX-diagram to its score.
+        exact: Always True."""
+
+    exact = True
+
+    def __init__(self, score=g_wgc):
+        self.score = score
+
+    def reset(self, g):
+        return self.score(g)
+
+    def update(self, g, state, touched):
+        return self.score(g)
+
+    def value(self, state):
+        return state
+
+
+class ProxyScore:
+    """Scoring strategy that estimates the cost of the extracted circuit without extracting it.
+
+    The estimate is a weighted sum of the number of edges between spiders, the rank over F2 of the
+    biadjacency matrix between the output frontier and its neighbours, and the number of non-Clifford
+    spiders. The edge count is read from the graph in constant time, and the non-Clifford count is
+    invariant under the congruences in congruences.py. The frontier rank is only recomputed when a
+    congruence touches a frontier vertex. The exact score is left to :attr:`score`.
+
+    Attributes:
+        score: The exact score function to confirm improvements with (default is `g_wgc`).
+        edge_weight: Weight of the edge count.
+        rank_weight: Weight of the frontier rank.
+        non_clifford_weight: Weight of the non-Clifford spider count.
+        exact: Always False."""
+
+    exact = False
+
+    def __init__(self, score=g_wgc, edge_weight=10, rank_weight=10, non_clifford_weight=1):
+        self.score = score
+        self.edge_weight = edge_weight
+        self.rank_weight = rank_weight
+        self.non_clifford_weight = non_clifford_weight
+
+    def _frontier(self, g):
+        return {n for o in g.outputs() for n in g.neighbors(o) if g.type(n) != VertexType.BOUNDARY}
+
+    def _frontier_rank(self, g, frontier):
+        rows = list(frontier)
+        cols = list({n for v in rows for n in g.neighbors(v)
+                     if n not in frontier and g.type(n) != VertexType.BOUNDARY})
+        if not rows or not cols:
+            return 0
+        col_index = {n: j for j, n in enumerate(cols)}
+        m = [[0] * len(cols) for _ in rows]
+        for i, v in enumerate(rows):
+            for n in g.neighbors(v):
+                if n in col_index:
+                    m[i][col_index[n]] = 1
+        return Mat2(m).rank()
+
+    def reset(self, g):
+        """Computes the state ``(internal edges, boundary edges, frontier rank, non-Clifford count)``
+        from scratch, where the internal edges are those between two spiders."""
+        boundary_edges = sum(g.vertex_degree(b) for b in g.inputs() + g.outputs())
+        non_clifford = sum(1 for p in g.phases().values() if not phase_is_clifford(p))
+        rank = self._frontier_rank(g, self._frontier(g))
+        return (g.num_edges() - boundary_edges, boundary_edges, rank, non_clifford)
+
+    def update(self, g, state, touched):
+        """Updates the state after a congruence. Boundary edges are only moved around by the
+        congruences, so the number of edges between spiders follows from the total edge count."""
+        _, boundary_edges, rank, non_clifford = state
+        frontier = self._frontier(g)
+        if not frontier.isdisjoint(touched):
+            rank = self._frontier_rank(g, frontier)
+        return (g.num_edges() - boundary_edges, boundary_edges, rank, non_clifford)
+
+    def value(self, state):
+        edges, _, rank, non_clifford = state
+        return (self.edge_weight * edges + self.rank_weight * rank +
+                self.non_clifford_weight * non_clifford)
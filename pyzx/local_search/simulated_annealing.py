@@ -21,7 +21,7 @@ import math
 import numpy as np
 
 from .congruences import uniform_weights, apply_rand_lc, apply_rand_pivot
-from .scores import g_wgc
+from .scores import g_wgc, ExactScore
 import sys
 if __name__ == '__main__':
     sys.path.append('..')
@@ -45,7 +45,8 @@ def anneal(g, iters=1000,
            pivot_select=uniform_weights,
            full_reduce_prob=0.1,
            reset_prob=0.0,
-           quiet=False
+           quiet=False,
+           strategy=None
 ):
     """
     Performs simulated annealing over ZX-diagram to minimize energy function.
@@ -63,12 +64,20 @@ def anneal(g, iters=1000,
     :param full_reduce_prob: Probability of applying full reduction (default is 0.1).
     :param reset_prob: Probability of resetting to the best state (default is 0.0).
     :param quiet: If True, suppresses progress output (default is False).
-    :return: A tuple containing the best ZX-diagram found and a list of best scores over iterations.
+    :param strategy: Scoring strategy from `scores.py` used to accept or reject moves (default is
+                     `ExactScore(score)`). With a strategy that only estimates the score, such as
+                     `ProxyScore`, `score` is only evaluated on states that improve the best estimate so far.
+    :return: A tuple containing the best ZX-diagram found and a list of the best score after every iteration.
     """
 
+    if strategy is None:
+        strategy = ExactScore(score)
+
     g_best = g.copy()
-    sz = score(g_best)
-    sz_best = sz
+    state = strategy.reset(g)
+    sz = strategy.value(state)
+    sz_best = sz if strategy.exact else score(g_best)
+    sz_proxy_best = sz
 
     best_scores = list()
 
@@ -80,16 +89,17 @@ def anneal(g, iters=1000,
         cong_method = "PIVOT"
 
         if cong_method == "PIVOT":
-            apply_rand_pivot(g1, weight_func=pivot_select)
+            touched = apply_rand_pivot(g1, weight_func=pivot_select)
         else:
-            apply_rand_lc(g1, weight_func=lc_select)
+            touched = apply_rand_lc(g1, weight_func=lc_select)
 
         # probabilistically full_reduce:
         if random.uniform(0, 1) < full_reduce_prob:
             full_reduce(g1)
-        sz1 = score(g1)
-
-        best_scores.append(sz_best)
+            state1 = strategy.reset(g1)
+        else:
+            state1 = strategy.update(g1, state, touched)
+        sz1 = strategy.value(state1)
 
         if temp != 0: temp *= 1.0 - cool
 
@@ -97,11 +107,22 @@ def anneal(g, iters=1000,
             (temp != 0 and random.random() < math.exp((sz - sz1)/temp)):
 
             sz = sz1
+            state = state1
             g = g1.copy()
-            if sz < sz_best:
-                g_best = g.copy()
-                sz_best = sz
+            if strategy.exact:
+                if sz < sz_best:
+                    g_best = g.copy()
+                    sz_best = sz
+            elif sz < sz_proxy_best:
+                # only confirm promising states with the exact score
+                sz_proxy_best = sz
+                sz_exact = score(g)
+                if sz_exact < sz_best:
+                    g_best = g.copy()
+                    sz_best = sz_exact
         elif random.uniform(0, 1) < reset_prob:
             g = g_best.copy()
 
+        best_scores.append(sz_best)
+
     return g_best, best_scores
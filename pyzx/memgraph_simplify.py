@@ -23,12 +23,17 @@ using Cypher query rewrites instead of in-memory graph operations.
 
 Main procedures:
 - :func:`full_reduce_db`: Full simplification using all available rewrites
+- :func:`resume_full_reduce_db`: Continue a full_reduce_db that was interrupted
 - :func:`clifford_simp_db`: Clifford simplifications only
 - :func:`interior_clifford_simp`: Interior clifford simplifications
 - :func:`gadget_simp_db`: Phase gadget fusion
+- :func:`reduce_graphs`: Simplify many graphs of the same database concurrently
+- :func:`hybrid_full_reduce`: Full simplification that does the interior Clifford
+  simplifications of regions of the graph in memory
 
 Each function takes a session_factory and graph_id to identify which graph
-in the database to simplify.
+in the database to simplify. The batch sizes of the batched rewrite queries
+are chosen adaptively by :data:`batch_tuner`.
 
 Example usage:
     from neo4j import GraphDatabase
@@ -56,16 +61,35 @@ __all__ = [
     'copy_simp',
     'supplementarity_simp',
     'full_reduce',
+    'full_reduce_db',
+    'resume_full_reduce_db',
+    'hybrid_full_reduce',
+    'simplify_regions',
+    'custom_reduce',
+    'reduce_graphs',
     'reduce_scalar',
+    'GraphReduceError',
     'Stats'
 ]
 
 
-from typing import Callable, Optional, Dict, Any
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Optional, Dict, Any, Iterable, List, Tuple, Union
+from . import simplify as simplify_mem
 from .graph.memgraph_queries import ZXQueryStore
+from .graph.graph_db_rewrite_runner import BatchSizeTuner, is_transient_error
 from pyzx.utils import VertexType, EdgeType
 from pyzx.graph.base import BaseGraph, VT, ET
+from pyzx.graph.scalar import Scalar
+from .graph.db_checkpoint import ReduceLog
+from .graph.db_phase import migrate_legacy_phases
+from .graph.diff import GraphDiff
 from .graph.graph_memgraph import GraphMemgraph
+from .graph.graph_neo4j import GraphNeo4j
+from .graph.graph_s import GraphS
 
 
 class Stats:
@@ -73,6 +97,7 @@ class Stats:
     
     def __init__(self) -> None:
         self.num_rewrites: Dict[str, int] = {}
+        self.batch_sizes: Dict[str, int] = {}
     
     def count_rewrites(self, rule: str, n: int) -> None:
         """Record that n rewrites of the given rule were applied."""
@@ -80,6 +105,16 @@ class Stats:
             self.num_rewrites[rule] += n
         else:
             self.num_rewrites[rule] = n
+
+    def record_batch_size(self, query_name: str, size: int) -> None:
+        """Record the batch size that was chosen for the given batched query."""
+        self.batch_sizes[query_name] = size
+
+    def merge(self, other: 'Stats') -> None:
+        """Add the rewrites counted by another tracker to this one."""
+        for rule, n in other.num_rewrites.items():
+            self.count_rewrites(rule, n)
+        self.batch_sizes.update(other.batch_sizes)
     
     def __str__(self) -> str:
         s = "GRAPH DB REWRITES\n"
@@ -88,8 +123,16 @@ class Stats:
             nt += n
             s += "%s %s\n" % (str(n).rjust(6), r)
         s += "%s TOTAL" % str(nt).rjust(6)
+        if self.batch_sizes:
+            s += "\nBATCH SIZES"
+            for r, n in self.batch_sizes.items():
+                s += "\n%s %s" % (str(n).rjust(6), r)
         return s
 
+
+batch_tuner = BatchSizeTuner()
+"""Chooses the batch sizes of the batched rewrite queries, shared by all the simplifications in this module."""
+
 def toggle_edge(ty: EdgeType) -> EdgeType:
     """Swap the regular and Hadamard edge types."""
     return EdgeType.HADAMARD if ty == EdgeType.SIMPLE else EdgeType.SIMPLE
@@ -112,6 +155,35 @@ def to_gh(
     query = ZXQueryStore().get("to_gh")
     _execute_query(session_factory, query, {"graph_id": graph_id}, quiet=quiet)
 
+def _execute_batched_query(
+    session_factory: Callable,
+    query_name: str,
+    params: Dict[str, Any],
+    quiet: bool = True,
+    stats: Optional[Stats] = None
+) -> int:
+    """
+    Execute a batched query from the query store, with the batch size chosen by :data:`batch_tuner`.
+    
+    Args:
+        session_factory: Function that returns a database session
+        query_name: Name of the query in the ZXQueryStore
+        params: Query parameters, without the batch size
+        quiet: If False, print execution details
+        stats: Optional statistics tracker, in which the chosen batch size is recorded
+        
+    Returns:
+        Number of rewrites applied (extracted from query result)
+    """
+    query = ZXQueryStore().get(query_name)
+
+    def execute(size: int) -> int:
+        if stats:
+            stats.record_batch_size(query_name, size)
+        return _execute_query(session_factory, query, dict(params, batch_size=size), quiet)
+
+    return batch_tuner.run(query_name, execute) or 0
+
 def _execute_query(
     session_factory: Callable,
     query: str,
@@ -172,14 +244,11 @@ def spider_simp(
     Returns:
         True if any rewrites were applied, False otherwise
     """
-    queries = ZXQueryStore()
-    query = queries.get("spider_fusion_rewrite")
-    
     # Add graph_id filter to query
     # Note: This assumes your queries support graph_id filtering
     params = {"graph_id": graph_id}
     
-    count = _execute_query(session_factory, query, params, quiet)
+    count = _execute_batched_query(session_factory, "spider_fusion_rewrite", params, quiet, stats)
     
     if stats:
         stats.count_rewrites("spider_fusion", count)
@@ -300,11 +369,9 @@ def hadamard_simp(
     Returns:
         True if any rewrites were applied, False otherwise
     """
-    queries = ZXQueryStore()
-    query = queries.get("hadamard_edge_cancellation")
     params = {"graph_id": graph_id}
     
-    count = _execute_query(session_factory, query, params, quiet)
+    count = _execute_batched_query(session_factory, "hadamard_edge_cancellation", params, quiet, stats)
     
     if stats:
         stats.count_rewrites("hadamard_cancellation", count)
@@ -401,11 +468,9 @@ def bialgebra_simp(
     params = {"graph_id": graph_id}
     
     # Try all bialgebra variants
-    query1 = queries.get("bialgebra_red_green")
-    count1 = _execute_query(session_factory, query1, params, quiet)
+    count1 = _execute_batched_query(session_factory, "bialgebra_red_green", params, quiet, stats)
     
-    query2 = queries.get("bialgebra_hadamard")
-    count2 = _execute_query(session_factory, query2, params, quiet)
+    count2 = _execute_batched_query(session_factory, "bialgebra_hadamard", params, quiet, stats)
     
     query3 = queries.get("bialgebra_simplification")
     count3 = _execute_query(session_factory, query3, params, quiet)
@@ -758,7 +823,42 @@ def verify_connectivity(session_factory: Callable, graph_id: str) -> bool:
     return True
 
 def full_reduce(
-    graph: GraphMemgraph
+    graph: GraphMemgraph,
+    quiet: bool = False,
+    stats: Optional[Stats] = None
+) -> None:
+    """
+    The main simplification routine for graph database ZX-diagrams,
+    see :func:`full_reduce_db`.
+    """
+    full_reduce_db(graph.session_get, graph.graph_id, quiet, stats, scalar=graph.scalar)
+
+
+# The steps of full_reduce_db: those of its start, done once as iteration 0, and those of
+# every iteration of its main loop. The loop ends after an iteration in which none of the
+# steps of _LOOP_PROGRESS applied a rewrite.
+_START_STEPS: List[Tuple[str, Callable[..., bool]]] = [
+    ("interior_clifford_simp", interior_clifford_simp),
+    ("pivot_gadget_simp", pivot_gadget_simp),
+]
+_LOOP_STEPS: List[Tuple[str, Callable[..., bool]]] = [
+    ("clifford_simp", clifford_simp),
+    ("gadget_simp", gadget_simp),
+    ("interior_clifford_simp", interior_clifford_simp),
+    ("copy_simp", copy_simp),
+    ("supplementarity_simp", supplementarity_simp),
+    ("pivot_gadget_simp", pivot_gadget_simp),
+]
+_LOOP_PROGRESS = {"gadget_simp", "copy_simp", "supplementarity_simp", "pivot_gadget_simp"}
+
+
+def full_reduce_db(
+    session_factory: Callable,
+    graph_id: str,
+    quiet: bool = True,
+    stats: Optional[Stats] = None,
+    checkpoint: bool = True,
+    scalar: Optional[Scalar] = None
 ) -> None:
     """
     The main simplification routine for graph database ZX-diagrams.
@@ -773,86 +873,304 @@ def full_reduce(
        - Full Clifford simplification (including boundary)
        - Gadget fusion
        - Interior Clifford simplification
+       - Copy and supplementarity simplification
        - Pivot gadget simplification
        - Repeat until no changes
+
+    When ``checkpoint`` is set, every step is recorded in a
+    :class:`~pyzx.graph.db_checkpoint.ReduceLog` in the database, so that a run that was
+    interrupted can be continued with :func:`resume_full_reduce_db`. The log is removed
+    when the run completes. Nodes with a phase of the old encoding are converted first,
+    see :func:`~pyzx.graph.db_phase.migrate_legacy_phases`.
     
     Args:
         session_factory: Function that returns a database session
         graph_id: Identifier of the graph to simplify
         quiet: If False, print progress information
         stats: Optional statistics tracker
+        checkpoint: Whether to record the steps in the database
+        scalar: Optional scalar of the graph, tracked by the client, to record with the steps
     """
-    graph_id = graph.graph_id
-    session_factory = graph.session_get
-    quiet = False
-    stats = None
-
-
     if not quiet:
         print(f"Starting full_reduce_db on graph '{graph_id}'...")
-    
-    # Initial simplifications
-    if not quiet:
-        print("Phase 1: Initial interior clifford simplification")
-    interior_clifford_simp(session_factory, graph_id, quiet)
-    if not quiet: verify_connectivity(session_factory, graph_id)
+    with session_factory() as session:
+        migrate_legacy_phases(session, graph_id)
+    log = None
+    if checkpoint:
+        log = ReduceLog(session_factory, graph_id)
+        log.clear()
+    _full_reduce_steps(session_factory, graph_id, 0, 0, False, {}, quiet, stats, log, scalar)
 
+
+def resume_full_reduce_db(
+    session_factory: Callable,
+    graph_id: str,
+    quiet: bool = True,
+    stats: Optional[Stats] = None
+) -> Optional[Scalar]:
+    """
+    Continues a :func:`full_reduce_db` of the graph that was interrupted, after the last step
+    recorded as done in its log. The step that was interrupted is run again, which is safe
+    since every rewrite query commits on its own. Without a log, which is also the case when
+    the run had completed, the graph is simplified with :func:`full_reduce_db` from the start.
+
+    Args:
+        session_factory: Function that returns a database session
+        graph_id: Identifier of the graph to simplify
+        quiet: If False, print progress information
+        stats: Optional statistics tracker, to which the rewrites done before the
+            interruption are added as well
+
+    Returns:
+        The scalar recorded with the last step, to restore the scalar of the graph with,
+        or None if the run recorded no scalar or there was nothing to resume
+    """
+    log = ReduceLog(session_factory, graph_id)
+    entry = log.last()
+    if entry is None:
+        if not quiet:
+            print(f"No checkpoint of graph '{graph_id}' to resume from")
+        full_reduce_db(session_factory, graph_id, quiet, stats)
+        return None
     if not quiet:
-        print("Phase 2: Initial pivot gadget simplification")
-    pivot_gadget_simp(session_factory, graph_id, quiet)
-    if not quiet: verify_connectivity(session_factory, graph_id)
-    
-    # Main reduction loop
-    if not quiet:
-        print("Phase 3: Main reduction loop")
-    
-    iteration = 0
+        print(f"Resuming full_reduce_db on graph '{graph_id}' after {entry['rule']} "
+              f"of iteration {entry['iteration']}")
+    counts = entry["counts"]
+    if stats:
+        for rule, n in counts.items():
+            stats.count_rewrites(rule, n)
+    scalar = entry["scalar"]
+    _full_reduce_steps(session_factory, graph_id, entry["iteration"], entry["step"] + 1,
+                       entry["progress"], counts, quiet, stats, log, scalar)
+    return scalar
+
+
+def _full_reduce_steps(
+    session_factory: Callable,
+    graph_id: str,
+    iteration: int,
+    step: int,
+    progress: bool,
+    counts: Dict[str, int],
+    quiet: bool,
+    stats: Optional[Stats],
+    log: Optional[ReduceLog],
+    scalar: Optional[Scalar]
+) -> None:
+    """Runs the steps of full_reduce_db from the step ``step`` of the iteration ``iteration``,
+    where ``progress`` is whether the iteration already made progress and ``counts`` are the
+    rewrites of the run so far."""
     while True:
-        iteration += 1
+        steps = _START_STEPS if iteration == 0 else _LOOP_STEPS
+        if step >= len(steps):
+            if iteration > 0 and not progress:
+                break
+            iteration, step, progress = iteration + 1, 0, False
+            continue
+        name, simp = steps[step]
         if not quiet:
-            print(f"  Main loop iteration {iteration}")
-        
-        # Full Clifford simplification
-        clifford_simp(session_factory, graph_id, quiet)
-        if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after clifford_simp")
-        
-        # Gadget simplification
-        i = gadget_simp(session_factory, graph_id, quiet)
+            if iteration == 0:
+                print(f"Phase {step + 1}: Initial {name}")
+            elif step == 0:
+                print(f"  Main loop iteration {iteration}")
+
+        if log:
+            log.write(iteration, step, name, "started", progress, counts, scalar)
+        step_stats = Stats()
+        applied = simp(session_factory, graph_id, quiet, step_stats)
         if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after gadget_simp")
-        
-        # Interior Clifford again
-        interior_clifford_simp(session_factory, graph_id, quiet)
-        if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after interior_clifford_simp")
-
-        # Copy and supplementarity
-        k = copy_simp(session_factory, graph_id, quiet)
-        if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after copy_simp")
-        l = supplementarity_simp(session_factory, graph_id, quiet)
-        if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after supplementarity_simp")
-        
-        # Pivot gadget
-        j = pivot_gadget_simp(session_factory, graph_id, quiet)
-        if not quiet and not verify_connectivity(session_factory, graph_id):
-            print("Connectivity broken after pivot_gadget_simp")
-        
-        # Check if any gadget operations were applied
-        if not (i or j or k or l):
-            remove_isolated_vertices(session_factory, graph_id, quiet, stats)
-            if not quiet:
-                print("No more gadget rewrites applicable, terminating")
-            break
-
+            print(f"Connectivity broken after {name}")
+        for rule, n in step_stats.num_rewrites.items():
+            counts[rule] = counts.get(rule, 0) + n
+        if stats:
+            stats.merge(step_stats)
+        progress = progress or (iteration > 0 and name in _LOOP_PROGRESS and applied)
+        if log:
+            log.write(iteration, step, name, "done", progress, counts, scalar)
+        step += 1
+
+    remove_isolated_vertices(session_factory, graph_id, quiet, stats)
+    if log:
+        log.clear()
     if not quiet:
+        print("No more gadget rewrites applicable, terminating")
         print(f"Completed full_reduce_db after {iteration} iterations")
         if stats:
             print(stats)
 
 
+def _partition_regions(g: GraphS, region_size: int) -> List[List[int]]:
+    """Split the Z and X spiders of g into connected regions of at most region_size vertices."""
+    spiders = (VertexType.Z, VertexType.X)
+    seen = set()
+    regions = []
+    for v in sorted(g.vertices()):
+        if v in seen or g.type(v) not in spiders:
+            continue
+        region: List[int] = []
+        queue = deque([v])
+        seen.add(v)
+        while queue and len(region) < region_size:
+            w = queue.popleft()
+            region.append(w)
+            for n in sorted(g.neighbors(w)):
+                if n not in seen and g.type(n) in spiders:
+                    seen.add(n)
+                    queue.append(n)
+        seen.difference_update(queue)
+        regions.append(region)
+    return regions
+
+
+def _region_graph(g: GraphS, region: List[int], first_id: int) -> Tuple[GraphS, Dict[int, int]]:
+    """
+    The interior of a region as a GraphS with a frozen boundary.
+
+    The interior are the vertices of the region all of whose neighbours are in the region or
+    are boundaries. Every wire from the interior to another vertex ends in a boundary vertex of
+    its own in the region graph, with an id from first_id on, which stands in for that vertex.
+    As the rewrites never touch boundaries, the rewrites of two regions never touch the same
+    vertex or wire.
+
+    Returns:
+        The region graph, and the vertex of g that every boundary of the region graph stands for
+    """
+    members = set(region)
+    interior = [v for v in region
+                if all(n in members or g.type(n) == VertexType.BOUNDARY for n in g.neighbors(v))]
+    inner = set(interior)
+    sub = GraphS()
+    for v in interior:
+        sub.add_vertex_indexed(v)
+        sub.set_type(v, g.type(v))
+        sub.set_phase(v, g.phase(v))
+        sub.set_position(v, g.qubit(v), g.row(v))
+    stand_ins: Dict[int, int] = {}
+    for v in interior:
+        for n in g.neighbors(v):
+            et = g.edge_type(g.edge(v, n))
+            if n in inner:
+                if v < n:
+                    sub.add_edge((v, n), et)
+                continue
+            b = first_id + len(stand_ins)
+            sub.add_vertex_indexed(b)
+            sub.set_position(b, g.qubit(n), g.row(n))
+            sub.add_edge((b, v), et)
+            stand_ins[b] = n
+    return sub, stand_ins
+
+
+def _simplify_region(sub: GraphS) -> GraphS:
+    """Apply the in-memory interior Clifford simplifications to a region graph."""
+    simplify_mem.interior_clifford_simp(sub)
+    return sub
+
+
+def _merge_region(g: GraphS, before: GraphS, after: GraphS, stand_ins: Dict[int, int]) -> None:
+    """
+    Apply the changes from before to after of a region graph to g, with every boundary of
+    the region graph replaced by the vertex it stands for. New wires are added with
+    ``add_edge``, so that wires which end up parallel in g are merged as in pyzx.
+    """
+    diff = GraphDiff(before, after)
+    ids = dict(stand_ins)
+
+    def edge(e: Tuple[int, int]) -> Tuple[int, int]:
+        return g.edge(ids.get(e[0], e[0]), ids.get(e[1], e[1]))
+
+    old_verts = before.vertex_set() - set(stand_ins)
+    old_edges = before.edge_set()
+    for e in diff.removed_edges:
+        g.remove_edge(edge(e))
+    g.remove_vertices(diff.removed_verts)
+    for v, ty in diff.changed_vertex_types.items():
+        if v in old_verts:
+            g.set_type(v, ty)
+    for v, phase in diff.changed_phases.items():
+        if v in old_verts:
+            g.set_phase(v, phase)
+    for v, (q, r) in diff.changed_pos.items():
+        if v in old_verts:
+            g.set_position(v, q, r)
+    for e, et in diff.changed_edge_types.items():
+        if e in old_edges:
+            g.set_edge_type(edge(e), et)
+    for v in diff.new_verts:
+        ids[v] = g.add_vertex(after.type(v), after.qubit(v), after.row(v), after.phase(v))
+    for e, et in diff.new_edges:
+        g.add_edge(edge(e), et)
+    g.scalar.mult_with_scalar(after.scalar)
+
+
+def simplify_regions(g: GraphS, region_size: int = 1000, max_workers: int = 4) -> GraphS:
+    """
+    Simplify the interior of every region of g with :func:`pyzx.simplify.interior_clifford_simp`,
+    and return a copy of g with all the changes, see :func:`hybrid_full_reduce`.
+    The vertices of g keep their ids, and new vertices get ids from ``g.vindex()`` on.
+    """
+    g = g.clone()
+    regions = []
+    for region in _partition_regions(g, region_size):
+        sub, stand_ins = _region_graph(g, region, g.vindex())
+        if sub.num_vertices() > len(stand_ins):
+            regions.append((sub, stand_ins))
+
+    subs = [sub.clone() for sub, _ in regions]
+    if max_workers > 1 and len(subs) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(subs))) as pool:
+            results = list(pool.map(_simplify_region, subs))
+    else:
+        results = [_simplify_region(sub) for sub in subs]
+    for (before, stand_ins), after in zip(regions, results):
+        _merge_region(g, before, after, stand_ins)
+    return g
+
+
+def hybrid_full_reduce(
+    graph: Union[GraphMemgraph, GraphNeo4j],
+    region_size: int = 1000,
+    max_workers: int = 4,
+    quiet: bool = True,
+    stats: Optional[Stats] = None
+) -> None:
+    """
+    Full simplification of a graph database ZX-diagram that does the iterative
+    pivot and local complementation cascades in memory.
+
+    The graph is exported with ``to_graph_s`` and its spiders are partitioned into connected
+    regions of at most ``region_size`` vertices. The interior of every region is simplified
+    with :func:`pyzx.simplify.interior_clifford_simp`, with the wires leaving it frozen, in
+    a pool of ``max_workers`` processes. The changes are merged into the exported graph, and
+    only the resulting :class:`~pyzx.graph.diff.GraphDiff` is written back to the database.
+    Finally :func:`full_reduce_db` stitches the regions together in the database, which
+    takes care of the vertices on the borders of the regions and of the gadget rewrites.
+
+    Args:
+        graph: The graph to simplify
+        region_size: Maximum number of vertices of a region
+        max_workers: Number of regions simplified at the same time, 1 to simplify them in this process
+        quiet: If False, print progress information
+        stats: Optional statistics tracker for the rewrites done in the database
+    """
+    snapshot = graph.to_graph_s()
+    snapshot._vindex = max(snapshot._vindex, graph.vindex())
+    if not quiet:
+        print(f"Simplifying the regions of graph '{graph.graph_id}' in memory...")
+    g = simplify_regions(snapshot, region_size, max_workers)
+
+    diff = GraphDiff(snapshot, g)
+    if not quiet:
+        print(f"Writing back {len(diff.removed_verts)} removed and {len(diff.new_verts)} new vertices, "
+              f"{len(diff.removed_edges)} removed and {len(diff.new_edges)} new wires")
+    graph.apply_diff(diff)
+    graph.scalar = g.scalar.copy()
+
+    if not quiet:
+        print("Stitching the regions together in the database")
+    full_reduce_db(graph._get_session, graph.graph_id, quiet, stats, scalar=graph.scalar)
+
+
 def custom_reduce(
     session_factory: Callable,
     graph_id: str,
@@ -889,9 +1207,11 @@ def custom_reduce(
         
         applied_any = False
         for rule_name in rules:
-            query = queries.get(rule_name)
             params = {"graph_id": graph_id}
-            count = _execute_query(session_factory, query, params, quiet)
+            if queries.default_batch_size(rule_name) is not None:
+                count = _execute_batched_query(session_factory, rule_name, params, quiet, stats)
+            else:
+                count = _execute_query(session_factory, queries.get(rule_name), params, quiet)
             
             if count > 0:
                 applied_any = True
@@ -907,3 +1227,129 @@ def custom_reduce(
         print("Completed custom_reduce")
         if stats:
             print(stats)
+
+
+class GraphReduceError(Exception):
+    """
+    Raised by :func:`reduce_graphs` when some graphs could not be simplified.
+
+    Attributes:
+        errors: The exception of every graph that failed, by graph_id
+        results: The statistics of every graph that was simplified, by graph_id
+    """
+
+    def __init__(self, errors: Dict[str, BaseException], results: Dict[str, Stats]) -> None:
+        super().__init__("Simplification failed for {} of {} graphs: {}".format(
+            len(errors), len(errors) + len(results),
+            ", ".join("{} ({})".format(g, e) for g, e in errors.items())))
+        self.errors = errors
+        self.results = results
+
+
+def reduce_graphs(
+    session_factory: Callable,
+    graph_ids: Iterable[str],
+    rules: Optional[List[str]] = None,
+    max_workers: int = 4,
+    max_retries: int = 3,
+    retry_delay: float = 0.5,
+    quiet: bool = True,
+    stats: Optional[Stats] = None,
+    progress: Optional[Callable[[str, str, Stats], None]] = None,
+    reducer: Optional[Callable[..., Any]] = None
+) -> Dict[str, Stats]:
+    """
+    Simplify many graphs of the same database concurrently.
+
+    Every graph is simplified by :func:`full_reduce_db`, or by :func:`custom_reduce` with the
+    given rules, in a pool of ``max_workers`` threads. Every query opens its own session
+    from ``session_factory``, so the number of sessions in use is bounded by ``max_workers``,
+    and the throughput is bounded by the cores of the database instead of the latency of a
+    single session. The rewrites of one graph only touch the nodes of its graph_id.
+
+    When the simplification of a graph fails with a transient error (a conflict with a
+    concurrent transaction, or a lost connection), it is retried after a backoff of
+    ``retry_delay * 2**attempt`` seconds, at most ``max_retries`` times. A :func:`full_reduce_db`
+    is continued after its last logged step with :func:`resume_full_reduce_db`; other
+    reducers are called again, and carry on from the graph as it was last committed.
+
+    Args:
+        session_factory: Function that returns a database session. Its driver has to be shared
+            by the workers, and should have a connection pool of at least ``max_workers``.
+        graph_ids: Identifiers of the graphs to simplify
+        rules: Rule names for :func:`custom_reduce`. By default :func:`full_reduce_db` is used.
+        max_workers: Number of graphs simplified at the same time
+        max_retries: Number of times the simplification of a graph is retried
+        retry_delay: Backoff in seconds before the first retry
+        quiet: If False, print a line for every graph that finishes
+        stats: Optional statistics tracker, to which the rewrites of all graphs are added
+        progress: Optional function called as ``progress(graph_id, status, stats)`` with
+            status ``started``, ``retrying``, ``done`` or ``failed``, from the worker threads
+        reducer: Optional simplification to use instead, called as
+            ``reducer(session_factory, graph_id, quiet=..., stats=...)``
+
+    Returns:
+        The statistics of every graph, by graph_id
+
+    Raises:
+        GraphReduceError: If some graphs still failed, after all others have finished
+    """
+    resume: Optional[Callable[..., Any]] = None
+    if reducer is None:
+        if rules is None:
+            reducer, resume = full_reduce_db, resume_full_reduce_db
+        else:
+            reducer = partial(custom_reduce, rules=rules)
+    graph_ids = list(dict.fromkeys(graph_ids))
+    results: Dict[str, Stats] = {}
+    errors: Dict[str, BaseException] = {}
+
+    def report(graph_id: str, status: str, graph_stats: Stats) -> None:
+        if progress is not None:
+            progress(graph_id, status, graph_stats)
+
+    def reduce_graph(graph_id: str) -> Stats:
+        graph_stats = Stats()
+        report(graph_id, "started", graph_stats)
+        attempt = 0
+        while True:
+            try:
+                if attempt and resume is not None:
+                    # The log holds the rewrites done before the failure, which are counted again
+                    graph_stats = Stats()
+                    resume(session_factory, graph_id, quiet=True, stats=graph_stats)
+                else:
+                    reducer(session_factory, graph_id, quiet=True, stats=graph_stats)
+                break
+            except Exception as e:
+                if attempt >= max_retries or not is_transient_error(e):
+                    report(graph_id, "failed", graph_stats)
+                    raise
+                report(graph_id, "retrying", graph_stats)
+                time.sleep(retry_delay * 2**attempt)
+                attempt += 1
+        report(graph_id, "done", graph_stats)
+        return graph_stats
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(graph_ids) or 1))) as pool:
+        futures = {pool.submit(reduce_graph, g): g for g in graph_ids}
+        for i, future in enumerate(as_completed(futures)):
+            graph_id = futures[future]
+            try:
+                graph_stats = future.result()
+            except Exception as e:
+                errors[graph_id] = e
+                line = "failed ({})".format(e)
+            else:
+                results[graph_id] = graph_stats
+                if stats is not None:
+                    stats.merge(graph_stats)
+                line = "{} rewrites".format(sum(graph_stats.num_rewrites.values()))
+            if not quiet:
+                print("[{}/{}] {}: {} ({:.2f}s)".format(
+                    i + 1, len(graph_ids), graph_id, line, time.perf_counter() - start))
+
+    if errors:
+        raise GraphReduceError(errors, results)
+    return {g: results[g] for g in graph_ids}
@@ -19,8 +19,10 @@ The function :func:`basic_optimization` runs a set of back-and-forth gate commut
 :func:`phase_block_optimize` does phase polynomial optimization using the TODD algorithm,
 and :func:`full_optimize` combines these two methods."""
 
+from collections import deque
 from fractions import Fraction
-from typing import overload, Tuple, List, Union, Dict, Set
+from itertools import islice
+from typing import overload, Tuple, List, Union, Dict, Set, Deque, Sequence
 from typing_extensions import Literal
 
 from .circuit import Circuit
@@ -31,15 +33,16 @@ from .todd import todd_simp
 
 __all__ = ['full_optimize', 'basic_optimization', 'phase_block_optimize']
 
-def full_optimize(circuit: Circuit, quiet:bool=True) -> Circuit:
+def full_optimize(circuit: Circuit, quiet:bool=True, todd_method:str='bitset') -> Circuit:
     """Optimizes the circuit using first some basic commutation and cancellation rules,
     and then a dedicated phase polynomial optimization strategy involving the TODD algorithm.
 
     Args:
         circuit: Circuit to be optimized.
-        quiet: Whether to print some progress indicators."""
+        quiet: Whether to print some progress indicators.
+        todd_method: Implementation of TODD to use, see :func:`phase_block_optimize`."""
     c = basic_optimization(circuit.to_basic_gates())
-    c = phase_block_optimize(c, quiet=quiet)
+    c = phase_block_optimize(c, quiet=quiet, todd_method=todd_method)
     return basic_optimization(c.to_basic_gates())
 
 def basic_optimization(circuit: Circuit, do_swaps:bool=True, quiet:bool=True) -> Circuit:
@@ -70,6 +73,28 @@ def swap_element(l:list, e1:object, e2:object) -> None:
         l.remove(e2)
         l.append(e1)
 
+# Every gate placed by the Optimizer during a pass gets a unique ``index``, and so occurs at most once
+# in the gate lists of a qubit. Hence gates can be compared by identity, instead of the much slower
+# ``Gate.__eq__`` that ``list.remove`` and ``in`` use. Gates are removed from the end of the
+# lists during parsing, and from the front during the topological sort, so we search from there.
+
+def _remove_last(gs: Union[List[Gate],Deque[Gate]], g: Gate) -> None:
+    for i, h in enumerate(reversed(gs)):
+        if h is g:
+            del gs[-i-1]
+            return
+    raise ValueError("Gate {} not found".format(str(g)))
+
+def _remove_first(gs: Deque[Gate], g: Gate) -> None:
+    for i, h in enumerate(gs):
+        if h is g:
+            del gs[i]
+            return
+    raise ValueError("Gate {} not found".format(str(g)))
+
+def _contains(gs: Sequence[Gate], g: Gate) -> bool:
+    return any(h is g for h in reversed(gs))
+
 def stats(circ: Circuit) -> Tuple[int,int,int]:
     two_qubit = 0
     had = 0
@@ -88,6 +113,8 @@ class Optimizer(object):
     Works by doing alternating forward and backward 'passes' through a circuit.
     During a pass, we iteratively consume gates, while 
     keeping track of a stack of mutually commuting gates on each qubit.
+    The gates placed on each qubit are kept in a queue, so that the last gates
+    on a qubit can be found and removed in constant time.
     When the gate can be combined with a gate on the stack, this is done.
     If it doesn't combine, but commutes with the gates on the stack, it is added to the stack.
     If it doesn't commute, the stack is reset."""
@@ -154,13 +181,14 @@ class Optimizer(object):
     
     def parse_forward(self) -> Tuple[Circuit, List[Gate]]:
         """Does a single forward pass trough self.circuit.gates."""
-        self.gates: Dict[int,List[Gate]] = {i:list() for i in range(self.qubits)}
+        self.gates: Dict[int,Deque[Gate]] = {i:deque() for i in range(self.qubits)}
         self.available: Dict[int,List[Gate]] = {i:list() for i in range(self.qubits)}
         self.availty = {i: 1 for i in range(self.qubits)}
         self.hadamards: List[int] = []
         self.nots: List[int] = []
         self.zs: List[int] = []
         self.permutation = {i:i for i in range(self.qubits)}
+        self.inverse_permutation = {i:i for i in range(self.qubits)}
         self.gcount = 0
         for g in self.circuit.gates:
             self.parse_gate(g)
@@ -195,27 +223,27 @@ class Optimizer(object):
         return c, correction
 
     def topological_sort_gates(self) -> List[Gate]:
-        """self.gates is a a {qubit:[list of gates]} dictionary. This function consumes this dictionary and outputs a
+        """self.gates is a a {qubit:[queue of gates]} dictionary. This function consumes this dictionary and outputs a
         single list of gates, with the gates in the correct order.
         Note that 2-qubit gates are present in two entries in the dictionary and are identified with an ``index`` parameter."""
-        output = []
+        output: List[Gate] = []
         while any(self.gates.values()):
             available_indices: Set[int] = set()
             for q, gs in self.gates.items():
                 while gs:
                     g = gs[0]
                     if g.name not in ('CZ', 'CNOT'):
-                        output.append(gs.pop(0))
+                        output.append(gs.popleft())
                     elif g.index in available_indices:
                         available_indices.remove(g.index)
                         q2 = g.target if q == g.control else g.control
-                        self.gates[q2].remove(g)
-                        output.append(gs.pop(0))
+                        _remove_first(self.gates[q2], g)
+                        output.append(gs.popleft())
                     else:
                         ty = 1 if (g.name == 'CZ' or g.control == q) else 2
                         available_indices.add(g.index)
                         remove = []
-                        for i, g2 in enumerate(gs[1:]):
+                        for i, g2 in enumerate(islice(gs, 1, None)):
                             if (ty == 1 and isinstance(g2, ZPhase)) or (ty == 2 and isinstance(g2, XPhase)):
                                 output.append(g2)
                                 remove.append(i)
@@ -225,7 +253,7 @@ class Optimizer(object):
                                 if g2.index in available_indices:
                                     available_indices.remove(g2.index)
                                     q2 = g2.target if q == g2.control else g2.control
-                                    self.gates[q2].remove(g2)
+                                    _remove_first(self.gates[q2], g2)
                                     output.append(g2)
                                     remove.append(i)
                                 else:
@@ -233,7 +261,7 @@ class Optimizer(object):
                             else:
                                 break
                         for i in reversed(remove):
-                            gs.pop(i+1)
+                            del gs[i+1]
                         break
         return output
 
@@ -266,7 +294,7 @@ class Optimizer(object):
                 for g in self.available[c]:
                     if g.name == 'CNOT' and g.control == c and g.target == t:
                         if self.availty[t] == 2:
-                            if g in self.available[t]: # The gate is also available on the target qubit
+                            if _contains(self.available[t], g): # The gate is also available on the target qubit
                                 found_match = True
                                 break
                             else:
@@ -274,7 +302,8 @@ class Optimizer(object):
                         # There are Z-like gates blocking the CNOT from usage
                         # But if the CNOT can be passed all the way up to these Z-like gates
                         # Then we can commute the CZ gate next to the CNOT and hence use it.
-                        for h in list(reversed(self.gates[t][:-len(self.available[t])])): # We start looking at the gates behind the Z-like gates
+                        behind = len(self.available[t])
+                        for h in islice(reversed(self.gates[t]), behind, None) if behind else (): # We start looking at the gates behind the Z-like gates
                             if h.name != 'CNOT' or h.target != t: # If any of those gates is not a CNOT of the right type, then we stop our search
                                 break
                             if h == g: # But if all the previous gates are fine, than we can use this CNOT.
@@ -287,9 +316,9 @@ class Optimizer(object):
             if self.availty[t] == 2:
                 self.availty[t] == 1
                 self.available[t] = []
-            self.gates[t].remove(g)
-            self.gates[c].remove(g)
-            self.available[c].remove(g)
+            _remove_last(self.gates[t], g)
+            _remove_last(self.gates[c], g)
+            _remove_last(self.available[c], g)
             s1 = S(t, adjoint=True)
             s1.index = self.gcount
             self.gcount += 1
@@ -326,13 +355,13 @@ class Optimizer(object):
                 found_match = True                                    # to have cz.control<cz.target
                 break
         if found_match:
-            if g not in self.available[t2]: # We still need to check if the CZ is actually available on the other qubit
+            if not _contains(self.available[t2], g): # We still need to check if the CZ is actually available on the other qubit
                 found_match = False
             else:
-                self.available[t1].remove(g)
-                self.gates[t1].remove(g)
-                self.available[t2].remove(g)
-                self.gates[t2].remove(g)
+                _remove_last(self.available[t1], g)
+                _remove_last(self.gates[t1], g)
+                _remove_last(self.available[t2], g)
+                _remove_last(self.gates[t2], g)
 
         if not found_match: # No cancellation found, so we just add the gate
             cz.index = self.gcount
@@ -354,9 +383,9 @@ class Optimizer(object):
                         found_match = True
                         break
                 if found_match and self.do_swaps: # We do the CNOT(t,c)CNOT(c,t) = CNOT(c,t)SWAP(c,t) commutation
-                    if g in self.available[t]:
-                        self.gates[c].remove(g)
-                        self.gates[t].remove(g)
+                    if _contains(self.available[t], g):
+                        _remove_last(self.gates[c], g)
+                        _remove_last(self.gates[t], g)
                         self.availty[c] = 1
                         self.availty[t] = 2
                         cnot.index = self.gcount
@@ -369,6 +398,8 @@ class Optimizer(object):
                         b = self.permutation[t]
                         self.permutation[c] = b
                         self.permutation[t] = a
+                        self.inverse_permutation[b] = c
+                        self.inverse_permutation[a] = t
                         swap_element(self.hadamards, t, c)
                         swap_element(self.nots, t, c)
                         swap_element(self.zs, t, c)
@@ -385,13 +416,13 @@ class Optimizer(object):
                 found_match = True
                 break
         if found_match: # We do CNOT(c,t)CNOT(c,t) = id
-            if g not in self.available[t]:
+            if not _contains(self.available[t], g):
                 found_match = False
             else:
-                self.available[c].remove(g)
-                self.gates[c].remove(g)
-                self.available[t].remove(g)
-                self.gates[t].remove(g)
+                _remove_last(self.available[c], g)
+                _remove_last(self.gates[c], g)
+                _remove_last(self.available[t], g)
+                _remove_last(self.gates[t], g)
                 
         if not found_match:
             cnot.index = self.gcount
@@ -407,10 +438,10 @@ class Optimizer(object):
         Only supports ZPhase, HAD, CNOT and CZ gates. """
         g = g.copy()
         # If we have some SWAPs recorded we need to change the target/control of the gate accordingly
-        g.target = next(i for i in self.permutation if self.permutation[i] == g.target)
+        g.target = self.inverse_permutation[g.target]
         t = g.target
         if g.name in ('CZ', 'CNOT'):
-            g.control = next(i for i in self.permutation if self.permutation[i] == g.control)
+            g.control = self.inverse_permutation[g.control]
 
         if g.name == 'HAD':
             # If we have recorded a NOT or Z gate at the target location, we push it trough the Hadamard and change the type
@@ -454,7 +485,7 @@ class Optimizer(object):
             if self.availty[t] == 1 and any(isinstance(g2, ZPhase) for g2 in self.available[t]): # There is an available phase gate
                 i = next(i for i,g2 in enumerate(self.available[t]) if isinstance(g2, ZPhase))   # That we can fuse with the new one
                 g2 = self.available[t].pop(i)
-                self.gates[t].remove(g2)
+                _remove_last(self.gates[t], g2)
                 phase = (g.phase+g2.phase)%2
                 if phase == 1:
                     toggle_element(self.zs, t)
@@ -673,7 +704,7 @@ def greedy_consume_gates(gates: Dict[int, List[Gate]], qubits: int) -> Tuple[Lis
     return block, hadamards
 
 
-def phase_block_optimize(circuit: Circuit, pre_optimize:bool=True, quiet:bool=True) -> Circuit:
+def phase_block_optimize(circuit: Circuit, pre_optimize:bool=True, quiet:bool=True, todd_method:str='bitset') -> Circuit:
     """Optimizes the given circuit, by cutting it into phase polynomial pieces, and
     using the `TODD algorithm <https://iopscience.iop.org/article/10.1088/2058-9565/aad604/meta>`_ 
     to optimize each of these phase polynomials. 
@@ -691,6 +722,9 @@ def phase_block_optimize(circuit: Circuit, pre_optimize:bool=True, quiet:bool=Tr
         circuit: The circuit to be optimized.
         pre_optimize: Whether to call :func:`basic_optimization` first.
         quiet: Whether to print some progress indicators. Helpful when execution time is long. 
+        todd_method: Implementation of the TODD inner loop. Either ``'bitset'`` (default), which
+            works on bit-packed columns, or ``'mat2'``, the original and much slower implementation
+            on :class:`~pyzx.linalg.Mat2` matrices.
     """
     qubits = circuit.qubits
     o = Optimizer(circuit)
@@ -769,7 +803,7 @@ def phase_block_optimize(circuit: Circuit, pre_optimize:bool=True, quiet:bool=Tr
         newblock, hadamards = greedy_consume_gates(gates, qubits)
         block = list(reversed(revblock))
         block.extend(newblock)
-        block, permute = todd_simp(block, qubits, quiet=quiet)
+        block, permute = todd_simp(block, qubits, quiet=quiet, method=todd_method)
         inverse = {v:k for k,v in permute.items()}
         gates = {inverse[t]:gs for t,gs in gates.items()}
         indices = set()
@@ -28,9 +28,241 @@ The RewriteSimpGraph class is for rewrites that act on the entire graph at once,
 because their behaviour is too complex to fit into these other cases.
 """
 
-from typing import Callable, Optional, Generic, Set, Tuple, List
+import atexit
+import json
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+from multiprocessing import cpu_count, current_process
+from multiprocessing.pool import Pool
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, Optional, Generic, Set, Tuple, List
 
 from .graph.base import BaseGraph, VT, ET
+from .utils import settings
+
+shared_memory: Optional[ModuleType]
+try:
+    from multiprocessing import shared_memory
+except ImportError: # on platforms without shared memory the matches are always found serially
+    shared_memory = None
+
+# Finding the matches of the automatic rewrites only reads the graph and is independent
+# per vertex, so for large graphs it is spread over a pool of processes, see settings.match_processes.
+# The graph is pickled once per round into a shared memory block, which saves sending it with
+# every job, but each worker still unpickles a full private copy of the graph from there.
+# Each job checks the matches of a contiguous range of graph.vertices(). The ranges are concatenated
+# in order, so the matches are found, and hence applied, in the same order as in a serial search.
+
+_match_pool: Optional[Pool] = None
+_match_pool_size = 0
+
+def _get_match_pool(n: int) -> Pool:
+    global _match_pool, _match_pool_size
+    if _match_pool is None or _match_pool_size != n:
+        _close_match_pool()
+        _match_pool = Pool(n)
+        _match_pool_size = n
+    return _match_pool
+
+@atexit.register
+def _close_match_pool() -> None:
+    global _match_pool
+    if _match_pool is not None:
+        _match_pool.terminate()
+        _match_pool = None
+
+# The snapshot that a pool worker last loaded, as (name of the shared memory block, graph)
+_worker_snapshot: Optional[Tuple[str, Any]] = None
+
+def _load_snapshot(name: str, size: int) -> Any:
+    global _worker_snapshot
+    if _worker_snapshot is None or _worker_snapshot[0] != name:
+        assert shared_memory is not None
+        shm = shared_memory.SharedMemory(name)
+        try:
+            buf = shm.buf
+            assert buf is not None
+            graph = pickle.loads(buf[:size])
+        finally:
+            shm.close()
+        _worker_snapshot = (name, graph)
+    return _worker_snapshot[1]
+
+def _match_range(args: Tuple[str, int, Callable, bool, bool, int, int]) -> List[Any]:
+    name, size, match, double, is_ordered, start, stop = args
+    graph = _load_snapshot(name, size)
+    vertices = list(graph.vertices())[start:stop]
+    if not double:
+        return [v for v in vertices if match(graph, v)]
+    matches = []
+    for v1 in vertices:
+        for v2 in graph.neighbors(v1):
+            if v1 == v2: continue
+            if match(graph, v1, v2):
+                matches.append((v1, v2) if (is_ordered or v1 <= v2) else (v2, v1))
+    return matches
+
+def _parallel_matches(graph: BaseGraph[VT, ET], match: Callable, double: bool, is_ordered: bool = False) -> Optional[List[Any]]:
+    """Finds the matches of ``match`` in a pool of processes, in the order of a serial search.
+    Returns None when the search should be done serially instead: when this is disabled in the settings,
+    the graph is small, or the graph or the matcher cannot be pickled."""
+    n = settings.match_processes if settings.match_processes > 0 else cpu_count()
+    if (n <= 1 or shared_memory is None or current_process().daemon
+            or graph.num_vertices() < settings.parallel_match_threshold):
+        return None
+    try:
+        pickle.dumps(match)
+        data = pickle.dumps(graph, pickle.HIGHEST_PROTOCOL)
+    except Exception: # e.g. a lambda, or a graph backed by a database connection
+        return None
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        buf = shm.buf
+        assert buf is not None
+        buf[:len(data)] = data
+        nv = graph.num_vertices()
+        step = -(-nv // (4*n)) # a few ranges per process to even out the load
+        jobs = [(shm.name, len(data), match, double, is_ordered, i, i+step) for i in range(0, nv, step)]
+        return [m for ms in _get_match_pool(n).map(_match_range, jobs) for m in ms]
+    finally:
+        shm.close()
+        shm.unlink()
+
+class RewriteTrace(object):
+    """A record of the matches that the automatic rewrites applied, which can be replayed on a structurally
+    identical graph (same vertices, edges and phases) to skip searching for the matches again.
+
+    Every call of ``simp`` of a :class:`RewriteSimpSingleVertex` or :class:`RewriteSimpDoubleVertex` adds
+    the matches it applied, in order, to the trace. When replaying, such a call instead applies the
+    recorded matches of the corresponding call, checking only each recorded match with the matcher of the
+    rule. At the first call that does not correspond to the trace, or the first match that does not apply,
+    replaying stops and the rewrites go back to searching the graph for matches. The result is therefore
+    always a valid rewrite of the graph, but a replayed call does not look for matches that the recorded
+    run did not have. Rewrites acting on the entire graph, such as ``pivot_gadget_simp``, are never recorded
+    and always run normally.
+
+    Example::
+
+        with RewriteTrace.record() as trace:
+            full_reduce(g)
+        trace.save('circuit.trace')
+        with RewriteTrace.load('circuit.trace').replay() as trace:
+            full_reduce(g2)
+        print(trace.mismatch)
+    """
+
+    MAGIC = b'PZXTRACE1'
+
+    def __init__(self, calls: Optional[List[Tuple[str, int, List[Any]]]] = None) -> None:
+        # The recorded calls, as (rule, number of vertices in a match, applied matches)
+        self.calls: List[Tuple[str, int, List[Any]]] = calls if calls is not None else []
+        self.replaying = False
+        self.position = 0 # The next call to replay
+        self.mismatch: Optional[str] = None # Why replaying stopped before the end of the trace
+
+    @staticmethod
+    @contextmanager
+    def record() -> Iterator['RewriteTrace']:
+        """Records the rewrites applied inside the ``with`` block into a new trace."""
+        trace = RewriteTrace()
+        with trace._activate():
+            yield trace
+
+    @contextmanager
+    def replay(self) -> Iterator['RewriteTrace']:
+        """Replays the trace on the rewrites run inside the ``with`` block."""
+        self.replaying = True
+        self.position = 0
+        self.mismatch = None
+        try:
+            with self._activate():
+                yield self
+        finally:
+            self.replaying = False
+
+    @contextmanager
+    def _activate(self) -> Iterator[None]:
+        global _active_trace
+        previous = _active_trace
+        _active_trace = self
+        try:
+            yield
+        finally:
+            _active_trace = previous
+
+    def _next_call(self, rule: str) -> Optional[List[Any]]:
+        """Returns the matches of the next recorded call when it is of ``rule``, and otherwise stops replaying."""
+        if self.position >= len(self.calls):
+            self._stop("the trace has no more calls, but {} was called".format(rule))
+            return None
+        recorded, _, matches = self.calls[self.position]
+        if recorded != rule:
+            self._stop("call {} of the trace is {}, but {} was called".format(self.position, recorded, rule))
+            return None
+        self.position += 1
+        return matches
+
+    def _stop(self, reason: str) -> None:
+        self.replaying = False
+        self.mismatch = reason
+
+    def to_bytes(self) -> bytes:
+        """Encodes the trace in a compact binary format. Only supports integer vertices."""
+        rules: Dict[Tuple[str, int], int] = dict()
+        data = array('q')
+        for rule, arity, matches in self.calls:
+            data.append(rules.setdefault((rule, arity), len(rules)))
+            data.append(len(matches))
+            for m in matches:
+                if arity == 1: data.append(m)
+                else: data.extend(m)
+        if sys.byteorder == 'big': data.byteswap()
+        header = json.dumps(list(rules)).encode('utf-8')
+        return self.MAGIC + zlib.compress(struct.pack('<I', len(header)) + header + data.tobytes())
+
+    @classmethod
+    def from_bytes(cls, b: bytes) -> 'RewriteTrace':
+        """Decodes a trace produced by :meth:`to_bytes`."""
+        if not b.startswith(cls.MAGIC):
+            raise ValueError("Not a rewrite trace")
+        payload = zlib.decompress(b[len(cls.MAGIC):])
+        size, = struct.unpack_from('<I', payload)
+        rules = [(rule, arity) for rule, arity in json.loads(payload[4:4+size].decode('utf-8'))]
+        data = array('q', payload[4+size:])
+        if sys.byteorder == 'big': data.byteswap()
+        calls = []
+        i = 0
+        while i < len(data):
+            rule, arity = rules[data[i]]
+            n = data[i+1]
+            i += 2
+            if arity == 1:
+                matches: List[Any] = list(data[i:i+n])
+            else:
+                matches = [tuple(data[j:j+arity]) for j in range(i, i + n*arity, arity)]
+            i += n*arity
+            calls.append((rule, arity, matches))
+        return cls(calls)
+
+    def save(self, fname: str) -> None:
+        with open(fname, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, fname: str) -> 'RewriteTrace':
+        with open(fname, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+# The trace that is being recorded or replayed, see RewriteTrace
+_active_trace: Optional[RewriteTrace] = None
+
+def _rule_name(applier: Callable, match: Callable) -> str:
+    return "{}:{}".format(getattr(applier, '__qualname__', '?'), getattr(match, '__qualname__', '?'))
+
 
 class Rewrite(Generic[VT, ET]):
 
@@ -107,6 +339,9 @@ class RewriteSimpSingleVertex(RewriteSingleVertex[VT, ET]):
         else:
             match = self.is_match
 
+        matches = _parallel_matches(graph, match, False)
+        if matches is not None:
+            return set(matches)
         for v in graph.vertices():  # Make a subset of vertices
             if match(graph, v):
                 all_matches.add(v)
@@ -118,6 +353,23 @@ class RewriteSimpSingleVertex(RewriteSingleVertex[VT, ET]):
         else:
             match = self.is_match
         applied: bool = False
+        trace = _active_trace
+        if trace is not None:
+            rule = _rule_name(self.applier, match)
+            if trace.replaying:
+                replayed = trace._next_call(rule)
+                if replayed is not None:
+                    for m in replayed:
+                        if not match(graph, m):
+                            trace._stop("{} does not match {}".format(rule, m))
+                            break
+                        self.applier(graph, m)
+                        applied = True
+                        if self.rmv_isolated:
+                            graph.remove_isolated_vertices()
+                    else:
+                        return applied
+            recorded: List[VT] = []
         while True:
             j = 0
             all_matches = self.find_all_matches(graph)
@@ -126,9 +378,12 @@ class RewriteSimpSingleVertex(RewriteSingleVertex[VT, ET]):
                     j += 1
                     self.applier(graph, m)
                     applied = True
+                    if trace is not None: recorded.append(m)
                     if self.rmv_isolated:
                         graph.remove_isolated_vertices()
             if j == 0: break
+        if trace is not None and not trace.replaying and trace.mismatch is None:
+            trace.calls.append((rule, 1, recorded))
         return applied
 
 class RewriteDoubleVertex(Rewrite[VT, ET]):
@@ -198,6 +453,9 @@ class RewriteSimpDoubleVertex(RewriteDoubleVertex[VT, ET]):
         else:
             match = self.is_match
 
+        matches = _parallel_matches(graph, match, True, self.is_ordered)
+        if matches is not None:
+            return set(matches)
         for v1 in graph.vertices():
             for v2 in graph.neighbors(v1):
                 if v1 == v2: continue
@@ -213,6 +471,23 @@ class RewriteSimpDoubleVertex(RewriteDoubleVertex[VT, ET]):
             match = self.is_match
 
         applied: bool = False
+        trace = _active_trace
+        if trace is not None:
+            rule = _rule_name(self.applier, match)
+            if trace.replaying:
+                replayed = trace._next_call(rule)
+                if replayed is not None:
+                    for m in replayed:
+                        if not match(graph, m[0], m[1]):
+                            trace._stop("{} does not match {}".format(rule, m))
+                            break
+                        self.applier(graph, m[0], m[1])
+                        applied = True
+                        if self.rmv_isolated:
+                            graph.remove_isolated_vertices()
+                    else:
+                        return applied
+            recorded: List[Tuple[VT, VT]] = []
         while True:
             j = 0
             all_matches = self.find_all_matches(graph)
@@ -222,10 +497,13 @@ class RewriteSimpDoubleVertex(RewriteDoubleVertex[VT, ET]):
                     j += 1
                     self.applier(graph, m[0], m[1])
                     applied = True
+                    if trace is not None: recorded.append(m)
                     if self.rmv_isolated:
                         graph.remove_isolated_vertices()
             if j == 0:
                 break
+        if trace is not None and not trace.replaying and trace.mismatch is None:
+            trace.calls.append((rule, 2, recorded))
         return applied
 
 class RewriteSimpGraph(Rewrite[VT, ET]):
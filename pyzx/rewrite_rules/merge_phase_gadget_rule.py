@@ -90,7 +90,12 @@ def match_phase_gadgets(g: BaseGraph[VT,ET], vertices:Optional[List[VT]]=None) -
                 g.phase_negate(v)
                 m.append((v,n,-phases[v],[],[]))
         else:
-            totphase = sum((1 if phases[n]==0 else -1)*phases[gadgets[n]] for n in gad)%2
+            totphase: FractionLike = 0
+            for n in gad:
+                phase = phases[gadgets[n]] if phases[n] == 0 else -phases[gadgets[n]]
+                # After the first addition a symbolic total is a fresh Poly we can accumulate into
+                totphase = totphase.add_inplace(phase) if isinstance(totphase, Poly) else totphase + phase
+            totphase = totphase.mod_inplace(2) if isinstance(totphase, Poly) else totphase % 2
             for n in gad:
                 if phases[n] != 0:
                     g.scalar.add_phase(phases[gadgets[n]])
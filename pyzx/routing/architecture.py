@@ -18,8 +18,8 @@
 import math
 import itertools
 import sys
-from typing import Any, Dict, Iterator, List, Set, Tuple, Optional, Union
-from typing_extensions import Literal
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterator, List, Set, Tuple, Optional, Union
 
 from pyzx.graph.base import BaseGraph
 if __name__ == '__main__':
@@ -59,11 +59,17 @@ hamiltonian_path_architectures = [FULLY_CONNECTED, LINE, CIRCLE, SQUARE, IBM_QX4
                 IBM_QX5, IBM_Q20_TOKYO, RIGETTI_8Q_AGAVE, RIGETTI_16Q_ASPEN, 
                 IBMQ_POUGHKEEPSIE]
 
+# The result of :meth:`Architecture.all_pairs`: the vertex to index map, the distance matrix and the next-hop matrix
+AllPairs = Tuple[Dict[int,int], np.ndarray, np.ndarray]
+
 class Architecture():
     """
     Class that represents the architecture of the qubits to be taken into account when routing.
     """
 
+    # Maximal number of entries kept in the all-pairs and Steiner tree caches
+    cache_size = 4096
+
     def __init__(self, name: str, coupling_graph: Optional[BaseGraph]=None, coupling_matrix=None, backend: Optional[str]=None, qubit_map: Optional[List[int]] = None, reduce_order: Optional[List[int]]=None, **kwargs):
         """
         Class that represents the architecture of the qubits to be taken into account when routing.
@@ -104,13 +110,12 @@ class Architecture():
             if self.graph.qubit(v) < 0: # Defaults to -1
                 self.graph.set_qubit(v, i)
 
-        # Pre-calculated distances between all pairs of qubits in the architecture
-        # See :func:`pre_calc_distances` for more details
-        self.distances: Optional[Dict[Literal["upper", "full"], List[Dict[Tuple[int,int], Tuple[int,List[Tuple[int,int]]]]]]] = None
-
         self.n_qubits = len(self.vertices)
         self.reduce_order = self._get_reduce_order() if reduce_order is None else reduce_order
         self._non_cutting_vertices: Dict[Tuple[int, ...], List[int]] = {}
+        # LRU caches for :meth:`all_pairs` and the Steiner trees, keyed by the subgraph and terminals
+        self._all_pairs_cache: OrderedDict = OrderedDict()
+        self._steiner_cache: OrderedDict = OrderedDict()
 
     def qubit2vertex(self, qubit: int) -> int:
         """Get the internal graph vertex index for a logical architecture qubit."""
@@ -120,18 +125,6 @@ class Architecture():
         """Get the logical architecture qubit for an internal graph vertex index."""
         return int(self.graph.qubit(vertex))
 
-    def pre_calc_distances(self) -> Dict[Literal["upper", "full"], List[Dict[Tuple[int,int], Tuple[int,List[Tuple[int,int]]]]]]:
-        """
-        Pre-calculates the distances between all pairs of qubits in the architecture.
-
-        :return: The computed distances. distances["upper"|"full"][until][(v1,v2)] contains the distance between v1 and v2, and the shortest path, where
-            upper|full indicates whether to consider bidirectional edges or not (respectively),
-            until indicates the number of qubits to consider, for "full" the distance is calculated only between qubits with index <= until),
-            and for "upper" the distance is calculated only between qubits with index >= until)
-        """
-        return {"upper": [self.floyd_warshall(self.vertices[until:], upper=True) for until, v in enumerate(self.vertices)],
-                "full": [self.floyd_warshall(self.vertices[:until+1], upper=False) for until, v in enumerate(self.vertices)]}
-
     def _get_reduce_order(self) -> List[int]:
         """
         Determines reduction order by iteratively removing the largest labelled leaf node.
@@ -333,47 +326,95 @@ class Architecture():
             filename = self.name + ".png"
         plt.savefig(filename)
 
+    def _cache_get(self, cache: OrderedDict, key: Any) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any) -> None:
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def all_pairs(self, subgraph_vertices: Optional[List[int]]=None, upper: bool=True, rec_vertices: List[int]=[]) -> AllPairs:
+        """
+        Calculates the all-pairs distances in a given subgraph with a vectorised Floyd-Warshall algorithm.
+        The results are cached, so every subgraph is only solved once per architecture.
+
+        :param subgraph_vertices: Subset of vertices to consider, default all vertices
+        :param upper: Whether use bidirectional edges or only ordered edges (src, tgt) such that src > tgt, default True
+        :param rec_vertices: A subgraph for which edges are considered undirected, as if the `upper` flag was set
+        :return: A tuple (index, dist, next_hop), where index maps the vertices to rows of the matrices, dist[i,j] is the
+            length of the shortest path from i to j (infinite if there is none) and next_hop[i,j] is the index of the
+            vertex following i on that path (-1 if there is none)
+        """
+        vertices = tuple(subgraph_vertices if subgraph_vertices is not None else self.vertices)
+        rec = frozenset(rec_vertices)
+        key = (vertices, upper, rec)
+        cached = self._cache_get(self._all_pairs_cache, key)
+        if cached is not None:
+            return cached
+        # https://en.wikipedia.org/wiki/Floyd%E2%80%93Warshall_algorithm#Path_reconstruction
+        index = {v: i for i, v in enumerate(vertices)}
+        n = len(vertices)
+        dist = np.full((n, n), np.inf)
+        next_hop = np.full((n, n), -1, dtype=np.int64)
+        for edge in self.graph.edges():
+            src, tgt = self.graph.edge_st(edge)
+            if src in index and tgt in index:
+                s, t = index[src], index[tgt]
+                if upper or (src in rec and tgt in rec):
+                    arcs = [(s, t), (t, s)]
+                elif self.vertex2qubit(src) > self.vertex2qubit(tgt):
+                    arcs = [(s, t)]
+                else:
+                    arcs = [(t, s)]
+                for a, b in arcs:
+                    dist[a, b] = 1
+                    next_hop[a, b] = b
+        np.fill_diagonal(dist, 0)
+        np.fill_diagonal(next_hop, np.arange(n))
+        for k in range(n):
+            via = dist[:, k:k+1] + dist[k:k+1, :]
+            shorter = via < dist
+            dist = np.where(shorter, via, dist)
+            next_hop = np.where(shorter, next_hop[:, k:k+1], next_hop)
+        result = (index, dist, next_hop)
+        self._cache_put(self._all_pairs_cache, key, result)
+        return result
+
+    @staticmethod
+    def _path_indices(next_hop: np.ndarray, i: int, j: int) -> List[int]:
+        path = [i]
+        while i != j:
+            i = int(next_hop[i, j])
+            path.append(i)
+        return path
+
     def floyd_warshall(self, subgraph_vertices: List[int], upper: bool=True, rec_vertices: List[int]=[]) -> Dict[Tuple[int,int], Tuple[int,List[Tuple[int,int]]]]:
         """
         Implementation of the Floyd-Warshall algorithm to calculate the all-pair distances in a given graph.
+        This is a dictionary view of :meth:`all_pairs`.
 
         :param subgraph_vertices: Subset of vertices to consider
         :param upper: Whether use bidirectional edges or only ordered edges (src, tgt) such that src > tgt, default True
         :param rec_vertices: A subgraph for which edges are considered undirected, as if the `upper` flag was set
         :return: A dict with for each pair of qubits in the graph, a tuple with their distance and the corresponding shortest path
         """
-        # https://en.wikipedia.org/wiki/Floyd%E2%80%93Warshall_algorithm
+        index, dist, next_hop = self.all_pairs(subgraph_vertices, upper, rec_vertices)
+        vertices = list(index.keys())
         distances = {}
-        vertices = subgraph_vertices if subgraph_vertices is not None else self.vertices
-        for edge in self.graph.edges():
-            src, tgt = self.graph.edge_st(edge)
-            if src in vertices and tgt in vertices:
-                if upper or (src in rec_vertices and tgt in rec_vertices):
-                    distances[(src, tgt)] = (1, [(src, tgt)])
-                    distances[(tgt, src)] = (1, [(tgt, src)])
-                elif self.vertex2qubit(src) > self.vertex2qubit(tgt):
-                    distances[(src, tgt)] = (1, [(src, tgt)])
-                else:
-                    distances[(tgt, src)] = (1, [(tgt, src)])
-        for v in vertices:
-            distances[(v, v)] = (0, [])
-        for v0 in vertices+vertices:
-            for v1 in vertices:
-                for v2 in vertices:
-                    # Consider the path v0 -> v1 -> v2 as a shortest path candidate for v0 -> v2
-                    if (v0, v1) in distances.keys() and (v1, v2) in distances.keys():
-                        if (v0, v2) not in distances.keys() or distances[(v0, v2)][0] > distances[(v0, v1)][0] + distances[(v1, v2)][0]:
-                            # There is a path v0 -> v1 -> v2 that is either the first one we see, or the shortest one yet
-                            distances[(v0, v2)] = (distances[(v0, v1)][0] + distances[(v1, v2)][0],
-                                                distances[(v0, v1)][1] + distances[(v1, v2)][1])
-                            if upper:
-                                distances[(v2, v0)] = (distances[(v0, v1)][0] + distances[(v1, v2)][0],
-                                                distances[(v2, v1)][1] + distances[(v1, v0)][1])
+        for v0, i in index.items():
+            for v1, j in index.items():
+                if dist[i, j] != np.inf:
+                    path = [vertices[k] for k in self._path_indices(next_hop, i, j)]
+                    distances[(v0, v1)] = (int(dist[i, j]), list(zip(path, path[1:])))
         return distances
 
     def shortest_path(self, start_qubit: int, end_qubit: int, qubits_to_use: Optional[List[int]]=None) -> Optional[List[int]]:
         """
-        Find the shortest path between two qubits in the graph using breadth-first search (BFS)
+        Find the shortest path between two qubits in the graph using the cached all-pairs distances.
         
         :param start_qubit: Location of the start qubit index within the graph
         :param end_qubit: Location of the end qubit index within the graph
@@ -386,27 +427,58 @@ class Architecture():
             nodes = [self.qubit2vertex(n) for n in qubits_to_use]
         start = self.qubit2vertex(start_qubit)
         end = self.qubit2vertex(end_qubit)
-
-        queue = [(start, [start])] 
-        visited = [start]
-  
-        while queue != []: 
-            
-            node, path = queue.pop() 
-            if node == end:
-                return path
-            edges = [edge for edge in self.graph.edges() if node in edge]
-            neighbors = [n for edge in edges for n in edge if n != node and n in nodes]
-            for new_node in neighbors: 
-                if new_node not in visited: 
-                    queue.append((new_node, path + [new_node]))
-                    visited.append(new_node)
-        return None
+        if start not in nodes:
+            nodes = nodes + [start]
+        index, dist, next_hop = self.all_pairs(nodes, upper=True)
+        if end not in index or dist[index[start], index[end]] == np.inf:
+            return None
+        vertices = list(index.keys())
+        return [vertices[k] for k in self._path_indices(next_hop, index[start], index[end])]
+
+    def _approximate_steiner_tree(self, root: int, terminals: List[int], all_pairs: AllPairs) -> Tuple[List[int], List[int], List[Tuple[int,int]]]:
+        """
+        Approximates the Steiner tree on the shortest-path metric with Prim's algorithm, vectorised over the terminals.
+        
+        :param root: The vertex at the root of the tree
+        :param terminals: The vertices that should be present in the tree, in the order they should be considered on ties
+        :param all_pairs: The result of :meth:`all_pairs` for the subgraph the tree should live in
+        :return: The terminals in the order they were added, the added Steiner points, and the edges of all used paths
+        """
+        index, dist, next_hop = all_pairs
+        vertices = list(index.keys())
+        term = np.array([index[v] for v in terminals], dtype=np.int64)
+        # For every terminal: the shortest distance to the tree so far and the tree vertex realising it
+        best = dist[index[root], term].copy()
+        best_src = np.full(len(term), index[root], dtype=np.int64)
+        remaining = np.ones(len(term), dtype=bool)
+        in_tree = {index[root]}
+        added: List[int] = []
+        steiner_pnts: List[int] = []
+        edges: List[Tuple[int,int]] = []
+        while remaining.any():
+            masked = np.where(remaining, best, np.inf)
+            j = int(np.argmin(masked))
+            if masked[j] == np.inf:
+                raise ValueError("The considered subgraph is not connected")
+            path = self._path_indices(next_hop, int(best_src[j]), int(term[j]))
+            edges.extend((vertices[a], vertices[b]) for a, b in zip(path, path[1:]))
+            remaining[j] = False
+            added.append(vertices[term[j]])
+            for k in path:
+                if k in in_tree: continue
+                in_tree.add(k)
+                if k != term[j]:
+                    steiner_pnts.append(vertices[k])
+                closer = dist[k, term] < best
+                best = np.where(closer, dist[k, term], best)
+                best_src = np.where(closer, k, best_src)
+        return added, steiner_pnts, edges
 
     def steiner_tree(self, start_qubit: int, qubits_to_use: List[int], upper: bool=True) -> Iterator[Optional[Tuple[int,int]]]:
         """
         Approximates the steiner tree given the architecture, a root qubit and the other qubits that should be present.
-        This is done using the pre-calculated all-pairs shortest distance and Prim's algorithm for creating a minimum spanning tree.
+        This is done using the cached all-pairs shortest distance and Prim's algorithm for creating a minimum spanning tree.
+        The resulting trees are cached by (root, terminals).
 
         :param start_qubit: The index of the root qubit to be used
         :param qubits_to_use: The indices of the other qubits that should be present in the steiner tree
@@ -421,76 +493,46 @@ class Architecture():
         # https://en.wikipedia.org/wiki/Prim%27s_algorithm
 
         # returns an iterator that walks the steiner tree, yielding (adj_node, leaf) pairs. If the walk is finished, it yields None
-        if self.distances is None:
-            self.distances = self.pre_calc_distances()
         root = self.qubit2vertex(start_qubit)
         target_nodes = set(self.qubit2vertex(q) for q in qubits_to_use)
 
         # Check that all nodes are valid and that there are no duplicates
         assert all(n >= root if upper else n <= root for n in target_nodes)
         assert len(qubits_to_use) == len(set(qubits_to_use))
-        
-        # The vertices and edges of the generated tree
-        tree_vertices: Set[int] = {root}
-        edges: Set[Tuple[int,int]] = set()
-        # Map with all distances between nodes with index <= root (if not upper) or index >= root (if upper), and the corresponding shortest paths
-        distances: Dict[Tuple[int,int], Tuple[int,List[Tuple[int,int]]]] = self.distances["upper"][root] if upper else self.distances["full"][root]
-        # Nodes that are not yet in the tree
-        remaining_nodes = set(n for n in target_nodes if n != root)
-        # Non-target nodes added to the tree
-        steiner_pnts: Set[int] = set()
-
-        while remaining_nodes:
-            # Each candidate is a tuple of (tree node, candidate, distance, path)
-            candidates = []
-            for node in remaining_nodes:
-                for v in tree_vertices.union(steiner_pnts):
-                    if (v, node) not in distances.keys():
-                        # The nodes are not connected in the considered subgraph
-                        continue
-                    dist, path = distances[(v, node)]
-                    candidates.append((node, v, dist, path))
-            if not candidates:
-                raise ValueError("The considered subgraph is not connected")
-            best_option = min(candidates, key=lambda x: x[2])
-            new_node = best_option[0]
-            new_path = best_option[3]
-
-            # Add the target node and all intermediary vertices to the three
-            tree_vertices.add(new_node)
-            edges.update(new_path)
-            for _u,v in new_path:
-                if v not in tree_vertices:
-                    tree_vertices.add(v)
-                    steiner_pnts.add(v)
-            remaining_nodes.remove(new_node)
-        edges = set(edges)  # remove duplicates
-            
-        # Compute all the edges of the steiner tree in BFS order, starting from the root
-        visited = {root}
-        queue = [root] 
-        generated_edges: List[Tuple[int,int]] = []
-        
-        while queue != []:
-            node = queue.pop(0)
-            neighbors = [v for v in self.graph.neighbors(node) if v in tree_vertices and v not in visited]
-
-            for v in neighbors:
-                queue.append(v)
-                visited.add(v)
-                edge = (self.vertex2qubit(node), self.vertex2qubit(v))
-                generated_edges.append(edge)
-                yield edge
+
+        key = (root, frozenset(target_nodes), upper)
+        generated_edges: Optional[List[Tuple[int,int]]] = self._cache_get(self._steiner_cache, key)
+        if generated_edges is None:
+            # All distances between nodes with index <= root (if not upper) or index >= root (if upper), and the corresponding shortest paths
+            subgraph = self.vertices[root:] if upper else self.vertices[:root+1]
+            all_pairs = self.all_pairs(subgraph, upper=upper)
+            added, steiner_pnts, _ = self._approximate_steiner_tree(root, sorted(n for n in target_nodes if n != root), all_pairs)
+            tree_vertices = {root} | set(added) | set(steiner_pnts)
+
+            # Compute all the edges of the steiner tree in BFS order, starting from the root
+            visited = {root}
+            queue = [root]
+            generated_edges = []
+            while queue != []:
+                node = queue.pop(0)
+                neighbors = [v for v in self.graph.neighbors(node) if v in tree_vertices and v not in visited]
+                for v in neighbors:
+                    queue.append(v)
+                    visited.add(v)
+                    generated_edges.append((self.vertex2qubit(node), self.vertex2qubit(v)))
+            self._cache_put(self._steiner_cache, key, generated_edges)
+
+        yield from generated_edges
         yield None
         
         # Now go through the tree in reverse order
-        for edge in generated_edges[::-1]:
-            yield edge
+        yield from generated_edges[::-1]
         yield None
 
     def rec_steiner_tree(self, start_qubit, terminal_qubits, usable_qubits, rec_qubits, upper=True):
         """
         Build a Steiner tree with recursive constraints for given qubits, connecting all terminal qubits using the min number of edges.
+        The resulting trees are cached by (root, terminals, usable qubits, recursive qubits).
         
         :param start_qubit: Location of the start qubit index within the graph
         :param terminal_qubits: List of qubit indicies within the graph that must be included in the tree
@@ -501,30 +543,32 @@ class Architecture():
         """
         if not all([q in usable_qubits for q in terminal_qubits]):
             raise Exception("Terminals not in the subgraph")
+        key = (start_qubit, frozenset(terminal_qubits), tuple(usable_qubits), frozenset(rec_qubits), upper)
+        cached = self._cache_get(self._steiner_cache, key)
+        if cached is None:
+            cached = self._rec_steiner_tree_edges(start_qubit, terminal_qubits, usable_qubits, rec_qubits, upper)
+            self._cache_put(self._steiner_cache, key, cached)
+        top_down, bottom_up = cached
+        yield from top_down
+        yield None # Signal next phase
+        yield from bottom_up
+        yield None # Signal done
+
+    def _rec_steiner_tree_edges(self, start_qubit, terminal_qubits, usable_qubits, rec_qubits, upper):
+        """
+        Computes the edges yielded by :meth:`rec_steiner_tree`, top-down and bottom-up respectively.
+        """
         # Builds the steiner tree with start as root, contains at least nodes and at most useable_nodes
         start = self.qubit2vertex(start_qubit)
         usable_nodes = [self.qubit2vertex(i) for i in usable_qubits]
         nodes = [self.qubit2vertex(i) for i in terminal_qubits]
         rec_nodes = [self.qubit2vertex(i) for i in rec_qubits]
-        # Calculate all-pairs shortest path
-        distances = self.floyd_warshall(usable_nodes, upper=upper, rec_vertices=rec_nodes)
-        # Build the spanning tree of shortest paths with root start, containing at least nodes
-        vertices = [start]
-        edges = []
-        steiner_pnts = []
-        while nodes != []:
-            options = [(node, v, *distances[(v, node)]) for node in nodes for v in (vertices + steiner_pnts) if
-                        (v, node) in distances.keys()]
-            if options == []:
-                raise ValueError("The considered subgraph is not connected")
-            best_option = min(options, key=lambda x: x[2])
-            vertices.append(best_option[0])
-            edges += best_option[3]
-            steiner = [v for edge in best_option[3] for v in edge if v not in vertices]
-            steiner_pnts += steiner
-            nodes.remove(best_option[0])
+        # Calculate all-pairs shortest path and build the spanning tree of shortest paths with root start, containing at least nodes
+        added, steiner_pnts, edges = self._approximate_steiner_tree(start, nodes, self.all_pairs(usable_nodes, upper=upper, rec_vertices=rec_nodes))
+        vertices = [start] + added
         edges = list(set(edges)) #removes duplicates
 
+        top_down = []
         vs = {start} # Start with the root
         n_edges = len(edges)
         yielded_edges = set()
@@ -532,12 +576,12 @@ class Architecture():
             es = [e for e in edges for v in vs if e[0] == v] # Find all vertices connected to previously yielded vertices
             old_vs = [v for v in vs]
             for edge in es: # yield the corresponding edges.
-                yield (self.vertex2qubit(edge[0]), self.vertex2qubit(edge[1]))
+                top_down.append((self.vertex2qubit(edge[0]), self.vertex2qubit(edge[1])))
                 vs.add(edge[1])
                 yielded_edges.add(edge)
             [vs.remove(v) for v in old_vs]
-        yield None # Signal next phase
         # Walk the tree bottom up to remove all ones.
+        bottom_up = []
         while len(edges) > 0:
             # find leaf nodes:
             vs_to_consider = [vertex for vertex in vertices if vertex not in [e0 for e0, e1 in edges]] + \
@@ -545,9 +589,9 @@ class Architecture():
             for v in vs_to_consider:
                 # Get the edge that is connected to this leaf node
                 for edge in [e for e in edges if e[1] == v]:
-                    yield (self.vertex2qubit(edge[0]), self.vertex2qubit(edge[1])) # yield it
+                    bottom_up.append((self.vertex2qubit(edge[0]), self.vertex2qubit(edge[1])))
                     edges.remove(edge) # Remove it from the steiner tree
-        yield None # Signal done
+        return top_down, bottom_up
 
     def transpose(self):
         """
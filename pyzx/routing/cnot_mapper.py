@@ -11,7 +11,7 @@ from .architecture import (
     create_fully_connected_architecture,
 )
 from .parity_maps import CNOT_tracker
-from .machine_learning import GeneticAlgorithm, ParticleSwarmOptimization
+from .machine_learning import FitnessCache, GeneticAlgorithm, ParticleSwarmOptimization
 
 from .steiner import rec_steiner_gauss as steiner_gauss
 
@@ -104,6 +104,22 @@ class FitnessFunction(object):
         self.full_reduce = full_reduce
         self.n_qubits = architecture.n_qubits if architecture else matrix.cols()
         self.kwargs = kwargs
+        # Distinguishes this function in a FitnessCache that is shared with fitness functions
+        # of other matrices, architectures or arguments
+        self.cache_context = (
+            metric,
+            mode,
+            row,
+            col,
+            full_reduce,
+            tuple(tuple(int(v) for v in r) for r in matrix.data),
+            None if architecture is None else (
+                architecture.name,
+                tuple(architecture.qubit_map),
+                tuple(sorted(architecture.graph.edge_st(e) for e in architecture.graph.edges())),
+            ),
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
 
     def _make_function(self):
         if self.metric == CostMetric.COMBINED:
@@ -246,6 +262,8 @@ def permuted_gauss(
     fitness_func: Optional[FitnessFunction] = None,
     x=None,
     y=None,
+    n_threads: Optional[int] = 1,
+    cache: Optional[FitnessCache] = None,
     **kwargs,
 ) -> Tuple[List[int], Circuit, int]:
     """
@@ -265,6 +283,8 @@ def permuted_gauss(
     :param fitness_func: Optional fitness function to use
     :param x: Optional tracker for the row operations
     :param y: Optional tracker for the column operations
+    :param n_threads: Number of processes used to evaluate the population of the genetic algorithm. If None, use all available threads.
+    :param cache: Optional fitness memo of the genetic algorithm, to share it with other runs
     :return: Best permutation found, list of CNOTS corresponding to the
         elimination.
     """
@@ -285,6 +305,8 @@ def permuted_gauss(
             crossover_prob,
             mutate_prob,
             fitness_func,
+            n_threads=n_threads,
+            cache=cache,
         )
         permsize = len(matrix.data) if row else len(matrix.data[0])
         best_permutation = optimizer.find_optimum(
@@ -323,6 +345,7 @@ def sequential_gauss(
     p_crossover: float = 0.3,
     pso_mutation: float = 0.2,
     full_reduce: bool = True,
+    cache: Optional[FitnessCache] = None,
     **kwargs,
 ) -> Tuple[List[CNOT_tracker], List[List[int]], int]:
     """
@@ -343,6 +366,8 @@ def sequential_gauss(
     :param p_crossover: The crossover percentage with the personal best of a particle for the particle swarm optimizer. Must be between 0.0 and 1.0.
     :param pso_mutation: The mutation percentage of a particle for the particle swarm optimizer. Must be between 0.0 and 1.0.
     :param full_reduce: Fully reduce the matrices
+    :param cache: Optional fitness memo shared by all the genetic algorithms of the elimination. The particle
+        swarm optimization modes always share one between the steps of all particles.
     :return: List of CNOT trackers corresponding to the eliminations, list of
         final permutations for each matrix, and the cost of the eliminations.
     """
@@ -383,6 +408,7 @@ def sequential_gauss(
                 fitness_func=fitness_func,
                 row=row,
                 col=col,
+                cache=cache,
                 **kwargs,
             )
             # if not col and not row:
@@ -411,11 +437,12 @@ def sequential_gauss(
                 fitness_func=fitness_func,
                 input_perm=input_perm,
                 output_perm=output_perm,
+                cache=cache,
                 **kwargs,
             )
 
         step_func = StepFunction(
-            matrices, new_mode, architecture, fitness_func, **kwargs
+            matrices, new_mode, architecture, fitness_func, cache=cache, **kwargs
         )
         optimizer = ParticleSwarmOptimization(
             swarm_size=swarm_size,
@@ -441,7 +468,7 @@ class StepFunction:
     A step function for the PSO algorithm.
     """
 
-    def __init__(self, matrices, mode, architecture, fitness_func, **kwargs):
+    def __init__(self, matrices, mode, architecture, fitness_func, cache=None, **kwargs):
         """
         Creates and returns a step function.
 
@@ -449,12 +476,14 @@ class StepFunction:
         :param mode: The type of Gaussian elimination to be used
         :param architecture: The architecture to take into account when routing
         :param fitness_func: Fitness function to guide optimisation
+        :param cache: Fitness memo of the genetic algorithms, shared by all steps. If None, a new :class:`FitnessCache` is used
         :param **kwargs: Additional arguments passed
         """
         self.matrices = matrices
         self.mode = mode
         self.architecture = architecture
         self.fitness_func = fitness_func
+        self.cache = cache if cache is not None else FitnessCache()
         self.kwargs = kwargs
         self.rev_matrices = [
             Mat2(np.asarray(m.data).T.tolist()) for m in reversed(matrices)
@@ -488,6 +517,7 @@ class StepFunction:
             fitness_func=fitness_func,
             input_perm=False,
             output_perm=True,
+            cache=self.cache,
             **kwargs,
         )
         # Resulting permutation is the initial permutation of the reverse pass
@@ -506,6 +536,7 @@ class StepFunction:
             fitness_func=fitness_func,
             input_perm=False,
             output_perm=True,
+            cache=self.cache,
             **kwargs,
         )
         # New initial placement is the final placement of the reverse pass.
@@ -15,12 +15,122 @@
 # limitations under the License.
 
 
-from multiprocessing import cpu_count
+from collections import OrderedDict
+from multiprocessing import cpu_count, current_process
 from multiprocessing.pool import Pool
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 import numpy as np
 
 
+class FitnessCache:
+    """
+    A least-recently-used memo of evaluations, keyed by the permutation that was evaluated.
+    Identical permutations occur often across the generations of :class:`GeneticAlgorithm`
+    and the steps of :class:`ParticleSwarmOptimization`, so they are only evaluated once.
+    The key can be prefixed with a context, such as the matrix the permutation is applied to,
+    so one cache can be shared between optimizers with different evaluation functions.
+    """
+    def __init__(self, maxsize: int = 4096):
+        """
+        Creates and returns an empty cache.
+
+        :param maxsize: The maximal number of stored evaluations, default 4096
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memo: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(permutation, context: Hashable = None) -> Hashable:
+        """
+        Converts a permutation (a list or numpy array) into a hashable key.
+
+        :param permutation: The permutation
+        :param context: What distinguishes the evaluation function from the others that share the cache, default None
+        :return: The permutation as a tuple of ints, paired with the context if there is one
+        """
+        perm = tuple(int(i) for i in permutation)
+        return perm if context is None else (context, perm)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Looks up an evaluation, marking it as recently used.
+
+        :param key: The key of the permutation, see :meth:`key`
+        :return: The stored evaluation, or None if there is none
+        """
+        value = self._memo.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._memo.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores an evaluation, evicting the least recently used one if the cache is full.
+
+        :param key: The key of the permutation, see :meth:`key`
+        :param value: The evaluation
+        """
+        self._memo[key] = value
+        self._memo.move_to_end(key)
+        if len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+
+    def update(self, other: "FitnessCache") -> None:
+        """
+        Stores all the evaluations of another cache, e.g. the copy that was filled in a pool worker.
+
+        :param other: The cache to merge into this one
+        """
+        for key, value in other._memo.items():
+            self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def clear(self) -> None:
+        self._memo.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _pool_size(n_threads: Optional[int]) -> int:
+    """
+    The number of processes a pool for ``n_threads`` threads has, or 1 if no pool would be created.
+    Pool workers are daemonic and cannot have children, so no pool is created inside a worker.
+    """
+    n_threads = (
+        min(n_threads, cpu_count()) if n_threads is not None else cpu_count()
+    )
+    if n_threads > 1 and not current_process().daemon:
+        return n_threads
+    return 1
+
+def _make_pool(n_threads: Optional[int], initializer: Optional[Callable] = None, initargs: tuple = ()) -> Optional[Pool]:
+    """
+    Creates a pool with :func:`_pool_size` processes, or None if at most one process would be used.
+    """
+    n_processes = _pool_size(n_threads)
+    if n_processes > 1:
+        return Pool(n_processes, initializer, initargs)
+    return None
+
+# The fitness function of the GeneticAlgorithm in a pool worker, set once by the pool initializer
+_worker_fitness_func: Optional[Callable] = None
+
+def _set_worker_fitness_func(fitness_func: Callable) -> None:
+    global _worker_fitness_func
+    _worker_fitness_func = fitness_func
+
+def _worker_fitness(chromosome) -> Any:
+    assert _worker_fitness_func is not None
+    return _worker_fitness_func(chromosome)
+
+
 class GeneticAlgorithm:
     """
     A genetic algorithm for optimising permutations based on a fitness function.
@@ -32,6 +142,9 @@ class GeneticAlgorithm:
         mutation_prob: float,
         fitness_func,
         maximize: bool = False,
+        n_threads: Optional[int] = 1,
+        chunksize: Optional[int] = None,
+        cache: Optional[FitnessCache] = None,
     ):
         """
         Creates and returns a genetic algorithm.
@@ -39,8 +152,13 @@ class GeneticAlgorithm:
         :param population_size: Number of individuals in the population
         :param crossover_prob: Probability of crossover between individuals
         :param mutation_prob: Probability of mutation for an offspring
-        :param fitness_func: Function to evaluate fitness of permutations
+        :param fitness_func: Function to evaluate fitness of permutations. Must be picklable when using multiple threads.
         :param maximize: True, Maximise the fitness, False, Minimise the Fitness, default False 
+        :param n_threads: Number of processes used to evaluate the population. If None, use all available threads, default 1
+        :param chunksize: Number of chromosomes sent to a process at a time. If None, spread each generation evenly, default None
+        :param cache: Memo of the fitness per permutation. If None, a new :class:`FitnessCache` is used, default None.
+            The keys are prefixed with the ``cache_context`` attribute of the fitness function, if it has one,
+            so that genetic algorithms over different matrices can share a cache.
         """
         self.population_size = population_size
         self.negative_population_size = int(np.sqrt(population_size))
@@ -51,6 +169,64 @@ class GeneticAlgorithm:
         self.maximize = maximize
         self.n_qubits = 0
         self.population: List[Tuple[List[int], Any]] = []
+        self.n_threads = n_threads
+        self.chunksize = chunksize
+        self.cache = cache if cache is not None else FitnessCache()
+        self.pool: Optional[Pool] = None
+        self.n_processes = 1
+
+    def __getstate__(self):
+        """
+        Prepares the object state for pickling by removing non-serialisable fields.
+
+        :return: The state dictionary
+        """
+        state = self.__dict__.copy()
+        del state["pool"]
+        del state["_sort"]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the object state after unpickling
+
+        :param state: The state to be restored to the dictionary
+        """
+        self.__dict__.update(state)
+        self._sort = lambda l: l.sort(key=lambda x: x[1], reverse=self.maximize)
+        self.pool = None
+
+    def _evaluate(self, chromosomes) -> List[Any]:
+        """
+        Evaluates the fitness of the given chromosomes. Chromosomes that were evaluated before are
+        looked up in the cache, the others are evaluated (in parallel, if there is a pool).
+
+        :param chromosomes: The permutations to evaluate
+        :return: The fitness of every chromosome
+        """
+        context = getattr(self.fitness_func, "cache_context", None)
+        keys = [FitnessCache.key(c, context) for c in chromosomes]
+        fitness: Dict[Hashable, Any] = {}
+        todo = {}
+        for k, c in zip(keys, chromosomes):
+            if k in fitness or k in todo: continue
+            f = self.cache.get(k)
+            if f is None:
+                todo[k] = c
+            else:
+                fitness[k] = f
+        if todo:
+            if self.pool is not None:
+                chunksize = self.chunksize
+                if chunksize is None:
+                    chunksize = max(1, len(todo) // (4 * self.n_processes))
+                values = self.pool.map(_worker_fitness, list(todo.values()), chunksize)
+            else:
+                values = [self.fitness_func(c) for c in todo.values()]
+            for k, f in zip(todo, values):
+                fitness[k] = f
+                self.cache.put(k, f)
+        return [fitness[k] for k in keys]
 
     def _select(self):
         """
@@ -80,8 +256,8 @@ class GeneticAlgorithm:
         """
         population = [np.random.permutation(n) for _ in range(self.population_size)]
         self.population = [
-            (list(chromosome), self.fitness_func(chromosome))
-            for chromosome in population
+            (list(chromosome), f)
+            for chromosome, f in zip(population, self._evaluate(population))
         ]
         self._sort(self.population)
         self.negative_population = self.population[-self.negative_population_size :]
@@ -101,20 +277,28 @@ class GeneticAlgorithm:
         """
         self.n_qubits = n_qubits
         partial_solution = False
-        if not continued or not self.population:
-            if initial_order is None:
-                self._create_population(n_qubits)
-            elif n_qubits < len(initial_order):
-                self._create_population(initial_order[:n_qubits])
-                partial_solution = True
-            else:
-                self._create_population(initial_order)
-
-        if n_child is None:
-            n_child = self.population_size
-
-        for _ in range(n_generations):
-            self._update_population(n_child)
+        self.n_processes = _pool_size(self.n_threads)
+        self.pool = _make_pool(self.n_threads, _set_worker_fitness_func, (self.fitness_func,))
+        try:
+            if not continued or not self.population:
+                if initial_order is None:
+                    self._create_population(n_qubits)
+                elif n_qubits < len(initial_order):
+                    self._create_population(initial_order[:n_qubits])
+                    partial_solution = True
+                else:
+                    self._create_population(initial_order)
+
+            if n_child is None:
+                n_child = self.population_size
+
+            for _ in range(n_generations):
+                self._update_population(n_child)
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
         if partial_solution and initial_order is not None:
             return self.population[0] + initial_order[n_qubits:]
         return self.population[0][0]
@@ -126,9 +310,7 @@ class GeneticAlgorithm:
         :param children: The children to be added to the population
         """
         n_child = len(children)
-        self.population.extend(
-            [(child, self.fitness_func(child)) for child in children]
-        )
+        self.population.extend(zip(children, self._evaluate(children)))
         self._sort(self.population)
         self.negative_population.extend(self.population[-n_child:])
         self.negative_population = [
@@ -232,12 +414,7 @@ class ParticleSwarmOptimization:
         self.best_particle = None
         self.maximize = maximize
         self.swarm: List[Particle] = []
-        self.pool: Optional[Pool] = None
-        n_threads = (
-            min(n_threads, cpu_count()) if n_threads is not None else cpu_count()
-        )
-        if n_threads > 1:
-            self.pool = Pool(n_threads)
+        self.pool: Optional[Pool] = _make_pool(n_threads)
 
     def __getstate__(self):
         """
@@ -323,18 +500,34 @@ class ParticleSwarmOptimization:
         p.step(swarm_best)
         return p
 
+    @staticmethod
+    def particle_evaluate_func(p):
+        """
+        Evaluate the step function at the current position of a single particle.
+
+        :param p: The particle to evaluate
+        :return: The result of the step function, a tuple (new_position, solution, fitness), and the
+            fitness memo of the step function, if it has one, with the evaluations made in this step
+        """
+        return p.step_func(p.current), getattr(p.step_func, "cache", None)
+
     def _update_swarm(self):
         """
         Update the state of all particles in the swarm, after updating the method finds the best particle in the swarm.
+        The step function is evaluated for every particle, in the pool if there is one. If the step function has a
+        ``cache`` (the fitness memo of its genetic algorithms, see :class:`FitnessCache`), it is shared by all
+        particles: the evaluations made in the pool workers are merged back into it after every step.
         """
         if self.pool is not None:
-            self.swarm = self.pool.map(
-                self.particle_update_func, [(self.best_particle, p) for p in self.swarm]
-            )
+            evaluated = self.pool.map(self.particle_evaluate_func, self.swarm)
+            cache = getattr(self.step_func, "cache", None)
+            if cache is not None:
+                for _, worker_cache in evaluated:
+                    cache.update(worker_cache)
         else:
-            self.swarm = [
-                self.particle_update_func((self.best_particle, p)) for p in self.swarm
-            ]
+            evaluated = [self.particle_evaluate_func(p) for p in self.swarm]
+        for p, (result, _) in zip(self.swarm, evaluated):
+            p.step(self.best_particle, result)
         if self.maximize:
             top = max(
                 self.swarm, key=lambda p: p.best if p.best is not None else -np.inf
@@ -398,14 +591,17 @@ class Particle:
         else:
             return x > self.best
 
-    def step(self, swarm_best):
+    def step(self, swarm_best, result=None):
         """
         Preform one optimisation step for the particle.
 
         :param swarm_best: The best particle in the swarm
+        :param result: The result of the step function at the current position, if it is already known, default None
         :return: True, a better solution was found, False, no better solution was found
         """
-        new, solution, fitness = self.step_func(self.current)
+        if result is None:
+            result = self.step_func(self.current)
+        new, solution, fitness = result
         is_better = self.best is None or not self.compare(fitness)
         if is_better:
             self.best = fitness
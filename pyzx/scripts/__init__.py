@@ -20,6 +20,7 @@ Run one of the scripts supplied with PyZX.
 
 The options for command are:
     opt       -- Optimize a circuit using PyZX
+    batch     -- Optimize all circuits in a directory using a pool of worker processes
     tikz      -- Convert a circuit into a Tikz file
     router    -- Map any circuit onto restricted architectures
     cnots     -- Generate random CNOT circuits 
@@ -30,6 +31,7 @@ For help on the arguments for these commands run for instance 'python -m pyzx op
 
 import argparse
 from . import circ2circ
+from . import batch
 from . import circ2tikz
 from . import circuit_router
 from . import cnot_generator
@@ -43,13 +45,15 @@ def main(argv):
         parser.print_help()
         exit(1)
     args = parser.parse_args(argv[1:2])
-    if args.command not in ('opt', 'tikz', 'router', 'cnots', 'phasepoly'):
+    if args.command not in ('opt', 'batch', 'tikz', 'router', 'cnots', 'phasepoly'):
         print("Unrecognized command '{}'".format(args.command))
         parser.print_help()
         exit(1)
 
     if args.command == 'opt':
         circ2circ.main(argv[2:])
+    if args.command == 'batch':
+        batch.main(argv[2:])
     if args.command == 'tikz':
         circ2tikz.main(argv[2:])
     if args.command == 'router':
@@ -0,0 +1,233 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import sys
+import glob
+import json
+import time
+import signal
+from multiprocessing import cpu_count
+from multiprocessing.pool import Pool
+from typing import Any, Dict, List, Set, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None # type: ignore # Not available on Windows
+
+from ..circuit import Circuit, determine_file_type
+from .circ2circ import optimize_circuit, circuit_to_string
+
+description="""Batch circuit optimizer
+
+Optimises every circuit in the given directories or glob patterns with a pool
+of worker processes, so that the start-up cost is only paid once:
+    python -m pyzx batch -d optimized circuits/qasm
+    python -m pyzx batch -j 8 --timeout 600 --memory 4096 "circuits/**/*.qasm"
+
+Every circuit is run through the same pipeline as 'python -m pyzx opt' and written
+to the destination directory, keeping its path relative to the inputs.
+For every circuit a JSON line with the gate counts, T-count and timings is appended
+to the summary file (by default summary.jsonl in the destination directory).
+Circuits that already have a successful record in the summary are skipped, so an
+interrupted run is resumed by running the same command again.
+"""
+
+import argparse
+parser = argparse.ArgumentParser(prog="pyzx batch", description=description, formatter_class=argparse.RawTextHelpFormatter)
+parser.add_argument('sources',type=str,nargs='+',help='directories or glob patterns of source circuits')
+parser.add_argument('-d',type=str,help='destination directory for the output files (default pyzx_batch)',
+    dest='dest',default='pyzx_batch')
+parser.add_argument('-t',type=str,default='match', dest='outformat',
+    help='Specify the output format (qasm, qc, quipper). By default matches the input')
+parser.add_argument('-s',type=str,default='', dest='summary',
+    help='JSONL file to which the statistics are appended (default DEST/summary.jsonl)')
+parser.add_argument('-j',type=int,default=0, dest='workers',
+    help='Number of worker processes (default is the number of cores)')
+parser.add_argument('--timeout',type=float,default=0, dest='timeout',
+    help='Time limit in seconds for every circuit (default none). Needs SIGALRM, so is ignored on Windows')
+parser.add_argument('--memory',type=int,default=0, dest='memory',
+    help='Memory limit in MB for every worker process (default none). Ignored on Windows')
+parser.add_argument('-g',type=str,default='full', dest='simp',
+    help='ZX-simplifier to use. Options are full (default), cliff, or tele')
+parser.add_argument('-p',default=False, action='store_true', dest='phasepoly',
+    help='Whether to also run the phase-polynomial optimizer (default is false)')
+parser.add_argument('--force',default=False, action='store_true', dest='force',
+    help='Also rerun the circuits that were completed in a previous run')
+
+# Extensions of the files that are picked up when a directory is given
+circuit_extensions = ('.qasm', '.qc', '.tfc', '.quipper', '.quip', '.circuit')
+
+# source, destination, output format, simplifier, phasepoly, timeout
+Job = Tuple[str, str, str, str, bool, float]
+
+
+def _is_circuit_file(fname: str) -> bool:
+    ext = os.path.splitext(fname)[1]
+    if ext: return ext in circuit_extensions
+    try: # Quipper files often come without an extension
+        return determine_file_type(fname) in ('qasm', 'qc', 'quipper')
+    except (TypeError, UnicodeDecodeError):
+        return False
+
+def collect_sources(patterns: List[str]) -> List[str]:
+    """Expands directories (recursively) and glob patterns into a sorted list of circuit files."""
+    files: Set[str] = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(os.path.join(root, n) for n in names
+                             if _is_circuit_file(os.path.join(root, n)))
+        else:
+            files.update(f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f))
+    return sorted(os.path.abspath(f) for f in files)
+
+def completed_sources(summary: str) -> Set[str]:
+    """Returns the sources that have a successful record in an existing summary file."""
+    done: Set[str] = set()
+    if not os.path.exists(summary): return done
+    with open(summary, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue # A line cut off by an interrupted run
+            if record.get('status') == 'ok' and os.path.exists(record.get('dest', '')):
+                done.add(record['source'])
+    return done
+
+def circuit_stats(c: Circuit) -> Dict[str, Any]:
+    d = c.to_basic_gates().stats_dict()
+    return {k: d[k] for k in ('qubits', 'gates', 'tcount', 'twoqubit', 'clifford')}
+
+
+class CircuitTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise CircuitTimeout()
+
+def _init_worker(memory: int) -> None:
+    if memory and resource is not None:
+        limit = memory * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def optimize_file(job: Job) -> Dict[str, Any]:
+    """Optimises a single circuit file. Used as the worker function of the batch pool.
+
+    Returns:
+        The summary record of the circuit. Its ``status`` is one of ``ok``, ``timeout``,
+        ``memory`` or ``error``, in which case ``error`` contains the exception.
+    """
+    source, dest, dtype, simp, phasepoly, timeout = job
+    record: Dict[str, Any] = {'source': source, 'dest': dest, 'status': 'ok'}
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    use_alarm = timeout > 0 and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        c = Circuit.load(source)
+        timings['load'] = time.perf_counter() - start
+        record['before'] = circuit_stats(c)
+        c2 = optimize_circuit(c, simp, phasepoly, timings=timings)
+        record['after'] = circuit_stats(c2)
+        output = circuit_to_string(c2, dtype)
+        with open(dest, 'w') as f:
+            f.write(output)
+    except CircuitTimeout:
+        record['status'] = 'timeout'
+    except MemoryError:
+        record['status'] = 'memory'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        if use_alarm: signal.setitimer(signal.ITIMER_REAL, 0)
+    timings['total'] = time.perf_counter() - start
+    record['timings'] = timings
+    return record
+
+def make_jobs(sources: List[str], options: argparse.Namespace) -> List[Job]:
+    if len(sources) == 1:
+        root = os.path.dirname(sources[0])
+    else:
+        root = os.path.commonpath([os.path.dirname(s) for s in sources])
+    jobs = []
+    for source in sources:
+        if options.outformat == 'match':
+            try:
+                dtype = determine_file_type(source)
+            except TypeError:
+                dtype = 'qasm'
+            if dtype not in ('qasm', 'qc', 'quipper'): dtype = 'qasm'
+        else:
+            dtype = options.outformat
+        rel = os.path.splitext(os.path.relpath(source, root))[0]
+        dest = os.path.abspath(os.path.join(options.dest, rel + "." + dtype))
+        jobs.append((source, dest, dtype, options.simp, options.phasepoly, options.timeout))
+    return jobs
+
+def main(args):
+    options = parser.parse_args(args)
+    if options.outformat not in ('match', 'qasm', 'qc', 'quipper'):
+        print("Unsupported circuit type {}. Please use qasm, qc or quipper".format(options.outformat))
+        return
+    # Never pick up our own output when the destination is inside a source directory
+    dest_dir = os.path.join(os.path.abspath(options.dest), '')
+    sources = [s for s in collect_sources(options.sources) if not s.startswith(dest_dir)]
+    if not sources:
+        print("No circuits found in {}".format(", ".join(options.sources)))
+        return
+    summary = options.summary if options.summary else os.path.join(options.dest, 'summary.jsonl')
+    jobs = make_jobs(sources, options)
+    if not options.force:
+        done = completed_sources(summary)
+        if done:
+            print("Skipping {} circuits completed in a previous run".format(sum(1 for j in jobs if j[0] in done)))
+        jobs = [j for j in jobs if j[0] not in done]
+    for j in jobs:
+        os.makedirs(os.path.dirname(j[1]), exist_ok=True)
+    if os.path.dirname(summary):
+        os.makedirs(os.path.dirname(summary), exist_ok=True)
+
+    n_workers = min(options.workers, cpu_count()) if options.workers > 0 else cpu_count()
+    n_workers = max(1, min(n_workers, len(jobs)))
+    counts: Dict[str, int] = {}
+    pool = Pool(n_workers, initializer=_init_worker, initargs=(options.memory,))
+    try:
+        with open(summary, 'a') as f:
+            for i, record in enumerate(pool.imap_unordered(optimize_file, jobs)):
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                counts[record['status']] = counts.get(record['status'], 0) + 1
+                line = "[{}/{}] {}: {}".format(i+1, len(jobs), os.path.basename(record['source']), record['status'])
+                if record['status'] == 'ok':
+                    line += " (T-count {} -> {}, gates {} -> {}, {:.2f}s)".format(
+                        record['before']['tcount'], record['after']['tcount'],
+                        record['before']['gates'], record['after']['gates'], record['timings']['total'])
+                elif record['status'] == 'error':
+                    line += " ({})".format(record['error'])
+                print(line)
+                sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+    print("Finished: " + ", ".join("{} {}".format(n, s) for s, n in sorted(counts.items())))
+    print("Summary written to {}".format(os.path.abspath(summary)))
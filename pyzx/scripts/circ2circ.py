@@ -17,6 +17,8 @@
 
 import os
 import sys
+import time
+from typing import Dict, Optional
 
 from ..circuit import Circuit, determine_file_type
 from .. import simplify
@@ -70,31 +72,62 @@ def main(args):
     if options.verbose:
         print("Starting circuit:")
         print(c.to_basic_gates().stats())
+    c3 = optimize_circuit(c, options.simp, options.phasepoly, options.verbose)
+    if options.verbose: print(c3.stats())
+    print("Writing output to {}".format(os.path.abspath(dest)))
+    output = circuit_to_string(c3, dtype)
+    f = open(dest, 'w')
+    f.write(output)
+    f.close()
+
+def optimize_circuit(c: Circuit, simp: str='full', phasepoly: bool=False, verbose: bool=False,
+                     timings: Optional[Dict[str,float]]=None) -> Circuit:
+    """Runs the end-to-end optimisation of ``pyzx opt`` on a circuit.
+
+    Args:
+        c: The circuit to optimise.
+        simp: The ZX-simplifier to use: ``full``, ``cliff`` or ``tele``.
+        phasepoly: Whether to also run the phase-polynomial optimizer.
+        verbose: Whether to print progress information.
+        timings: If given, the seconds spent in the ``simplify``, ``extract``
+            and ``optimize`` stages are stored in this dictionary.
+
+    Returns:
+        The optimised circuit, in basic gates with split phase gates.
+    """
+    t = time.perf_counter()
     g = c.to_graph()
-    if options.verbose: print("Running simplification algorithm...")
-    if options.simp == 'tele':
+    if verbose: print("Running simplification algorithm...")
+    if simp == 'tele':
         g = simplify.teleport_reduce(g)
+        t_simp = time.perf_counter()
         c2 = Circuit.from_graph(g)
         c2 = c2.split_phase_gates()
     else:
-        if options.simp == 'full':
+        if simp == 'full':
             simplify.full_reduce(g)
-        if options.simp == 'cliff':
+        if simp == 'cliff':
             simplify.clifford_simp(g)
-        if options.verbose: print("Extracting circuit...")
+        t_simp = time.perf_counter()
+        if verbose: print("Extracting circuit...")
         c2 = extract.extract_circuit(g)
-    if options.verbose: print("Optimizing...")
-    if options.phasepoly:
+    t_extr = time.perf_counter()
+    if verbose: print("Optimizing...")
+    if phasepoly:
         c3 = optimize.full_optimize(c2.to_basic_gates())
     else:
         c3 = optimize.basic_optimization(c2.to_basic_gates())
     c3 = c3.to_basic_gates()
     c3 = c3.split_phase_gates()
-    if options.verbose: print(c3.stats())
-    print("Writing output to {}".format(os.path.abspath(dest)))
-    if dtype == 'qc': output = c3.to_qc()
-    if dtype == 'qasm': output = c3.to_qasm()
-    if dtype == 'quipper': output = c3.to_quipper()
-    f = open(dest, 'w')
-    f.write(output)
-    f.close()
+    if timings is not None:
+        timings['simplify'] = t_simp - t
+        timings['extract'] = t_extr - t_simp
+        timings['optimize'] = time.perf_counter() - t_extr
+    return c3
+
+def circuit_to_string(c: Circuit, dtype: str) -> str:
+    """Serialises a circuit in one of the output formats ``qasm``, ``qc`` or ``quipper``."""
+    if dtype == 'qc': return c.to_qc()
+    if dtype == 'qasm': return c.to_qasm()
+    if dtype == 'quipper': return c.to_quipper()
+    raise TypeError("Unsupported circuit type {}".format(dtype))
@@ -24,7 +24,7 @@ import math
 sq2 = math.sqrt(2)
 omega = (1+1j)/sq2
 from fractions import Fraction
-from typing import List, Optional, Dict, Tuple, Any
+from typing import List, Optional, Dict, Tuple, Any, Union, Sequence, Iterable, NamedTuple
 
 import numpy as np
 
@@ -316,6 +316,204 @@ def max_terms_needed(g: BaseGraph[VT,ET]) -> int:
     return count
 
 
+BitString = Union[str, Sequence[int]]
+
+def _bits_to_str(bits: BitString) -> str:
+    s = bits if isinstance(bits, str) else ''.join(str(int(b)) for b in bits)
+    if any(b not in '01' for b in s):
+        raise ValueError("Bitstring should only contain 0s and 1s: " + repr(bits))
+    return s
+
+def _contract_scalar(g: BaseGraph[VT,ET], max_memory: int) -> complex:
+    """Contracts what remains of a scalar diagram after simplification, refusing to
+    do so when the rank-decomposition suggests intermediate tensors bigger than
+    ``max_memory`` bytes."""
+    from .rank_width import generate_decomposition, rank_width
+    g.remove_isolated_vertices()
+    if g.num_vertices() == 0: return g.scalar.to_number()
+    decomp = generate_decomposition(g)
+    width = rank_width(decomp, g)
+    # The largest intermediate tensor of the rank-width contraction has at most 2^(2w) entries
+    if 16 * 2**(2*width) > max_memory:
+        raise MemoryError("Contracting the remaining diagram of rank-width {:d} "
+                          "would exceed the memory cap of {:d} bytes".format(width, max_memory))
+    return complex(g.to_tensor(True, 'rw-auto').flatten()[0])
+
+def _evaluate_scalar(g: BaseGraph[VT,ET], max_terms: int, max_memory: int) -> complex:
+    """Computes the number a scalar diagram represents. The diagram is simplified
+    with :func:`~pyzx.simplify.reduce_scalar`. If something non-Clifford survives,
+    it is split into a stabilizer decomposition when that requires at most ``max_terms``
+    terms, and contracted directly otherwise. The graph is modified in place."""
+    simplify.to_gh(g)
+    simplify.reduce_scalar(g)
+    g.remove_isolated_vertices()
+    if g.num_vertices() == 0 or g.scalar.is_zero:
+        return g.scalar.to_number()
+    if simplify.tcount(g) == 0 or max_terms_needed(g) > max_terms:
+        return _contract_scalar(g, max_memory)
+    val: complex = 0
+    for h in find_stabilizer_decomp(g):
+        simplify.reduce_scalar(h)
+        val += _contract_scalar(h, max_memory)
+    return val
+
+def _plug_basis_states(g: BaseGraph[VT,ET], inputs_bits: BitString, outputs_bits: BitString) -> BaseGraph[VT,ET]:
+    inp = _bits_to_str(inputs_bits)
+    outp = _bits_to_str(outputs_bits)
+    if len(inp) != g.num_inputs() or len(outp) != g.num_outputs():
+        raise ValueError("Expected {:d} input bits and {:d} output bits, got {:d} and {:d}".format(
+                            g.num_inputs(), g.num_outputs(), len(inp), len(outp)))
+    g = g.copy()
+    g.apply_state(inp)
+    g.apply_effect(outp)
+    return g
+
+def amplitude(g: Union[BaseGraph[VT,ET], Circuit],
+        inputs_bits: BitString,
+        outputs_bits: BitString,
+        max_terms: int = 2**12,
+        max_memory: int = 2**30) -> complex:
+    """Calculates the single amplitude ``<outputs_bits|g|inputs_bits>`` without building
+    the full tensor of ``g``. The computational basis states are plugged into the diagram,
+    after which it is reduced to a scalar.
+
+    Args:
+        g: The diagram or circuit to evaluate. It is not modified.
+        inputs_bits: A string like ``'0110'`` or a sequence of 0s and 1s, one for every input.
+        outputs_bits: The same, but for every output.
+        max_terms: The largest stabilizer decomposition to attempt for non-Clifford leftovers.
+        max_memory: The largest amount of bytes a fallback tensor contraction is allowed to use.
+
+    Example: ``amplitude(circ, '000', '101')`` gives the entry in row 101 and column 000 of ``circ.to_matrix()``.
+    """
+    if isinstance(g, Circuit): g = g.to_graph()
+    return _evaluate_scalar(_plug_basis_states(g, inputs_bits, outputs_bits), max_terms, max_memory)
+
+def amplitudes(g: Union[BaseGraph[VT,ET], Circuit],
+        bitstrings: Iterable[Tuple[BitString, BitString]],
+        max_terms: int = 2**12,
+        max_memory: int = 2**30) -> List[complex]:
+    """Batched version of :func:`amplitude`. ``bitstrings`` should be an iterable of
+    ``(inputs_bits, outputs_bits)`` pairs. The diagram is simplified with
+    :func:`~pyzx.simplify.full_reduce` once, and each amplitude then starts from this shared
+    reduced diagram, so that only the part touched by the basis states needs to be simplified again."""
+    if isinstance(g, Circuit): g = g.to_graph()
+    g = g.copy()
+    simplify.full_reduce(g)
+    return [_evaluate_scalar(_plug_basis_states(g, inp, outp), max_terms, max_memory)
+            for inp, outp in bitstrings]
+
+
+class EquivalenceResult(NamedTuple):
+    """Outcome of :func:`verify_equality_sampled`."""
+    equal: bool
+    """Whether the circuits were found to be equal (up to global phase, if requested)."""
+    confidence: Optional[float]
+    """1.0 when the outcome is certain: when ``method`` is ``'full_reduce'`` or a mismatch was found.
+    None when all samples agreed. A random product stabilizer state can catch a difference with a
+    probability that is exponentially small in the number of qubits (for instance a multi-controlled Z),
+    so no useful bound follows from the number of ``samples`` alone."""
+    method: str
+    """Either ``'full_reduce'`` when the composition reduced to the identity, or ``'sampling'``."""
+    samples: int
+    """The number of sampled product states that were evaluated."""
+    timings: Dict[str, float]
+    """Seconds spent in the ``'reduce'`` and ``'sampling'`` stages and in ``'total'``."""
+
+_STABILIZER_STATES = [(VertexType.X, Fraction(0)), (VertexType.X, Fraction(1)),
+                      (VertexType.Z, Fraction(0)), (VertexType.Z, Fraction(1,2)),
+                      (VertexType.Z, Fraction(1)), (VertexType.Z, Fraction(3,2))]
+
+def _plug_product_state(g: BaseGraph[VT,ET], state: List[Tuple[VertexType,Fraction]]) -> BaseGraph[VT,ET]:
+    """Returns ``<psi|g|psi>`` as a scalar diagram, where ``psi`` is the product state
+    described by ``state``, which lists the spider for every qubit."""
+    g = g.copy()
+    for v, w, (ty, phase) in zip(g.inputs(), g.outputs(), state):
+        g.set_type(v, ty)
+        g.set_phase(v, phase)
+        g.set_type(w, ty)
+        g.set_phase(w, -phase if ty == VertexType.Z else phase)
+        g.scalar.add_power(-2)
+    g.set_inputs(())
+    g.set_outputs(())
+    return g
+
+def _is_identity(g: BaseGraph[VT,ET]) -> bool:
+    return (g.num_vertices() == 2*g.num_inputs() and
+            all(g.edge_type(e) == EdgeType.SIMPLE for e in g.edges()) and
+            all(g.connected(v,w) for v,w in zip(g.inputs(),g.outputs())))
+
+def verify_equality_sampled(c1: Circuit,
+        c2: Circuit,
+        chunk_size: int = 100,
+        samples: int = 20,
+        up_to_global_phase: bool = True,
+        max_terms: int = 2**12,
+        max_memory: int = 2**30,
+        seed: Optional[int] = None) -> EquivalenceResult:
+    """Checks whether two circuits are equal without building their matrices.
+
+    The diagram of ``c1`` composed with the adjoint of ``c2`` is built from the middle out,
+    adding ``chunk_size`` gates of each circuit at a time and calling :func:`~pyzx.simplify.full_reduce`
+    after every chunk, so that the diagram stays small when the circuits are similar. If the final
+    diagram is the identity the circuits are equal. Otherwise ``samples`` random product stabilizer
+    states ``psi`` are drawn, and ``<psi|D|psi>`` is compared to the value of the first sample,
+    which for equal circuits is the global phase. The check stops at the first sample that disagrees.
+    A disagreement proves the circuits differ, but agreeing samples are only evidence that they are
+    equal, and some differences are rarely caught by product states.
+
+    Example::
+
+        res = verify_equality_sampled(c, optimized)
+        if not res.equal: print("Circuits differ, found after", res.samples, "samples")
+    """
+    import time
+    if c1.bits or c2.bits:
+        raise NotImplementedError("The equality verification does not support hybrid circuits.")
+    if c1.qubits != c2.qubits:
+        raise TypeError("Circuits have a different amount of qubits: {:d} vs {:d}".format(c1.qubits, c2.qubits))
+    rng = random.Random(seed)
+    timings = {'reduce': 0.0, 'sampling': 0.0, 'total': 0.0}
+    start = time.perf_counter()
+    n = c1.qubits
+    g = Circuit(n).to_graph()
+    chunks = max(len(c1.gates), len(c2.gates)) // chunk_size + 1
+    for i in range(chunks):
+        part1 = Circuit(n)
+        part1.gates = c1.gates[i*chunk_size:(i+1)*chunk_size]
+        part2 = Circuit(n)
+        part2.gates = c2.gates[i*chunk_size:(i+1)*chunk_size]
+        g.compose(part1.to_graph())
+        h = part2.adjoint().to_graph()
+        h.compose(g)
+        g = h
+        simplify.full_reduce(g)
+    timings['reduce'] = time.perf_counter() - start
+    if _is_identity(g) and (up_to_global_phase or g.scalar.phase == 0):
+        timings['total'] = timings['reduce']
+        return EquivalenceResult(True, 1.0, 'full_reduce', 0, timings)
+
+    t = time.perf_counter()
+    reference: Optional[complex] = None if up_to_global_phase else 1
+    equal = True
+    count = 0
+    for count in range(1, samples+1):
+        state = [rng.choice(_STABILIZER_STATES) for _ in range(n)]
+        val = _evaluate_scalar(_plug_product_state(g, state), max_terms, max_memory)
+        if reference is None:
+            reference = val
+            if not np.isclose(abs(val), 1):
+                equal = False
+                break
+        elif not np.isclose(val, reference):
+            equal = False
+            break
+    timings['sampling'] = time.perf_counter() - t
+    timings['total'] = time.perf_counter() - start
+    confidence = None if equal else 1.0
+    return EquivalenceResult(equal, confidence, 'sampling', count, timings)
+
+
 def replace_magic_states(g: BaseGraph[VT,ET], pick_random:Any=False) -> SumGraph:
     """This function takes in a ZX-diagram in graph-like form 
     (all spiders fused, only Z spiders, only H-edges between spiders),
@@ -21,12 +21,16 @@ and Poly is a sum of terms.
 Lark is used to define a parser that can translate a string into a Poly.
 """
 
-from typing import Any, Callable, Union, Optional, Dict, List, Tuple, Set
+from typing import Any, Callable, Union, Optional, Dict, List, Tuple, Set, Iterable
 from lark import Lark, Transformer
 from functools import reduce
+from itertools import chain
 from operator import add, mul
 from fractions import Fraction
 
+Coeff = Union[int, float, complex, Fraction]
+TermKey = Tuple[Tuple[str, int], ...]
+
 
 class VarRegistry:
     """Registry to track variable types (Boolean/continuous) for a specific graph"""
@@ -105,11 +109,29 @@ class Var:
 class Term:
     """Product of symbolic variables with associated integer exponents.
     Example: x^2 * y * z^3 is represented as Term([(x, 2), (y, 1), (z, 3)])
+
+    Terms are compared and hashed through their :attr:`key`, which is computed once
+    and interned, so that equal terms share the same key object.
     """
     vars: List[Tuple[Var, int]]
 
+    # Interned canonical keys of all the terms created so far.
+    # Only names and exponents are interned: the Var objects themselves are bound
+    # to the registry of a graph, and so can't be shared between terms.
+    _keys: Dict[TermKey, TermKey] = {}
+
     def __init__(self, vars: List[Tuple[Var,int]]) -> None:
         self.vars = vars
+        self._key: Optional[TermKey] = None
+        self._hash: Optional[int] = None
+
+    @property
+    def key(self) -> TermKey:
+        """The canonical form of the term: its (name, exponent) pairs sorted by name."""
+        if self._key is None:
+            key = tuple(sorted((v.name, c) for v, c in self.vars))
+            self._key = Term._keys.setdefault(key, key)
+        return self._key
 
     def free_vars(self) -> Set[Var]:
         return set(var for var, _ in self.vars)
@@ -130,6 +152,8 @@ class Term:
         Boolean variables are treated idempotently (x^2 = x), ensuring their
         exponent isreduced to 1 when multiplying.
         """
+        if not other.vars: return self
+        if not self.vars: return other
         vs = dict()
         for v, c in self.vars + other.vars:
             if v not in vs: vs[v] = c
@@ -140,10 +164,13 @@ class Term:
         return Term([(v, c) for v, c in vs.items()])
 
     def __hash__(self) -> int:
-        return hash(tuple(sorted(self.vars)))
+        if self._hash is None:
+            self._hash = hash(self.key)
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
-        return self.__hash__() == other.__hash__()
+        if not isinstance(other, Term): return False
+        return self.key is other.key or self.key == other.key
 
     def __lt__(self, other: 'Term') -> bool:
         """Compare terms lexicographically by variable name and exponent"""
@@ -191,11 +218,38 @@ class Poly:
 
     Example: 3*x^2*y + (1/2)*y*z + 5 is represented as
     Poly([(3, Term([(x,2),(y,1)])), (1/2, Term([(y,1),(z,1)])), (5, Term([]))])
+
+    Equality and hashing go through the canonical :attr:`key`, which is cached until
+    the terms are changed, so that polynomials can be used as dictionary keys.
+    Assign to :attr:`terms` (instead of mutating the list) to change a polynomial.
     """
-    terms: List[Tuple[Union[int, float, complex, Fraction], Term]]
 
-    def __init__(self, terms: List[Tuple[Union[int, float, complex, Fraction], Term]]) -> None:
-        self.terms = terms
+    def __init__(self, terms: List[Tuple[Coeff, Term]]) -> None:
+        self._terms = terms
+        self._key: Optional[Tuple[Tuple[TermKey, Coeff], ...]] = None
+        self._hash: Optional[int] = None
+
+    @property
+    def terms(self) -> List[Tuple[Coeff, Term]]:
+        return self._terms
+
+    @terms.setter
+    def terms(self, terms: List[Tuple[Coeff, Term]]) -> None:
+        self._terms = terms
+        self._key = None
+        self._hash = None
+
+    @property
+    def key(self) -> Tuple[Tuple[TermKey, Coeff], ...]:
+        """The canonical form of the polynomial: the coefficients of equal terms summed,
+        zero coefficients dropped, and sorted by the term keys."""
+        if self._key is None:
+            coeffs: Dict[TermKey, Coeff] = {}
+            for c, t in self._terms:
+                k = t.key
+                coeffs[k] = coeffs[k] + c if k in coeffs else c
+            self._key = tuple(sorted((k, c) for k, c in coeffs.items() if c != 0))
+        return self._key
 
     def free_vars(self) -> Set[Var]:
         output = set()
@@ -204,24 +258,16 @@ class Poly:
         return output
 
     def __add__(self, other: Union['Poly', Fraction, int, float, complex]) -> 'Poly':
-        if isinstance(other, (int, float, complex, Fraction)):
-            other = Poly([(other, Term([]))])
-        counter = dict()
-        for c, t in self.terms + other.terms:
-            if t not in counter: counter[t] = c
-            else: counter[t] += c
-            counter_t = counter[t] # need to assign to variable to avoid type errors
-            if not isinstance(counter_t, complex) and len(t.vars) > 0 and all(tt[0].is_bool for tt in t.vars):
-                counter[t] = counter_t % 2
-
-        # remove terms with coefficient 0
-        for t in list(counter.keys()):
-            if counter[t] == 0:
-                del counter[t]
-        return Poly([(c, t) for t, c in counter.items()])
+        return Poly(_merge_terms(chain(self._terms, _as_terms(other))))
 
     __radd__ = __add__
 
+    def add_inplace(self, other: Union['Poly', Fraction, int, float, complex]) -> 'Poly':
+        """Adds ``other`` to this polynomial in place and returns it.
+        Only use this on polynomials that are not shared, e.g. the result of an earlier addition."""
+        self.terms = _merge_terms(chain(self._terms, _as_terms(other)))
+        return self
+
     def __neg__(self) -> 'Poly':
         return Poly([(-c, t) for c, t in self.terms])
 
@@ -232,13 +278,8 @@ class Poly:
         return other + (-self)
 
     def __mul__(self, other: Union['Poly', Fraction, int, float, complex]) -> 'Poly':
-        if isinstance(other, (int, float, complex, Fraction)):
-            other = Poly([(other, Term([]))])
-        p = Poly([])
-        for c1, t1 in self.terms:
-            for c2, t2 in other.terms:
-                p += Poly([(c1 * c2, t1 * t2)])
-        return p
+        other_terms = _as_terms(other)
+        return Poly(_merge_terms((c1 * c2, t1 * t2) for c1, t1 in self._terms for c2, t2 in other_terms))
 
     __rmul__ = __mul__
 
@@ -247,16 +288,16 @@ class Poly:
             other = Poly([(other, Term([]))])
         if len(other.terms) == 0:
             raise ZeroDivisionError("division by zero")
-        quotient = Poly([])
+        quotient_terms: List[Tuple[Coeff, Term]] = []
         while len(self.terms) > 0 and self.degree >= other.degree:
             leading_term_dividend = sorted(self.terms)[0][1]
             leading_term_divisor = sorted(other.terms)[0][1]
             coeff = sorted(self.terms)[0][0] / sorted(other.terms)[0][0]
             new_term_quotient_vars = [(var, exp - dict(leading_term_divisor.vars).get(var, 0)) for var, exp in leading_term_dividend.vars]
             new_term_quotient = (coeff, Term(new_term_quotient_vars))
-            quotient.terms.append(new_term_quotient)
+            quotient_terms.append(new_term_quotient)
             self -= other * Poly([new_term_quotient])
-        return quotient
+        return Poly(quotient_terms)
 
     def __pow__(self, other: int) -> 'Poly':
         if other < 0:
@@ -268,13 +309,12 @@ class Poly:
         return self * (self ** (other - 1))
 
     def __mod__(self, other: int) -> 'Poly':
-        new_terms = []
-        for c, t in self.terms:
-            if isinstance(c, complex) or not t.is_bool:
-                new_terms.append((c, t))
-            else:
-                new_terms.append((c % other, t))
-        return Poly(new_terms)
+        return Poly(_mod_terms(self._terms, other))
+
+    def mod_inplace(self, other: int) -> 'Poly':
+        """In-place version of ``self % other``, which returns this polynomial."""
+        self.terms = _mod_terms(self._terms, other)
+        return self
 
     def __repr__(self) -> str:
         return f'Poly({str(self)})'
@@ -282,7 +322,7 @@ class Poly:
     def __str__(self) -> str:
         ts = []
         for c, t in self.terms:
-            if t == Term([]):
+            if not t.vars:
                 ts.append(f'{c}')
             elif c == 1:
                 ts.append(f'{t}')
@@ -291,13 +331,13 @@ class Poly:
         return ' + '.join(ts)
 
     def __eq__(self, other: object) -> bool:
+        if isinstance(other, Poly):
+            if self is other: return True
+            return hash(self) == hash(other) and self.key == other.key
         if isinstance(other, (int, float, Fraction)):
-            if other == 0:
-                other = Poly([])
-            else:
-                other = Poly([(other, Term([]))])
-        if not isinstance(other, Poly): return False
-        return set(self.terms) == set(other.terms)
+            if other == 0: return not self.key
+            return self.key == (((), other),)
+        return False
 
     def __lt__(self, other: Union['Poly', Fraction, int, float, complex]) -> bool:
         if isinstance(other, (int, float, complex, Fraction)):
@@ -320,7 +360,9 @@ class Poly:
         return not self < other
 
     def __hash__(self) -> int:
-        return hash(tuple(sorted(self.terms)))
+        if self._hash is None:
+            self._hash = hash(self.key)
+        return self._hash
 
     @property
     def degree(self) -> int:
@@ -390,11 +432,32 @@ class Poly:
 
     def substitute(self, var_map: Dict[Var, Union[float, complex, 'Fraction']]) -> 'Poly':
         """Partially evaluate the polynomial with the provided variable values."""
-        p = Poly([])
+        substituted = []
         for c, t in self.terms:
             coeff, term = t.substitute(var_map)
-            p += Poly([(c * coeff, term)])
-        return p
+            substituted.append((c * coeff, term))
+        return Poly(_merge_terms(substituted))
+
+_one_term = Term([])
+
+def _as_terms(p: Union[Poly, Fraction, int, float, complex]) -> List[Tuple[Coeff, Term]]:
+    if isinstance(p, (int, float, complex, Fraction)):
+        return [(p, _one_term)]
+    return p.terms
+
+def _merge_terms(terms: Iterable[Tuple[Coeff, Term]]) -> List[Tuple[Coeff, Term]]:
+    """Sums the coefficients of equal terms in a single pass, reducing those of
+    Boolean terms modulo 2 and dropping the zero coefficients."""
+    counter: Dict[Term, Coeff] = dict()
+    for c, t in terms:
+        if t in counter: c = counter[t] + c
+        if not isinstance(c, complex) and t.vars and all(v.is_bool for v, _ in t.vars):
+            c = c % 2
+        counter[t] = c
+    return [(c, t) for t, c in counter.items() if c != 0]
+
+def _mod_terms(terms: List[Tuple[Coeff, Term]], n: int) -> List[Tuple[Coeff, Term]]:
+    return [(c, t) if isinstance(c, complex) or not t.is_bool else (c % n, t) for c, t in terms]
 
 def new_var(name: str, is_bool: bool, registry: Optional[VarRegistry] = None) -> Poly:
     """Create a polynomial consisting of a single symbolic variable."""
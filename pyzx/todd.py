@@ -28,6 +28,8 @@ import subprocess
 import tempfile
 import time
 import random
+from collections import Counter
+from itertools import combinations
 from typing import Optional, Dict, Tuple, List, Set, Iterable, cast
 
 import numpy as np
@@ -42,6 +44,9 @@ from .symbolic import Poly
 
 USE_REED_MULLER: bool = False
 
+# Implementations of the TODD inner loop that can be selected in :func:`todd_iter`
+TODD_METHODS = ('bitset', 'mat2')
+
 
 class ParityPolynomial(object):
     """Class used to represent phase polynomials in the standard
@@ -316,9 +321,149 @@ def do_todd_single(m: Mat2) -> Tuple[Mat2,int]:
                 
     return m.transpose(), startcols - newcols
 
-def todd_iter(m: Mat2, quiet:bool=True) -> Mat2:
+class _Z2Basis(object):
+    """Row-echelon basis over Z2 with the rows stored as bitsets, indexed by their lowest bit,
+    which is their pivot. Adding a vector to it hence never touches the existing rows."""
+    def __init__(self) -> None:
+        self.rows: Dict[int,int] = {}
+        self.pivots = 0
+
+    def copy(self) -> '_Z2Basis':
+        b = _Z2Basis()
+        b.rows = self.rows.copy()
+        b.pivots = self.pivots
+        return b
+
+    def reduce(self, v: int) -> int:
+        """Returns the unique representative of ``v`` modulo the basis without pivot bits."""
+        rows, pivots = self.rows, self.pivots
+        w = v & pivots
+        while w:
+            v ^= rows[w & -w] # Only changes bits higher than the pivot
+            w = v & pivots
+        return v
+
+    def extend(self, vs: Iterable[int], full_rank: int) -> None:
+        """Adds the vectors to the basis, stopping once it has ``full_rank`` elements."""
+        for v in vs:
+            v = self.reduce(v)
+            if not v: continue
+            p = v & -v
+            self.rows[p] = v
+            self.pivots |= p
+            if len(self.rows) == full_rank: break
+
+    def nullspace_vector(self, t: int) -> int:
+        """Returns a vector ``y`` orthogonal to all the rows with ``y.t = 1``.
+        Requires that ``t`` is not in the span of the basis."""
+        # Back substitution to make every row contain only its own pivot bit
+        full: Dict[int,int] = {}
+        for p in sorted(self.rows, reverse=True):
+            r = self.rows[p]
+            w = r & self.pivots & ~p
+            while w:
+                q = w & -w
+                r ^= full[q]
+                w ^= q
+            full[p] = r
+        # For the nullspace vector y of a free column f we have y.t = reduce(t)[f]
+        f = self.reduce(t)
+        f &= -f
+        y = f
+        for p, r in full.items():
+            if r & f: y |= p
+        return y
+
+def _chi_span(prods: Dict[Tuple[int,int],int], z: int, rows: int) -> Iterable[int]:
+    """Generates the row space of the triples part of \\chi for the bitset ``z``.
+    Instead of all the triples it only yields a spanning set of at most ``(rows-1)(rows-2)/2``
+    vectors, writing S for the support of ``z``, s0 for its first element and U for its complement:
+    the products of pairs in U, the sums ``p(s0,u) + p(s,u)`` for s in S,
+    and the triples of S containing s0 (the sum of three of those is any other triple of S)."""
+    s_rows = [i for i in range(rows) if z >> i & 1]
+    if not s_rows: return
+    u_rows = [i for i in range(rows) if not z >> i & 1]
+    s0, rest = s_rows[0], s_rows[1:]
+    for u, v in combinations(u_rows, 2):
+        yield prods[(u,v)]
+    for u in u_rows:
+        p0 = prods[(s0,u)]
+        for t in rest:
+            yield p0 ^ prods[(t,u)]
+    for t1, t2 in combinations(rest, 2):
+        yield prods[(s0,t1)] ^ prods[(s0,t2)] ^ prods[(t1,t2)]
+
+def find_todd_match_bits(cols: List[int], rows: int) -> Optional[Tuple[int,int,int,int]]:
+    """Bit-packed version of :func:`find_todd_match`. The parity matrix is given as a list
+    of columns, each a bitset over the ``rows``.
+
+    The \\chi matrix of a pair of columns only depends on their difference ``z``,
+    and pairs ``a,b`` with a solution are exactly those for which ``e_a + e_b`` is not
+    in the row space of \\chi. Hence \\chi is only row reduced once for every
+    distinct ``z`` (see :func:`_chi_span`), after which every pair costs a single
+    reduction of ``e_a + e_b``.
+
+    Returns:
+        ``(a, b, z, y)`` for the first match with ``z`` a bitset over the rows and
+        ``y`` a bitset over the columns, or None if there is no match.
+    """
+    ncols = len(cols)
+    row_bits = [0]*rows
+    for j, c in enumerate(cols):
+        for i in range(rows):
+            if c >> i & 1: row_bits[i] |= 1 << j
+    # The rows of \chi are sums of pairwise products of rows, which are ANDs of bitsets
+    prods = {(i,j): row_bits[i] & row_bits[j] for i in range(rows) for j in range(rows)}
+    common = _Z2Basis() # The original rows are part of every \chi
+    common.extend(row_bits, ncols)
+    bases: Dict[int, _Z2Basis] = {}
+    for a in range(ncols):
+        for b in range(a+1, ncols):
+            z = cols[a] ^ cols[b]
+            basis = bases.get(z)
+            if basis is None:
+                basis = bases[z] = common.copy()
+                basis.extend(_chi_span(prods, z, rows), ncols)
+            if len(basis.rows) == ncols: continue # The nullspace of \chi is trivial
+            t = (1 << a) | (1 << b)
+            if basis.reduce(t):
+                return a, b, z, basis.nullspace_vector(t)
+    return None
+
+def _remove_trivial_cols_bits(cols: List[int]) -> List[int]:
+    """Bit-packed version of :func:`remove_trivial_cols`."""
+    counts = Counter(cols)
+    last = {c: j for j, c in enumerate(cols)}
+    return [c for j, c in enumerate(cols) if c and counts[c] % 2 and last[c] == j]
+
+def todd_iter_bits(m: Mat2, quiet:bool=True) -> Mat2:
+    """Bit-packed version of the loop in :func:`todd_iter` using :func:`find_todd_match_bits`.
+    Stops as soon as no match is found anymore."""
+    rows = m.rows()
+    cols = [sum(1 << i for i, v in enumerate(col) if v) for col in m.transpose().data]
+    while True:
+        match = find_todd_match_bits(cols, rows)
+        if match is None:
+            if not quiet: print()
+            break
+        a, b, z, y = match
+        startcols = len(cols)
+        cols = [c ^ z if y >> j & 1 else c for j, c in enumerate(cols)]
+        if bin(y).count('1') % 2 == 1:
+            cols.append(z)
+        cols.pop(b)
+        cols.pop(a)
+        cols = _remove_trivial_cols_bits(cols)
+        if not quiet: print(startcols - len(cols), end='.')
+    return Mat2([[cast(Z2, c >> i & 1) for c in cols] for i in range(rows)])
+
+def todd_iter(m: Mat2, quiet:bool=True, method:str='bitset') -> Mat2:
     """Keep finding TODD matches until nothing is found anymore.
-    If ``zx.settings.topt_command`` is set it uses the TOpt implementation of TODD."""
+    If ``zx.settings.topt_command`` is set it uses the TOpt implementation of TODD.
+    Otherwise ``method`` selects the implementation of the inner loop: either ``'bitset'``
+    (:func:`todd_iter_bits`) or ``'mat2'`` (:func:`do_todd_single`), which is much slower."""
+    if method not in TODD_METHODS:
+        raise ValueError("Unknown TODD method {}. Options are {}".format(method, ", ".join(TODD_METHODS)))
     m = m.transpose()
     remove_trivial_cols(m)
     random.shuffle(m.data) # Randomly shuffle the columns
@@ -327,6 +472,8 @@ def todd_iter(m: Mat2, quiet:bool=True) -> Mat2:
         return m
     if settings.topt_command is not None:
         return call_topt(m, quiet=quiet)
+    if method == 'bitset':
+        return todd_iter_bits(m, quiet=quiet)
     while True:
         m, reduced = do_todd_single(m)
         if reduced == 0:
@@ -383,16 +530,17 @@ def call_topt(m: Mat2, quiet:bool=True) -> Mat2:
     return m2
 
 
-def todd_simp(gates: List[Gate], qubits: int, quiet:bool=True) -> Tuple[List[Gate],Dict[int,int]]:
+def todd_simp(gates: List[Gate], qubits: int, quiet:bool=True, method:str='bitset') -> Tuple[List[Gate],Dict[int,int]]:
     """Run the TODD algorithm on a CNOT+CZ+T set of gates and 
     apply the necessary Clifford corrections. Uses the 
     CNOT parity algorithm from https://arxiv.org/pdf/1712.01859.pdf
-    to synthesize the necessary parities."""
+    to synthesize the necessary parities.
+    ``method`` selects the implementation of TODD, see :func:`todd_iter`."""
     phase_poly, parity_polys = phase_gates_to_poly(gates, qubits)
     #print(phase_poly)
     #print(parity_polys)
     m = phase_poly.to_par_matrix()
-    m2 = todd_iter(m,quiet=quiet)
+    m2 = todd_iter(m,quiet=quiet,method=method)
 
     newgates: List[Gate] = []
     parities = []
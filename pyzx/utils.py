@@ -240,6 +240,8 @@ class Settings(object):  # namespace class
     show_labels: bool = False
     tikz_classes: Dict[str, str] = tikz_classes
     default_qasm_version: int = 2
+    match_processes: int = 1  # Processes used to find the matches of the automatic rewrites, 0 for all cores
+    parallel_match_threshold: int = 20000  # Smallest number of vertices for which matching is done in parallel
     colors: Dict[str, str] = original_colors
     javascript_importmap: Dict[str, Any] = {
         "imports": {
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark the throughput of the QASM parser on the largest files in ``circuits/``.
+
+Usage:
+
+    python scripts/bench_qasm_parser.py [--top=N] [--repeat=R] [dir ...]
+
+For every file, the best time of R parses is reported together with the parsed
+gates and bytes per second. A synthetic source with many custom ``gate``
+definitions and ``if`` blocks is included, as those used to be parsed in
+quadratic time.
+"""
+
+import glob
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pyzx.circuit.qasmparser import qasm  # noqa: E402
+
+DEFAULT_DIRS = ["circuits/qasm", "circuits/Fast", "circuits/Slow"]
+
+
+def synthetic_source(n: int = 3000) -> str:
+    src = ['OPENQASM 2.0;', 'include "qelib1.inc";']
+    src += ['gate g%d a,b { cx a,b; h b; t a; }' % i for i in range(n)]
+    src += ['qreg q[4];', 'creg c[1];']
+    src += ['g%d q[%d],q[%d];' % (i, i % 3, i % 3 + 1) for i in range(n)]
+    src += ['if (c==1) { x q[0]; z q[1]; }' for _ in range(n)]
+    return "\n".join(src)
+
+
+def bench(source: str, repeat: int) -> Tuple[float, int]:
+    best = float("inf")
+    n_gates = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        c = qasm(source)
+        best = min(best, time.perf_counter() - start)
+        n_gates = len(c.gates)
+    return best, n_gates
+
+
+def main(argv: List[str]) -> int:
+    top, repeat = 5, 3
+    dirs = []
+    for arg in argv:
+        if arg.startswith("--top="):
+            top = int(arg.split("=", 1)[1])
+        elif arg.startswith("--repeat="):
+            repeat = int(arg.split("=", 1)[1])
+        else:
+            dirs.append(arg)
+    files = [f for d in (dirs or DEFAULT_DIRS) for f in glob.glob(os.path.join(d, "*.qasm"))]
+    files = sorted(files, key=os.path.getsize, reverse=True)[:top]
+
+    sources = [(os.path.basename(f), open(f).read()) for f in files]
+    sources.append(("<synthetic gate/if>", synthetic_source()))
+    print("file".ljust(24) + "gates".rjust(9) + "time (s)".rjust(10) + "gates/s".rjust(11) + "MB/s".rjust(8))
+    for name, source in sources:
+        t, n_gates = bench(source, repeat)
+        print(name.ljust(24) + str(n_gates).rjust(9) + "{:.3f}".format(t).rjust(10)
+              + "{:.0f}".format(n_gates / t).rjust(11) + "{:.2f}".format(len(source) / t / 1e6).rjust(8))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
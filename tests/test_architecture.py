@@ -0,0 +1,50 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+from pyzx.routing.architecture import create_architecture, LINE
+
+
+class TestSteinerTree(unittest.TestCase):
+
+    def setUp(self):
+        self.arch = create_architecture(LINE, n_qubits=5)
+        self.v = [self.arch.qubit2vertex(q) for q in range(5)]
+
+    def test_connected_terminals(self):
+        all_pairs = self.arch.all_pairs(self.v)
+        added, steiner_pnts, edges = self.arch._approximate_steiner_tree(self.v[0], [self.v[2], self.v[4]], all_pairs)
+        self.assertEqual(sorted(added), sorted([self.v[2], self.v[4]]))
+        self.assertEqual(sorted(steiner_pnts), sorted([self.v[1], self.v[3]]))
+        self.assertEqual(len(edges), 4)
+
+    def test_unreachable_terminal_raises(self):
+        # Without the middle qubit, the line falls apart into two pieces
+        subgraph = [v for v in self.v if v != self.v[2]]
+        all_pairs = self.arch.all_pairs(subgraph)
+        with self.assertRaises(ValueError):
+            self.arch._approximate_steiner_tree(self.v[0], [self.v[1], self.v[3]], all_pairs)
+        with self.assertRaises(ValueError):
+            self.arch._approximate_steiner_tree(self.v[0], [self.v[1], self.v[3], self.v[4]], all_pairs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,7 @@ from pyzx.routing.cnot_mapper import (
     gauss,
     ElimMode,
     FitnessFunction,
+    StepFunction,
     sequential_gauss,
 )
 from pyzx.routing.architecture import (
@@ -40,11 +41,12 @@ from pyzx.routing.architecture import (
     hamiltonian_path_architectures,
     create_architecture,
     SQUARE,
+    LINE,
     FULLY_CONNECTED,
     IBMQ_SINGAPORE,
 )
 from pyzx.routing.parity_maps import CNOT_tracker
-from pyzx.routing.machine_learning import GeneticAlgorithm
+from pyzx.routing.machine_learning import FitnessCache, GeneticAlgorithm, ParticleSwarmOptimization
 from pyzx.circuit import CNOT
 from pyzx.extract import permutation_as_swaps
 from pyzx.generate import build_random_parity_map
@@ -278,6 +280,49 @@ class TestSteiner(unittest.TestCase):
                     self.matrix[i], best_permutation, best_permutation
                 )
 
+    def test_genetic_optimization_cache_and_threads(self):
+        fitness = FitnessFunction(CostMetric.COUNT, self.matrix[0], ElimMode.STEINER_MODE, self.arch)
+        populations = []
+        for n_threads in [1, 2]:
+            np.random.seed(SEED)
+            optimizer = GeneticAlgorithm(6, 0.8, 0.2, fitness, n_threads=n_threads)
+            optimizer.find_optimum(self.n_qubits, 4)
+            populations.append([(list(c), f) for c, f in optimizer.population])
+            self.assertGreater(optimizer.cache.hits, 0)
+            for c, f in optimizer.population:
+                self.assertEqual(f, fitness(c))
+        self.assertEqual(populations[0], populations[1])
+
+    def test_genetic_optimization_shared_cache(self):
+        other = Mat2(build_random_parity_map(self.n_qubits, 16, CNOT_tracker(self.n_qubits)))
+        cache = FitnessCache()
+        for matrix in [self.matrix[0], other]:
+            fitness = FitnessFunction(CostMetric.COUNT, matrix, ElimMode.STEINER_MODE, self.arch)
+            optimizer = GeneticAlgorithm(6, 0.8, 0.2, fitness, cache=cache)
+            optimizer.find_optimum(self.n_qubits, 2)
+            # The evaluations of the other matrix are never used
+            for c, f in optimizer.population:
+                self.assertEqual(f, fitness(c))
+
+    def test_fitness_cache_shared_between_architectures(self):
+        cache = FitnessCache()
+        for arch in [self.arch, create_architecture(LINE, n_qubits=self.n_qubits)]:
+            fitness = FitnessFunction(CostMetric.COUNT, self.matrix[0], ElimMode.STEINER_MODE, arch)
+            # Both runs evaluate the same permutations
+            np.random.seed(SEED)
+            optimizer = GeneticAlgorithm(6, 0.8, 0.2, fitness, cache=cache)
+            optimizer.find_optimum(self.n_qubits, 2)
+            for c, f in optimizer.population:
+                self.assertEqual(f, fitness(c))
+
+    def test_pso_shares_fitness_cache(self):
+        matrices = [self.matrix[0].copy()]
+        step_func = StepFunction(matrices, ElimMode.GENETIC_STEINER_MODE, self.arch, None, population_size=4, n_iterations=1)
+        optimizer = ParticleSwarmOptimization(3, step_func, 0.4, 0.3, 0.2, n_threads=1)
+        optimizer.find_optimum(self.n_qubits, 3)
+        self.assertGreater(len(step_func.cache), 0)
+        self.assertGreater(step_func.cache.hits, 0)
+
     def test_pso_optimization(self):
         modes = [
             ElimMode.STEINER_MODE,
@@ -362,6 +407,20 @@ class TestSteiner(unittest.TestCase):
                                         circuits[i].cnot_depth(), c.cnot_depth()
                                     )
 
+    def test_cached_shortest_paths(self):
+        arch = create_architecture(SQUARE, n_qubits=16)
+        distances = arch.floyd_warshall(arch.vertices, upper=True)
+        for (v0, v1), (dist, path) in distances.items():
+            self.assertEqual(len(path), dist)
+            path_vs = arch.shortest_path(arch.vertex2qubit(v0), arch.vertex2qubit(v1))
+            self.assertEqual(len(path_vs) - 1, dist)
+            for e in zip(path_vs, path_vs[1:]):
+                self.assertTrue(arch.graph.connected(*e))
+        # Repeated trees are served from the cache and are identical
+        tree = list(arch.steiner_tree(0, [3, 5, 12], upper=True))
+        self.assertEqual(tree, list(arch.steiner_tree(0, [3, 5, 12], upper=True)))
+        self.assertEqual(len(arch._steiner_cache), 1)
+
     @unittest.skip("This test fails because the steiner_gauss tries to find a steiner tree in a disconnected subgraph of the architecture")
     def test_small_steiner_gauss(self):
         """
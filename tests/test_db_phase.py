@@ -0,0 +1,93 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import re
+import unittest
+import unittest.mock
+import sys
+from fractions import Fraction
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+
+from pyzx.graph.db_phase import (LEGACY_PHASES_QUERY, SET_PHASES_QUERY, cypher_phase_const, decode_node_phase,
+                                 decode_phase, encode_phase, migrate_legacy_phases)
+from pyzx.graph.memgraph_queries import ZXQueryStore
+from pyzx.symbolic import new_var, parse
+
+
+class TestDBPhase(unittest.TestCase):
+
+    def test_round_trip(self):
+        for phase, n, d in [(None, 0, 1), (0, 0, 1), (4, 0, 1), (Fraction(-1, 2), 3, 2),
+                            (Fraction(7, 4), 7, 4), (0.25, 1, 4), (Fraction(1, 3), 1, 3)]:
+            props = encode_phase(phase)
+            self.assertEqual((props["phase_n"], props["phase_d"], props["phase_sym"]), (n, d, None))
+            self.assertEqual(decode_node_phase(props), Fraction(n, d))
+            self.assertIsInstance(props["phase_n"], int)
+
+    def test_symbolic(self):
+        phase = parse("a + 1/2", lambda x: new_var(x, False))
+        props = encode_phase(phase)
+        self.assertEqual((props["phase_n"], props["phase_d"]), (0, 1))
+        self.assertEqual(decode_node_phase(props), phase)
+
+    def test_legacy_phase_property(self):
+        self.assertEqual(decode_phase(None, None, legacy="1/2"), Fraction(1, 2))
+        self.assertEqual(decode_phase(None, None, legacy=0.75), Fraction(3, 4))
+        self.assertEqual(decode_phase(None, None), 0)
+        # The exact encoding takes precedence
+        self.assertEqual(decode_phase(1, 4, legacy="1/2"), Fraction(1, 4))
+
+    def test_migrate_legacy_phases(self):
+        class Session:
+            def __init__(self, nodes):
+                self.nodes = nodes
+
+            def run(self, query, params):
+                self.test.assertEqual(params["graph_id"], "g")
+                if query == LEGACY_PHASES_QUERY:
+                    return [{"id": v, "phase": p["phase"]} for v, p in self.nodes.items()
+                            if "phase" in p and "phase_n" not in p]
+                self.test.assertEqual(query, SET_PHASES_QUERY)
+                for row in params["rows"]:
+                    props = self.nodes[row["id"]]
+                    del props["phase"]
+                    props.update(phase_n=row["phase_n"], phase_d=row["phase_d"], phase_sym=row["phase_sym"])
+                return unittest.mock.Mock()
+
+        nodes = {0: {"phase": "1/4"}, 1: {"phase": 1.5}, 2: {"phase": "a"}, 3: encode_phase(Fraction(1, 2))}
+        session = Session(nodes)
+        session.test = self
+        self.assertEqual(migrate_legacy_phases(session, "g"), 3)
+        self.assertEqual((nodes[0]["phase_n"], nodes[0]["phase_d"]), (1, 4))
+        self.assertEqual((nodes[1]["phase_n"], nodes[1]["phase_d"]), (3, 2))
+        self.assertEqual(nodes[2]["phase_sym"], "a")
+        self.assertEqual(decode_node_phase(nodes[3]), Fraction(1, 2))
+        # Nothing is left to convert
+        self.assertEqual(migrate_legacy_phases(session, "g"), 0)
+
+    def test_queries_use_exact_phases(self):
+        self.assertEqual(cypher_phase_const(-1), "[1, 1]")
+        store = ZXQueryStore()
+        for rule in store.list_rules():
+            query = re.sub(r"//.*", "", store.get(rule))
+            self.assertNotRegex(query, r"\.phase\b|phase:|toFloat\(")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+import sys
+from unittest import mock
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+
+from pyzx.graph.graph_db_rewrite_runner import BatchSizeTuner, is_resource_error, is_transient_error
+from pyzx.graph.memgraph_queries import ZXQueryStore
+from pyzx import memgraph_simplify
+from pyzx.memgraph_simplify import GraphReduceError, Stats, reduce_graphs
+
+
+class DatabaseError(Exception):
+    """An error with the status code of a database error, like those of the neo4j driver."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class TestBatchSizeTuner(unittest.TestCase):
+
+    def test_batched_queries_take_batch_size(self):
+        store = ZXQueryStore()
+        for rule in store.list_rules():
+            self.assertEqual("$batch_size" in store.get(rule), store.default_batch_size(rule) is not None)
+
+    def test_grows_while_throughput_improves(self):
+        tuner = BatchSizeTuner()
+        rule = "spider_fusion_rewrite"
+        self.assertEqual(tuner.size(rule), 100)
+        tuner.observe(rule, 100, 100, 1.0)
+        self.assertEqual(tuner.size(rule), 200)
+        tuner.observe(rule, 200, 200, 1.0)
+        self.assertEqual(tuner.size(rule), 400)
+        # Slower per rewrite: back to the previous size, and stay there
+        tuner.observe(rule, 400, 400, 4.0)
+        self.assertEqual(tuner.size(rule), 200)
+        tuner.observe(rule, 200, 200, 0.5)
+        self.assertEqual(tuner.size(rule), 200)
+
+    def test_batch_not_full(self):
+        tuner = BatchSizeTuner()
+        tuner.observe("bialgebra_hadamard", 10, 3, 0.001)
+        self.assertEqual(tuner.size("bialgebra_hadamard"), 10)
+
+    def test_shrinks_on_resource_errors(self):
+        tuner = BatchSizeTuner(min_size=25)
+        sizes = []
+        def execute(size):
+            sizes.append(size)
+            if size > 30:
+                raise DatabaseError("Memgraph.TransientError.MemgraphError.MemgraphError", "Memory limit exceeded!")
+            return size
+        self.assertEqual(tuner.run("hadamard_edge_cancellation", execute), 25)
+        self.assertEqual(sizes, [100, 50, 25])
+        self.assertEqual(tuner.sizes(), {"hadamard_edge_cancellation": 25})
+
+        def fail(size):
+            raise TimeoutError()
+        self.assertRaises(TimeoutError, tuner.run, "hadamard_edge_cancellation", fail)
+        self.assertTrue(is_resource_error(DatabaseError("Neo.TransientError.General.MemoryPoolOutOfMemoryError", "")))
+        self.assertFalse(is_resource_error(ValueError("Unknown rewrite rule")))
+        self.assertFalse(is_resource_error(ValueError("Not enough memory in this matrix")))
+
+    def test_grows_again_after_shrinking(self):
+        tuner = BatchSizeTuner(retry_after=3)
+        rule = "spider_fusion_rewrite"
+        self.assertTrue(tuner.shrink(rule))
+        self.assertEqual(tuner.size(rule), 50)
+        for _ in range(2):
+            tuner.observe(rule, 50, 50, 1.0)
+        self.assertEqual(tuner.size(rule), 50)
+        tuner.observe(rule, 50, 50, 1.0)
+        self.assertEqual(tuner.size(rule), 100)
+        # The larger batch was not faster: back to the ceiling, until the next retry
+        tuner.observe(rule, 100, 100, 4.0)
+        self.assertEqual(tuner.size(rule), 50)
+        for _ in range(3):
+            tuner.observe(rule, 50, 50, 1.0)
+        self.assertEqual(tuner.size(rule), 100)
+
+
+class TestReduceGraphs(unittest.TestCase):
+
+    def test_full_reduce_is_resumed(self):
+        def full_reduce(session_factory, graph_id, quiet, stats):
+            stats.count_rewrites("spider_simp", 2)
+            raise DatabaseError("Memgraph.TransientError.MemgraphError.MemgraphError",
+                                "Cannot resolve conflicting transactions")
+
+        def resume(session_factory, graph_id, quiet, stats):
+            # The rewrites logged before the failure, and those done after it
+            stats.count_rewrites("spider_simp", 3)
+
+        with mock.patch.object(memgraph_simplify, "full_reduce_db", side_effect=full_reduce) as full, \
+             mock.patch.object(memgraph_simplify, "resume_full_reduce_db", side_effect=resume) as resumed:
+            results = reduce_graphs(None, ["g"], retry_delay=0)
+        self.assertEqual(full.call_count, 1)
+        self.assertEqual(resumed.call_count, 1)
+        self.assertEqual(results["g"].num_rewrites, {"spider_simp": 3})
+
+    def test_reduce_graphs(self):
+        attempts = {}
+        def reducer(session_factory, graph_id, quiet, stats):
+            attempts[graph_id] = attempts.get(graph_id, 0) + 1
+            if graph_id == "conflict" and attempts[graph_id] == 1:
+                raise DatabaseError("Memgraph.TransientError.MemgraphError.MemgraphError",
+                                    "Cannot resolve conflicting transactions")
+            if graph_id == "broken":
+                raise ValueError("Unknown rewrite rule")
+            stats.count_rewrites("spider_fusion", len(graph_id))
+
+        events = []
+        total = Stats()
+        graph_ids = ["a", "bb", "conflict", "a"]
+        results = reduce_graphs(None, graph_ids, max_workers=3, retry_delay=0, stats=total,
+                                progress=lambda g, status, st: events.append((g, status)), reducer=reducer)
+        self.assertEqual(list(results), ["a", "bb", "conflict"])
+        self.assertEqual(results["conflict"].num_rewrites, {"spider_fusion": 8})
+        self.assertEqual(total.num_rewrites, {"spider_fusion": 11})
+        self.assertEqual(attempts, {"a": 1, "bb": 1, "conflict": 2})
+        self.assertIn(("conflict", "retrying"), events)
+        self.assertEqual(sum(1 for _, status in events if status == "done"), 3)
+
+        with self.assertRaises(GraphReduceError) as cm:
+            reduce_graphs(None, ["a", "broken"], retry_delay=0, reducer=reducer)
+        self.assertEqual(list(cm.exception.errors), ["broken"])
+        self.assertEqual(list(cm.exception.results), ["a"])
+        self.assertEqual(attempts["broken"], 1)
+        self.assertTrue(is_transient_error(DatabaseError("Neo.TransientError.Transaction.DeadlockDetected", "")))
+        self.assertTrue(is_transient_error(ConnectionResetError()))
+        self.assertFalse(is_transient_error(DatabaseError("Neo.ClientError.Statement.SyntaxError", "")))
+        self.assertFalse(is_transient_error(ValueError("Unknown rewrite rule")))
+
+        class TransientError(Exception):
+            pass
+        # Only the status code counts, not the name of the exception
+        self.assertFalse(is_transient_error(TransientError("Cannot resolve conflicting transactions")))
+
+
+if __name__ == '__main__':
+    unittest.main()
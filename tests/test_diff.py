@@ -0,0 +1,90 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import copy
+import random
+import unittest
+import sys
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+
+from pyzx.generate import cliffordT
+from pyzx.graph.diff import GraphDiff
+from pyzx.simplify import full_reduce, spider_simp, to_gh
+
+
+def _normalised(d):
+    return (sorted(d.removed_verts), sorted(d.new_verts), sorted(d.removed_edges), sorted(d.new_edges),
+            d.changed_vertex_types, d.changed_edge_types, d.changed_phases, d.changed_pos,
+            d.changed_vdata, d.changed_edata)
+
+
+class TestGraphDiff(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1337)
+        self.g = cliffordT(4, 60, p_t=0.2)
+        self.g.set_vdata(5, "label", "a")
+
+    def assertSameGraph(self, g, h):
+        self.assertEqual(set(h.vertices()), set(g.vertices()))
+        self.assertEqual(set(h.edges()), set(g.edges()))
+        self.assertEqual(h.num_edges(), g.num_edges())
+        self.assertEqual(dict(h.types()), dict(g.types()))
+        self.assertEqual(dict(h.phases()), dict(g.phases()))
+        self.assertEqual({e: h.edge_type(e) for e in h.edges()}, {e: g.edge_type(e) for e in g.edges()})
+        self.assertEqual(h.vdata(5, "label"), g.vdata(5, "label"))
+
+    def test_from_changes(self):
+        g = copy.deepcopy(self.g)
+        g.record_changes()
+        spider_simp(g)
+        to_gh(g)
+        checkpoint = copy.deepcopy(g)
+        d1 = GraphDiff.from_changes(g)
+        self.assertEqual(_normalised(d1), _normalised(GraphDiff(self.g, checkpoint)))
+
+        g.set_vdata(5, "label", "b")
+        full_reduce(g)
+        d2 = GraphDiff.from_changes(g, restart=False)
+        self.assertEqual(_normalised(d2), _normalised(GraphDiff(checkpoint, g)))
+        g.stop_recording_changes()
+        self.assertRaises(ValueError, GraphDiff.from_changes, g)
+
+        h = d2.apply_diff(d1.apply_diff(self.g))
+        self.assertSameGraph(g, h)
+        # apply_diff copies the graph unless in_place is set
+        self.assertEqual(self.g.vdata(5, "label"), "a")
+        h = copy.deepcopy(self.g)
+        h.record_changes()
+        d1.apply_diff(h, in_place=True)
+        self.assertSameGraph(checkpoint, h)
+        self.assertEqual(_normalised(GraphDiff.from_changes(h)), _normalised(d1))
+
+    def test_bytes(self):
+        g = copy.deepcopy(self.g)
+        full_reduce(g)
+        d = GraphDiff(self.g, g)
+        data = d.to_bytes()
+        self.assertLess(len(data), len(d.to_json()))
+        self.assertEqual(_normalised(GraphDiff.from_bytes(data)), _normalised(d))
+        self.assertRaises(Exception, GraphDiff.from_bytes, b"not a diff")
+
+
+if __name__ == '__main__':
+    unittest.main()
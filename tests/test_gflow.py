@@ -0,0 +1,74 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+import random
+import sys
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+
+from pyzx.generate import CNOT_HAD_PHASE_circuit
+from pyzx.simplify import to_gh, interior_clifford_simp
+from pyzx.gflow import gflow, _reduce_flow_demand
+from pyzx.linalg import Mat2
+
+
+class TestGflow(unittest.TestCase):
+
+    def test_reduce_matches_solve(self):
+        random.seed(1)
+        for _ in range(20):
+            n_rows, n_cols = random.randint(1, 8), random.randint(0, 8)
+            data = [[random.randint(0, 1) for _ in range(n_cols)] for _ in range(n_rows)]
+            rows = [sum(b << j for j, b in enumerate(r)) for r in data]
+            pivots, inconsistent = _reduce_flow_demand(rows)
+            for u in range(n_rows):
+                b = Mat2.zeros(n_rows, 1)
+                b.data[u][0] = 1
+                x = Mat2(data).solve(b) if n_cols else None
+                if x is None:
+                    self.assertTrue(inconsistent & (1 << u))
+                else:
+                    self.assertFalse(inconsistent & (1 << u))
+                    self.assertEqual({j for j in range(n_cols) if x.data[j][0]},
+                                     {c for c, ops in pivots if ops & (1 << u)})
+
+    def test_gflow_conditions(self):
+        random.seed(2)
+        for _ in range(5):
+            g = CNOT_HAD_PHASE_circuit(4, 40, p_had=0.3, p_t=0.2).to_graph()
+            to_gh(g)
+            interior_clifford_simp(g)
+            res = gflow(g)
+            self.assertIsNotNone(res)
+            assert res is not None
+            l, flow = res
+            outputs = {w for o in g.outputs() for w in g.neighbors(o)}
+            for u, corr in flow.items():
+                odd = set()
+                for v in corr:
+                    self.assertGreater(l[v], l[u])
+                    odd ^= set(g.neighbors(v))
+                self.assertIn(u, odd)
+                for w in odd:
+                    if w != u and w in l and w not in outputs:
+                        self.assertGreater(l[w], l[u])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,7 +68,7 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(exists_count=0)
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             self.assertEqual(g.vindex(), 0)
 
@@ -90,10 +90,10 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
             q2, p2 = fake_session.tx.calls[1]
             self.assertIn("CREATE", q2)
             self.assertIn(":Node", q2)
+            self.assertIn("phase_n: 0", q2)
             self.assertEqual(p2["graph_id"], g.graph_id)
             self.assertEqual(p2["id"], 5)
             self.assertEqual(p2["t"], VertexType.BOUNDARY.value)
-            self.assertEqual(p2["phase"], "0")
             self.assertEqual(p2["qubit"], -1)
             self.assertEqual(p2["row"], -1)
         finally:
@@ -109,7 +109,7 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(exists_count=0)
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._vindex = 10
             g.add_vertex_indexed(3)
@@ -132,7 +132,7 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(exists_count=1)  # simulate "id already exists"
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             with self.assertRaises(ValueError):
                 g.add_vertex_indexed(2)
@@ -176,7 +176,7 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
             # Verify defaults in DB
             query = """
                 MATCH (n:Node {graph_id: $gid})
-                RETURN n.id AS id, n.t AS t, n.phase AS phase, n.qubit AS qubit, n.row AS row
+                RETURN n.id AS id, n.t AS t, [n.phase_n, n.phase_d] AS phase, n.qubit AS qubit, n.row AS row
                 ORDER BY id
             """
             with g._get_session() as session:
@@ -184,7 +184,7 @@ class TestGraphNeo4jAddVertexIndexed(unittest.TestCase):
 
             self.assertEqual([r["id"] for r in rows], [2, 5])
             self.assertTrue(all(r["t"] == VertexType.BOUNDARY.value for r in rows))
-            self.assertTrue(all(r["phase"] == "0" for r in rows))
+            self.assertTrue(all(r["phase"] == [0, 1] for r in rows))
             self.assertTrue(all(r["qubit"] == -1 for r in rows))
             self.assertTrue(all(r["row"] == -1 for r in rows))
         finally:
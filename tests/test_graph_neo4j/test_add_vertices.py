@@ -48,7 +48,7 @@ class TestGraphNeo4jAddVertices(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session  # patch instance method
+            g._get_session = lambda **config: fake_session  # patch instance method
 
             self.assertEqual(g.vindex(), 0)
 
@@ -67,7 +67,7 @@ class TestGraphNeo4jAddVertices(unittest.TestCase):
             payload = params["vertices"]
             self.assertEqual([v["id"] for v in payload], [0, 1, 2])
             self.assertTrue(all(v["t"] == VertexType.BOUNDARY.value for v in payload))
-            self.assertTrue(all(v["phase"] == "0" for v in payload))
+            self.assertTrue(all((v["phase_n"], v["phase_d"]) == (0, 1) for v in payload))
             self.assertTrue(all(v["qubit"] == -1 for v in payload))
             self.assertTrue(all(v["row"] == -1 for v in payload))
         finally:
@@ -83,7 +83,7 @@ class TestGraphNeo4jAddVertices(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session
+            g._get_session = lambda **config: fake_session
 
             vs = g.add_vertices(0)
             self.assertEqual(vs, [])
@@ -114,7 +114,7 @@ class TestGraphNeo4jAddVertices(unittest.TestCase):
 
             query = """
                 MATCH (n:Node {graph_id: $gid})
-                RETURN n.id AS id, n.t AS t, n.phase AS phase, n.qubit AS qubit, n.row AS row
+                RETURN n.id AS id, n.t AS t, [n.phase_n, n.phase_d] AS phase, n.qubit AS qubit, n.row AS row
                 ORDER BY id
             """
             with g._get_session() as session:
@@ -122,7 +122,7 @@ class TestGraphNeo4jAddVertices(unittest.TestCase):
 
             self.assertEqual([r["id"] for r in rows], [0, 1, 2, 3])
             self.assertTrue(all(r["t"] == VertexType.BOUNDARY.value for r in rows))
-            self.assertTrue(all(r["phase"] == "0" for r in rows))
+            self.assertTrue(all(r["phase"] == [0, 1] for r in rows))
             self.assertTrue(all(r["qubit"] == -1 for r in rows))
             self.assertTrue(all(r["row"] == -1 for r in rows))
         finally:
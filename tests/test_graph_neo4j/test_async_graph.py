@@ -0,0 +1,119 @@
+import asyncio
+import os
+import unittest
+import uuid
+from fractions import Fraction
+from unittest import mock
+
+from neo4j.exceptions import Neo4jError
+
+from pyzx.graph.graph_async import AsyncGraphMemgraph, AsyncGraphNeo4j
+from pyzx.utils import EdgeType, VertexType
+
+
+def _neo4j_env_present() -> bool:
+    return all(os.getenv(k) for k in ("DB_URI", "DB_PASSWORD"))
+
+
+class _IndexSession:
+    """Session of a Memgraph that fails to create the composite index with the given error."""
+
+    def __init__(self, error):
+        self.error = error
+        self.queries = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query):
+        self.queries.append(query)
+        if "graph_id, t" in query:
+            raise self.error
+        return mock.AsyncMock()
+
+
+class TestAsyncMemgraphIndices(unittest.IsolatedAsyncioTestCase):
+
+    async def _init_indices(self, code, message):
+        session = _IndexSession(Neo4jError._hydrate_neo4j(code=code, message=message))
+        driver = mock.Mock(session=mock.Mock(return_value=session))
+        g = AsyncGraphMemgraph(graph_id="test_graph", driver=driver)
+        with mock.patch.object(g, "_migrate_legacy_phases", mock.AsyncMock()):
+            await g.init_indices()
+        return session.queries
+
+    async def test_composite_index_unsupported(self):
+        queries = await self._init_indices("Memgraph.ClientError.MemgraphError.MemgraphError",
+                                           "mismatched input '(' expecting ')'")
+        self.assertEqual(len(queries), 2)
+
+    async def test_other_errors_are_raised(self):
+        with self.assertRaises(Neo4jError):
+            await self._init_indices("Neo.ClientError.Security.Forbidden", "Index creation is not allowed")
+
+
+class TestAsyncGraphNeo4j(unittest.IsolatedAsyncioTestCase):
+    """End-to-end tests of AsyncGraphNeo4j, requires a reachable Neo4j."""
+
+    async def asyncSetUp(self):
+        if not _neo4j_env_present():
+            raise unittest.SkipTest("Neo4j env vars missing (DB_URI/DB_PASSWORD).")
+        if os.getenv("BACKEND_NAME") != "neo4j":
+            raise unittest.SkipTest("Different backend in use.")
+        self.owner = AsyncGraphNeo4j(
+            uri=os.getenv("DB_URI", "bolt://localhost:7687"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+        )
+        try:
+            await self.owner.driver.verify_connectivity()
+        except Exception as e:
+            await self.owner.close()
+            raise unittest.SkipTest(f"Neo4j not reachable: {e}")
+        self.graphs = []
+
+    def _graph(self) -> AsyncGraphNeo4j:
+        g = AsyncGraphNeo4j(graph_id=f"test_graph_{uuid.uuid4().hex}",
+                            database=self.owner.database, driver=self.owner.driver)
+        self.graphs.append(g)
+        return g
+
+    async def asyncTearDown(self):
+        await asyncio.gather(*(g.remove_all_data() for g in self.graphs))
+        await self.owner.close()
+
+    async def test_concurrent_graphs(self):
+        vertices = [
+            {"ty": VertexType.BOUNDARY, "qubit": 0, "row": 0},
+            {"ty": VertexType.Z, "phase": Fraction(1, 2), "qubit": 0, "row": 1},
+            {"ty": VertexType.X, "qubit": 0, "row": 2},
+            {"ty": VertexType.BOUNDARY, "qubit": 0, "row": 3},
+        ]
+        edges = [((0, 1), EdgeType.SIMPLE), ((1, 2), EdgeType.HADAMARD), ((2, 3), EdgeType.SIMPLE)]
+        graphs = [self._graph() for _ in range(4)]
+        await asyncio.gather(*(g.create_graph(vertices, edges, inputs=[0], outputs=[3]) for g in graphs))
+        await asyncio.gather(*(g.add_edges([(1, 1)], EdgeType.HADAMARD) for g in graphs))
+        await graphs[0].remove_vertices([2])
+
+        exported = await asyncio.gather(*(g.to_graph() for g in graphs))
+        self.assertEqual(exported[0].num_vertices(), 3)
+        for g in exported[1:]:
+            self.assertEqual(g.num_vertices(), 4)
+            self.assertEqual(g.num_edges(), 3)
+            self.assertEqual(g.phase(1), Fraction(3, 2))
+            self.assertEqual(g.edge_type(g.edge(1, 2)), EdgeType.HADAMARD)
+            self.assertEqual((g.inputs(), g.outputs()), ((0,), (3,)))
+
+        cpy = await graphs[1].clone()
+        self.graphs.append(cpy)
+        self.assertNotEqual(cpy.graph_id, graphs[1].graph_id)
+        self.assertEqual(await cpy.num_edges(), 3)
+        await cpy.run_cypher_rewrite("spider_fusion_rewrite")
+        self.assertEqual(await graphs[1].num_vertices(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -82,7 +82,8 @@ class TestCloneUnit(Neo4jUnitTestCase):
                     "graph_id": g.graph_id,
                     "id": 0,
                     "t": VertexType.BOUNDARY.value,
-                    "phase": "0",
+                    "phase_n": 0,
+                    "phase_d": 1,
                     "qubit": 0,
                     "row": 0,
                     "extra": "v0",
@@ -95,7 +96,8 @@ class TestCloneUnit(Neo4jUnitTestCase):
                     "graph_id": g.graph_id,
                     "id": 1,
                     "t": VertexType.Z.value,
-                    "phase": "1/2",
+                    "phase_n": 1,
+                    "phase_d": 2,
                     "qubit": 0,
                     "row": 1,
                     "extra": "v1",
@@ -108,7 +110,8 @@ class TestCloneUnit(Neo4jUnitTestCase):
                     "graph_id": g.graph_id,
                     "id": 2,
                     "t": VertexType.BOUNDARY.value,
-                    "phase": "0",
+                    "phase_n": 0,
+                    "phase_d": 1,
                     "qubit": 0,
                     "row": 2,
                     "extra": "v2",
@@ -130,7 +133,7 @@ class TestCloneUnit(Neo4jUnitTestCase):
         ]
 
         fake_session = _FakeSession(nodes_rows=nodes_rows, edges_rows=edges_rows)
-        g._get_session = lambda: fake_session
+        g._get_session = lambda **config: fake_session
 
         with patch("uuid.uuid4", return_value=SimpleNamespace(hex="deadbeef")):
             cpy = g.clone()
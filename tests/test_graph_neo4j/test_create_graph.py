@@ -42,7 +42,7 @@ class TestCreateGraphUnit(Neo4jUnitTestCase):
     def test_create_graph_unit_updates_indices_and_marks_inputs_outputs(self):
         g = self.g
         fake_session = _FakeSession()
-        g._get_session = lambda: fake_session
+        g._get_session = lambda **config: fake_session
 
         vertices_data = [
             {"ty": VertexType.BOUNDARY, "row": 0, "qubit": 0},
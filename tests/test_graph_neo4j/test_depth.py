@@ -35,7 +35,7 @@ class _FakeSessionRead:
 class TestDepthUnit(Neo4jUnitTestCase):
     def test_depth_unit_returns_max_row(self):
         g = self.g
-        g._get_session = lambda: _FakeSessionRead(maxr=7)
+        g._get_session = lambda **config: _FakeSessionRead(maxr=7)
 
         self.assertEqual(g.depth(), 7)
         self.assertEqual(g._maxr, 7)
@@ -0,0 +1,163 @@
+# tests/test_graph_neo4j/test_graph_s_transfer.py
+import os
+import unittest
+import uuid
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Tuple
+
+from pyzx.graph.graph_neo4j import GraphNeo4j
+from pyzx.graph.graph_s import GraphS
+from pyzx.utils import EdgeType, VertexType
+from typing_extensions import Literal
+
+
+class _FakeTx:
+    """Keeps the nodes and wires written by from_graph_s, and streams them back as
+    the rows of the export query."""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.nodes: List[Dict[str, Any]] = []
+        self.wires: List[Dict[str, Any]] = []
+
+    def run(self, query: str, **params: Any) -> Any:
+        self.calls.append((query, dict(params)))
+        if "UNWIND $vertices AS v" in query:
+            self.nodes.extend(params["vertices"])
+        elif "UNWIND $edges AS e" in query:
+            self.wires.extend(params["edges"])
+        elif "UNION ALL" in query:
+            return iter(self._rows())
+        return None
+
+    def _rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for n in self.nodes:
+            labels = ["Node"] + (["Input"] if n["input"] else []) + (["Output"] if n["output"] else [])
+            rows.append(dict(n, phase=None, labels=labels, target=None))
+        for w in self.wires:
+            rows.append({"id": w["s"], "t": w["et"], "phase_n": None, "phase_d": None,
+                         "phase_sym": None, "phase": None, "qubit": None, "row": None,
+                         "labels": None, "target": w["t"]})
+        return rows
+
+
+class _FakeSession:
+    def __init__(self):
+        self.tx: _FakeTx = _FakeTx()
+        self.configs: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "_FakeSession":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> Literal[False]:
+        return False
+
+    def execute_write(self, fn: Callable[[_FakeTx], Any]) -> Any:
+        return fn(self.tx)
+
+    def execute_read(self, fn: Callable[[_FakeTx], Any]) -> Any:
+        return fn(self.tx)
+
+    def run(self, query: str, **params: Any) -> Any:
+        return self.tx.run(query, **params)
+
+
+def _neo4j_env_present() -> bool:
+    return all(os.getenv(k) for k in ("DB_URI", "DB_PASSWORD"))
+
+
+def _sample_graph() -> GraphS:
+    g = GraphS()
+    # Add the outputs first, so that their ids are not in the order of the qubits
+    o1 = g.add_vertex(VertexType.BOUNDARY, qubit=1, row=3)
+    o0 = g.add_vertex(VertexType.BOUNDARY, qubit=0, row=3)
+    i0 = g.add_vertex(VertexType.BOUNDARY, qubit=0, row=0)
+    i1 = g.add_vertex(VertexType.BOUNDARY, qubit=1, row=0)
+    z = g.add_vertex(VertexType.Z, qubit=0, row=1, phase=Fraction(1, 4))
+    x = g.add_vertex(VertexType.X, qubit=1, row=1, phase=Fraction(3, 2))
+    h = g.add_vertex(VertexType.Z, qubit=0, row=2)
+    g.add_edges([(i0, z), (z, h), (i1, x), (x, o1), (z, x)])
+    g.add_edge((h, o0), EdgeType.HADAMARD)
+    g.set_inputs((i0, i1))
+    g.set_outputs((o0, o1))
+    g.scalar.add_power(3)
+    return g
+
+
+class TestGraphNeo4jGraphSTransfer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph_id: str = f"test_graph_{uuid.uuid4().hex}"
+
+    def _assert_same_graph(self, g: GraphS, h: GraphS) -> None:
+        self.assertEqual(set(h.vertices()), set(g.vertices()))
+        self.assertEqual(h.types(), g.types())
+        self.assertEqual(h.phases(), g.phases())
+        self.assertEqual(h.qubits(), g.qubits())
+        self.assertEqual(h.rows(), g.rows())
+        self.assertEqual({(h.edge_st(e), h.edge_type(e)) for e in h.edges()},
+                         {(g.edge_st(e), g.edge_type(e)) for e in g.edges()})
+        self.assertEqual(h.inputs(), g.inputs())
+        self.assertEqual(h.outputs(), g.outputs())
+        self.assertEqual(h.scalar, g.scalar)
+
+    def test_round_trip_unit(self) -> None:
+        g = _sample_graph()
+        fake_session = _FakeSession()
+
+        class _Graph(GraphNeo4j):
+            def _get_session(self, **config: Any) -> _FakeSession:
+                fake_session.configs.append(config)
+                return fake_session
+
+        dbg = _Graph.from_graph_s(g, graph_id=self.graph_id, batch_size=3)
+        try:
+            self.assertEqual(dbg.graph_id, self.graph_id)
+            self.assertEqual(dbg._vindex, g.vindex())
+            # Nodes and wires are written in batches, in a single transaction
+            queries = [q for q, _ in fake_session.tx.calls]
+            self.assertEqual(len(queries), 3 + 2)
+            self.assertTrue(all(p["graph_id"] == self.graph_id for _, p in fake_session.tx.calls))
+
+            self._assert_same_graph(g, dbg.to_graph_s())
+            self.assertEqual(fake_session.configs[-1], {"fetch_size": 10000})
+
+            # Without the in-memory inputs and outputs, those labelled in the database are used
+            dbg._inputs, dbg._outputs = tuple(), tuple()
+            h = dbg.to_graph_s()
+            self.assertEqual(h.inputs(), g.inputs())
+            self.assertEqual(h.outputs(), tuple(sorted(g.outputs())))
+
+            h = dbg.to_graph_s(layout=True)
+            self.assertNotEqual(h.qubits(), g.qubits())
+        finally:
+            dbg.close()
+
+    @unittest.skipUnless(
+        _neo4j_env_present(),
+        "Neo4j env vars missing (DB_URI/DB_PASSWORD).",
+    )
+    def test_round_trip_e2e(self) -> None:
+        g = _sample_graph()
+        try:
+            dbg = GraphNeo4j.from_graph_s(
+                g,
+                uri=os.getenv("DB_URI", ""),
+                user=os.getenv("DB_USER", "neo4j"),
+                password=os.getenv("DB_PASSWORD", ""),
+                graph_id=self.graph_id,
+                database=os.getenv("NEO4J_DATABASE", "neo4j"),
+            )
+        except Exception as e:
+            raise unittest.SkipTest(f"Neo4j not reachable: {e}")
+        try:
+            self._assert_same_graph(g, dbg.to_graph_s(fetch_size=2))
+            self.assertEqual(dbg.num_vertices(), g.num_vertices())
+            self.assertEqual(dbg.phase(4), Fraction(1, 4))
+        finally:
+            dbg.remove_all_data()
+            dbg.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -69,7 +69,7 @@ class TestGraphNeo4jInputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(input_rows=[{"id": 9}])
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._inputs = (0, 3)
 
@@ -91,7 +91,7 @@ class TestGraphNeo4jInputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(input_rows=[{"id": 0}, {"id": 4}])
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._inputs = tuple()  # not cached
 
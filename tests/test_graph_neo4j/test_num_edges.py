@@ -31,7 +31,7 @@ class _FakeSessionEdgesCount:
 class TestNumEdgesUnit(Neo4jUnitTestCase):
     def test_num_edges_empty_returns_0(self):
         g = self.g
-        g._get_session = lambda: _FakeSessionEdgesCount(count=0)
+        g._get_session = lambda **config: _FakeSessionEdgesCount(count=0)
         self.assertEqual(g.num_edges(), 0)
 
 
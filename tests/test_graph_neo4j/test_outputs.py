@@ -69,7 +69,7 @@ class TestGraphNeo4jOutputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession(output_rows=[{"id": 9}])
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._outputs = (2, 5)
 
@@ -92,7 +92,7 @@ class TestGraphNeo4jOutputs(unittest.TestCase):
         try:
             # simulate DB having Output labels on ids 3 and 1 (should come ordered)
             fake_session = _FakeSession(output_rows=[{"id": 1}, {"id": 3}])
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._outputs = tuple()  # not cached
 
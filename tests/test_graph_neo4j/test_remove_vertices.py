@@ -35,7 +35,7 @@ class TestRemoveVerticesUnit(Neo4jUnitTestCase):
         g._outputs = (3, 4, 5)
 
         fake_session = _FakeSession()
-        g._get_session = lambda: fake_session
+        g._get_session = lambda **config: fake_session
 
         g.remove_vertices([1, 3])
 
@@ -51,7 +51,7 @@ class TestRemoveVerticesUnit(Neo4jUnitTestCase):
     def test_remove_vertices_unit_with_empty_list(self):
         g = self.g
         fake_session = _FakeSession()
-        g._get_session = lambda: fake_session
+        g._get_session = lambda **config: fake_session
 
         g.remove_vertices([])
 
@@ -53,7 +53,7 @@ class TestGraphNeo4jSetInputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             self.assertEqual(g._inputs, tuple())
 
@@ -86,7 +86,7 @@ class TestGraphNeo4jSetInputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._inputs = (1, 2)
 
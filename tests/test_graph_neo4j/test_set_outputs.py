@@ -53,7 +53,7 @@ class TestGraphNeo4jSetOutputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             self.assertEqual(g._outputs, tuple())
 
@@ -86,7 +86,7 @@ class TestGraphNeo4jSetOutputs(unittest.TestCase):
         )
         try:
             fake_session = _FakeSession()
-            g._get_session = lambda: fake_session  # type: ignore[method-assign]
+            g._get_session = lambda **config: fake_session  # type: ignore[method-assign]
 
             g._outputs = (1, 2)
 
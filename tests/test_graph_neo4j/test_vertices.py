@@ -26,7 +26,7 @@ class _FakeSessionVerticesEmpty:
 class TestVerticesUnit(Neo4jUnitTestCase):
     def test_vertices_empty(self):
         g = self.g
-        g._get_session = lambda: _FakeSessionVerticesEmpty()
+        g._get_session = lambda **config: _FakeSessionVerticesEmpty()
         self.assertEqual(g.vertices(), [])
 
 
@@ -22,7 +22,7 @@ if __name__ == '__main__':
     sys.path.append('..')
     sys.path.append('.')
 
-from pyzx.linalg import Mat2, rank_factorise, generalised_inverse
+from pyzx.linalg import Mat2, rank_factorise, generalised_inverse, pack_row, unpack_row
 
 
 class TestMat2(unittest.TestCase):
@@ -57,6 +57,21 @@ class TestMat2(unittest.TestCase):
                 if self.m3.data[i][j] != 0: flagged = True
         self.assertFalse(flagged)
 
+    def test_gauss_records_row_operations(self):
+        for blocksize in (1, 2, 3, 6):
+            m = self.m3.copy()
+            x = Mat2.id(5)
+            y = Mat2.id(5)
+            m.gauss(full_reduce=True, x=x, y=y, blocksize=blocksize, pivot_cols=[])
+            self.assertEqual(x*self.m3, m)
+            self.assertEqual(x*y, Mat2.id(5))
+            self.assertEqual(m.data[:4], [[1,0,0,0,0],[0,1,0,0,1],[0,0,1,0,1],[0,0,0,1,1]])
+
+    def test_pack_row(self):
+        self.assertEqual(pack_row([1,0,1,1,0]), 0b01101)
+        self.assertEqual(pack_row([]), 0)
+        self.assertEqual(unpack_row(0b01101, 5), [1,0,1,1,0])
+
     def test_rank_of_matrix(self):
         self.assertEqual(self.m3.rank(),4)
 
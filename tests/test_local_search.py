@@ -0,0 +1,112 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import random
+import sys
+from unittest import mock
+
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+from pyzx.generate import CNOT_HAD_PHASE_circuit
+from pyzx.simplify import full_reduce
+from pyzx.extract import extract_circuit
+from pyzx.tensor import compare_tensors
+from pyzx.local_search.parallel import parallel_anneal, parallel_evolve
+from pyzx.local_search.simulated_annealing import anneal
+from pyzx.local_search.scores import ProxyScore
+from pyzx.local_search.congruences import apply_rand_pivot, apply_rand_lc
+
+
+class TestParallelLocalSearch(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(42)
+        self.c = CNOT_HAD_PHASE_circuit(qubits=4, depth=40, clifford=False)
+        self.g = self.c.to_graph()
+        full_reduce(self.g)
+
+    def assert_preserves_semantics(self, g):
+        g = g.copy()
+        full_reduce(g)
+        self.assertTrue(compare_tensors(extract_circuit(g), self.c))
+
+    def test_parallel_anneal(self):
+        g, trace = parallel_anneal(self.g, n_chains=2, iters=10, exchange_every=5,
+                                   n_threads=1, full_reduce_prob=1.0)
+        self.assertEqual(len(trace), 3)
+        self.assertTrue(all(trace[i][1] >= trace[i+1][1] for i in range(len(trace)-1)))
+        self.assert_preserves_semantics(g)
+
+    def test_parallel_anneal_is_deterministic(self):
+        _, trace1 = parallel_anneal(self.g, n_chains=2, iters=10, exchange_every=5,
+                                    n_threads=1, full_reduce_prob=1.0, seed=3)
+        _, trace2 = parallel_anneal(self.g, n_chains=2, iters=10, exchange_every=5,
+                                    n_threads=1, full_reduce_prob=1.0, seed=3)
+        self.assertEqual([s for _, s in trace1], [s for _, s in trace2])
+
+    def test_parallel_evolve(self):
+        g, trace = parallel_evolve(self.g, n_islands=2, n_mutants=3, n_generations=2,
+                                   migrate_every=1, n_threads=1)
+        self.assertEqual(len(trace), 3)
+        self.assert_preserves_semantics(g)
+
+    def test_parallel_runs_match_serial_runs(self):
+        # Two workers, even where there is only one core, so that the pool and the seeding of its workers are used
+        with mock.patch('pyzx.local_search.parallel.cpu_count', return_value=2):
+            for n_threads in [1, 2]:
+                with self.subTest(n_threads=n_threads):
+                    g1, trace1 = parallel_anneal(self.g, n_chains=2, iters=10, exchange_every=5,
+                                                 n_threads=n_threads, full_reduce_prob=1.0, seed=3)
+                    g2, trace2 = parallel_evolve(self.g, n_islands=2, n_mutants=3, n_generations=2,
+                                                 migrate_every=1, n_threads=n_threads, seed=3)
+                    self.assert_preserves_semantics(g1)
+                    self.assert_preserves_semantics(g2)
+                    if n_threads == 1:
+                        serial = ([s for _, s in trace1], [s for _, s in trace2])
+                    else:
+                        self.assertEqual(([s for _, s in trace1], [s for _, s in trace2]), serial)
+
+
+class TestProxyScore(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(42)
+        self.c = CNOT_HAD_PHASE_circuit(qubits=4, depth=40, clifford=False)
+        self.g = self.c.to_graph()
+        full_reduce(self.g)
+
+    def test_update_matches_reset(self):
+        proxy = ProxyScore()
+        g = self.g.copy()
+        state = proxy.reset(g)
+        for i in range(10):
+            if i % 2: touched = apply_rand_pivot(g)
+            else: touched = apply_rand_lc(g)
+            state = proxy.update(g, state, touched)
+            self.assertEqual(state, proxy.reset(g))
+
+    def test_anneal_with_proxy(self):
+        g, scores = anneal(self.g, iters=10, full_reduce_prob=1.0, quiet=True, strategy=ProxyScore())
+        self.assertEqual(len(scores), 10)
+        g = g.copy()
+        full_reduce(g)
+        self.assertTrue(compare_tensors(extract_circuit(g), self.c))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# PyZX - Python library for quantum circuit rewriting
+#        and optimization using the ZX-calculus
+# Copyright (C) 2018 - Aleks Kissinger and John van de Wetering
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import random
+import unittest
+import sys
+from unittest import mock
+if __name__ == '__main__':
+    sys.path.append('..')
+    sys.path.append('.')
+
+from pyzx import memgraph_simplify
+from pyzx.generate import cliffordT
+from pyzx.graph.db_transfer import diff_rows
+from pyzx.graph.diff import GraphDiff
+from pyzx.graph.scalar import Scalar
+from pyzx.memgraph_simplify import Stats, full_reduce_db, resume_full_reduce_db, simplify_regions
+from pyzx.simplify import to_graph_like
+from pyzx.tensor import compare_tensors
+
+
+class TestSimplifyRegions(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1337)
+        self.g = cliffordT(4, 50, p_t=0.1)
+        to_graph_like(self.g)
+
+    def test_regions_preserve_semantics(self):
+        for region_size in (3, 8, 1000):
+            h = simplify_regions(self.g, region_size, max_workers=1)
+            self.assertTrue(compare_tensors(self.g, h, preserve_scalar=True))
+            self.assertLessEqual(h.num_vertices(), self.g.num_vertices())
+            # The vertices that are left keep their ids
+            self.assertTrue(set(h.vertices()) - set(self.g.vertices()) <= set(range(self.g.vindex(), h.vindex())))
+        self.assertLess(h.num_vertices(), self.g.num_vertices())
+
+    def test_regions_in_processes(self):
+        h = simplify_regions(self.g, 5, max_workers=2)
+        self.assertTrue(compare_tensors(self.g, h, preserve_scalar=True))
+
+    def test_diff_rows(self):
+        h = simplify_regions(self.g, 1000, max_workers=1)
+        rows = diff_rows(GraphDiff(self.g, h))
+        self.assertEqual(sorted(rows["removed_verts"]), sorted(set(self.g.vertices()) - set(h.vertices())))
+        self.assertEqual(len(rows["new_edges"]), len(set(h.edges()) - set(self.g.edges())))
+        for row in rows["new_edges"]:
+            self.assertLess(row["s"], row["t"])
+        for row in rows["changed_verts"]:
+            self.assertIn(row["id"], set(h.vertices()))
+
+
+class _Record:
+    def __init__(self, value):
+        self.value = value
+
+    def __getitem__(self, i):
+        return self.value
+
+
+class _LogSession:
+    """Keeps the entries of the ReduceLog in a list."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params):
+        if "CREATE (e:ReduceLog" in query:
+            self.entries.append(dict(params["entry"]))
+        elif "max(e.seq)" in query:
+            return mock.Mock(single=lambda: _Record(max((e["seq"] for e in self.entries), default=None)))
+        elif "'done'" in query:
+            done = [e for e in self.entries if e["status"] == "done"]
+            return mock.Mock(single=lambda: _Record(done[-1]) if done else None)
+        elif "DELETE e" in query:
+            self.entries.clear()
+        elif "n.phase IS NOT NULL" in query:
+            return []  # No nodes with a phase of the old encoding
+        return mock.Mock(single=lambda: None)
+
+
+class TestResumeFullReduce(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = []
+        self.calls = []
+        self.crash_at = None
+        self.loop_rewrites = {"gadget_simp": [2, 0]}
+
+    def _step(self, name):
+        def simp(session_factory, graph_id, quiet, stats):
+            if len(self.calls) == self.crash_at:
+                raise ConnectionError("Connection lost")
+            self.calls.append(name)
+            rewrites = self.loop_rewrites.get(name, [0])
+            n = rewrites.pop(0) if len(rewrites) > 1 else rewrites[0]
+            stats.count_rewrites(name, n + 1)
+            return n > 0
+        return simp
+
+    def _run(self, fn, *args, **kwargs):
+        with mock.patch.object(memgraph_simplify, "_START_STEPS", [(n, self._step(n)) for n in ("a", "b")]), \
+                mock.patch.object(memgraph_simplify, "_LOOP_STEPS", [(n, self._step(n)) for n in ("c", "gadget_simp")]), \
+                mock.patch.object(memgraph_simplify, "remove_isolated_vertices"):
+            return fn(lambda: _LogSession(self.entries), "g", *args, **kwargs)
+
+    def test_full_reduce_log(self):
+        self._run(full_reduce_db)
+        self.assertEqual(self.calls, ["a", "b", "c", "gadget_simp", "c", "gadget_simp"])
+        # The log is removed when the run completes
+        self.assertEqual(self.entries, [])
+
+    def test_resume(self):
+        scalar = Scalar()
+        scalar.add_power(3)
+        self.crash_at = 3
+        self.assertRaises(ConnectionError, self._run, full_reduce_db, scalar=scalar)
+        self.assertEqual([(e["rule"], e["status"]) for e in self.entries[-2:]],
+                         [("c", "done"), ("gadget_simp", "started")])
+        self.assertEqual([e["seq"] for e in self.entries], list(range(1, 8)))
+
+        self.crash_at = None
+        stats = Stats()
+        restored = self._run(resume_full_reduce_db, stats=stats)
+        # The interrupted step is run again, and the loop still needs the iteration after it
+        self.assertEqual(self.calls, ["a", "b", "c", "gadget_simp", "c", "gadget_simp"])
+        self.assertEqual(stats.num_rewrites, {"a": 1, "b": 1, "c": 2, "gadget_simp": 4})
+        self.assertEqual(restored, scalar)
+        self.assertEqual(self.entries, [])
+
+        # Nothing left to resume: the graph is simplified from the start
+        self.assertIsNone(self._run(resume_full_reduce_db))
+        self.assertEqual(self.calls[6:], ["a", "b", "c", "gadget_simp"])
+
+
+if __name__ == '__main__':
+    unittest.main()
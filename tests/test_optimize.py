@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import unittest
+import random
 import sys
 from fractions import Fraction
 
@@ -24,7 +25,11 @@ if __name__ == '__main__':
 
 from pyzx.circuit import Circuit
 from pyzx.circuit.gates import XPhase, SX, HAD, ZPhase, CNOT, NOT
-from pyzx.optimize import full_optimize, basic_optimization
+from pyzx.optimize import full_optimize, basic_optimization, Optimizer
+from pyzx.generate import CNOT_HAD_PHASE_circuit
+from pyzx.linalg import Mat2
+from pyzx.todd import find_todd_match, find_todd_match_bits, xi
+from pyzx.tensor import compare_tensors
 
 
 class TestXPhaseOptimization(unittest.TestCase):
@@ -140,5 +145,53 @@ rx(pi*0.545344) q[1];
         self.assertIsNotNone(optimized)
 
 
+class TestBasicOptimization(unittest.TestCase):
+
+    def test_basic_optimization_preserves_semantics(self):
+        random.seed(4)
+        for qubits, depth, p_had in [(3, 60, 0.3), (5, 300, 0.15), (6, 400, 0.5)]:
+            c = CNOT_HAD_PHASE_circuit(qubits, depth, p_had=p_had, p_t=0.3, clifford=False)
+            c.add_gate("CZ", 0, 1)
+            c.add_gate("NOT", 1)
+            for do_swaps in (True, False):
+                c2 = basic_optimization(c.to_basic_gates(), do_swaps=do_swaps)
+                self.assertTrue(compare_tensors(c, c2, preserve_scalar=False))
+                self.assertLessEqual(len(c2.gates), len(c.to_basic_gates().gates))
+            c2, correction = Optimizer(c.to_basic_gates()).parse_circuit(separate_correction=True)
+            c2.gates.extend(correction)
+            self.assertTrue(compare_tensors(c, c2, preserve_scalar=False))
+
+
+class TestTodd(unittest.TestCase):
+
+    def test_bitset_match_agrees_with_mat2(self):
+        random.seed(3)
+        for _ in range(100):
+            rows, cols = random.randint(2, 6), random.randint(2, 16)
+            data = [[random.randint(0, 1) for _ in range(cols)] for _ in range(rows)]
+            a, b, z, _ = find_todd_match(Mat2(data))
+            match = find_todd_match_bits([sum(data[i][j] << i for i in range(rows)) for j in range(cols)], rows)
+            if z is None:
+                self.assertIsNone(match)
+                continue
+            assert match is not None
+            self.assertEqual(match[:2], (a, b))
+            self.assertEqual([match[2] >> i & 1 for i in range(rows)], z)
+            y = [match[3] >> j & 1 for j in range(cols)]
+            self.assertEqual((y[a] + y[b]) % 2, 1)
+            for r in xi(Mat2(data), z).data:
+                self.assertEqual(sum(r[j] * y[j] for j in range(cols)) % 2, 0)
+
+    def test_full_optimize_todd_methods(self):
+        random.seed(5)
+        c = CNOT_HAD_PHASE_circuit(5, 150, p_had=0.05, p_t=0.4, clifford=False)
+        for method in ('bitset', 'mat2'):
+            c2 = full_optimize(c, todd_method=method)
+            self.assertTrue(compare_tensors(c, c2, preserve_scalar=False))
+            self.assertLessEqual(c2.tcount(), c.tcount())
+        with self.assertRaises(ValueError):
+            full_optimize(c, todd_method='numpy')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -69,6 +69,10 @@ class TestQASM(unittest.TestCase):
         self.assertEqual(c2.qubits, 1)
         self.assertEqual(len(c2.gates), 1)
         self.assertTrue(c1.verify_equality(c2))
+        # The phases parsed for one circuit are not kept for the next
+        p._phase_cache["pi/4"] = Fraction(1, 4)
+        p.parse(s)
+        self.assertEqual(p._phase_cache, {})
 
     def test_parse_qasm3(self):
         qasm3 = Circuit.from_qasm("""
@@ -235,6 +239,36 @@ class TestQASM(unittest.TestCase):
         self.assertEqual(c1.qubits, c2.qubits)
         self.assertListEqual(c1.gates, c2.gates)
 
+    def test_custom_gates_with_comments_and_blocks(self):
+        from pyzx.circuit.qasmparser import QASMParser
+        s1 = """
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        // gate commented { x a; }
+        gate swp a,b { cx a,b; cx b,a; cx a,b } // no trailing semicolon
+        gate xgate a { x a; }
+        qreg q[2];
+        creg c[1];
+        swp q[0],q[1];
+        xgate q;
+        if (c==1) { h q[0]; swp q[1],q[0]; }
+        """
+        s2 = """
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        qreg q[2];
+        creg c[1];
+        cx q[0],q[1]; cx q[1],q[0]; cx q[0],q[1];
+        x q[0]; x q[1];
+        if (c==1) h q[0];
+        if (c==1) cx q[1],q[0]; if (c==1) cx q[0],q[1]; if (c==1) cx q[1],q[0];
+        """
+        p = QASMParser()
+        c1 = p.parse(s1)
+        self.assertListEqual(sorted(p.custom_gates), ['swp', 'xgate'])
+        c2 = p.parse(s2)
+        self.assertListEqual(c1.gates, c2.gates)
+
     @unittest.skipUnless(QuantumCircuit, "qiskit needs to be installed for this test")
     def test_qasm_qiskit_semantics(self):
         """Verify/document qasm gate semantics when imported into pyzx.
@@ -1122,14 +1156,20 @@ class TestQASM(unittest.TestCase):
             """)
         self.assertIn("Nested if-blocks", str(ctx.exception))
 
-    def test_expand_if_blocks_static_method(self):
-        """_expand_if_blocks is a static method callable on the parser class."""
+    def test_statements_splits_blocks(self):
+        """_statements splits the source into commands and braced blocks."""
         from pyzx.circuit.qasmparser import QASMParser
-        result = QASMParser._expand_if_blocks(
-            "if (c==1) { x q[0]; z q[1]; }")
-        self.assertIn("if (c==1) x q[0]", result)
-        self.assertIn("if (c==1) z q[1]", result)
-        self.assertNotIn("{", result)
+        result = QASMParser._statements(
+            "x q[0]; // comment\nif (c==1) { x q[0]; z q[1]; }")
+        self.assertEqual(result, ["x q[0]", ("if (c==1)", ["x q[0]", "z q[1]"])])
+
+    def test_parse_custom_gate_whole_definition(self):
+        """parse_custom_gate also accepts the definition as a single string."""
+        from pyzx.circuit.qasmparser import QASMParser
+        p = QASMParser()
+        p.parse_custom_gate("gate mygate a, b { cx a, b; h b; }")
+        self.assertEqual(p.custom_gates["mygate"].qubits, 2)
+        self.assertEqual(len(p.custom_gates["mygate"].gates), 2)
 
     def test_creg_declaration_for_result_bit(self):
         """Measurement with result_bit should produce a creg declaration."""
@@ -23,6 +23,9 @@ if __name__ == '__main__':
     sys.path.append('.')
 
 import io
+import json
+import shutil
+import tempfile
 
 from pyzx.scripts import main
 
@@ -56,6 +59,24 @@ class TestScripts(unittest.TestCase):
         os.remove('tests/other_name.bla')
         sys.stdout = sys.__stdout__
 
+    def test_batch_optimize_and_resume(self):
+        sys.stdout = io.StringIO()
+        tmp = tempfile.mkdtemp()
+        try:
+            shutil.copy('tests/test_circuit.circuit', tmp)
+            dest = os.path.join(tmp, 'out')
+            main(['fakepath', 'batch', '-j', '1', '--timeout', '60', '-d', dest, tmp])
+            main(['fakepath', 'batch', '-j', '1', '-d', dest, tmp])
+            with open(os.path.join(dest, 'summary.jsonl')) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0]['status'], 'ok')
+            self.assertLessEqual(records[0]['after']['tcount'], records[0]['before']['tcount'])
+            assert os.path.isfile(os.path.join(dest, 'test_circuit.quipper'))
+        finally:
+            sys.stdout = sys.__stdout__
+            shutil.rmtree(tmp)
+
     def test_tikz_conversion(self):
         sys.stdout = io.StringIO()
         main('fakepath tikz tests/test_circuit.circuit tests/tikz_circuit.tikz'.split())
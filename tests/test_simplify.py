@@ -248,6 +248,47 @@ class TestSimplify(unittest.TestCase):
         self.assertTrue(g.num_vertices() == g1.num_vertices())
         self.assertTrue(compare_tensors(g1.to_tensor(),g.to_tensor()))
 
+    def test_parallel_matching(self):
+        from pyzx.utils import settings
+        processes, threshold = settings.match_processes, settings.parallel_match_threshold
+        results = []
+        try:
+            settings.parallel_match_threshold = 0
+            for n in (1, 2):
+                settings.match_processes = n
+                random.seed(SEED)
+                g = cliffordT(4, 60, 0.2)
+                g0 = g.copy()
+                full_reduce(g)
+                self.assertTrue(compare_tensors(g0, g))
+                results.append((sorted(g.vertices()), sorted(g.edges()), g.scalar.to_number()))
+        finally:
+            settings.match_processes, settings.parallel_match_threshold = processes, threshold
+        self.assertEqual(results[0], results[1])
+
+    def test_rewrite_trace_replay(self):
+        from pyzx.rewrite import RewriteTrace
+        g = cliffordT(4, 60, 0.2)
+        g1, g2 = g.copy(), g.copy()
+        with RewriteTrace.record() as trace:
+            full_reduce(g1)
+        self.assertTrue(any(matches for _, _, matches in trace.calls))
+        trace = RewriteTrace.from_bytes(trace.to_bytes())
+        with trace.replay():
+            full_reduce(g2)
+        self.assertIsNone(trace.mismatch)
+        self.assertEqual(trace.position, len(trace.calls))
+        self.assertEqual(sorted(g1.edges()), sorted(g2.edges()))
+        self.assertEqual(str(g1.scalar), str(g2.scalar))
+
+        # A different graph falls back to matching, and is still reduced correctly
+        g3 = cliffordT(4, 60, 0.2)
+        g4 = g3.copy()
+        with trace.replay():
+            full_reduce(g4)
+        self.assertIsNotNone(trace.mismatch)
+        self.assertTrue(compare_tensors(g3, g4))
+
 
 
 qasm_1 = """OPENQASM 2.0;
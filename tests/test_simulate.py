@@ -29,10 +29,14 @@ from pyzx.simulate import (
     replace_magic_states,
     cut_vertex,
     cut_edge,
-    gen_catlike_term
+    gen_catlike_term,
+    amplitude,
+    amplitudes,
+    verify_equality_sampled
 )
-from pyzx.generate import cliffords
+from pyzx.generate import cliffords, CNOT_HAD_PHASE_circuit
 from pyzx.simplify import full_reduce
+from pyzx.extract import extract_circuit
 
 np: Optional[ModuleType]
 try:
@@ -117,6 +121,54 @@ class TestSimulate(unittest.TestCase):
         # Check if the scalar from generated term is correct
         self.assertTrue(G.scalar.to_number() == s.to_number())
 
+    def test_amplitude_matches_matrix(self):
+        c = CNOT_HAD_PHASE_circuit(4, 40, p_t=0.2)
+        m = c.to_matrix()
+        pairs = []
+        for _ in range(6):
+            x = ''.join(random.choice('01') for _ in range(4))
+            y = ''.join(random.choice('01') for _ in range(4))
+            self.assertTrue(np.isclose(amplitude(c, y, x), m[int(x,2), int(y,2)]))
+            self.assertTrue(np.isclose(amplitude(c, y, x, max_terms=0), m[int(x,2), int(y,2)]))
+            pairs.append((y,x))
+        expected = [m[int(x,2), int(y,2)] for y,x in pairs]
+        self.assertTrue(np.allclose(amplitudes(c, pairs), expected))
+
+    def test_amplitude_wrong_number_of_bits(self):
+        c = CNOT_HAD_PHASE_circuit(3, 10)
+        with self.assertRaises(ValueError):
+            amplitude(c, '00', '000')
+        with self.assertRaises(ValueError):
+            amplitude(c, '002', '000')
+
+    def test_verify_equality_sampled(self):
+        c = CNOT_HAD_PHASE_circuit(5, 80, p_t=0.2)
+        g = c.to_graph()
+        full_reduce(g)
+        c2 = extract_circuit(g)
+        res = verify_equality_sampled(c, c2, chunk_size=20, seed=1)
+        self.assertTrue(res.equal)
+        self.assertEqual(res.confidence, 1.0)
+        self.assertIn('total', res.timings)
+        c3 = c2.copy()
+        c3.add_gate("T", 2)
+        res = c.verify_equality_sampled(c3, chunk_size=20, seed=1)
+        self.assertFalse(res.equal)
+        self.assertEqual(res.method, 'sampling')
+        self.assertEqual(res.confidence, 1.0)
+
+    def test_verify_equality_sampled_global_phase(self):
+        c = Circuit(2)
+        c.add_gate("Z", 0)
+        c.add_gate("NOT", 0)
+        c2 = Circuit(2)
+        c2.add_gate("NOT", 0)
+        c2.add_gate("Z", 0)
+        res = verify_equality_sampled(c, c2, seed=1)
+        self.assertTrue(res.equal)
+        res = verify_equality_sampled(c, c2, up_to_global_phase=False, seed=1)
+        self.assertFalse(res.equal)
+
 
 if __name__ == '__main__':
     unittest.main()
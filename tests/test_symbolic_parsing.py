@@ -302,5 +302,39 @@ class TestPolyConjugate(unittest.TestCase):
 
 
 
+class TestPolyCanonical(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = VarRegistry()
+        self.new_var = lambda name: new_var(name, False, self.registry)
+
+    def test_canonical_key_and_hash(self):
+        x, y = self.new_var("x"), self.new_var("y")
+        b = new_var("b", True, self.registry)
+        self.assertIs((x * y).terms[0][1].key, (y * x).terms[0][1].key)
+        self.assertEqual(x + y, y + x)
+        self.assertEqual(hash(x + y), hash(y + x))
+        self.assertEqual({x + y: 1}[y + x], 1)
+        self.assertEqual(x - x, 0)
+        self.assertEqual(b + b, 0)
+        self.assertEqual(x + 1 - x, 1)
+        p = x + y
+        h = hash(p)
+        p.terms = (x + x).terms
+        self.assertNotEqual(hash(p), h)
+        self.assertEqual(p, 2 * x)
+
+    def test_inplace_accumulation(self):
+        x, y = self.new_var("x"), self.new_var("y")
+        b = new_var("b", True, self.registry)
+        p = x + b
+        q = p.add_inplace(y).add_inplace(b).add_inplace(Fraction(3))
+        self.assertIs(p, q)
+        self.assertEqual(p, x + y + 3)
+        self.assertEqual(p.mod_inplace(2), x + y + 1)
+        self.assertEqual((x + y) * (x - y), x**2 - y**2)
+
+
+
 if __name__ == '__main__':
     unittest.main()
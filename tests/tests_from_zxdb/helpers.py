@@ -4,6 +4,9 @@ import time
 import pyzx as zx
 from pyzx.utils import VertexType, EdgeType
 
+# The fixtures are marked as patterns of this run, see the docstring of neo4j_queries
+FIXTURE_RUN_ID = "fixture"
+
 @dataclass
 class BackendRunResult:
     name: str
@@ -78,6 +81,7 @@ def _run_neo4j_query(
     run_params = dict(params or {})
     if "graph_id" not in run_params and hasattr(graph, "graph_id"):
         run_params["graph_id"] = graph.graph_id
+    run_params.setdefault("run_id", FIXTURE_RUN_ID)
 
     start = time.perf_counter()
     with graph._get_session() as session:
@@ -313,7 +317,7 @@ def make_bialgebra_fixture():
 
     return g
 
-def mark_bialgebra_fixture_pattern(db_graph, pattern_id="fixture_bialg"):
+def mark_bialgebra_fixture_pattern(db_graph, pattern_id=FIXTURE_RUN_ID + ":bialg"):
     with db_graph._get_session() as session:
         result = session.run(
             """
@@ -372,7 +376,7 @@ def make_hadamard_cancel_fixture():
     g.set_outputs((o,))
     return g
 
-def mark_hadamard_cancel_pattern(db_graph, pattern_id="fixture_hh"):
+def mark_hadamard_cancel_pattern(db_graph, pattern_id=FIXTURE_RUN_ID + ":hh"):
     with db_graph._get_session() as session:
         # mark the middle node (row=1 in the fixture)
         marked_nodes = session.run(
@@ -397,6 +401,34 @@ def mark_hadamard_cancel_pattern(db_graph, pattern_id="fixture_hh"):
 
     return marked_nodes
 
+def make_spider_fusion_fixture():
+    g = zx.Graph(backend="simple")
+    i = g.add_vertex(VertexType.BOUNDARY, qubit=0, row=0)
+    a = g.add_vertex(VertexType.Z, qubit=0, row=1, phase=0.25)
+    b = g.add_vertex(VertexType.Z, qubit=0, row=2, phase=0.25)
+    o = g.add_vertex(VertexType.BOUNDARY, qubit=0, row=3)
+
+    g.add_edge((i, a), edgetype=EdgeType.SIMPLE)
+    g.add_edge((a, b), edgetype=EdgeType.SIMPLE)
+    g.add_edge((b, o), edgetype=EdgeType.SIMPLE)
+
+    g.set_inputs((i,))
+    g.set_outputs((o,))
+    return g
+
+def mark_spider_fusion_pattern(db_graph, pattern_id=FIXTURE_RUN_ID + ":fuse"):
+    with db_graph._get_session() as session:
+        # mark the two spiders (rows 1 and 2 in the fixture) and the wire between them
+        return session.run(
+            """
+            MATCH (a:Node {graph_id: $graph_id})-[w:Wire]-(b:Node {graph_id: $graph_id})
+            WHERE toInteger(a.row) = 1 AND toInteger(b.row) = 2
+            SET a.pattern_id = $pattern_id, b.pattern_id = $pattern_id, w.pattern_id = $pattern_id
+            RETURN count(w) AS c
+            """,
+            {"graph_id": db_graph.graph_id, "pattern_id": pattern_id},
+        ).single()["c"]
+
 def _noop_rule(graph: Any) -> Any:
     """No-op rule for cases where PyZX has no equivalent primitive rewrite."""
     return None
@@ -567,7 +599,7 @@ def make_lcomp_fixture():
     return g
 
 
-def mark_lcomp_fixture_pattern(db_graph, pattern_id="fixture_lcomp"):
+def mark_lcomp_fixture_pattern(db_graph, pattern_id=FIXTURE_RUN_ID + ":lcomp"):
     """
     Marks the 4 internal nodes (center + 3 neighbors) by row.
     Assumes the fixture above: rows 1..4 are exactly those nodes.
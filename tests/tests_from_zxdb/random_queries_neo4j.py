@@ -1,3 +1,5 @@
+from pyzx.graph.db_phase import cypher_phase, cypher_phase_neg, cypher_phase_sum, cypher_set_phase
+
 BIALGEBRA_SIMPLIFICATION_MUTANT = """
 CALL () {
     // Work on exactly one marked pattern
@@ -349,7 +351,7 @@ CALL () {
   MATCH (center)-[:Wire]-(nbr:Node {graph_id:$graph_id})
   WHERE nbr.pattern_id = pid
   WITH pid, center, collect(DISTINCT nbr) AS neighbors,
-       coalesce(toFloat(center.phase), 0.0) AS cphase
+       """ + cypher_phase("center") + """ AS cphase
 
   // Toggle edges among neighbors:
   UNWIND range(0, size(neighbors)-2) AS i
@@ -362,10 +364,10 @@ CALL () {
   )
   FOREACH (rel IN es | DELETE rel)
 
-  // Update neighbor phases: subtract center phase (cast-safe)
+  // Update neighbor phases: subtract center phase
   WITH pid, center, neighbors, cphase
   FOREACH (n IN neighbors |
-    SET n.phase = coalesce(toFloat(n.phase), 0.0) - cphase
+    """ + cypher_set_phase("n", cypher_phase_sum(cypher_phase("n"), cypher_phase_neg("cphase"))) + """
   )
 
   DETACH DELETE center
@@ -0,0 +1,140 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.tests_from_zxdb._base_unittest_neo4j import Neo4jUnitTestCase
+from pyzx.graph.graph_neo4j import GraphNeo4j
+from pyzx.graph.neo4j_queries import CypherRewrites
+from .helpers import (
+    FIXTURE_RUN_ID,
+    load_simple_graph_into_neo4j,
+    make_hadamard_cancel_fixture,
+    make_lcomp_fixture,
+    make_spider_fusion_fixture,
+    mark_hadamard_cancel_pattern,
+    mark_lcomp_fixture_pattern,
+    mark_spider_fusion_pattern,
+    validate_db_only_rule,
+)
+
+
+class TestConcurrentRewrites(Neo4jUnitTestCase):
+    def setUp(self):
+        super().setUp()
+        self.g2 = GraphNeo4j(
+            uri=os.getenv("DB_URI", ""),
+            user=os.getenv("DB_USER", ""),
+            password=os.getenv("DB_PASSWORD", ""),
+            graph_id=f"test_graph_{uuid.uuid4().hex}",
+            database=os.getenv("NEO4J_DATABASE"),
+        )
+
+    def tearDown(self):
+        try:
+            self.g2.close()
+        finally:
+            super().tearDown()
+
+    def _rewrite(self, graph, query, key, run_id=FIXTURE_RUN_ID) -> int:
+        with graph._get_session() as session:
+            record = session.run(query, {"graph_id": graph.graph_id, "run_id": run_id}).single()
+        return record[key] if record else 0
+
+    def _cancel(self, graph, run_id=FIXTURE_RUN_ID) -> int:
+        return self._rewrite(graph, CypherRewrites.HADAMARD_EDGE_CANCELLATION, "patterns_processed", run_id)
+
+    def _lcomp(self, graph, run_id=FIXTURE_RUN_ID) -> int:
+        return self._rewrite(graph, CypherRewrites.LOCAL_COMPLEMENT, "num_processed", run_id)
+
+    def _fuse(self, graph, run_id=FIXTURE_RUN_ID) -> int:
+        return self._rewrite(graph, CypherRewrites.SPIDER_FUSION, "patterns_processed", run_id)
+
+    def _num_marked(self, graph) -> int:
+        with graph._get_session() as session:
+            return session.run(
+                "MATCH (n:Node {graph_id: $graph_id}) WHERE n.pattern_id IS NOT NULL RETURN count(n) AS c",
+                {"graph_id": graph.graph_id},
+            ).single()["c"]
+
+    def test_hadamard_cancel_on_two_graphs_at_once(self):
+        fixture = make_hadamard_cancel_fixture()
+        for graph in (self.g, self.g2):
+            load_simple_graph_into_neo4j(fixture, graph)
+            # The same pattern id in both graphs: only graph_id tells them apart
+            self.assertEqual(mark_hadamard_cancel_pattern(graph), 1)
+
+        # Another run does not pick up the patterns of this one
+        self.assertEqual(self._cancel(self.g, run_id="other_run"), 0)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            processed = list(pool.map(self._cancel, [self.g, self.g2]))
+        self.assertEqual(processed, [1, 1])
+
+        for graph in (self.g, self.g2):
+            report = validate_db_only_rule(
+                original_graph=fixture,
+                db_graph_after=graph,
+                db_return_value=[1],
+                qubits=1,
+                preserve_scalar=False,
+                require_fired=True,
+                check_boundary_counts=True,
+                print_results=False,
+            )
+            self.assertTrue(report["db_vs_original"])
+
+    def test_lcomp_on_two_graphs_at_once(self):
+        fixture = make_lcomp_fixture()
+        for graph in (self.g, self.g2):
+            load_simple_graph_into_neo4j(fixture, graph)
+            self.assertEqual(mark_lcomp_fixture_pattern(graph), 4)
+
+        # Another run neither rewrites the patterns of this one nor clears their markers
+        self.assertEqual(self._lcomp(self.g, run_id="other_run"), 0)
+        self.assertEqual(self._num_marked(self.g), 4)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            processed = list(pool.map(self._lcomp, [self.g, self.g2]))
+        self.assertEqual(processed, [1, 1])
+
+        for graph in (self.g, self.g2):
+            self.assertEqual(self._num_marked(graph), 0)
+            report = validate_db_only_rule(
+                original_graph=fixture,
+                db_graph_after=graph,
+                db_return_value=[1],
+                qubits=1,
+                preserve_scalar=False,
+                require_fired=True,
+                check_boundary_counts=True,
+                print_results=False,
+            )
+            self.assertTrue(report["db_vs_original"])
+
+    def test_spider_fusion_on_two_graphs_at_once(self):
+        fixture = make_spider_fusion_fixture()
+        for graph in (self.g, self.g2):
+            load_simple_graph_into_neo4j(fixture, graph)
+            self.assertEqual(mark_spider_fusion_pattern(graph), 1)
+
+        # Another run neither fuses the spiders of this one nor clears their markers
+        self.assertEqual(self._fuse(self.g, run_id="other_run"), 0)
+        self.assertEqual(self._num_marked(self.g), 2)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            processed = list(pool.map(self._fuse, [self.g, self.g2]))
+        self.assertEqual(processed, [1, 1])
+
+        for graph in (self.g, self.g2):
+            self.assertEqual(self._num_marked(graph), 0)
+            report = validate_db_only_rule(
+                original_graph=fixture,
+                db_graph_after=graph,
+                db_return_value=[1],
+                qubits=1,
+                preserve_scalar=False,
+                require_fired=True,
+                check_boundary_counts=True,
+                print_results=False,
+            )
+            self.assertTrue(report["db_vs_original"])
@@ -0,0 +1,106 @@
+import os
+import re
+import unittest
+import uuid
+from typing import Any, Dict
+
+from pyzx.graph.graph_memgraph import GraphMemgraph
+from pyzx.graph.memgraph_queries import ZXQueryStore
+from .helpers import make_hadamard_cancel_fixture, make_spider_fusion_fixture
+
+# A scan over all nodes, or all nodes of a label, instead of an index lookup on graph_id
+_FULL_SCAN = re.compile(r"ScanAll(ByLabel)?\s")
+
+
+class TestMemgraphQueryProfile(unittest.TestCase):
+    """PROFILE of the ZXQueryStore queries: requires a reachable Memgraph."""
+
+    def setUp(self):
+        if not all(os.getenv(k) for k in ("DB_URI", "DB_USER", "DB_PASSWORD")):
+            raise unittest.SkipTest("Memgraph env vars missing (DB_URI/DB_USER/DB_PASSWORD).")
+        self.graph_ids = []
+        self.g = self._graph()
+        try:
+            self.g.driver.verify_connectivity()
+            agent = self.g.driver.get_server_info().agent
+        except Exception as e:
+            self.g.close()
+            raise unittest.SkipTest(f"Memgraph not reachable: {e}")
+        if "memgraph" not in agent.lower():
+            self.g.close()
+            raise unittest.SkipTest(f"Not a Memgraph server: {agent}")
+        self.g.init_indices()
+        self.store = ZXQueryStore()
+
+    def tearDown(self):
+        try:
+            with self.g._get_session() as session:
+                session.run(
+                    "MATCH (n:Node) WHERE n.graph_id IN $graph_ids DETACH DELETE n",
+                    {"graph_ids": self.graph_ids},
+                ).consume()
+        finally:
+            self.g.close()
+
+    def _graph(self, fixture=None) -> GraphMemgraph:
+        graph_id = f"test_graph_{uuid.uuid4().hex}"
+        self.graph_ids.append(graph_id)
+        kwargs: Dict[str, Any] = {
+            "uri": os.getenv("DB_URI", ""),
+            "user": os.getenv("DB_USER", ""),
+            "password": os.getenv("DB_PASSWORD", ""),
+            "graph_id": graph_id,
+            "database": os.getenv("MEMGRAPH_DATABASE"),
+        }
+        if fixture is None:
+            return GraphMemgraph(**kwargs)
+        return GraphMemgraph.from_graph_s(fixture, **kwargs)
+
+    def _profile(self, query_name, fixture):
+        """Loads the fixture as a new graph, runs the query on it under PROFILE
+        and returns the operators of the plan and their total number of hits."""
+        graph = self._graph(fixture)
+        try:
+            with graph._get_session() as session:
+                rows = session.run(
+                    "PROFILE " + self.store.get(query_name),
+                    {"graph_id": graph.graph_id, "batch_size": self.store.default_batch_size(query_name)},
+                ).data()
+        finally:
+            graph.close()
+        operators = [row["OPERATOR"] for row in rows]
+        return operators, sum(row["ACTUAL HITS"] for row in rows)
+
+    def _add_other_graph(self, n):
+        """Adds n chains of another graph, each with a Hadamard-wrapped spider pair, to the database."""
+        other = self._graph()
+        with self.g._get_session() as session:
+            session.run(
+                """
+                UNWIND range(1, $n) AS i
+                CREATE (:Node {graph_id: $other, t: 0})-[:Wire {t: 2}]->(:Node {graph_id: $other, t: 1, phase_n: 0, phase_d: 1})
+                       -[:Wire {t: 1}]->(:Node {graph_id: $other, t: 1, phase_n: 0, phase_d: 1})
+                       -[:Wire {t: 2}]->(:Node {graph_id: $other, t: 0})
+                """,
+                {"n": n, "other": other.graph_id},
+            ).consume()
+        other.close()
+
+    def _assert_anchored(self, query_name, fixture):
+        operators, hits = self._profile(query_name, fixture)
+        self.assertFalse([op for op in operators if _FULL_SCAN.search(op)], operators)
+        self.assertTrue(any("ScanAllByLabelPropert" in op for op in operators), operators)
+
+        # Nodes of another graph in the same database must not make the rewrite more expensive
+        self._add_other_graph(2000)
+        self.assertLessEqual(self._profile(query_name, fixture)[1], hits + 10)
+
+    def test_hadamard_edge_cancellation(self):
+        self._assert_anchored("hadamard_edge_cancellation", make_hadamard_cancel_fixture())
+
+    def test_spider_fusion_rewrite(self):
+        self._assert_anchored("spider_fusion_rewrite", make_spider_fusion_fixture())
+
+
+if __name__ == '__main__':
+    unittest.main()
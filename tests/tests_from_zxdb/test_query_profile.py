@@ -0,0 +1,43 @@
+from tests.tests_from_zxdb._base_unittest_neo4j import Neo4jUnitTestCase
+from pyzx.graph.neo4j_queries import CypherRewrites
+from .helpers import (
+    FIXTURE_RUN_ID,
+    load_simple_graph_into_neo4j,
+    make_hadamard_cancel_fixture,
+    mark_hadamard_cancel_pattern,
+)
+
+
+def _db_hits(plan) -> int:
+    """Total number of database hits of a PROFILE plan."""
+    return plan.get("dbHits", 0) + sum(_db_hits(c) for c in plan.get("children", []))
+
+
+class TestQueryProfile(Neo4jUnitTestCase):
+    def _profile_hadamard_cancel(self) -> int:
+        load_simple_graph_into_neo4j(make_hadamard_cancel_fixture(), self.g)
+        self.assertEqual(mark_hadamard_cancel_pattern(self.g), 1)
+        with self.g._get_session() as session:
+            summary = session.run(
+                "PROFILE " + CypherRewrites.HADAMARD_EDGE_CANCELLATION,
+                {"graph_id": self.graph_id, "run_id": FIXTURE_RUN_ID},
+            ).consume()
+        self.assertEqual(summary.counters.nodes_deleted, 1)
+        return _db_hits(summary.profile)
+
+    def test_hadamard_cancel_db_hits_do_not_grow_with_database(self):
+        self.g.init_indices()
+        hits = self._profile_hadamard_cancel()
+        self.assertLess(hits, 200)
+
+        # Chains of another graph in the same database must not make the rewrite more expensive
+        with self.g._get_session() as session:
+            session.run(
+                """
+                UNWIND range(1, $n) AS i
+                CREATE (:Node {graph_id: $other, t: 0})-[:Wire {t: 2}]->(:Node {graph_id: $other, t: 1, phase_n: 0, phase_d: 1})
+                       -[:Wire {t: 2}]->(:Node {graph_id: $other, t: 0})
+                """,
+                {"n": 2000, "other": self.graph_id + "_other"},
+            ).consume()
+        self.assertLessEqual(self._profile_hadamard_cancel(), hits + 10)